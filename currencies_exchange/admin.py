@@ -1,7 +1,12 @@
-from django.db.models import F
-from django.contrib import admin
+from django.db.models import F, Q
+from django.contrib import admin, messages
+from django.utils.timezone import now
 from .forms import CurrencyRateForm
-from .models import Currency, CurrencyRate
+from .models import Currency, CurrencyRate, RateFetchJob
+from .settings import ADMIN_CURRENCY_AUTOCOMPLETE, ADMIN_ESTIMATED_COUNT, ADMIN_QUEUE_RATE_FETCHES
+from .pagination import EstimatedCountPaginator
+from django.core.paginator import Paginator
+from .services import rate_currency_codes, search_currency_ids
 from django.contrib.auth.models import Group, User
 
 admin.site.unregister(User)
@@ -30,6 +35,14 @@ class CurrencyAdmin(admin.ModelAdmin):
         """
         return False
 
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Override to look the search term up in the currency search index.
+        """
+        if not search_term.split():
+            return queryset, False
+        return queryset.filter(id__in=search_currency_ids(search_term)), False
+
 
 class CurrencyBaseCodeFilter(admin.SimpleListFilter):
     """
@@ -41,9 +54,10 @@ class CurrencyBaseCodeFilter(admin.SimpleListFilter):
     def lookups(self, request, model_admin):
         """
         Returns a list of tuples representing the choices for the filter.
+
+        The codes are cached until the next rate write.
         """
-        queryset = CurrencyRate.objects.values_list('currency_base__currency_code', flat=True).distinct()
-        return [(code, code) for code in queryset]
+        return [(code, code) for code in rate_currency_codes('currency_base')]
 
     def queryset(self, request, queryset):
         """
@@ -64,9 +78,10 @@ class CurrencyTargetCodeFilter(admin.SimpleListFilter):
     def lookups(self, request, model_admin):
         """
         Returns a list of tuples representing the choices for the filter.
+
+        The codes are cached until the next rate write.
         """
-        queryset = CurrencyRate.objects.values_list('currency_target__currency_code', flat=True).distinct()
-        return [(code, code) for code in queryset]
+        return [(code, code) for code in rate_currency_codes('currency_target')]
 
     def queryset(self, request, queryset):
         """
@@ -81,12 +96,26 @@ class CurrencyTargetCodeFilter(admin.SimpleListFilter):
 class CurrencyRateAdmin(admin.ModelAdmin):
     """
     Admin configuration for the CurrencyRate model.
+
+    The changelist is ordered by ID alone, which the primary key serves without sorting.
+    With ADMIN_ESTIMATED_COUNT the unfiltered changelist count is estimated and the full
+    count next to filtered results is not shown, so that no page load counts the whole table.
+    With ADMIN_CURRENCY_AUTOCOMPLETE the form currencies are searched as the user types,
+    through the CurrencyAdmin search, instead of being sent inline. With
+    ADMIN_QUEUE_RATE_FETCHES a rate that cannot be derived is saved as pending and fetched
+    by the run_workers command, so that saving never waits for the external API; the
+    changelist shows the state of its fetch until it is filled.
     """
     search_fields = ['currency_base__currency_code', 'currency_target__currency_code']
-    list_display = ['id', 'currency_base_code', 'currency_target_code', 'rate', 'history_date']
+    list_display = ['id', 'currency_base_code', 'currency_target_code', 'rate_value', 'history_date']
+    actions = ['retry_fetches']
     form = CurrencyRateForm
     list_per_page = 10
     list_filter = [CurrencyBaseCodeFilter, CurrencyTargetCodeFilter]
+    ordering = ['-id']
+    autocomplete_fields = ['currency_base', 'currency_target'] if ADMIN_CURRENCY_AUTOCOMPLETE else []
+    paginator = EstimatedCountPaginator if ADMIN_ESTIMATED_COUNT else Paginator
+    show_full_result_count = not ADMIN_ESTIMATED_COUNT
 
     def get_queryset(self, request):
         """
@@ -96,6 +125,22 @@ class CurrencyRateAdmin(admin.ModelAdmin):
         return queryset.annotate(currency_base_code=F('currency_base__currency_code'),
                                  currency_target_code=F('currency_target__currency_code'))
 
+    def get_changelist_instance(self, request):
+        """
+        Returns the changelist, with the fetch state of the pending rates of its page.
+
+        The states are read for the pending rows of the page only, with one query, rather
+        than joined to every changelist and count query, as almost no rate is pending.
+        """
+        changelist = super().get_changelist_instance(request)
+        changelist.result_list = list(changelist.result_list)
+        pending = {obj.id: obj for obj in changelist.result_list if obj.rate is None}
+        if pending:
+            for rate_id, state, error in RateFetchJob.objects.filter(rate_id__in=pending).values_list(
+                    'rate_id', 'state', 'last_error'):
+                pending[rate_id].fetch_state, pending[rate_id].fetch_error = state, error
+        return changelist
+
     def currency_base_code(self, obj):
         """
         Returns the currency base code for display in the admin list view.
@@ -108,12 +153,55 @@ class CurrencyRateAdmin(admin.ModelAdmin):
         """
         return obj.currency_target_code
 
+    def rate_value(self, obj):
+        """
+        Returns the rate, or the state of its queued fetch while it is pending.
+        """
+        if obj.rate is not None:
+            return obj.rate
+        if getattr(obj, 'fetch_state', None) == RateFetchJob.FAILED:
+            return f'Fetch failed: {obj.fetch_error}'
+        return 'Pending'
+
+    rate_value.admin_order_field = 'rate'
+    rate_value.short_description = 'Currency Rate'
+
     currency_base_code.admin_order_field = 'currency_base__currency_code'
     currency_base_code.short_description = 'Currency Base Code'
 
     currency_target_code.admin_order_field = 'currency_target__currency_code'
     currency_target_code.short_description = 'Currency Target Code'
 
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Override to look every word of the search term up in the currency codes of the search index.
+
+        A rate matches when its base or target currency code starts with each word.
+        """
+        for word in search_term.split():
+            ids = search_currency_ids(word, column='currency_code')
+            queryset = queryset.filter(Q(currency_base_id__in=ids) | Q(currency_target_id__in=ids))
+        return queryset, False
+
+    def save_model(self, request, obj, form, change):
+        """
+        Saves the rate, queuing the fetch of a rate that cannot be derived with ADMIN_QUEUE_RATE_FETCHES.
+        """
+        obj.save(fetch_rate=not ADMIN_QUEUE_RATE_FETCHES)
+        if obj.rate is None:
+            self.message_user(request, f'The rate of {obj.currency_base.currency_code}/'
+                                       f'{obj.currency_target.currency_code} on {obj.history_date} is pending, '
+                                       f'it is fetched in the background.', messages.INFO)
+
+    @admin.action(description='Retry the failed fetches of the selected rates')
+    def retry_fetches(self, request, queryset):
+        """
+        Queues the failed fetches of the selected rates again.
+        """
+        count = RateFetchJob.objects.filter(rate__in=queryset.values('id'), state=RateFetchJob.FAILED).update(
+            state=RateFetchJob.QUEUED, attempts=0, run_after=now(), last_error='')
+        self.message_user(request, f'Queued {count} failed fetches again.', messages.SUCCESS)
+
     def get_form(self, request, obj=None, **kwargs):
         """
         Returns the form to be used in the admin view.
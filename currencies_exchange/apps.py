@@ -0,0 +1,18 @@
+from django.apps import AppConfig
+
+
+class CurrenciesExchangeConfig(AppConfig):
+    """
+    Application configuration for the currencies_exchange app.
+
+    Methods:
+        ready(): Connects the model signal handlers.
+    """
+
+    name = 'currencies_exchange'
+
+    def ready(self):
+        """
+        Connects the model signal handlers once the app registry is ready.
+        """
+        from . import signals  # noqa: F401
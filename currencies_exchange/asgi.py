@@ -13,4 +13,26 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'currencies_exchange.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from currencies_exchange.services import close_async_client, keep_async_client  # noqa: E402
+
+
+async def application(scope, receive, send):
+    """
+    Serves the Django application and handles the lifespan protocol of the ASGI server.
+
+    On startup the event loop of the server keeps its currencyapi client and connections
+    for all the requests of the process, they are closed on shutdown.
+    """
+    if scope['type'] != 'lifespan':
+        return await django_application(scope, receive, send)
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            keep_async_client()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await close_async_client()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
@@ -0,0 +1,173 @@
+"""
+Load benchmark of rate lookups that miss the database, served over WSGI and over ASGI.
+
+Starts the currencyapi stand-in (see currencies_exchange.standin) with the requested
+latency and sends the same set of /rates/lookup/ requests, none of whose rates is stored,
+so that every request waits for an upstream call. The WSGI path serves them from a pool
+of worker threads, like a threaded WSGI server, where every pending upstream call holds
+a worker. The ASGI path serves them on a single event loop with the given number of
+requests in flight, over at most CURRENCY_API_ASYNC_MAX_CONNECTIONS upstream connections.
+Both run in-process through Django's handlers and the full middleware stack; reports the
+throughput and the latency percentiles of every run.
+
+Example:
+    python -m currencies_exchange.benchmarks.async_lookups --requests 500 --workers 8 --concurrency 8 64 256
+"""
+
+import os
+import time
+import random
+import asyncio
+import threading
+from io import StringIO
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from currencies_exchange.benchmarks import support
+from currencies_exchange.standin import start_server
+
+LOOKUP_URL = '/rates/lookup/'
+
+
+def lookups(codes, count, rng):
+    """
+    Returns distinct lookup queries of random pairs and dates.
+    """
+    queries = set()
+    while len(queries) < count:
+        base, target = rng.sample(codes, 2)
+        queries.add((base, target, support.SEED_START_DATE + timedelta(days=rng.randrange(3650))))
+    return [{'currency_base': base, 'currency_target': target, 'date': day.isoformat()}
+            for base, target, day in sorted(queries)]
+
+
+def result(timings, seconds):
+    """
+    Returns the latency percentiles and the throughput of a run.
+    """
+    return dict(support.summarize(timings), seconds=seconds, requests_per_second=len(timings) / seconds)
+
+
+def run_wsgi(queries, workers):
+    """
+    Serves the queries through the WSGI path from a pool of worker threads.
+
+    Returns:
+        dict: The latency percentiles and the throughput.
+    """
+    from django.db import connections
+    from django.test import Client
+
+    local = threading.local()
+
+    def request(params):
+        if not hasattr(local, 'client'):
+            local.client = Client()
+        started = time.perf_counter()
+        response = local.client.get(LOOKUP_URL, params)
+        elapsed = (time.perf_counter() - started) * 1000
+        connections.close_all()
+        if response.status_code != 200:
+            raise RuntimeError(f'Lookup failed with {response.status_code}: {response.content[:200]}')
+        return elapsed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        timings = list(executor.map(request, queries))
+    return result(timings, time.perf_counter() - started)
+
+
+async def run_asgi(queries, concurrency):
+    """
+    Serves the queries through the ASGI path on one event loop, up to concurrency at a time.
+
+    Returns:
+        dict: The latency percentiles and the throughput.
+    """
+    from django.test import AsyncClient
+    from currencies_exchange.services import close_async_client, keep_async_client
+
+    client = AsyncClient()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def request(params):
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.get(LOOKUP_URL, params)
+            elapsed = (time.perf_counter() - started) * 1000
+        if response.status_code != 200:
+            raise RuntimeError(f'Lookup failed with {response.status_code}: {response.content[:200]}')
+        return elapsed
+
+    keep_async_client()
+    started = time.perf_counter()
+    timings = await asyncio.gather(*(request(params) for params in queries))
+    seconds = time.perf_counter() - started
+    await close_async_client()
+    return result(timings, seconds)
+
+
+def run(options):
+    """
+    Runs the lookups once over WSGI and once per ASGI concurrency level.
+
+    Args:
+        options (argparse.Namespace): The parsed benchmark arguments.
+
+    Returns:
+        dict: A mapping of run name to its latency percentiles and throughput.
+    """
+    server = start_server(currencies=options.currencies, latency=options.latency, seed=options.seed)
+    os.environ['CURRENCY_API_BASE_URL'] = server.url
+    os.environ['CURRENCY_API_RATE_LIMIT'] = '0'
+    os.environ['CURRENCY_API_POOL_SIZE'] = str(options.workers)
+    support.setup(options.database)
+
+    from django.core.management import call_command
+    from currencies_exchange.models import Currency, CurrencyRate
+    from currencies_exchange.services import invalidate_snapshot
+
+    call_command('pull_currencies', stdout=StringIO())
+    queries = lookups(list(Currency.objects.values_list('currency_code', flat=True)), options.requests,
+                      random.Random(options.seed))
+    print(f'Stand-in at {server.url}: {options.requests} lookups missing the database, latency {options.latency}')
+
+    def reset():
+        CurrencyRate.objects.all().delete()
+        invalidate_snapshot()
+
+    results = {}
+    try:
+        reset()
+        results[f'wsgi_{options.workers}_threads'] = run_wsgi(queries, options.workers)
+        for concurrency in options.concurrency:
+            reset()
+            results[f'asgi_{concurrency}_in_flight'] = asyncio.run(run_asgi(queries, concurrency))
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+def main(argv=None):
+    """
+    Runs the benchmark from the command line and prints the throughputs and latencies.
+    """
+    parser = support.create_parser(__doc__.strip().splitlines()[0])
+    parser.set_defaults(currencies=40)
+    parser.add_argument('--requests', type=int, default=500, help='Number of lookups per run')
+    parser.add_argument('--workers', type=int, default=8, help='Worker threads of the WSGI run')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[8, 64, 256],
+                        help='Requests in flight of the ASGI runs')
+    parser.add_argument('--latency', default='lognormal:100:0.3', help='Latency of the stand-in, see LatencyModel')
+    options = parser.parse_args(argv)
+
+    results = run(options)
+    width = max(len(name) for name in results)
+    print(f'{"run":<{width}}  {"seconds":>8}  {"req/s":>8}  {"p50 ms":>8}  {"p95 ms":>8}  {"max ms":>8}')
+    for name, stats in results.items():
+        print(f'{name:<{width}}  {stats["seconds"]:>8.2f}  {stats["requests_per_second"]:>8.1f}  '
+              f'{stats["p50_ms"]:>8.1f}  {stats["p95_ms"]:>8.1f}  {stats["max_ms"]:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark of rate reads while rates are being ingested.
+
+Reader threads look rates up by pair and date while a writer thread inserts new rates in
+batched transactions, like backfill_rates does. The run is repeated with the rollback
+journal, with the WAL journal of the database profile, and with the readers on the read
+replica, and reports the read latencies and the read and write throughputs of each.
+
+Example:
+    python -m currencies_exchange.benchmarks.concurrent_reads --rows 1000000 --readers 4 --duration 5
+"""
+
+import time
+import random
+import threading
+from datetime import timedelta
+from contextlib import nullcontext
+from currencies_exchange.benchmarks import support
+
+PROFILES = {
+    'rollback_journal': ('DELETE', 'FULL', False),
+    'wal': ('WAL', 'NORMAL', False),
+    'wal_replica': ('WAL', 'NORMAL', True),
+}
+
+
+def run(options):
+    """
+    Seeds the scratch database and times the reads under ingest for every profile.
+
+    Args:
+        options (argparse.Namespace): The parsed benchmark arguments.
+
+    Returns:
+        dict: A mapping of operation name to its timings.
+    """
+    support.setup(options.database)
+    dataset = support.seed(options.currencies, options.rows, options.pairs, options.seed)
+
+    from django.conf import settings
+    from django.db import connection, connections, transaction
+    from currencies_exchange.models import CurrencyRate
+    from currencies_exchange.database import replica_reads, sync_replica
+
+    print(f'Seeded {len(dataset.currency_ids)} currencies and {dataset.rows} rates')
+    next_date = [dataset.dates[-1]]
+    results = {}
+
+    for name, (journal_mode, synchronous, use_replica) in PROFILES.items():
+        settings.SQLITE_JOURNAL_MODE, settings.SQLITE_SYNCHRONOUS = journal_mode, synchronous
+        connections.close_all()
+        connection.ensure_connection()
+        if use_replica:
+            sync_replica()
+        connections.close_all()
+
+        stop = threading.Event()
+        timings, written = [], [0]
+
+        def read(index):
+            rng = random.Random(options.seed + index)
+            local = []
+            with replica_reads() if use_replica else nullcontext():
+                while not stop.is_set():
+                    (base, target), history_date = rng.choice(dataset.pairs), rng.choice(dataset.dates)
+                    started = time.perf_counter()
+                    CurrencyRate.objects.filter(currency_base_id=base, currency_target_id=target,
+                                                history_date=history_date).values_list('rate', flat=True).first()
+                    local.append((time.perf_counter() - started) * 1000)
+            timings.extend(local)
+            connection.close()
+
+        def write():
+            while not stop.is_set():
+                next_date[0] += timedelta(days=1)
+                with transaction.atomic():
+                    CurrencyRate.objects.bulk_create([
+                        CurrencyRate(currency_base_id=base, currency_target_id=target, rate=1.0,
+                                     history_date=next_date[0])
+                        for base, target in dataset.pairs[:options.write_batch]
+                    ])
+                written[0] += min(options.write_batch, len(dataset.pairs))
+            connection.close()
+
+        threads = [threading.Thread(target=read, args=(index,)) for index in range(options.readers)]
+        threads.append(threading.Thread(target=write))
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(options.duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        results[f'read_{name}'] = support.summarize(timings)
+        print(f'{name}: {len(timings) / elapsed:.0f} reads/s, {written[0] / elapsed:.0f} rows/s written')
+    return results
+
+
+def main(argv=None):
+    """
+    Runs the benchmark from the command line and prints the timings.
+    """
+    parser = support.create_parser(__doc__.strip().splitlines()[0])
+    parser.add_argument('--readers', type=int, default=4, help='Number of reader threads')
+    parser.add_argument('--duration', type=float, default=5, help='Seconds every profile runs for')
+    parser.add_argument('--write-batch', type=int, default=500, help='Number of rates inserted per transaction')
+    options = parser.parse_args(argv)
+    support.print_results('Reads under ingest', run(options))
+
+
+if __name__ == '__main__':
+    main()
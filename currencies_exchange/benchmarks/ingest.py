@@ -0,0 +1,104 @@
+"""
+Benchmark of the backfill_rates ingest against the local currencyapi stand-in.
+
+Starts the stand-in server (see currencies_exchange.standin) with the requested latency,
+rate limit and error injection, points CURRENCY_API_BASE_URL at it and runs backfill_rates
+once per concurrency level on an empty rate table. Reports the wall time, the call and row
+throughputs, the client retries and failures and the 429 responses of the stand-in, so that
+concurrency, retry and rate limit changes can be compared reproducibly.
+
+Example:
+    python -m currencies_exchange.benchmarks.ingest --days 60 --concurrency 1 4 16 --latency lognormal:80:0.5
+"""
+
+import os
+import time
+from datetime import timedelta
+from io import StringIO
+from currencies_exchange.benchmarks import support
+from currencies_exchange.standin import start_server
+
+
+def run(options):
+    """
+    Runs backfill_rates against the stand-in for every concurrency level.
+
+    Args:
+        options (argparse.Namespace): The parsed benchmark arguments.
+
+    Returns:
+        dict: A mapping of concurrency level to its throughput and error counters.
+    """
+    server = start_server(currencies=options.currencies, latency=options.latency, rate_limit=options.rate_limit,
+                          burst=options.burst, error_rate=options.error_rate, seed=options.seed)
+    os.environ['CURRENCY_API_BASE_URL'] = server.url
+    os.environ['CURRENCY_API_RATE_LIMIT'] = str(options.client_rate_limit)
+    os.environ['CURRENCY_API_BACKOFF'] = str(options.backoff)
+    support.setup(options.database)
+
+    from django.core.management import call_command
+    from currencies_exchange.models import Currency, CurrencyRate
+    from currencies_exchange.services import get_client
+
+    call_command('pull_currencies', stdout=StringIO())
+    codes = list(Currency.objects.values_list('currency_code', flat=True))
+    start = support.SEED_START_DATE
+    end = start + timedelta(days=options.days - 1)
+    bases = codes[:options.bases]
+    print(f'Stand-in at {server.url}: {len(codes)} currencies, {len(bases)} bases, {options.days} days, '
+          f'latency {options.latency}, rate limit {options.rate_limit}/s, error rate {options.error_rate}')
+
+    results = {}
+    try:
+        for concurrency in options.concurrency:
+            CurrencyRate.objects.all().delete()
+            before = get_client().stats().get('historical', {})
+            counters = dict(server.counters)
+            started = time.perf_counter()
+            call_command('backfill_rates', '--base', *bases, '--start', start.isoformat(), '--end', end.isoformat(),
+                         '--concurrency', str(concurrency), stdout=StringIO())
+            elapsed = time.perf_counter() - started
+            after = get_client().stats()['historical']
+            calls = after['calls'] - before.get('calls', 0)
+            results[concurrency] = {
+                'seconds': elapsed,
+                'calls_per_second': calls / elapsed,
+                'rows_per_second': CurrencyRate.objects.count() / elapsed,
+                'retries': after['retries'] - before.get('retries', 0),
+                'failed': after['errors'] - before.get('errors', 0),
+                'rate_limited': server.counters['rate_limited'] - counters['rate_limited'],
+            }
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+def main(argv=None):
+    """
+    Runs the benchmark from the command line and prints the throughputs.
+    """
+    parser = support.create_parser(__doc__.strip().splitlines()[0])
+    parser.set_defaults(currencies=40)
+    parser.add_argument('--bases', type=int, default=2, help='Number of base currencies to backfill')
+    parser.add_argument('--days', type=int, default=30, help='Number of days to backfill')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16], help='Concurrency levels to run')
+    parser.add_argument('--latency', default='lognormal:80:0.5', help='Latency of the stand-in, see LatencyModel')
+    parser.add_argument('--rate-limit', type=float, default=0, help='Requests per second allowed by the stand-in')
+    parser.add_argument('--burst', type=int, default=10, help='Burst allowed by the stand-in rate limit')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of stand-in requests failing')
+    parser.add_argument('--client-rate-limit', type=float, default=0, help='CURRENCY_API_RATE_LIMIT of the client')
+    parser.add_argument('--backoff', type=float, default=0.05, help='CURRENCY_API_BACKOFF of the client')
+    options = parser.parse_args(argv)
+
+    results = run(options)
+    print(f'{"concurrency":>11}  {"seconds":>8}  {"calls/s":>8}  {"rows/s":>9}  {"retries":>7}  '
+          f'{"failed":>6}  {"429s":>5}')
+    for concurrency, stats in results.items():
+        print(f'{concurrency:>11}  {stats["seconds"]:>8.2f}  {stats["calls_per_second"]:>8.1f}  '
+              f'{stats["rows_per_second"]:>9.1f}  {stats["retries"]:>7}  {stats["failed"]:>6}  '
+              f'{stats["rate_limited"]:>5}')
+
+
+if __name__ == '__main__':
+    main()
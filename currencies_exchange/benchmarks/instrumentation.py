@@ -0,0 +1,73 @@
+"""
+Benchmark of the overhead of the request metrics middleware.
+
+Times the currency list, a page of the rate list and a conversion through the full
+middleware stack with METRICS_ENABLED off and on, alternating rounds to even out noise,
+and prints the relative overhead of the instrumentation per endpoint.
+
+Example:
+    python -m currencies_exchange.benchmarks.instrumentation --rows 200000 --repeat 2000
+"""
+
+from currencies_exchange.benchmarks import support
+
+ROUNDS = 4
+
+
+def run(options):
+    """
+    Seeds the scratch database and times the endpoints with and without metrics.
+
+    Args:
+        options (argparse.Namespace): The parsed benchmark arguments.
+
+    Returns:
+        dict: A mapping of operation name to its timings.
+    """
+    support.setup(options.database)
+    dataset = support.seed(options.currencies, options.rows, options.pairs, options.seed)
+
+    from django.conf import settings
+    from django.test import Client
+
+    history_date = dataset.dates[0].isoformat()
+    codes = list(dataset.currency_ids)
+    requests = {
+        'currency_list': lambda client: client.get('/currency/'),
+        'rate_page': lambda client: client.get('/rates/', {'page_size': 100}),
+        'convert': lambda client: client.post('/convert/', [{'amount': 1, 'from': codes[1], 'to': codes[2],
+                                                             'date': history_date}], content_type='application/json'),
+    }
+
+    timings = {f'{name}_{mode}': [] for name in requests for mode in ('off', 'on')}
+    for _ in range(ROUNDS):
+        for mode in ('off', 'on'):
+            settings.METRICS_ENABLED = mode == 'on'
+            client = Client()
+            for name, request in requests.items():
+                request(client)
+                stats = support.measure(lambda index: request(client), options.repeat // ROUNDS)
+                timings[f'{name}_{mode}'].append(stats)
+
+    results = {}
+    for name in timings:
+        rounds = timings[name]
+        results[name] = {key: sum(stats[key] for stats in rounds) / len(rounds) for key in rounds[0]}
+    for name in requests:
+        off, on = results[f'{name}_off']['p50_ms'], results[f'{name}_on']['p50_ms']
+        print(f'{name}: median {off:.3f} ms without metrics, {on:.3f} ms with metrics ({(on / off - 1) * 100:+.1f}%)')
+    return results
+
+
+def main(argv=None):
+    """
+    Runs the benchmark from the command line and prints the timings.
+    """
+    parser = support.create_parser(__doc__.strip().splitlines()[0])
+    parser.set_defaults(rows=200000, repeat=2000)
+    options = parser.parse_args(argv)
+    support.print_results('Metrics overhead', run(options))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark of the request latency overhead of logging.
+
+Times the currency list and a page of the rate list through the full middleware stack
+with SQL statement logging enabled (like DEBUG=True does), under three logging setups:
+no logging, the former synchronous DEBUG FileHandler writing every statement, and the
+queued JSON pipeline of settings.LOGGING with its sampling of django.db.backends.
+Rounds alternate between the setups to even out noise.
+
+Example:
+    python -m currencies_exchange.benchmarks.logging_overhead --rows 200000 --repeat 2000
+"""
+
+import os
+import tempfile
+import logging.config
+from currencies_exchange.benchmarks import support
+
+ROUNDS = 4
+
+
+def logging_configs(directory):
+    """
+    Returns the compared logging configurations, writing their files into a directory.
+    """
+    from currencies_exchange import settings as project_settings
+
+    queued = dict(project_settings.LOGGING)
+    queued['handlers'] = {'file': {**project_settings.LOGGING['handlers']['file'], 'level': 'DEBUG',
+                                   'filename': os.path.join(directory, 'queued.log')}}
+    queued['loggers'] = {name: {**logger, 'level': 'DEBUG'} for name, logger in queued['loggers'].items()}
+    return {
+        'off': {'version': 1, 'disable_existing_loggers': False, 'loggers': {'django': {'level': 'CRITICAL'}}},
+        'sync_file': {
+            'version': 1,
+            'disable_existing_loggers': False,
+            'handlers': {'file': {'level': 'DEBUG', 'class': 'logging.FileHandler',
+                                  'filename': os.path.join(directory, 'sync.log')}},
+            'loggers': {'django': {'handlers': ['file'], 'level': 'DEBUG', 'propagate': True}},
+        },
+        'queued_json': queued,
+    }
+
+
+def run(options):
+    """
+    Seeds the scratch database and times the requests under every logging setup.
+
+    Args:
+        options (argparse.Namespace): The parsed benchmark arguments.
+
+    Returns:
+        dict: A mapping of operation name to its timings.
+    """
+    support.setup(options.database)
+    support.seed(options.currencies, options.rows, options.pairs, options.seed)
+
+    from django.db import connections
+    from django.test import Client
+
+    directory = tempfile.mkdtemp(prefix='currencies_exchange_logging_')
+    configs = logging_configs(directory)
+    requests = {
+        'currency_list': lambda client: client.get('/currency/'),
+        'rate_page': lambda client: client.get('/rates/', {'page_size': 100}),
+    }
+
+    timings = {f'{name}_{setup}': [] for name in requests for setup in configs}
+    client = Client()
+    for alias in connections:
+        connections[alias].force_debug_cursor = True
+    for _ in range(ROUNDS):
+        for setup, config in configs.items():
+            logging.config.dictConfig(config)
+            for name, request in requests.items():
+                request(client)
+                timings[f'{name}_{setup}'].append(
+                    support.measure(lambda index: request(client), options.repeat // ROUNDS))
+    logging.config.dictConfig(configs['off'])
+
+    results = {name: {key: sum(stats[key] for stats in rounds) / len(rounds) for key in rounds[0]}
+               for name, rounds in timings.items()}
+    for name in requests:
+        off = results[f'{name}_off']['p50_ms']
+        for setup in ('sync_file', 'queued_json'):
+            value = results[f'{name}_{setup}']['p50_ms']
+            print(f'{name} {setup}: median {value:.3f} ms, {(value / off - 1) * 100:+.1f}% over no logging')
+    for file_name in sorted(os.listdir(directory)):
+        print(f'{file_name}: {os.path.getsize(os.path.join(directory, file_name)) / 1024:.0f} KiB written')
+    return results
+
+
+def main(argv=None):
+    """
+    Runs the benchmark from the command line and prints the timings.
+    """
+    parser = support.create_parser(__doc__.strip().splitlines()[0])
+    parser.set_defaults(rows=200000, repeat=2000)
+    options = parser.parse_args(argv)
+    support.print_results('Logging overhead', run(options))
+
+
+if __name__ == '__main__':
+    main()
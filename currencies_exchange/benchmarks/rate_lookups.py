@@ -0,0 +1,102 @@
+"""
+Benchmark of currency and rate lookups on a large rate table.
+
+Times the lookups served by the indexes of the rate_lookup_indexes migration: currency by
+code, rate by pair and date, and a one year date range scan of a pair. With --compare the
+same rate queries are also timed with the indexes disabled (SQLite ``NOT INDEXED``) to show
+what the lookups cost without them.
+
+Example:
+    python -m currencies_exchange.benchmarks.rate_lookups --rows 2000000 --compare
+"""
+
+import random
+from datetime import timedelta
+from currencies_exchange.benchmarks import support
+
+RANGE_DAYS = 365
+
+
+def run(options):
+    """
+    Seeds the scratch database and times the lookups.
+
+    Args:
+        options (argparse.Namespace): The parsed benchmark arguments.
+
+    Returns:
+        dict: A mapping of operation name to its timings.
+    """
+    support.setup(options.database)
+    dataset = support.seed(options.currencies, options.rows, options.pairs, options.seed)
+
+    from django.db import connection
+    from currencies_exchange.models import Currency, CurrencyRate
+
+    rng = random.Random(options.seed)
+    codes = list(dataset.currency_ids)
+    samples = [(rng.choice(dataset.pairs), rng.choice(dataset.dates)) for _ in range(options.repeat)]
+    table = CurrencyRate._meta.db_table
+
+    def currency_by_code(index):
+        Currency.objects.get(currency_code=codes[index % len(codes)])
+
+    def rate_by_pair_and_date(index):
+        (base, target), history_date = samples[index]
+        CurrencyRate.objects.filter(currency_base_id=base, currency_target_id=target,
+                                    history_date=history_date).values_list('rate', flat=True).first()
+
+    def pair_range(index):
+        (base, target), history_date = samples[index]
+        list(CurrencyRate.objects.filter(
+            currency_base_id=base, currency_target_id=target,
+            history_date__range=(history_date, history_date + timedelta(days=RANGE_DAYS))
+        ).order_by('history_date').values_list('history_date', 'rate'))
+
+    def raw_query(sql):
+        def query(index):
+            (base, target), history_date = samples[index]
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [base, target, history_date.isoformat()])
+                cursor.fetchall()
+        return query
+
+    point_sql = (f'SELECT rate FROM {table} {{}} '
+                 f'WHERE currency_base_id = %s AND currency_target_id = %s AND history_date = %s')
+    range_sql = (f'SELECT history_date, rate FROM {table} {{}} WHERE currency_base_id = %s '
+                 f'AND currency_target_id = %s AND history_date >= %s ORDER BY history_date LIMIT {RANGE_DAYS}')
+
+    print(f'Seeded {len(dataset.currency_ids)} currencies and {dataset.rows} rates '
+          f'over {len(dataset.pairs)} pairs and {len(dataset.dates)} days')
+    with connection.cursor() as cursor:
+        for name, sql in (('pair/date', point_sql), ('pair range', range_sql)):
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql.format("")}', [0, 0, '2010-06-01'])
+            print(f'{name} plan: {"; ".join(row[-1] for row in cursor.fetchall())}')
+
+    results = {
+        'currency_by_code': support.measure(currency_by_code, options.repeat),
+        'rate_by_pair_and_date': support.measure(rate_by_pair_and_date, options.repeat),
+        'pair_range_one_year': support.measure(pair_range, options.repeat),
+    }
+    if options.compare:
+        results['rate_by_pair_and_date_not_indexed'] = support.measure(
+            raw_query(point_sql.format('NOT INDEXED')), options.compare_repeat)
+        results['pair_range_one_year_not_indexed'] = support.measure(
+            raw_query(range_sql.format('NOT INDEXED')), options.compare_repeat)
+    return results
+
+
+def main(argv=None):
+    """
+    Runs the benchmark from the command line and prints the timings.
+    """
+    parser = support.create_parser(__doc__.strip().splitlines()[0])
+    parser.add_argument('--compare', action='store_true', help='Also time the rate queries without indexes')
+    parser.add_argument('--compare-repeat', type=int, default=10,
+                        help='Number of repetitions of the full table scans')
+    options = parser.parse_args(argv)
+    support.print_results('Rate lookups', run(options))
+
+
+if __name__ == '__main__':
+    main()
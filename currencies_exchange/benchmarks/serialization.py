@@ -0,0 +1,74 @@
+"""
+Benchmark of serializing and rendering a large rate list.
+
+Compares the DRF path (model instances with their currencies joined in, the serializer and
+the standard library JSON renderer) with the value row path of the list views (values_list()
+rows and the orjson renderer), and the value rows through the standard library renderer to
+split the gain between the two. With --compare the serializer is also timed without the
+currencies joined in, which costs one query per currency code.
+
+Example:
+    python -m currencies_exchange.benchmarks.serialization --rows 100000
+"""
+
+from currencies_exchange.benchmarks import support
+
+
+def run(options):
+    """
+    Seeds the scratch database and times the serialization paths.
+
+    Args:
+        options (argparse.Namespace): The parsed benchmark arguments.
+
+    Returns:
+        dict: A mapping of operation name to its timings.
+    """
+    support.setup(options.database)
+    dataset = support.seed(options.currencies, options.rows, options.pairs, options.seed)
+
+    from rest_framework.renderers import JSONRenderer
+    from currencies_exchange.models import CurrencyRate
+    from currencies_exchange.renderers import ORJSONRenderer
+    from currencies_exchange.serializers import CurrencyRateSerializer, serialize_values, values_fields
+
+    queryset = CurrencyRate.objects.order_by('history_date', 'id')[:options.rows]
+    names, lookups = values_fields(CurrencyRateSerializer)
+
+    def serializer(related):
+        def operation(index):
+            rates = queryset.select_related('currency_base', 'currency_target') if related else queryset
+            JSONRenderer().render(CurrencyRateSerializer(rates, many=True).data)
+        return operation
+
+    def values(renderer_class):
+        def operation(index):
+            renderer_class().render(serialize_values(queryset.values_list(*lookups), names))
+        return operation
+
+    print(f'Seeded {len(dataset.currency_ids)} currencies and {dataset.rows} rates, '
+          f'serializing {min(options.rows, dataset.rows)} of them')
+    results = {
+        'serializer_json': support.measure(serializer(True), options.repeat),
+        'values_json': support.measure(values(JSONRenderer), options.repeat),
+        'values_orjson': support.measure(values(ORJSONRenderer), options.repeat),
+    }
+    if options.compare:
+        results['serializer_json_lazy_currencies'] = support.measure(serializer(False), 1)
+    return results
+
+
+def main(argv=None):
+    """
+    Runs the benchmark from the command line and prints the timings.
+    """
+    parser = support.create_parser(__doc__.strip().splitlines()[0])
+    parser.add_argument('--compare', action='store_true',
+                        help='Also time the serializer without the currencies joined in (once)')
+    parser.set_defaults(rows=100000, repeat=5)
+    options = parser.parse_args(argv)
+    support.print_results('Serialization', run(options))
+
+
+if __name__ == '__main__':
+    main()
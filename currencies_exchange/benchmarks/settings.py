@@ -0,0 +1,34 @@
+"""
+Django settings for running the benchmarks against a scratch database.
+
+Everything is inherited from the project settings except the database and its replica,
+which default to files in the temporary directory, and the debug options that would
+distort timings. The replica is only read from once a benchmark syncs it.
+"""
+
+import tempfile
+from pathlib import Path
+from decouple import config
+from currencies_exchange.settings import *  # noqa: F401,F403
+
+DEBUG = False
+ALLOWED_HOSTS = ['testserver']
+
+DATABASE_REPLICA = config('BENCHMARK_REPLICA',
+                          default=str(Path(tempfile.gettempdir()) / 'currencies_exchange_benchmark_replica.sqlite3'))
+DATABASES = {
+    'default': {
+        **DATABASES['default'],
+        'NAME': config('BENCHMARK_DATABASE',
+                       default=str(Path(tempfile.gettempdir()) / 'currencies_exchange_benchmark.sqlite3')),
+    },
+    'replica': {
+        **DATABASES['default'],
+        'NAME': f'file:{DATABASE_REPLICA}?mode=ro',
+    },
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+}
@@ -0,0 +1,187 @@
+"""
+Benchmark suite of the hot paths with stored baselines and regression thresholds.
+
+Seeds one synthetic dataset and times the /currency/ list (search, filter and ordering,
+with a cold response cache), rate lookups by pair and date, serializer throughput, the
+pull_currencies ingest against a stubbed upstream and the admin rate changelist. The
+results are written as JSON and compared with a stored baseline: the run fails when the
+median of an operation is slower than the baseline by more than the threshold.
+
+Example:
+    python -m currencies_exchange.benchmarks.suite --output results.json
+    python -m currencies_exchange.benchmarks.suite --update-baseline
+"""
+
+import sys
+import json
+import random
+import platform
+from pathlib import Path
+from unittest import mock
+from currencies_exchange.benchmarks import support
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / 'baselines' / 'suite.json'
+DATASET_OPTIONS = ('currencies', 'rows', 'pairs', 'seed', 'serialize_rows')
+
+
+def run(options):
+    """
+    Seeds the scratch database and times every operation of the suite.
+
+    Args:
+        options (argparse.Namespace): The parsed benchmark arguments.
+
+    Returns:
+        dict: A mapping of operation name to its timings.
+    """
+    support.setup(options.database)
+    dataset = support.seed(options.currencies, options.rows, options.pairs, options.seed)
+
+    from io import StringIO
+    from django.urls import reverse
+    from django.test import Client
+    from django.core.cache import cache
+    from django.core.management import call_command
+    from django.contrib.auth.models import User
+    from rest_framework.renderers import JSONRenderer
+    from currencies_exchange.models import Currency, CurrencyRate
+    from currencies_exchange.renderers import ORJSONRenderer
+    from currencies_exchange.services import CurrencyAPIClient
+    from currencies_exchange.serializers import CurrencyRateSerializer, serialize_values, values_fields
+
+    rng = random.Random(options.seed)
+    samples = [(rng.choice(dataset.pairs), rng.choice(dataset.dates)) for _ in range(options.repeat)]
+    client = Client()
+    currency_url = reverse('currency-api')
+    changelist_url = reverse('admin:currencies_exchange_currencyrate_changelist')
+    admin_client = Client()
+    admin_client.force_login(User.objects.create_superuser('benchmark', 'benchmark@example.com', 'benchmark'))
+
+    def get(http_client, url, params=None, cold=False):
+        def operation(index):
+            if cold:
+                cache.clear()
+            response = http_client.get(url, params)
+            assert response.status_code == 200, response.status_code
+        return operation
+
+    def rate_by_pair_and_date(index):
+        (base, target), history_date = samples[index]
+        CurrencyRate.objects.filter(currency_base_id=base, currency_target_id=target,
+                                    history_date=history_date).values_list('rate', flat=True).first()
+
+    rates = CurrencyRate.objects.order_by('history_date', 'id')[:options.serialize_rows]
+    names, lookups = values_fields(CurrencyRateSerializer)
+
+    def serialize_instances(index):
+        JSONRenderer().render(CurrencyRateSerializer(
+            rates.select_related('currency_base', 'currency_target'), many=True).data)
+
+    def serialize_values_orjson(index):
+        ORJSONRenderer().render(serialize_values(rates.values_list(*lookups), names))
+
+    currencies = list(Currency.objects.values_list('currency_code', 'currency_name', 'currency_symbol'))
+
+    def pull_currencies(index):
+        # Every run renames all currencies upstream, so every run updates the whole catalog
+        upstream = {code: {'code': code, 'name': f'{name} {index}', 'symbol': symbol}
+                    for code, name, symbol in currencies}
+        with mock.patch.object(CurrencyAPIClient, 'currencies', return_value=upstream):
+            call_command('pull_currencies', '--update-changed', stdout=StringIO())
+
+    code = rng.choice(list(dataset.currency_ids))
+    heavy = options.heavy_repeat
+    return {
+        'currency_list': support.measure(get(client, currency_url, cold=True), options.repeat),
+        'currency_list_search': support.measure(
+            get(client, currency_url, {'search': code.lower()}, cold=True), options.repeat),
+        'currency_list_filter_ordering': support.measure(
+            get(client, currency_url, {'currency_name': 'currency', 'ordering': '-currency_name'}, cold=True),
+            options.repeat),
+        'currency_list_cached': support.measure(get(client, currency_url), options.repeat),
+        'rate_by_pair_and_date': support.measure(rate_by_pair_and_date, options.repeat),
+        'serialize_rates_serializer': support.measure(serialize_instances, heavy),
+        'serialize_rates_values_orjson': support.measure(serialize_values_orjson, heavy),
+        'pull_currencies_update_all': support.measure(pull_currencies, heavy),
+        'admin_rate_changelist': support.measure(get(admin_client, changelist_url), heavy),
+        'admin_rate_changelist_filtered': support.measure(
+            get(admin_client, changelist_url, {'currency_base_code': 'USD'}), heavy),
+    }
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """
+    Compares the medians of the results with the ones of a baseline.
+
+    Args:
+        results (dict): A mapping of operation name to the result of measure().
+        baseline (dict): The same mapping from the baseline run.
+        threshold (float): The tolerated relative slowdown, e.g. 0.25 for 25%.
+        min_delta_ms (float): Slowdowns below this many milliseconds are ignored as noise.
+
+    Returns:
+        list: One (operation, baseline ms, result ms, relative change) tuple per regression.
+    """
+    regressions = []
+    for name, stats in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]['p50_ms'], stats['p50_ms']
+        change = (after - before) / before if before else 0.0
+        if change > threshold and after - before > min_delta_ms:
+            regressions.append((name, before, after, change))
+    return regressions
+
+
+def main(argv=None):
+    """
+    Runs the suite, writes the results and fails on regressions against the baseline.
+    """
+    parser = support.create_parser(__doc__.strip().splitlines()[0])
+    parser.add_argument('--heavy-repeat', type=int, default=10,
+                        help='Number of repetitions of the serialization, ingest and admin operations')
+    parser.add_argument('--serialize-rows', type=int, default=10000, help='Number of rates serialized per repetition')
+    parser.add_argument('--output', help='Path of the JSON results file')
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help='Path of the JSON baseline file')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Tolerated relative slowdown of the median of an operation')
+    parser.add_argument('--min-delta-ms', type=float, default=0.2,
+                        help='Slowdowns below this many milliseconds are ignored as noise')
+    parser.add_argument('--update-baseline', action='store_true', help='Store the results as the new baseline')
+    parser.set_defaults(rows=200000, repeat=200)
+    options = parser.parse_args(argv)
+
+    results = run(options)
+    support.print_results('Benchmark suite', results)
+    report = {
+        'dataset': {name: getattr(options, name) for name in DATASET_OPTIONS},
+        'platform': {'python': platform.python_version(), 'machine': platform.machine()},
+        'results': results,
+    }
+    if options.output:
+        Path(options.output).write_text(json.dumps(report, indent=2) + '\n')
+    if options.update_baseline:
+        Path(options.baseline).write_text(json.dumps(report, indent=2) + '\n')
+        print(f'Stored the baseline {options.baseline}')
+        return 0
+
+    baseline_path = Path(options.baseline)
+    if not baseline_path.exists():
+        print(f'No baseline {baseline_path}, run with --update-baseline to store one')
+        return 0
+    baseline = json.loads(baseline_path.read_text())
+    if baseline['dataset'] != report['dataset']:
+        print(f'The baseline was measured on another dataset {baseline["dataset"]}, not comparing')
+        return 0
+
+    regressions = compare(results, baseline['results'], options.threshold, options.min_delta_ms)
+    for name, before, after, change in regressions:
+        print(f'REGRESSION {name}: median {before:.3f} ms -> {after:.3f} ms (+{change:.0%})')
+    if regressions:
+        return 1
+    print(f'No regression beyond {options.threshold:.0%} against {baseline_path}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,192 @@
+"""
+Shared helpers for the benchmarks: scratch database setup, synthetic data and timing.
+"""
+
+import os
+import math
+import time
+import random
+import argparse
+import itertools
+from datetime import date, timedelta
+from currencies_exchange.standin import currency_codes
+
+SEED_START_DATE = date(2010, 6, 1)
+INSERT_CHUNK_SIZE = 50000
+
+
+class Dataset:
+    """
+    Description of the seeded synthetic dataset.
+
+    Attributes:
+        currency_ids (dict): A mapping of currency code to currency ID.
+        pairs (list): The seeded (base ID, target ID) pairs.
+        dates (list): The seeded dates, every pair has a rate for each of them.
+        rows (int): The number of seeded rates.
+    """
+
+    def __init__(self, currency_ids, pairs, dates):
+        self.currency_ids = currency_ids
+        self.pairs = pairs
+        self.dates = dates
+        self.rows = len(pairs) * len(dates)
+
+
+def add_arguments(parser):
+    """
+    Registers the dataset and database arguments shared by all benchmarks.
+    """
+    parser.add_argument('--database', help='Path of the scratch SQLite database (recreated on every run)')
+    parser.add_argument('--currencies', type=int, default=170, help='Number of synthetic currencies')
+    parser.add_argument('--rows', type=int, default=1000000, help='Number of synthetic rates')
+    parser.add_argument('--pairs', type=int, default=500, help='Number of currency pairs the rates are spread over')
+    parser.add_argument('--repeat', type=int, default=1000, help='Number of timed repetitions per operation')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the random generator')
+    return parser
+
+
+def create_parser(description):
+    """
+    Returns an argument parser with the shared benchmark arguments.
+    """
+    return add_arguments(argparse.ArgumentParser(description=description))
+
+
+def setup(database=None):
+    """
+    Configures Django for a fresh scratch database, without replica, and applies the migrations.
+
+    Args:
+        database (str or None): The path of the scratch database, the settings default when None.
+    """
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'currencies_exchange.benchmarks.settings'
+    if database:
+        os.environ['BENCHMARK_DATABASE'] = database
+
+    import django
+    from django.conf import settings
+    from django.core.management import call_command
+
+    django.setup()
+    for path in (settings.DATABASES['default']['NAME'], settings.DATABASE_REPLICA):
+        for suffix in ('', '-wal', '-shm'):
+            if path and os.path.exists(f'{path}{suffix}'):
+                os.remove(f'{path}{suffix}')
+    call_command('migrate', verbosity=0)
+
+
+def seed(currencies=170, rows=1000000, pairs=500, random_seed=0):
+    """
+    Seeds the scratch database with synthetic currencies and rates.
+
+    The first pairs are USD against every other currency, so that the pivot snapshot of
+    every seeded date is complete, followed by random pairs. Rates are inserted with raw
+    chunked statements to keep seeding millions of rows fast.
+
+    Args:
+        currencies (int): The number of currencies.
+        rows (int): The approximate number of rates, rounded up to whole days.
+        pairs (int): The number of currency pairs.
+        random_seed (int): The seed of the random generator.
+
+    Returns:
+        Dataset: The description of the seeded data.
+    """
+    from django.db import connection, transaction
+    from currencies_exchange.models import Currency, CurrencyRate
+
+    rng = random.Random(random_seed)
+    Currency.objects.bulk_create([
+        Currency(currency_name=f'Currency {code}', currency_symbol=code[0], currency_code=code)
+        for code in currency_codes(currencies)
+    ])
+    currency_ids = dict(Currency.objects.values_list('currency_code', 'id'))
+    usd = currency_ids['USD']
+
+    ids = sorted(currency_ids.values())
+    seeded = [(usd, target) for target in ids if target != usd][:pairs]
+    known = set(seeded)
+    while len(seeded) < min(pairs, len(ids) * (len(ids) - 1)):
+        pair = tuple(rng.sample(ids, 2))
+        if pair not in known:
+            known.add(pair)
+            seeded.append(pair)
+
+    days = max(1, math.ceil(rows / len(seeded)))
+    dates = [SEED_START_DATE + timedelta(days=offset) for offset in range(days)]
+    base_rates = {pair: rng.uniform(0.01, 100) for pair in seeded}
+
+    def generate():
+        for history_date in dates:
+            day = history_date.isoformat()
+            for pair in seeded:
+                yield pair[0], pair[1], base_rates[pair] * rng.uniform(0.95, 1.05), day
+
+    sql = (f'INSERT INTO {CurrencyRate._meta.db_table} '
+           f'(currency_base_id, currency_target_id, rate, history_date) VALUES (%s, %s, %s, %s)')
+    values = generate()
+    with transaction.atomic(), connection.cursor() as cursor:
+        while True:
+            chunk = list(itertools.islice(values, INSERT_CHUNK_SIZE))
+            if not chunk:
+                break
+            cursor.executemany(sql, chunk)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return Dataset(currency_ids, seeded, dates)
+
+
+def measure(operation, repeat):
+    """
+    Times repeated calls of an operation.
+
+    Args:
+        operation (callable): Called with the repetition index.
+        repeat (int): The number of repetitions.
+
+    Returns:
+        dict: The number of repetitions and the mean, median, 95th percentile and maximum in milliseconds.
+    """
+    timings = []
+    for index in range(repeat):
+        started = time.perf_counter()
+        operation(index)
+        timings.append((time.perf_counter() - started) * 1000)
+    return summarize(timings)
+
+
+def summarize(timings):
+    """
+    Summarizes timings in milliseconds the way measure() does.
+
+    Args:
+        timings (list): The timings in milliseconds, at least one.
+
+    Returns:
+        dict: The number of timings and the mean, median, 95th percentile and maximum in milliseconds.
+    """
+    timings = sorted(timings)
+    return {
+        'repeat': len(timings),
+        'mean_ms': sum(timings) / len(timings),
+        'p50_ms': timings[len(timings) // 2],
+        'p95_ms': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        'max_ms': timings[-1],
+    }
+
+
+def print_results(title, results):
+    """
+    Prints the timings of a benchmark as a table.
+
+    Args:
+        title (str): The title of the benchmark.
+        results (dict): A mapping of operation name to the result of measure().
+    """
+    width = max(len(name) for name in results)
+    print(title)
+    print(f'{"operation":<{width}}  {"repeat":>7}  {"mean ms":>9}  {"p50 ms":>9}  {"p95 ms":>9}  {"max ms":>9}')
+    for name, stats in results.items():
+        print(f'{name:<{width}}  {stats["repeat"]:>7}  {stats["mean_ms"]:>9.3f}  {stats["p50_ms"]:>9.3f}  '
+              f'{stats["p95_ms"]:>9.3f}  {stats["max_ms"]:>9.3f}')
@@ -0,0 +1,160 @@
+"""
+Database profile: SQLite connection tuning and read replica routing.
+
+Every new SQLite connection gets the pragmas configured in the settings (WAL journal,
+relaxed fsync and memory-mapped reads), see configure_connection(). When DATABASE_REPLICA
+is set, reads made by the API views are routed to a read-only copy of the database (the
+``replica`` alias) that sync_replica() refreshes with the SQLite online backup API, so
+that API readers never wait on the ingest writer.
+"""
+
+import os
+import sqlite3
+import contextvars
+from contextlib import closing, contextmanager
+
+REPLICA = 'replica'
+APP_LABEL = 'currencies_exchange'
+
+_replica_reads = contextvars.ContextVar('replica_reads', default=False)
+
+
+def configure_connection(sender, connection, **kwargs):
+    """
+    Applies the SQLite pragmas of the settings to a new connection.
+
+    The journal mode and synchronous level are only set on writable connections, the
+    replica connection is read-only and inherits the journal mode of its file.
+
+    Args:
+        sender (class): The database wrapper class.
+        connection (DatabaseWrapper): The new connection.
+    """
+    from django.conf import settings
+
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        if connection.alias != REPLICA:
+            cursor.execute(f'PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}')
+            cursor.execute(f'PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}')
+        cursor.execute(f'PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}')
+
+
+def replica_available():
+    """
+    Returns whether a replica is configured and its file has been created by sync_replica().
+    """
+    from django.conf import settings
+
+    return REPLICA in settings.DATABASES and bool(settings.DATABASE_REPLICA) and \
+        os.path.exists(settings.DATABASE_REPLICA)
+
+
+@contextmanager
+def replica_reads():
+    """
+    Routes the reads of the app models made in the block to the replica.
+    """
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """
+    Routes the reads made in the block to the default database, even inside replica_reads().
+
+    Views reading from the replica use it to see the rows written since the last
+    sync_replica(), e.g. before fetching a rate the replica does not have yet.
+    """
+    token = _replica_reads.set(False)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def reading_replica():
+    """
+    Returns whether the reads of the app models are currently routed to the replica.
+    """
+    return _replica_reads.get()
+
+
+class ReplicaRouter:
+    """
+    Database router sending the reads of the app models to the replica when enabled.
+
+    Reads only go to the replica inside replica_reads() (see ReplicaReadMiddleware), so
+    that reads following a write, like the admin ones, see their own writes. Writes
+    always go to the default database, even for objects read from the replica, and the
+    replica is never migrated, it is a copy of the default database.
+
+    Methods:
+        db_for_read(model, **hints): Returns the replica inside replica_reads().
+        db_for_write(model, **hints): Returns the default database.
+        allow_relation(obj1, obj2, **hints): Allows relations between the default database and the replica.
+        allow_migrate(db, app_label, model_name=None, **hints): Disallows migrating the replica.
+    """
+
+    def db_for_read(self, model, **hints):
+        """
+        Returns the replica for app model reads inside replica_reads(), None otherwise.
+        """
+        if _replica_reads.get() and model._meta.app_label == APP_LABEL:
+            return REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        """
+        Returns the default database.
+        """
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """
+        Allows relations between objects of the default database and the replica.
+        """
+        if {obj1._state.db, obj2._state.db} <= {'default', REPLICA}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """
+        Disallows migrating the replica.
+        """
+        if db == REPLICA:
+            return False
+        return None
+
+
+def sync_replica(source=None, replica=None, pages=4096):
+    """
+    Copies the default database into the replica file with the SQLite online backup API.
+
+    The copy is made page by page into the replica file itself, so open replica
+    connections see the new data from their next read transaction on, and writers of the
+    default database are only paused between steps. The copy keeps the journal mode of
+    the default database.
+
+    Args:
+        source (str or None): The path of the default database, from the settings when None.
+        replica (str or None): The path of the replica, DATABASE_REPLICA when None.
+        pages (int): The number of pages copied per step.
+
+    Returns:
+        bool: Whether a replica was synced, False when none is configured.
+    """
+    from django.conf import settings
+
+    source = source or str(settings.DATABASES['default']['NAME'])
+    replica = replica or settings.DATABASE_REPLICA
+    if not replica:
+        return False
+    with closing(sqlite3.connect(source)) as primary, closing(sqlite3.connect(replica)) as copy:
+        primary.backup(copy, pages=pages)
+    return True
@@ -1 +1,3 @@
-from .currency_filter import CurrencyFilter
\ No newline at end of file
+from .currency_filter import CurrencyFilter
+from .currency_rate_filter import CurrencyRateFilter
+from .currency_search_filter import CurrencyOrderingFilter, CurrencySearchFilter
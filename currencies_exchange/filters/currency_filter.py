@@ -1,20 +1,25 @@
 import django_filters.rest_framework
 
 from currencies_exchange.models import Currency
+from currencies_exchange.services import search_currency_ids
 
 
 class CurrencyFilter(django_filters.FilterSet):
     """
     Filter set for the Currency model.
 
-    This filter set allows filtering currencies based on their name, symbol, and code
-    using case-insensitive partial matching.
+    This filter set allows filtering currencies based on their name, symbol, and code.
+    Every filter is looked up in the currency search index restricted to its column, so
+    a value matches the words of the field starting with it, case-insensitively.
 
     Attributes:
         currency_name (django_filters.CharFilter): Filter for currency names.
         currency_symbol (django_filters.CharFilter): Filter for currency symbols.
         currency_code (django_filters.CharFilter): Filter for currency codes.
 
+    Methods:
+        filter_search_index(queryset, name, value): Filters the queryset by a column of the search index.
+
     Meta:
         model (Currency): The model associated with the filter set.
         fields (list): The list of fields available for filtering.
@@ -25,9 +30,9 @@ class CurrencyFilter(django_filters.FilterSet):
         filtered_currencies = filter.qs
     """
 
-    currency_name = django_filters.CharFilter(lookup_expr='icontains')
-    currency_symbol = django_filters.CharFilter(lookup_expr='icontains')
-    currency_code = django_filters.CharFilter(lookup_expr='icontains')
+    currency_name = django_filters.CharFilter(method='filter_search_index')
+    currency_symbol = django_filters.CharFilter(method='filter_search_index')
+    currency_code = django_filters.CharFilter(method='filter_search_index')
 
     class Meta:
         """
@@ -39,3 +44,17 @@ class CurrencyFilter(django_filters.FilterSet):
         """
         model = Currency
         fields = ['currency_name', 'currency_symbol', 'currency_code']
+
+    def filter_search_index(self, queryset, name, value):
+        """
+        Filters the queryset by the search index column of the filtered field.
+
+        Args:
+            queryset (QuerySet): The queryset to filter.
+            name (str): The name of the filtered field.
+            value (str): The value to search for.
+
+        Returns:
+            QuerySet: The currencies matching the value.
+        """
+        return queryset.filter(id__in=search_currency_ids(value, column=name))
@@ -0,0 +1,44 @@
+import django_filters.rest_framework
+
+from currencies_exchange.models import CurrencyRate
+
+
+class CurrencyRateFilter(django_filters.FilterSet):
+    """
+    Filter set for the CurrencyRate model.
+
+    This filter set allows filtering rates by the exact base and target currency codes
+    and by an inclusive history date range.
+
+    Attributes:
+        currency_base (django_filters.CharFilter): Filter for the base currency code.
+        currency_target (django_filters.CharFilter): Filter for the target currency code.
+        date_from (django_filters.DateFilter): Filter for the first history date.
+        date_to (django_filters.DateFilter): Filter for the last history date.
+
+    Meta:
+        model (CurrencyRate): The model associated with the filter set.
+        fields (list): The list of fields available for filtering.
+
+    Example:
+        To filter the USD/EUR rates of 2023:
+        filter = CurrencyRateFilter(data={'currency_base': 'USD', 'currency_target': 'EUR',
+                                          'date_from': '2023-01-01', 'date_to': '2023-12-31'})
+        filtered_rates = filter.qs
+    """
+
+    currency_base = django_filters.CharFilter(field_name='currency_base__currency_code')
+    currency_target = django_filters.CharFilter(field_name='currency_target__currency_code')
+    date_from = django_filters.DateFilter(field_name='history_date', lookup_expr='gte')
+    date_to = django_filters.DateFilter(field_name='history_date', lookup_expr='lte')
+
+    class Meta:
+        """
+        Metadata class for the CurrencyRateFilter.
+
+        Attributes:
+            model (CurrencyRate): The model associated with the filter set.
+            fields (list): The list of fields available for filtering.
+        """
+        model = CurrencyRate
+        fields = ['currency_base', 'currency_target', 'date_from', 'date_to']
@@ -0,0 +1,50 @@
+from rest_framework import filters
+from currencies_exchange.services import rank_expression, search_currency_ids
+
+
+class CurrencySearchFilter(filters.SearchFilter):
+    """
+    Search filter for currencies backed by the currency search index.
+
+    Instead of OR-ing case-insensitive substring scans of every search field, the search
+    term is looked up in the full-text index (see services.currency_search) and the
+    queryset is narrowed to the matching IDs. Every match is annotated with its
+    ``search_rank``, an exact code match ranking first.
+
+    Methods:
+        filter_queryset(request, queryset, view): Filters and ranks the queryset by the search term.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        """
+        Filters and ranks the queryset by the search term.
+        """
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        ids = search_currency_ids(' '.join(terms))
+        if not ids:
+            return queryset.none()
+        return queryset.filter(id__in=ids).annotate(search_rank=rank_expression(ids))
+
+
+class CurrencyOrderingFilter(filters.OrderingFilter):
+    """
+    Ordering filter ordering searched currencies by relevance.
+
+    Searches without an explicit ``ordering`` parameter are ordered by ``search_rank``
+    instead of the view's default ordering. Cursor pagination takes its ordering from
+    this filter, so it pages through the ranked matches.
+
+    Methods:
+        get_ordering(request, queryset, view): Returns the relevance ordering when searching.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Returns the requested ordering, the relevance ordering or the view's default ordering.
+        """
+        params = request.query_params.get(self.ordering_param)
+        if not params and 'search_rank' in queryset.query.annotations:
+            return ['search_rank']
+        return super().get_ordering(request, queryset, view)
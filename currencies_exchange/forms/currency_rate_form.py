@@ -1,7 +1,9 @@
 from django import forms
 from ..models import CurrencyRate
-from datetime import date, timedelta
-from django.utils.timezone import now
+from datetime import date
+from ..models.currency_rate import yesterday
+from django.contrib.admin.widgets import AutocompleteSelect
+from ..services import currency_choices, derive_rate
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
@@ -11,12 +13,16 @@ class CurrencyRateForm(forms.ModelForm):
 
     This form is designed for creating and updating CurrencyRate instances through a web form.
 
+    Attributes:
+        history_date (forms.DateField): The date of the rate, from 2010-06-01 to yesterday.
+
     Meta:
         model (CurrencyRate): The model associated with the form.
         fields (list): The list of fields to be included in the form.
 
     Methods:
         __init__(*args, **kwargs): Initializes the form and customizes the behavior of some fields.
+        clean(): Derives the rate from the cross rate snapshot when possible.
 
     Example:
         To handle currency rate data in a web form:
@@ -25,6 +31,12 @@ class CurrencyRateForm(forms.ModelForm):
             currency_rate_instance = form.save()
     """
 
+    # The upper limit is a callable, so the validators are built once and still follow the current date
+    history_date = forms.DateField(label='History date', validators=[
+        MinValueValidator(date(2010, 6, 1)),
+        MaxValueValidator(yesterday),
+    ])
+
     class Meta:
         """
         Metadata class for the CurrencyRateForm.
@@ -40,22 +52,36 @@ class CurrencyRateForm(forms.ModelForm):
         """
         Initializes the form and customizes the behavior of some fields.
 
-        The currency_base and currency_target fields are customized to display only the currency codes
-        instead of the complete Currency objects. Additionally, the history_date field is validated
-        to ensure it falls within a specified range.
-
+        The currency_base and currency_target fields display only the currency codes, taken
+        from the process-wide cached currency choices, so that building the form does not
+        query the currency table. Fields rendered with an admin autocomplete widget are left
+        alone, as that widget loads its choices lazily.
         """
-        super(CurrencyRateForm, self).__init__()
+        super(CurrencyRateForm, self).__init__(*args, **kwargs)
 
-        # Customize the currency_base and currency_target fields to display only currency codes
-        self.fields['currency_base'].queryset = self.fields['currency_base'].queryset.only('currency_code')
-        self.fields['currency_base'].widget = forms.Select(
-            choices=[(currency.pk, currency.currency_code) for currency in self.fields['currency_base'].queryset])
+        choices = None
+        for name in ('currency_base', 'currency_target'):
+            field = self.fields[name]
+            # Admin widgets are wrapped in a RelatedFieldWidgetWrapper
+            widget = getattr(field.widget, 'widget', field.widget)
+            if isinstance(widget, AutocompleteSelect):
+                continue
+            if choices is None:
+                choices = currency_choices()
+            widget.choices = choices
 
-        self.fields['currency_target'].queryset = self.fields['currency_target'].queryset.only('currency_code')
-        self.fields['currency_target'].widget = forms.Select(
-            choices=[(currency.pk, currency.currency_code) for currency in self.fields['currency_target'].queryset])
+    def clean(self):
+        """
+        Derives the rate from the cross rate snapshot of the selected date when possible.
 
-        # Add validators to the history_date field to ensure it falls within a specified range
-        self.fields['history_date'].validators.append(MinValueValidator(date(2010, 6, 1)))
-        self.fields['history_date'].validators.append(MaxValueValidator(now().date() - timedelta(days=1)))
+        The derived rate is set on the instance so that saving it does not call the external
+        API. When the snapshot has no data for the pair the rate is left empty and fetched on save,
+        or queued for the background workers by the admin.
+        """
+        cleaned_data = super(CurrencyRateForm, self).clean()
+        currency_base = cleaned_data.get('currency_base')
+        currency_target = cleaned_data.get('currency_target')
+        history_date = cleaned_data.get('history_date')
+        if currency_base and currency_target and history_date:
+            self.instance.rate = derive_rate(currency_base.pk, currency_target.pk, history_date)
+        return cleaned_data
@@ -0,0 +1,143 @@
+from datetime import date, datetime, timedelta
+from currencies_exchange.profiling import ProfiledCommandMixin
+from django.core.management.base import BaseCommand, CommandError
+from currencies_exchange.models import Currency, CurrencyRate
+from currencies_exchange.database import sync_replica
+from currencies_exchange.services import ingest_rates, refresh_columnar_snapshot
+
+MIN_HISTORY_DATE = date(2010, 6, 1)
+
+
+def parse_date(value):
+    """
+    Parses a YYYY-MM-DD command line argument into a date.
+
+    Args:
+        value (str): The date string to parse.
+
+    Returns:
+        date: The parsed date.
+    """
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'Invalid date "{value}", expected YYYY-MM-DD')
+
+
+def date_range(start, end):
+    """
+    Yields every date from start to end, both inclusive.
+    """
+    for offset in range((end - start).days + 1):
+        yield start + timedelta(days=offset)
+
+
+class Command(ProfiledCommandMixin, BaseCommand):
+    """
+    Django management command for loading historical currency rates in bulk.
+
+    For every base currency and date in the requested range one upstream call is made,
+    asking for all target currencies at once. Calls run concurrently up to the given
+    limit and the fetched rates are written with chunked bulk inserts. Rows that are
+    already stored are skipped. The read replica, when configured, is synced afterwards,
+    and the columnar rate snapshot, once built, refreshed.
+    With --profile the run is profiled into PROFILING_DIR; the upstream calls run on worker
+    threads and appear as time spent waiting for their results.
+
+    Attributes:
+        help (str): A short description of the command's purpose.
+
+    Methods:
+        add_arguments(parser): Registers the command line arguments.
+        handle(*args, **options): Executes the command's logic.
+
+    Example:
+        To load USD and EUR rates against PLN and GBP for January 2023:
+        python manage.py backfill_rates --base USD EUR --target PLN GBP --start 2023-01-01 --end 2023-01-31
+    """
+
+    help = 'Load historical currency rates from the external API in bulk'
+
+    def add_arguments(self, parser):
+        """
+        Registers the command line arguments.
+        """
+        parser.add_argument('--base', nargs='+', required=True, help='Base currency codes')
+        parser.add_argument('--target', nargs='+', help='Target currency codes (default: all currencies)')
+        parser.add_argument('--start', required=True, help='First date to load (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Last date to load (YYYY-MM-DD, default: yesterday)')
+        parser.add_argument('--concurrency', type=int, default=8, help='Maximum number of concurrent API calls')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Number of rows per bulk insert')
+
+    def handle(self, *args, **options):
+        """
+        Executes the command's logic.
+
+        Fetches the rates for every base currency and date concurrently, writes them in
+        chunks and reports the throughput once finished.
+
+        Args:
+            *args: Additional positional arguments.
+            **options: Additional keyword arguments.
+        """
+        start = parse_date(options['start'])
+        end = parse_date(options['end']) if options['end'] else date.today() - timedelta(days=1)
+        if start < MIN_HISTORY_DATE or end < start:
+            raise CommandError(f'Invalid date range {start} - {end}')
+        if options['concurrency'] < 1 or options['chunk_size'] < 1:
+            raise CommandError('--concurrency and --chunk-size must be positive')
+
+        currencies = self.get_currencies(options['base'] + (options['target'] or []))
+        if options['target']:
+            targets = [currencies[code] for code in options['target']]
+        else:
+            targets = list(Currency.objects.all())
+        bases = [currencies[code] for code in options['base']]
+
+        existing = set(CurrencyRate.objects.filter(
+            currency_base__in=bases, currency_target__in=targets, history_date__range=(start, end)
+        ).values_list('currency_base_id', 'currency_target_id', 'history_date'))
+
+        jobs = []
+        for base in bases:
+            for history_date in date_range(start, end):
+                missing = [target for target in targets if target.pk != base.pk
+                           and (base.pk, target.pk, history_date) not in existing]
+                if missing:
+                    jobs.append((base, missing, history_date))
+
+        result = ingest_rates(jobs, options['concurrency'], options['chunk_size'], on_failure=self.report_failure)
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored {result.rows} rates from {result.calls} API calls ({result.failures} failed) '
+            f'in {result.seconds:.2f}s: {result.rows / result.seconds:.1f} rows/s, '
+            f'{result.calls / result.seconds:.1f} calls/s'))
+        if result.rows and sync_replica():
+            self.stdout.write(self.style.SUCCESS('Synced the read replica'))
+        if result.rows and refresh_columnar_snapshot():
+            self.stdout.write(self.style.SUCCESS('Refreshed the columnar rate snapshot'))
+
+    def get_currencies(self, codes):
+        """
+        Loads the requested currencies in a single query.
+
+        Args:
+            codes (list): The currency codes to load.
+
+        Returns:
+            dict: A mapping of currency code to Currency instance.
+
+        Raises:
+            CommandError: If any of the codes is unknown.
+        """
+        currencies = {currency.currency_code: currency
+                      for currency in Currency.objects.filter(currency_code__in=codes)}
+        unknown = sorted(set(codes) - set(currencies))
+        if unknown:
+            raise CommandError(f'Unknown currency codes: {", ".join(unknown)}')
+        return currencies
+
+    def report_failure(self, base, history_date, error):
+        """
+        Reports an upstream call that failed.
+        """
+        self.stdout.write(self.style.ERROR(f'Failed to fetch {base.currency_code} rates for {history_date}: {error}'))
@@ -0,0 +1,57 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from currencies_exchange.settings import RATE_SNAPSHOT_DIR
+from currencies_exchange.services import build_columnar_snapshot
+
+
+class Command(BaseCommand):
+    """
+    Django management command compiling the rate table into the columnar snapshot.
+
+    The snapshot is a directory of NumPy arrays sorted by pair and date that the app maps
+    into memory for lookups and analytics (see services.columnar_snapshot). By default
+    only the rates added since the last build are read and merged in, unless stored
+    rates were edited or deleted since, which rebuilds it.
+
+    Attributes:
+        help (str): A short description of the command's purpose.
+
+    Methods:
+        add_arguments(parser): Registers the command line arguments.
+        handle(*args, **options): Executes the command's logic.
+
+    Example:
+        To update the snapshot after new rates were loaded:
+        python manage.py build_rate_snapshot
+    """
+
+    help = 'Compile the rate table into the memory-mapped columnar snapshot'
+
+    def add_arguments(self, parser):
+        """
+        Registers the command line arguments.
+        """
+        parser.add_argument('--full', action='store_true', help='Rebuild the snapshot from scratch')
+        parser.add_argument('--directory', default=RATE_SNAPSHOT_DIR, help='Snapshot directory')
+        parser.add_argument('--chunk-size', type=int, default=50000, help='Number of rows read at once')
+
+    def handle(self, *args, **options):
+        """
+        Executes the command's logic.
+
+        Builds the snapshot and reports the number of rates read and stored.
+
+        Args:
+            *args: Additional positional arguments.
+            **options: Additional keyword arguments.
+        """
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive')
+        started = time.perf_counter()
+        try:
+            snapshot, read = build_columnar_snapshot(options['directory'], options['full'], options['chunk_size'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Snapshot {snapshot.path} holds {len(snapshot)} rates, read {read} in {elapsed:.2f}s'))
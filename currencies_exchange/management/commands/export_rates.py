@@ -0,0 +1,87 @@
+import sys
+import time
+from django.core.management.base import BaseCommand, CommandError
+from currencies_exchange.models import CurrencyRate
+from currencies_exchange.filters import CurrencyRateFilter
+from currencies_exchange.services import EXPORT_FORMATS, export_rates
+
+
+class Command(BaseCommand):
+    """
+    Django management command for exporting the rate history as CSV or NDJSON.
+
+    The rates are read in chunks and written while they are encoded, so the memory used
+    does not depend on the number of exported rates. The rates can be filtered by pair
+    and date range and the output can be gzipped.
+
+    Attributes:
+        help (str): A short description of the command's purpose.
+
+    Methods:
+        add_arguments(parser): Registers the command line arguments.
+        handle(*args, **options): Executes the command's logic.
+
+    Example:
+        To export the gzipped USD/EUR rates of 2023 as NDJSON:
+        python manage.py export_rates --base USD --target EUR --start 2023-01-01 --end 2023-12-31 \\
+            --format ndjson --gzip --output usd_eur.ndjson.gz
+    """
+
+    help = 'Export the rate history as CSV or NDJSON'
+
+    def add_arguments(self, parser):
+        """
+        Registers the command line arguments.
+        """
+        parser.add_argument('--base', help='Base currency code')
+        parser.add_argument('--target', help='Target currency code')
+        parser.add_argument('--start', help='First date to export (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Last date to export (YYYY-MM-DD)')
+        parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='csv', help='Output format')
+        parser.add_argument('--gzip', action='store_true', help='Compress the output with gzip')
+        parser.add_argument('--output', default='-', help='Output file path (default: standard output)')
+        parser.add_argument('--chunk-size', type=int, default=None, help='Number of rows fetched per query')
+
+    def handle(self, *args, **options):
+        """
+        Executes the command's logic.
+
+        Writes the filtered rates to the output and reports the exported size on the
+        error stream, so that it does not mix with exported data written to the standard
+        output.
+
+        Args:
+            *args: Additional positional arguments.
+            **options: Additional keyword arguments.
+        """
+        filterset = CurrencyRateFilter({
+            'currency_base': options['base'], 'currency_target': options['target'],
+            'date_from': options['start'], 'date_to': options['end'],
+        }, queryset=CurrencyRate.objects.all())
+        if not filterset.is_valid():
+            raise CommandError('; '.join(f'{name}: {" ".join(errors)}' for name, errors in filterset.errors.items()))
+        export_options = {}
+        if options['chunk_size'] is not None:
+            if options['chunk_size'] < 1:
+                raise CommandError('--chunk-size must be positive')
+            export_options['chunk_size'] = options['chunk_size']
+
+        started = time.perf_counter()
+        chunks = export_rates(filterset.qs, options['format'], options['gzip'], **export_options)
+        written = 0
+        if options['output'] == '-':
+            output = sys.stdout.buffer if options['gzip'] else None
+            for chunk in chunks:
+                if output is None:
+                    self.stdout.write(chunk.decode(), ending='')
+                else:
+                    output.write(chunk)
+                written += len(chunk)
+        else:
+            with open(options['output'], 'wb') as output:
+                for chunk in chunks:
+                    output.write(chunk)
+                    written += len(chunk)
+
+        elapsed = time.perf_counter() - started
+        self.stderr.write(self.style.SUCCESS(f'Exported {written} bytes in {elapsed:.2f}s'))
@@ -1,63 +1,97 @@
-import requests
-from currencies_exchange.models import Currency
+from django.db import transaction
+from currencies_exchange.models import CatalogVersion, Currency
+from currencies_exchange.profiling import ProfiledCommandMixin
 from django.core.management.base import BaseCommand
-from currencies_exchange.settings import CURRENCY_API_KEY
+from currencies_exchange.services import CurrencyAPIError, get_client
 
 
-class Command(BaseCommand):
+class Command(ProfiledCommandMixin, BaseCommand):
     """
     Django management command for getting data from an external API and saving it to the database.
 
     This command retrieves information about currencies from an external API and updates
-    the Currency model in the database with the fetched data.
+    the Currency model in the database with the fetched data. Existing currencies are
+    loaded in a single query and the difference is applied with bulk inserts and updates
+    inside one transaction. With --profile the run is profiled into PROFILING_DIR.
 
     Attributes:
         help (str): A short description of the command's purpose.
 
     Methods:
+        add_arguments(parser): Registers the command line arguments.
         handle(*args, **options): Executes the command's logic.
 
     Example:
         To pull currencies data from the external API and update database:
-        python manage.py pull_currencies
+        python manage.py pull_currencies --update-changed
     """
 
     help = 'Get data from external API and save it to the database'
 
-    def handle(self):
+    def add_arguments(self, parser):
+        """
+        Registers the command line arguments.
+        """
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report the changes without writing them to the database')
+        parser.add_argument('--update-changed', action='store_true',
+                            help='Update the names and symbols of existing currencies that changed upstream')
+
+    def handle(self, *args, **options):
         """
         Executes the command's logic.
 
-        Fetches data from an external API and updates the Currency model in the database
-        with the fetched information.
+        Fetches data from an external API, compares it with the stored currencies and
+        writes the difference, then prints a summary of the created, updated and
+        unchanged currencies.
 
         Args:
             *args: Additional positional arguments.
             **options: Additional keyword arguments.
         """
-        url = f'https://api.currencyapi.com/v3/currencies?apikey={CURRENCY_API_KEY}'
-        response = requests.get(url)
-
-        if response.status_code == 200:
-            all_currencies = response.json().get('data', {})
-            for currency_code, currency_data in all_currencies.items():
-                currency_name = currency_data.get('name')
-                if currency_name:
-                    currency, created = Currency.objects.get_or_create(
-                        currency_code=currency_code,
-                        defaults={
-                            'currency_name': currency_name,
-                            'currency_symbol': currency_data.get('symbol'),
-                            'currency_code': currency_code,
-                        }
-                    )
-                    if created:
-                        self.stdout.write(
-                            self.style.SUCCESS(f'Successfully created Currency: {currency.currency_name}'))
-                    else:
-                        self.stdout.write(self.style.WARNING(f'Currency already exists: {currency.currency_name}'))
-                else:
-                    self.stdout.write(self.style.ERROR(f'Invalid currency name for code {currency_code}'))
-        else:
-            self.stdout.write(
-                self.style.ERROR(f'Failed to fetch data from the API. Status code: {response.status_code}'))
+        try:
+            all_currencies = get_client().currencies()
+        except CurrencyAPIError as e:
+            self.stdout.write(self.style.ERROR(f'Failed to fetch data from the API. {e}'))
+            return
+
+        existing = {currency.currency_code: currency for currency in Currency.objects.all()}
+        to_create, to_update = [], []
+        unchanged = changed = invalid = 0
+
+        for currency_code, currency_data in all_currencies.items():
+            currency_name = currency_data.get('name')
+            if not currency_name:
+                invalid += 1
+                self.stdout.write(self.style.ERROR(f'Invalid currency name for code {currency_code}'))
+                continue
+
+            currency_symbol = currency_data.get('symbol') or currency_code
+            currency = existing.get(currency_code)
+            if currency is None:
+                to_create.append(Currency(currency_name=currency_name, currency_symbol=currency_symbol,
+                                          currency_code=currency_code))
+            elif (currency.currency_name, currency.currency_symbol) == (currency_name, currency_symbol):
+                unchanged += 1
+            elif options['update_changed']:
+                currency.currency_name = currency_name
+                currency.currency_symbol = currency_symbol
+                to_update.append(currency)
+            else:
+                changed += 1
+
+        if not options['dry_run']:
+            with transaction.atomic():
+                Currency.objects.bulk_create(to_create)
+                Currency.objects.bulk_update(to_update, ['currency_name', 'currency_symbol'])
+                if to_create or to_update:
+                    # Bulk writes skip the model signals that bump the catalog version
+                    CatalogVersion.bump(CatalogVersion.CURRENCY)
+
+        prefix = 'Dry run: would have ' if options['dry_run'] else ''
+        summary = f'{prefix}created {len(to_create)}, updated {len(to_update)}, unchanged {unchanged}'
+        if changed:
+            summary += f', changed upstream but not updated {changed} (use --update-changed)'
+        if invalid:
+            summary += f', invalid {invalid}'
+        self.stdout.write(self.style.SUCCESS(summary[0].upper() + summary[1:]))
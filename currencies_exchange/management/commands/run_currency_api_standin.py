@@ -0,0 +1,78 @@
+from django.core.management.base import BaseCommand, CommandError
+from currencies_exchange.standin import LatencyModel, StandinServer
+
+
+class Command(BaseCommand):
+    """
+    Django management command serving a local stand-in for the currencyapi.com API.
+
+    The stand-in implements /v3/currencies and /v3/historical with deterministic synthetic
+    data and can add latency, enforce a rate limit and a quota and inject error statuses
+    (see currencies_exchange.standin). Point the application at it by setting
+    CURRENCY_API_BASE_URL to the printed URL.
+
+    Attributes:
+        help (str): A short description of the command's purpose.
+
+    Methods:
+        add_arguments(parser): Registers the command line arguments.
+        handle(*args, **options): Executes the command's logic.
+
+    Example:
+        To serve the API with upstream-like latency and a 10 calls per second limit:
+        python manage.py run_currency_api_standin --port 8765 --latency lognormal:80:0.5 --rate-limit 10
+        CURRENCY_API_BASE_URL=http://127.0.0.1:8765/v3 python manage.py backfill_rates --base USD --start 2023-01-01
+    """
+
+    help = 'Serve a local stand-in for the currencyapi.com API'
+
+    def add_arguments(self, parser):
+        """
+        Registers the command line arguments.
+        """
+        parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on')
+        parser.add_argument('--port', type=int, default=8765, help='Port to listen on')
+        parser.add_argument('--currencies', type=int, default=170, help='Number of synthetic currencies')
+        parser.add_argument('--api-key', help='Required apikey parameter (default: any key is accepted)')
+        parser.add_argument('--latency', default='none',
+                            help='Latency in milliseconds: none, fixed:MS, uniform:MIN:MAX or lognormal:MEDIAN:SIGMA')
+        parser.add_argument('--rate-limit', type=float, default=0,
+                            help='Allowed requests per second, answered with 429 above it (0 disables it)')
+        parser.add_argument('--burst', type=int, default=10, help='Number of requests allowed at once')
+        parser.add_argument('--quota', type=int, default=0,
+                            help='Total number of served requests, answered with 429 above it (0 disables it)')
+        parser.add_argument('--error-rate', type=float, default=0.0,
+                            help='Share of requests failing with an injected error status')
+        parser.add_argument('--error-status', type=int, nargs='+', default=[500, 503],
+                            help='Injected error statuses')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic rates and injected failures')
+
+    def handle(self, *args, **options):
+        """
+        Executes the command's logic.
+
+        Args:
+            *args: Additional positional arguments.
+            **options: Additional keyword arguments.
+        """
+        try:
+            latency = LatencyModel.parse(options['latency'], options['seed'])
+        except ValueError as e:
+            raise CommandError(e)
+        if not 0 <= options['error_rate'] <= 1:
+            raise CommandError('--error-rate must be between 0 and 1')
+
+        server = StandinServer(
+            (options['host'], options['port']), currencies=options['currencies'], api_key=options['api_key'],
+            latency=latency, rate_limit=options['rate_limit'], burst=options['burst'], quota=options['quota'],
+            error_rate=options['error_rate'], error_statuses=options['error_status'], seed=options['seed'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Serving the stand-in API at {server.url}, set CURRENCY_API_BASE_URL={server.url}'))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f'Request counters: {server.counters}')
@@ -0,0 +1,148 @@
+import signal
+import threading
+import multiprocessing
+from django.db import connections
+from django.core.management.base import BaseCommand, CommandError
+from currencies_exchange.services import JobRunResult, retry_failed_jobs, work
+from currencies_exchange.settings import RATE_JOB_BATCH_SIZE, RATE_JOB_POLL_INTERVAL
+from currencies_exchange.workers import run_worker_process
+
+
+class Command(BaseCommand):
+    """
+    Django management command running the workers of the background rate fetch jobs.
+
+    The admin saves a rate it cannot derive as pending and queues its fetch as a
+    RateFetchJob instead of calling the external API during the request. The workers
+    claim due jobs in batches from the database, fetch them with one call per base
+    currency and date, retry the failed calls with a growing delay and fill the pending
+    rows. They run as threads, or as processes with --processes, until interrupted, or
+    until no job is due with --once, e.g. from cron. SIGINT and SIGTERM stop the workers
+    once their current batch is done. The read replica, when configured, is synced once the
+    queue is drained, and the columnar rate snapshot, once built, refreshed.
+
+    Attributes:
+        help (str): A short description of the command's purpose.
+
+    Methods:
+        add_arguments(parser): Registers the command line arguments.
+        handle(*args, **options): Executes the command's logic.
+        run_threads(stop, workers, batch_size, poll_interval, once): Runs the workers as threads.
+        run_processes(stop, workers, batch_size, poll_interval, once): Runs the workers as processes.
+        run_thread(stop, result, batch_size, poll_interval, once): Runs one worker thread.
+        wait(workers, stop): Joins the workers, stopping them on an interrupt.
+
+    Example:
+        To run four worker threads, or four processes:
+        python manage.py run_workers --workers 4
+        python manage.py run_workers --workers 4 --processes
+    """
+
+    help = 'Run the workers of the background rate fetch jobs'
+
+    def add_arguments(self, parser):
+        """
+        Registers the command line arguments.
+        """
+        parser.add_argument('--workers', type=int, default=4, help='Number of workers')
+        parser.add_argument('--processes', action='store_true', help='Run the workers as processes instead of threads')
+        parser.add_argument('--batch-size', type=int, default=RATE_JOB_BATCH_SIZE,
+                            help='Maximum number of jobs claimed at once by a worker')
+        parser.add_argument('--poll-interval', type=float, default=RATE_JOB_POLL_INTERVAL,
+                            help='Seconds to wait when no job is due')
+        parser.add_argument('--once', action='store_true', help='Stop once no job is due')
+        parser.add_argument('--retry-failed', action='store_true', help='Queue the failed jobs again first')
+
+    def handle(self, *args, **options):
+        """
+        Executes the command's logic.
+
+        Starts the workers, waits for them and reports the rates they filled.
+
+        Args:
+            *args: Additional positional arguments.
+            **options: Additional keyword arguments.
+        """
+        if options['workers'] < 1 or options['batch_size'] < 1 or options['poll_interval'] <= 0:
+            raise CommandError('--workers, --batch-size and --poll-interval must be positive')
+        if options['retry_failed']:
+            self.stdout.write(f'Queued {retry_failed_jobs()} failed jobs again')
+
+        run = self.run_processes if options['processes'] else self.run_threads
+        stop = multiprocessing.get_context('spawn').Event() if options['processes'] else threading.Event()
+        previous = signal.signal(signal.SIGTERM, lambda signum, frame: stop.set()) \
+            if threading.current_thread() is threading.main_thread() else None
+        try:
+            result = run(stop, options['workers'], options['batch_size'], options['poll_interval'], options['once'])
+        finally:
+            if previous is not None:
+                signal.signal(signal.SIGTERM, previous)
+        self.stdout.write(self.style.SUCCESS(
+            f'Filled {result.filled} rates from {result.calls} API calls, {result.retried} jobs to retry, '
+            f'{result.failed} failed'))
+
+    def run_threads(self, stop, workers, batch_size, poll_interval, once):
+        """
+        Runs the workers as threads of this process.
+
+        Returns:
+            JobRunResult: The counters of all the workers.
+        """
+        results = [JobRunResult() for _ in range(workers)]
+        threads = [threading.Thread(target=self.run_thread, args=(stop, result, batch_size, poll_interval, once),
+                                    name=f'rate-worker-{index}')
+                   for index, result in enumerate(results)]
+        for thread in threads:
+            thread.start()
+        self.wait(threads, stop)
+        total = JobRunResult()
+        for result in results:
+            total.add(result)
+        return total
+
+    def run_processes(self, stop, workers, batch_size, poll_interval, once):
+        """
+        Runs the workers as spawned processes.
+
+        Returns:
+            JobRunResult: The counters of the workers that completed.
+        """
+        context = multiprocessing.get_context('spawn')
+        queue = context.Queue()
+        processes = [context.Process(target=run_worker_process, args=(stop, queue, batch_size, poll_interval, once),
+                                     name=f'rate-worker-{index}')
+                     for index in range(workers)]
+        connections.close_all()
+        for process in processes:
+            process.start()
+        self.wait(processes, stop)
+
+        total = JobRunResult()
+        for process in processes:
+            if process.exitcode == 0:
+                for name, value in queue.get(timeout=5).items():
+                    setattr(total, name, getattr(total, name) + value)
+            else:
+                self.stdout.write(self.style.ERROR(f'{process.name} exited with code {process.exitcode}'))
+        return total
+
+    def run_thread(self, stop, result, batch_size, poll_interval, once):
+        """
+        Runs one worker thread, closing its database connection when it stops.
+        """
+        try:
+            result.add(work(stop, batch_size, poll_interval, once))
+        finally:
+            connections.close_all()
+
+    def wait(self, workers, stop):
+        """
+        Joins the workers, asking them to stop on a keyboard interrupt.
+        """
+        while any(worker.is_alive() for worker in workers):
+            try:
+                for worker in workers:
+                    worker.join(0.5)
+            except KeyboardInterrupt:
+                self.stdout.write('Stopping the workers after their current batch')
+                stop.set()
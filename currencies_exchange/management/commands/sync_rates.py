@@ -0,0 +1,209 @@
+from datetime import date, timedelta
+from django.utils import timezone
+from currencies_exchange.profiling import ProfiledCommandMixin
+from django.core.management.base import BaseCommand, CommandError
+from currencies_exchange.models import Currency, TrackedPair
+from currencies_exchange.database import sync_replica
+from currencies_exchange.services import find_gaps, ingest_rates, refresh_columnar_snapshot
+from .backfill_rates import MIN_HISTORY_DATE, date_range, parse_date
+
+
+class Command(ProfiledCommandMixin, BaseCommand):
+    """
+    Django management command keeping the rates of the tracked currency pairs up to date.
+
+    Every active TrackedPair has a watermark (synced_through) up to which all of its rates
+    are stored. A run looks for the dates missing after the watermarks with one indexed
+    query, fetches only those, grouping the targets missing on the same base and date into
+    one upstream call, and moves every watermark up to the day before its first date whose
+    call failed. A date the upstream answered without a rate for the pair (e.g. a day the
+    currency was not quoted) is settled and skipped, so that it does not hold the
+    watermark and get fetched again by every run. A run with nothing to fetch makes no
+    upstream call and no write, so the command can run from cron every few minutes. After
+    new rates are stored the read replica and the columnar rate snapshot, when used, are
+    refreshed.
+
+    Attributes:
+        help (str): A short description of the command's purpose.
+
+    Methods:
+        add_arguments(parser): Registers the command line arguments.
+        handle(*args, **options): Executes the command's logic.
+        track(codes, start): Starts tracking the given pairs.
+        split_pair(code): Splits a BASE/TARGET string into its currency codes.
+        get_pairs(codes): Returns the active tracked pairs to sync.
+        plan(gaps): Groups the missing dates into upstream calls.
+        advance(pairs, missing, end): Moves the watermarks of the synced pairs.
+        report_failure(base, history_date, error): Reports an upstream call that failed.
+
+    Example:
+        To track USD/EUR and USD/PLN from 2023 on and sync every tracked pair:
+        python manage.py sync_rates --track USD/EUR USD/PLN --start 2023-01-01
+        python manage.py sync_rates
+    """
+
+    help = 'Fetch the missing rates of the tracked currency pairs'
+
+    def add_arguments(self, parser):
+        """
+        Registers the command line arguments.
+        """
+        parser.add_argument('--track', nargs='+', metavar='BASE/TARGET', help='Start tracking these pairs')
+        parser.add_argument('--start', help='First date of the newly tracked pairs (YYYY-MM-DD)')
+        parser.add_argument('--pair', nargs='+', metavar='BASE/TARGET', help='Only sync these tracked pairs')
+        parser.add_argument('--end', help='Last date to sync (YYYY-MM-DD, default: yesterday)')
+        parser.add_argument('--concurrency', type=int, default=8, help='Maximum number of concurrent API calls')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Number of rows per bulk insert')
+        parser.add_argument('--dry-run', action='store_true', help='Report the gaps without fetching them')
+
+    def handle(self, *args, **options):
+        """
+        Executes the command's logic.
+
+        Finds the gaps of the tracked pairs, fetches them concurrently, moves the
+        watermarks and reports what was stored.
+
+        Args:
+            *args: Additional positional arguments.
+            **options: Additional keyword arguments.
+        """
+        end = parse_date(options['end']) if options['end'] else date.today() - timedelta(days=1)
+        if options['concurrency'] < 1 or options['chunk_size'] < 1:
+            raise CommandError('--concurrency and --chunk-size must be positive')
+        if options['track']:
+            start = parse_date(options['start']) if options['start'] else MIN_HISTORY_DATE
+            if start < MIN_HISTORY_DATE:
+                raise CommandError(f'Invalid start date {start}')
+            self.track(options['track'], start)
+
+        pairs = self.get_pairs(options['pair'])
+        due = [pair for pair in pairs if pair.window_start() <= end]
+        if not due:
+            self.stdout.write(self.style.SUCCESS(f'All {len(pairs)} tracked pairs are synced through {end}'))
+            return
+
+        gaps = find_gaps(due, end)
+        jobs = self.plan(gaps)
+        if options['dry_run']:
+            for pair, ranges in gaps.items():
+                self.stdout.write(f'{pair}: ' + ', '.join(
+                    str(first) if first == last else f'{first} - {last}' for first, last in ranges))
+            self.stdout.write(self.style.SUCCESS(f'{len(gaps)} of {len(due)} pairs have gaps, '
+                                                 f'{len(jobs)} API calls needed'))
+            return
+
+        result = ingest_rates(jobs, options['concurrency'], options['chunk_size'], on_failure=self.report_failure)
+        self.advance(due, result.missing - result.unavailable, end)
+        if result.unavailable:
+            self.stdout.write(self.style.WARNING(
+                f'Skipped {len(result.unavailable)} rates the upstream has no value for'))
+        self.stdout.write(self.style.SUCCESS(
+            f'Synced {len(due)} pairs: stored {result.rows} rates from {result.calls} API calls '
+            f'({result.failures} failed) in {result.seconds:.2f}s'))
+        if result.rows and sync_replica():
+            self.stdout.write(self.style.SUCCESS('Synced the read replica'))
+        if result.rows and refresh_columnar_snapshot():
+            self.stdout.write(self.style.SUCCESS('Refreshed the columnar rate snapshot'))
+
+    def track(self, codes, start):
+        """
+        Starts tracking the given pairs from the start date, reactivating the inactive ones.
+
+        Args:
+            codes (list): BASE/TARGET strings.
+            start (date): The first date of the new pairs.
+
+        Raises:
+            CommandError: If a pair is malformed or uses an unknown currency code.
+        """
+        pairs = [self.split_pair(code) for code in codes]
+        currencies = {currency.currency_code: currency for currency in Currency.objects.filter(
+            currency_code__in={code for pair in pairs for code in pair})}
+        unknown = sorted({code for pair in pairs for code in pair} - set(currencies))
+        if unknown:
+            raise CommandError(f'Unknown currency codes: {", ".join(unknown)}')
+        for base, target in pairs:
+            pair, created = TrackedPair.objects.get_or_create(
+                currency_base=currencies[base], currency_target=currencies[target], defaults={'start_date': start})
+            if not created and not pair.active:
+                pair.active = True
+                pair.save(update_fields=['active'])
+            self.stdout.write(f'{"Tracking" if created else "Already tracking"} {base}/{target}')
+
+    @staticmethod
+    def split_pair(code):
+        """
+        Splits a BASE/TARGET string into its two currency codes.
+        """
+        base, _, target = code.upper().partition('/')
+        if not base or not target or base == target:
+            raise CommandError(f'Invalid pair "{code}", expected BASE/TARGET')
+        return base, target
+
+    def get_pairs(self, codes):
+        """
+        Returns the active tracked pairs to sync, all of them when no codes are given.
+
+        Raises:
+            CommandError: If one of the requested pairs is not tracked.
+        """
+        pairs = list(TrackedPair.objects.filter(active=True).select_related('currency_base', 'currency_target'))
+        if not codes:
+            return pairs
+        requested = {self.split_pair(code) for code in codes}
+        selected = [pair for pair in pairs
+                    if (pair.currency_base.currency_code, pair.currency_target.currency_code) in requested]
+        unknown = requested - {(pair.currency_base.currency_code, pair.currency_target.currency_code)
+                               for pair in selected}
+        if unknown:
+            raise CommandError(f'Pairs not tracked: {", ".join(sorted("/".join(pair) for pair in unknown))}')
+        return selected
+
+    def plan(self, gaps):
+        """
+        Groups the missing dates into upstream calls, one per base currency and date.
+
+        Args:
+            gaps (dict): The missing date ranges of every pair, as returned by find_gaps().
+
+        Returns:
+            list: (base Currency, list of target Currency, date) jobs for ingest_rates().
+        """
+        calls = {}
+        for pair, ranges in gaps.items():
+            for first, last in ranges:
+                for history_date in date_range(first, last):
+                    key = (pair.currency_base_id, history_date)
+                    calls.setdefault(key, (pair.currency_base, []))[1].append(pair.currency_target)
+        return [(base, targets, history_date) for (_, history_date), (base, targets) in sorted(calls.items())]
+
+    def advance(self, pairs, missing, end):
+        """
+        Moves the watermark of every pair to the day before its first date still missing.
+
+        Args:
+            pairs (list): The synced pairs.
+            missing (set): The (base ID, target ID, date) triples whose call failed.
+            end (date): The last date of the sync.
+        """
+        first_missing = {}
+        for base_id, target_id, history_date in missing:
+            key = (base_id, target_id)
+            if key not in first_missing or history_date < first_missing[key]:
+                first_missing[key] = history_date
+        now = timezone.now()
+        for pair in pairs:
+            first = first_missing.get((pair.currency_base_id, pair.currency_target_id))
+            watermark = end if first is None else first - timedelta(days=1)
+            if watermark >= pair.window_start():
+                pair.synced_through = watermark
+            pair.last_synced_at = now
+            if first is not None:
+                self.stdout.write(self.style.WARNING(f'{pair} stays unsynced from {first}, the next run retries it'))
+        TrackedPair.objects.bulk_update(pairs, ['synced_through', 'last_synced_at'])
+
+    def report_failure(self, base, history_date, error):
+        """
+        Reports an upstream call that failed.
+        """
+        self.stdout.write(self.style.ERROR(f'Failed to fetch {base.currency_code} rates for {history_date}: {error}'))
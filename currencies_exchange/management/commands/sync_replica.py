@@ -0,0 +1,39 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from currencies_exchange.database import sync_replica
+
+
+class Command(BaseCommand):
+    """
+    Django management command copying the database into the read replica.
+
+    The copy is made with the SQLite online backup API into the DATABASE_REPLICA file,
+    which the API views read from once it exists (see currencies_exchange.database).
+
+    Attributes:
+        help (str): A short description of the command's purpose.
+
+    Methods:
+        handle(*args, **options): Executes the command's logic.
+
+    Example:
+        To create or refresh the replica:
+        DATABASE_REPLICA=/var/lib/currencies/replica.sqlite3 python manage.py sync_replica
+    """
+
+    help = 'Copy the database into the read replica'
+
+    def handle(self, *args, **options):
+        """
+        Executes the command's logic.
+
+        Args:
+            *args: Additional positional arguments.
+            **options: Additional keyword arguments.
+        """
+        started = time.perf_counter()
+        if not sync_replica():
+            raise CommandError('No read replica is configured, set DATABASE_REPLICA')
+        self.stdout.write(self.style.SUCCESS(
+            f'Synced {settings.DATABASE_REPLICA} in {time.perf_counter() - started:.2f}s'))
@@ -0,0 +1,272 @@
+"""
+Request and upstream instrumentation exposed in the Prometheus text format.
+
+The MetricsMiddleware times every request, the database queries it runs are counted by an
+execute wrapper installed on every connection (see install_query_tracker()) and the
+currencyapi client reports every upstream attempt with record_upstream(). Everything is
+aggregated in the process-wide ``registry``, which the /metrics endpoint renders. The
+counters live in the memory of each worker process, so a scraper sees the process that
+served the scrape.
+"""
+
+import time
+import bisect
+import threading
+import contextvars
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_request_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+def escape(value):
+    """
+    Escapes a label value for the Prometheus text format.
+    """
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels, extra=''):
+    """
+    Formats label pairs as a Prometheus label set.
+
+    Args:
+        labels (tuple): The (name, value) label pairs.
+        extra (str): An already formatted label appended last, e.g. the bucket bound.
+
+    Returns:
+        str: The label set including the braces, empty when there are no labels.
+    """
+    parts = [f'{name}="{escape(value)}"' for name, value in labels]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+class Histogram:
+    """
+    Cumulative histogram of observed values for one label set.
+
+    Attributes:
+        buckets (tuple): The upper bounds of the buckets, in increasing order.
+        counts (list): The number of observations per bucket, not cumulated.
+        total (float): The sum of all observations.
+        count (int): The number of observations.
+
+    Methods:
+        observe(value): Adds an observation.
+        lines(name, labels): Returns the Prometheus sample lines of the histogram.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """
+        Adds an observation.
+        """
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def lines(self, name, labels):
+        """
+        Returns the Prometheus sample lines of the histogram.
+        """
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            bucket_labels = format_labels(labels, f'le="{le}"')
+            lines.append(f'{name}_bucket{bucket_labels} {cumulative}')
+        lines.append(f'{name}_sum{format_labels(labels)} {self.total}')
+        lines.append(f'{name}_count{format_labels(labels)} {self.count}')
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of the counters and histograms of the process.
+
+    Attributes:
+        metrics (dict): A mapping of metric name to its type, help text and samples, the
+            samples being a mapping of label pairs to a number or a Histogram.
+
+    Methods:
+        inc(name, labels, value): Increments a counter.
+        observe(name, labels, value): Adds an observation to a histogram.
+        observe_request(view, method, status, seconds, timings): Records a served request.
+        render(): Returns all metrics in the Prometheus text format.
+        reset(): Clears all samples.
+    """
+
+    DEFINITIONS = {
+        'http_requests_total': ('counter', 'Requests served per view, method and status.'),
+        'http_request_duration_seconds': ('histogram', 'Request latency per view and method.'),
+        'db_queries_total': ('counter', 'Database queries run by the requests per view.'),
+        'db_query_duration_seconds_total': ('counter', 'Time spent in database queries per view.'),
+        'upstream_requests_total': ('counter', 'Currency API attempts per endpoint and status.'),
+        'upstream_request_duration_seconds': ('histogram', 'Currency API attempt latency per endpoint.'),
+        'upstream_retries_total': ('counter', 'Currency API attempts retried per endpoint.'),
+        'singleflight_fetches_total': ('counter', 'Upstream fetches run by single-flight leaders per flight.'),
+        'singleflight_coalesced_total': ('counter', 'Fetches answered by a concurrent fetch per flight and scope.'),
+    }
+
+    def __init__(self):
+        self.metrics = {name: {} for name in self.DEFINITIONS}
+        self._lock = threading.Lock()
+
+    def inc(self, name, labels, value=1):
+        """
+        Increments a counter.
+        """
+        with self._lock:
+            samples = self.metrics[name]
+            samples[labels] = samples.get(labels, 0) + value
+
+    def observe(self, name, labels, value):
+        """
+        Adds an observation to a histogram.
+        """
+        with self._lock:
+            histogram = self.metrics[name].get(labels)
+            if histogram is None:
+                histogram = self.metrics[name][labels] = Histogram()
+            histogram.observe(value)
+
+    def observe_request(self, view, method, status, seconds, timings):
+        """
+        Records a served request with its database query counters.
+
+        Args:
+            view (str): The URL name of the view.
+            method (str): The HTTP method.
+            status (int): The response status code.
+            seconds (float): The time taken to produce the response.
+            timings (RequestTimings): The query counters of the request.
+        """
+        labels = (('view', view), ('method', method))
+        with self._lock:
+            metrics = self.metrics
+            key = labels + (('status', status),)
+            metrics['http_requests_total'][key] = metrics['http_requests_total'].get(key, 0) + 1
+            histogram = metrics['http_request_duration_seconds'].get(labels)
+            if histogram is None:
+                histogram = metrics['http_request_duration_seconds'][labels] = Histogram()
+            histogram.observe(seconds)
+            view_labels = labels[:1]
+            metrics['db_queries_total'][view_labels] = \
+                metrics['db_queries_total'].get(view_labels, 0) + timings.queries
+            metrics['db_query_duration_seconds_total'][view_labels] = \
+                metrics['db_query_duration_seconds_total'].get(view_labels, 0.0) + timings.query_seconds
+
+    def render(self):
+        """
+        Returns all metrics in the Prometheus text format.
+        """
+        lines = []
+        with self._lock:
+            for name, (kind, help_text) in self.DEFINITIONS.items():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, sample in sorted(self.metrics[name].items(), key=lambda item: str(item[0])):
+                    if isinstance(sample, Histogram):
+                        lines.extend(sample.lines(name, labels))
+                    else:
+                        lines.append(f'{name}{format_labels(labels)} {sample}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        """
+        Clears all samples.
+        """
+        with self._lock:
+            for samples in self.metrics.values():
+                samples.clear()
+
+
+registry = MetricsRegistry()
+
+
+class RequestTimings:
+    """
+    Database and upstream counters of the request being served.
+
+    Attributes:
+        queries (int): The number of database queries.
+        query_seconds (float): The time spent in database queries.
+        upstream_calls (int): The number of currency API attempts.
+        upstream_seconds (float): The time spent in currency API attempts.
+
+    Methods:
+        server_timing(seconds): Returns the Server-Timing header value.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.upstream_calls = 0
+        self.upstream_seconds = 0.0
+
+    def server_timing(self, seconds):
+        """
+        Returns the Server-Timing header value for a request that took the given seconds.
+        """
+        value = f'app;dur={seconds * 1000:.2f}, db;dur={self.query_seconds * 1000:.2f};desc="{self.queries} queries"'
+        if self.upstream_calls:
+            value += f', upstream;dur={self.upstream_seconds * 1000:.2f};desc="{self.upstream_calls} calls"'
+        return value
+
+
+def track_queries(execute, sql, params, many, context):
+    """
+    Connection execute wrapper counting and timing the queries of the current request.
+
+    Installed once on every connection by install_query_tracker(), it only reads a context
+    variable outside of requests.
+    """
+    timings = _request_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.query_seconds += time.perf_counter() - started
+
+
+def install_query_tracker(sender, connection, **kwargs):
+    """
+    Adds track_queries() to the execute wrappers of a new connection, once per wrapper object.
+
+    Args:
+        sender (class): The database wrapper class.
+        connection (DatabaseWrapper): The new connection.
+    """
+    if track_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(track_queries)
+
+
+def record_upstream(endpoint, status, seconds, retried):
+    """
+    Records one currency API attempt, also in the timings of the current request if any.
+
+    Args:
+        endpoint (str): The endpoint path, e.g. 'historical'.
+        status (int or None): The response status code, None when no response was received.
+        seconds (float): The duration of the attempt.
+        retried (bool): Whether the attempt is retried.
+    """
+    labels = (('endpoint', endpoint),)
+    registry.inc('upstream_requests_total', labels + (('status', status or 'error'),))
+    registry.observe('upstream_request_duration_seconds', labels, seconds)
+    if retried:
+        registry.inc('upstream_retries_total', labels)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.upstream_calls += 1
+        timings.upstream_seconds += seconds
@@ -0,0 +1,3 @@
+from .metrics import MetricsMiddleware
+from .profiling import ProfilingMiddleware
+from .replica_reads import ReplicaReadMiddleware
@@ -0,0 +1,74 @@
+import time
+from django.conf import settings
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.exceptions import MiddlewareNotUsed
+from currencies_exchange.metrics import RequestTimings, _request_timings, registry
+
+
+class MetricsMiddleware:
+    """
+    Middleware recording the latency, database queries and upstream calls of every request.
+
+    The queries of all database aliases and the currencyapi attempts made while the request
+    is served are added to its RequestTimings, see currencies_exchange.metrics. The totals
+    are added to the registry rendered by /metrics and to the response as a Server-Timing
+    header. Streaming responses are timed until their headers are ready. The middleware is
+    removed from the stack when METRICS_ENABLED is off. It runs natively in both the
+    WSGI and the ASGI stack; queries that async views run through sync_to_async() are
+    counted as well, since their thread inherits the context of the request.
+
+    Methods:
+        view_name(request): Returns the label of the view that served the request.
+        finish(request, response, timings, started): Records the request and sets Server-Timing.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = _request_timings.set(timings)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_timings.reset(token)
+        return self.finish(request, response, timings, started)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = _request_timings.set(timings)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_timings.reset(token)
+        return self.finish(request, response, timings, started)
+
+    def finish(self, request, response, timings, started):
+        """
+        Adds the request to the registry and its timings to the response as Server-Timing.
+        """
+        seconds = time.perf_counter() - started
+        registry.observe_request(self.view_name(request), request.method, response.status_code, seconds, timings)
+        response['Server-Timing'] = timings.server_timing(seconds)
+        return response
+
+    @staticmethod
+    def view_name(request):
+        """
+        Returns the URL name of the view that served the request, or the route when unnamed.
+        """
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return 'unmatched'
+        return match.view_name or match.route
@@ -0,0 +1,65 @@
+import random
+from django.conf import settings
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.exceptions import MiddlewareNotUsed
+from currencies_exchange.profiling import try_profile
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_PARAMETER = 'profile'
+
+
+class ProfilingMiddleware:
+    """
+    Middleware profiling single requests on demand or at random.
+
+    A request is profiled when it comes from one of PROFILING_ALLOWED_IPS and carries the
+    X-Profile header or the ``profile`` query parameter, or otherwise at random with the
+    probability PROFILING_SAMPLE_RATE. The profile and the SQL timeline are written to
+    PROFILING_DIR (see currencies_exchange.profiling) and the response names them in the
+    X-Profile-Id header. Requests arriving while another one is profiled run unprofiled.
+    The middleware is removed from the stack when neither trigger is configured. Under
+    ASGI the profile covers the event loop while the request is served, so other requests
+    running on the loop meanwhile show up in it too.
+
+    Methods:
+        should_profile(request): Returns whether the request is profiled.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ALLOWED_IPS and settings.PROFILING_SAMPLE_RATE <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.should_profile(request):
+            return self.get_response(request)
+        with try_profile(f'{request.method} {request.path}') as result:
+            response = self.get_response(request)
+        if result is not None:
+            response['X-Profile-Id'] = result.path.stem
+        return response
+
+    async def __acall__(self, request):
+        if not self.should_profile(request):
+            return await self.get_response(request)
+        with try_profile(f'{request.method} {request.path}') as result:
+            response = await self.get_response(request)
+        if result is not None:
+            response['X-Profile-Id'] = result.path.stem
+        return response
+
+    def should_profile(self, request):
+        """
+        Returns whether the request is profiled.
+        """
+        requested = PROFILE_HEADER in request.headers or PROFILE_PARAMETER in request.GET
+        if requested and request.META.get('REMOTE_ADDR') in settings.PROFILING_ALLOWED_IPS:
+            return True
+        return settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE
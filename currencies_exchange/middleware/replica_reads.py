@@ -0,0 +1,69 @@
+from rest_framework.views import APIView
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from currencies_exchange.database import _replica_reads, replica_available
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaReadMiddleware:
+    """
+    Middleware routing the reads of the API views to the read replica.
+
+    Safe requests to DRF views, and requests to views declaring ``replica_reads = True``
+    (read-only POST endpoints), read from the replica when one is available. Every other
+    request, like the admin ones, reads from the default database and sees its own writes.
+    Under ASGI the view hook is a coroutine as well, so that Django does not run it on the
+    thread for synchronous code.
+
+    Methods:
+        process_view(request, view_func, view_args, view_kwargs): Enables replica reads for the view.
+        aprocess_view(request, view_func, view_args, view_kwargs): The same, for the async stack.
+        reset(request): Restores the default reads once the response is returned.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        self.reset(request)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        self.reset(request)
+        return response
+
+    @staticmethod
+    def reset(request):
+        """
+        Restores the default reads once the response is returned.
+        """
+        token = getattr(request, '_replica_reads_token', None)
+        if token is not None:
+            _replica_reads.reset(token)
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        """
+        Enables replica reads for the view, see process_view().
+        """
+        return ReplicaReadMiddleware.process_view(self, request, view_func, view_args, view_kwargs)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """
+        Enables replica reads until the response is returned when the view qualifies.
+        """
+        view_class = getattr(view_func, 'cls', None)
+        if view_class is None or not issubclass(view_class, APIView):
+            return None
+        if (request.method in SAFE_METHODS or getattr(view_class, 'replica_reads', False)) and replica_available():
+            request._replica_reads_token = _replica_reads.set(True)
+        return None
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:09
+
+import currencies_exchange.models.currency_rate
+import datetime
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Currency',
+            fields=[
+                ('id', models.AutoField(editable=False, primary_key=True, serialize=False)),
+                ('currency_name', models.TextField(default='US Dollar', validators=[django.core.validators.MinLengthValidator(1), django.core.validators.MaxLengthValidator(128)], verbose_name='Currency Name')),
+                ('currency_symbol', models.TextField(default='$', validators=[django.core.validators.MinLengthValidator(1), django.core.validators.MaxLengthValidator(128)], verbose_name='Currency Symbol')),
+                ('currency_code', models.TextField(default='USD', validators=[django.core.validators.MinLengthValidator(1), django.core.validators.MaxLengthValidator(128)], verbose_name='Currency Code')),
+            ],
+            options={
+                'verbose_name_plural': 'Currency',
+                'ordering': ['id', 'currency_name', 'currency_symbol', 'currency_code'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CurrencyRate',
+            fields=[
+                ('id', models.AutoField(editable=False, primary_key=True, serialize=False)),
+                ('rate', models.FloatField(verbose_name='Currency Rate')),
+                ('history_date', models.DateField(validators=[django.core.validators.MinValueValidator(datetime.date(2010, 6, 1)), django.core.validators.MaxValueValidator(currencies_exchange.models.currency_rate.yesterday)], verbose_name='History date')),
+                ('currency_base', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='base_currency', to='currencies_exchange.currency')),
+                ('currency_target', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='target_currency', to='currencies_exchange.currency')),
+            ],
+            options={
+                'verbose_name_plural': 'Historical Rates',
+                'ordering': ['id', 'currency_base', 'currency_target', 'rate', 'history_date'],
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:10
+
+import django.core.validators
+from django.db import migrations, models
+from django.db.models import Count, Min
+import django.db.models.deletion
+
+
+def remove_duplicates(apps, schema_editor):
+    """
+    Removes the duplicate currencies and rates that would violate the new unique constraints.
+
+    Rates of a duplicate currency are moved to the currency with the lowest ID before it is
+    deleted, then only the lowest ID rate of every pair and date is kept.
+    """
+    Currency = apps.get_model('currencies_exchange', 'Currency')
+    CurrencyRate = apps.get_model('currencies_exchange', 'CurrencyRate')
+
+    duplicates = (Currency.objects.order_by().values('currency_code')
+                  .annotate(keep=Min('id'), count=Count('id')).filter(count__gt=1))
+    for row in duplicates:
+        others = Currency.objects.filter(currency_code=row['currency_code']).exclude(id=row['keep'])
+        CurrencyRate.objects.filter(currency_base__in=others).update(currency_base_id=row['keep'])
+        CurrencyRate.objects.filter(currency_target__in=others).update(currency_target_id=row['keep'])
+        others.delete()
+
+    keep = (CurrencyRate.objects.order_by().values('currency_base', 'currency_target', 'history_date')
+            .annotate(keep=Min('id')).values('keep'))
+    CurrencyRate.objects.exclude(id__in=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('currencies_exchange', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='currency',
+            name='currency_code',
+            field=models.TextField(default='USD', unique=True, validators=[django.core.validators.MinLengthValidator(1), django.core.validators.MaxLengthValidator(128)], verbose_name='Currency Code'),
+        ),
+        migrations.AlterField(
+            model_name='currencyrate',
+            name='currency_base',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='base_currency', to='currencies_exchange.currency'),
+        ),
+        migrations.AddIndex(
+            model_name='currencyrate',
+            index=models.Index(fields=['currency_base', 'currency_target', 'history_date', 'rate'], name='currency_rate_pair_range_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='currencyrate',
+            index=models.Index(fields=['history_date'], name='currency_rate_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='currencyrate',
+            constraint=models.UniqueConstraint(fields=('currency_base', 'currency_target', 'history_date'), name='currency_rate_pair_date_unique'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:13
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('currencies_exchange', '0002_rate_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogVersion',
+            fields=[
+                ('name', models.CharField(max_length=64, primary_key=True, serialize=False, verbose_name='Catalog Name')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='Version')),
+                ('modified', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Last Modified')),
+            ],
+            options={
+                'verbose_name_plural': 'Catalog Versions',
+            },
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:17
+
+from django.db import migrations
+from django.db.utils import OperationalError
+
+FTS_TABLE = 'currencies_exchange_currency_fts'
+CONTENT_TABLE = 'currencies_exchange_currency'
+COLUMNS = 'currency_code, currency_name, currency_symbol'
+# Currency symbols are kept as tokens so that e.g. "$" or "€" can be searched for
+TOKENIZERS = ["unicode61 categories 'L* N* Co Sc Sm So'", 'unicode61']
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Creates the FTS5 index of the currencies and the triggers keeping it in sync.
+
+    The index is an external content table over the currency table, so only the index
+    itself is stored. The triggers follow every write, including bulk ones. Note that a
+    later migration rebuilding the currency table on SQLite drops the triggers, which then
+    have to be recreated by that migration.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for tokenizer in TOKENIZERS:
+        try:
+            schema_editor.execute(
+                f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5({COLUMNS}, content="{CONTENT_TABLE}", '
+                f'content_rowid="id", tokenize="{tokenizer}", prefix="1 2 3")')
+            break
+        except OperationalError:
+            if tokenizer == TOKENIZERS[-1]:
+                raise
+    schema_editor.execute(
+        f'CREATE TRIGGER {FTS_TABLE}_insert AFTER INSERT ON {CONTENT_TABLE} BEGIN '
+        f'INSERT INTO {FTS_TABLE}(rowid, {COLUMNS}) '
+        f'VALUES (new.id, new.currency_code, new.currency_name, new.currency_symbol); END')
+    schema_editor.execute(
+        f'CREATE TRIGGER {FTS_TABLE}_delete AFTER DELETE ON {CONTENT_TABLE} BEGIN '
+        f'INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {COLUMNS}) '
+        f"VALUES ('delete', old.id, old.currency_code, old.currency_name, old.currency_symbol); END")
+    schema_editor.execute(
+        f'CREATE TRIGGER {FTS_TABLE}_update AFTER UPDATE ON {CONTENT_TABLE} BEGIN '
+        f'INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {COLUMNS}) '
+        f"VALUES ('delete', old.id, old.currency_code, old.currency_name, old.currency_symbol); "
+        f'INSERT INTO {FTS_TABLE}(rowid, {COLUMNS}) '
+        f'VALUES (new.id, new.currency_code, new.currency_name, new.currency_symbol); END')
+    schema_editor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def drop_search_index(apps, schema_editor):
+    """
+    Drops the FTS5 index of the currencies and its triggers.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for trigger in ('insert', 'delete', 'update'):
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {FTS_TABLE}_{trigger}')
+    schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('currencies_exchange', '0003_catalog_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:45
+
+import datetime
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('currencies_exchange', '0004_currency_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrackedPair',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField(default=datetime.date(2010, 6, 1), verbose_name='Start date')),
+                ('synced_through', models.DateField(blank=True, null=True, verbose_name='Synced through')),
+                ('active', models.BooleanField(default=True, verbose_name='Active')),
+                ('last_synced_at', models.DateTimeField(blank=True, null=True, verbose_name='Last synced at')),
+                ('currency_base', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='tracked_as_base', to='currencies_exchange.currency')),
+                ('currency_target', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tracked_as_target', to='currencies_exchange.currency')),
+            ],
+            options={
+                'verbose_name_plural': 'Tracked Pairs',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='trackedpair',
+            constraint=models.UniqueConstraint(fields=('currency_base', 'currency_target'), name='tracked_pair_unique'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('currencies_exchange', '0005_tracked_pair'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FetchLock',
+            fields=[
+                ('key', models.CharField(max_length=255, primary_key=True, serialize=False, verbose_name='Key')),
+                ('value', models.TextField(blank=True, null=True, verbose_name='Value')),
+                ('expires', models.DateTimeField(db_index=True, verbose_name='Expires')),
+            ],
+            options={
+                'verbose_name_plural': 'Fetch Locks',
+            },
+        ),
+    ]
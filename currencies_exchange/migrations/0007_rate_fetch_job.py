@@ -0,0 +1,60 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.manager
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('currencies_exchange', '0006_fetch_lock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateFetchJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('state', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('failed', 'Failed')], default='queued', max_length=16, verbose_name='State')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Attempts')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Run after')),
+                ('claimed_by', models.CharField(blank=True, max_length=32, verbose_name='Claimed by')),
+                ('locked_until', models.DateTimeField(blank=True, null=True, verbose_name='Locked until')),
+                ('last_error', models.TextField(blank=True, verbose_name='Last error')),
+                ('created', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Created')),
+            ],
+            options={
+                'verbose_name_plural': 'Rate Fetch Jobs',
+            },
+        ),
+        migrations.AlterModelOptions(
+            name='currencyrate',
+            options={'default_manager_name': 'with_pending', 'ordering': ['id', 'currency_base', 'currency_target', 'rate', 'history_date'], 'verbose_name_plural': 'Historical Rates'},
+        ),
+        migrations.AlterModelManagers(
+            name='currencyrate',
+            managers=[
+                ('with_pending', django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='currencyrate',
+            name='rate',
+            field=models.FloatField(blank=True, null=True, verbose_name='Currency Rate'),
+        ),
+        migrations.AddIndex(
+            model_name='currencyrate',
+            index=models.Index(condition=models.Q(('rate__isnull', True)), fields=['history_date'], name='currency_rate_pending_idx'),
+        ),
+        migrations.AddField(
+            model_name='ratefetchjob',
+            name='rate',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='fetch_job', to='currencies_exchange.currencyrate'),
+        ),
+        migrations.AddIndex(
+            model_name='ratefetchjob',
+            index=models.Index(fields=['state', 'run_after'], name='rate_fetch_job_due_idx'),
+        ),
+    ]
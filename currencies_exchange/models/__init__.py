@@ -1,2 +1,6 @@
 from .currency import Currency
 from .currency_rate import CurrencyRate
+from .catalog_version import CatalogVersion
+from .tracked_pair import TrackedPair
+from .fetch_lock import FetchLock
+from .rate_fetch_job import RateFetchJob
@@ -0,0 +1,70 @@
+from django.db import models
+from django.db.models import F
+from django.utils.timezone import now
+
+
+class CatalogVersion(models.Model):
+    """
+    Model representing the version of a cached catalog.
+
+    The version of a catalog is bumped whenever its rows change, so that HTTP validators
+    (ETag and Last-Modified) and server-side caches derived from it are invalidated. The
+    RATE_EDIT catalog is only bumped when existing rates are changed or deleted, not when
+    rates are added, for the caches that merge in new rates (see build_columnar_snapshot()).
+
+    Attributes:
+        name (models.CharField): The name of the catalog, the primary key.
+        version (models.PositiveBigIntegerField): The number of changes of the catalog.
+        modified (models.DateTimeField): The time of the last change.
+
+    Methods:
+        current(name): Returns the version and modification time of a catalog.
+        bump(name): Increments the version of a catalog.
+
+    Example:
+        To get the version of the currency catalog:
+        version, modified = CatalogVersion.current(CatalogVersion.CURRENCY)
+    """
+
+    CURRENCY = 'currency'
+    RATE = 'rate'
+    RATE_EDIT = 'rate_edit'
+
+    name = models.CharField(verbose_name='Catalog Name', max_length=64, primary_key=True)
+    version = models.PositiveBigIntegerField(verbose_name='Version', default=0)
+    modified = models.DateTimeField(verbose_name='Last Modified', default=now)
+
+    @classmethod
+    def current(cls, name):
+        """
+        Returns the version and modification time of a catalog.
+
+        Args:
+            name (str): The name of the catalog.
+
+        Returns:
+            tuple: The version and modification time, (0, None) for a catalog that never changed.
+        """
+        return cls.objects.filter(name=name).values_list('version', 'modified').first() or (0, None)
+
+    @classmethod
+    def bump(cls, name):
+        """
+        Increments the version of a catalog and records the modification time.
+
+        Args:
+            name (str): The name of the catalog.
+        """
+        if not cls.objects.filter(name=name).update(version=F('version') + 1, modified=now()):
+            catalog, created = cls.objects.get_or_create(name=name, defaults={'version': 1})
+            if not created:
+                cls.objects.filter(name=name).update(version=F('version') + 1, modified=now())
+
+    class Meta:
+        """
+        Metadata class for the CatalogVersion model.
+
+        Attributes:
+            verbose_name_plural (str): The plural name for the model in the admin interface.
+        """
+        verbose_name_plural = "Catalog Versions"
@@ -13,7 +13,10 @@ class Currency(models.Model):
         id (models.AutoField): The primary key for the Currency model.
         currency_name (models.TextField): The name of the currency.
         currency_symbol (models.TextField): The symbol of the currency.
-        currency_code (models.TextField): The code of the currency.
+        currency_code (models.TextField): The unique code of the currency.
+
+    Methods:
+        __str__(): Returns the currency code, as shown in choices and autocomplete results.
 
     Meta:
         ordering (list): The default ordering for the model.
@@ -29,9 +32,18 @@ class Currency(models.Model):
                                      validators=[MinLengthValidator(1), MaxLengthValidator(128)])
     currency_symbol = models.TextField(verbose_name="Currency Symbol", default='$',
                                        validators=[MinLengthValidator(1), MaxLengthValidator(128)])
-    currency_code = models.TextField(verbose_name="Currency Code", default='USD',
+    currency_code = models.TextField(verbose_name="Currency Code", default='USD', unique=True,
                                      validators=[MinLengthValidator(1), MaxLengthValidator(128)])
 
+    def __str__(self):
+        """
+        Returns the currency code, as shown in choices and autocomplete results.
+
+        Returns:
+            str: The currency code.
+        """
+        return self.currency_code
+
     class Meta:
         """
         Metadata class for the Currency model.
@@ -1,37 +1,67 @@
 import logging
-import requests
 from django.db import models
 from .currency import Currency
 from datetime import date, timedelta
 from django.utils.timezone import now
-from ..settings import CURRENCY_API_KEY
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 logger = logging.getLogger(__name__)
 
 
+def yesterday():
+    """
+    Returns yesterday's date, the latest date a historical rate can be recorded for.
+
+    Used as a callable validator limit so that the limit moves with the current date.
+    """
+    return now().date() - timedelta(days=1)
+
+
+class FilledRateManager(models.Manager):
+    """
+    Manager of the rates whose value is known, leaving out the rows waiting for a queued fetch.
+    """
+
+    def get_queryset(self):
+        """
+        Returns the rates that have a value.
+        """
+        return super().get_queryset().filter(rate__isnull=False)
+
+
 class CurrencyRate(models.Model):
     """
     Model representing historical currency exchange rates.
 
     This model stores information about the exchange rate between two currencies
-    on a specific historical date.
+    on a specific historical date. A rate saved without its value is pending: its fetch
+    is queued as a RateFetchJob and the row is filled by the run_workers command. The
+    ``objects`` manager only returns filled rates, ``with_pending`` returns all of them
+    and is the default manager, so that the admin lists pending rows and uniqueness
+    checks see them.
 
     Attributes:
         id (models.AutoField): The primary key for the CurrencyRate model.
         currency_base (models.ForeignKey): The base currency for the exchange rate.
         currency_target (models.ForeignKey): The target currency for the exchange rate.
-        rate (models.FloatField): The exchange rate value.
+        rate (models.FloatField): The exchange rate value, null while its fetch is pending.
         history_date (models.DateField): The date for which the exchange rate is recorded.
 
+    Managers:
+        objects (FilledRateManager): The rates that have a value.
+        with_pending (models.Manager): All rates, pending ones included.
+
     Methods:
         __str__(): Returns a human-readable string representation of the CurrencyRate instance.
-        save(*args, **kwargs): Overrides the save method to fetch and update the exchange rate.
+        save(*args, fetch_rate=True, **kwargs): Overrides the save method to fetch or queue the exchange rate.
 
     Meta:
         ordering (list): The default ordering for the model.
+        default_manager_name (str): The manager including the pending rates.
         verbose_name_plural (str): The plural name for the model in the admin interface.
+        constraints (list): A pair can only have one rate per date.
+        indexes (list): A covering index for date range scans of a pair, a date index and a pending rates index.
 
     Example:
         To retrieve historical rates:
@@ -39,14 +69,19 @@ class CurrencyRate(models.Model):
     """
 
     id = models.AutoField(editable=False, primary_key=True)
-    currency_base = models.ForeignKey(Currency, related_name='base_currency', on_delete=models.CASCADE)
+    # Lookups by base currency are served by the leading column of the pair/date indexes
+    currency_base = models.ForeignKey(Currency, related_name='base_currency', on_delete=models.CASCADE,
+                                      db_index=False)
     currency_target = models.ForeignKey(Currency, related_name='target_currency', on_delete=models.CASCADE)
-    rate = models.FloatField(verbose_name='Currency Rate')
+    rate = models.FloatField(verbose_name='Currency Rate', null=True, blank=True)
     history_date = models.DateField(verbose_name='History date', validators=[
         MinValueValidator(date(2010, 6, 1)),
-        MaxValueValidator(now().date() - timedelta(days=1))
+        MaxValueValidator(yesterday)
     ])
 
+    objects = FilledRateManager()
+    with_pending = models.Manager()
+
     def __str__(self):
         """
         Returns a human-readable string representation of the CurrencyRate instance.
@@ -54,41 +89,52 @@ class CurrencyRate(models.Model):
         Returns:
             str: A string representation of the CurrencyRate instance.
         """
-        return f"{self.currency_base.currency_name} to {self.currency_target.currency_name} - Rate: {self.rate}"
+        rate = 'pending' if self.rate is None else self.rate
+        return f"{self.currency_base.currency_name} to {self.currency_target.currency_name} - Rate: {rate}"
 
-    def save(self):
+    def save(self, *args, fetch_rate=True, **kwargs):
         """
         Overrides the save method to fetch and update the exchange rate.
 
-        If the rate is not provided, it fetches the exchange rate from an external API
-        and updates the rate field before saving the instance.
+        If the rate is not provided, it is first derived from the pivot snapshot of the
+        history date. Only when the snapshot has no data for the pair is the exchange rate
+        fetched from an external API before saving the instance, once for all the concurrent
+        saves of the same pair and date (see SingleFlight). With fetch_rate=False the row is
+        saved pending instead and its fetch is queued for the run_workers command.
+
+        Args:
+            fetch_rate (bool): Whether to fetch a missing rate now rather than queue its fetch.
 
         Raises:
             ValidationError: If there is an issue fetching or updating the exchange rate.
         """
+        from ..services import CurrencyAPIError, derive_rate, enqueue_rate_fetch, fetch_historical, invalidate_snapshot
+
         if not self.rate:
-            base_currency_code = self.currency_base.currency_code
-            target_currency_code = self.currency_target.currency_code
-            history_date = self.history_date.strftime('%Y-%m-%d')
-            api_url = f'https://api.currencyapi.com/v3/historical?apikey={CURRENCY_API_KEY}&currencies={target_currency_code}&base_currency={base_currency_code}&date={history_date}'
+            self.rate = derive_rate(self.currency_base_id, self.currency_target_id, self.history_date)
 
+        if not self.rate and fetch_rate:
+            target_currency_code = self.currency_target.currency_code
             try:
-                response = requests.get(api_url)
-                response.raise_for_status()
-                data = response.json()
-                rate_value = data['data'][target_currency_code]['value']
-
+                # Concurrent saves of the same pair and date share one upstream call
+                rates = fetch_historical(self.currency_base.currency_code, [target_currency_code],
+                                         self.history_date)
                 # Update the rate field with the fetched value
-                self.rate = rate_value
-            except Exception as e:
-                if response.status_code == 422:
+                self.rate = rates[target_currency_code]
+            except CurrencyAPIError as e:
+                if e.status_code == 422:
                     logger.error(f'Failed to fetch currency exchange rate: Unprocessable Entity')
                     raise ValidationError('Failed to fetch currency exchange rate: Unprocessable Entity')
-                else:
-                    logger.error(f'Failed to fetch currency exchange rate: {e}')
-                    raise ValidationError(f'Failed to fetch currency exchange rate: {e}')
+                logger.error(f'Failed to fetch currency exchange rate: {e}')
+                raise ValidationError(f'Failed to fetch currency exchange rate: {e}')
+            except KeyError as e:
+                logger.error(f'Failed to fetch currency exchange rate: missing rate for {e}')
+                raise ValidationError(f'Failed to fetch currency exchange rate: missing rate for {e}')
 
         super(CurrencyRate, self).save(*args, **kwargs)
+        if self.rate is None:
+            enqueue_rate_fetch(self)
+        invalidate_snapshot(self.history_date, [self.currency_base_id, self.currency_target_id])
 
     class Meta:
         """
@@ -96,7 +142,24 @@ class CurrencyRate(models.Model):
 
         Attributes:
             ordering (list): The default ordering for the model.
+            default_manager_name (str): The manager including the pending rates.
             verbose_name_plural (str): The plural name for the model in the admin interface.
+            constraints (list): The unique constraint on the currency pair and date.
+            indexes (list): The covering pair/date/rate index, the date index and the pending rates index.
         """
         ordering = ['id', 'currency_base', 'currency_target', 'rate', 'history_date']
+        default_manager_name = 'with_pending'
         verbose_name_plural = "Historical Rates"
+        constraints = [
+            models.UniqueConstraint(fields=['currency_base', 'currency_target', 'history_date'],
+                                    name='currency_rate_pair_date_unique'),
+        ]
+        indexes = [
+            # Includes the rate so that date range scans of a pair never touch the table
+            models.Index(fields=['currency_base', 'currency_target', 'history_date', 'rate'],
+                         name='currency_rate_pair_range_idx'),
+            models.Index(fields=['history_date'], name='currency_rate_date_idx'),
+            # Only holds the pending rows, which every bulk write looks up to fill them
+            models.Index(fields=['history_date'], condition=models.Q(rate__isnull=True),
+                         name='currency_rate_pending_idx'),
+        ]
@@ -0,0 +1,34 @@
+from django.db import models
+
+
+class FetchLock(models.Model):
+    """
+    Model representing an upstream fetch in progress or just completed, see SingleFlight.
+
+    The process that creates the row of a key runs the fetch, other processes asking for
+    the same key wait until the row holds the result and use it instead of fetching again.
+    A row whose fetch did not complete in time expires and can be taken over, a completed
+    row expires after the result time to live.
+
+    Attributes:
+        key (models.CharField): The key of the fetch, the primary key.
+        value (models.TextField): The JSON encoded result, null while the fetch is running.
+        expires (models.DateTimeField): The time after which the row is ignored and deleted.
+
+    Example:
+        To list the fetches currently running:
+        FetchLock.objects.filter(value__isnull=True, expires__gte=now())
+    """
+
+    key = models.CharField(verbose_name='Key', max_length=255, primary_key=True)
+    value = models.TextField(verbose_name='Value', null=True, blank=True)
+    expires = models.DateTimeField(verbose_name='Expires', db_index=True)
+
+    class Meta:
+        """
+        Metadata class for the FetchLock model.
+
+        Attributes:
+            verbose_name_plural (str): The plural name for the model in the admin interface.
+        """
+        verbose_name_plural = "Fetch Locks"
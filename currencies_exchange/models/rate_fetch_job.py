@@ -0,0 +1,68 @@
+from django.db import models
+from django.utils.timezone import now
+from .currency_rate import CurrencyRate
+
+
+class RateFetchJob(models.Model):
+    """
+    Model representing the queued upstream fetch of a pending rate.
+
+    Saving a rate without its value, as the admin does, queues a job instead of calling
+    the external API during the request. The run_workers command claims due jobs in
+    batches, fetches their rates with one call per base currency and date, fills the
+    pending rows and deletes the jobs. A failed call is retried with a growing delay until
+    RATE_JOB_MAX_ATTEMPTS, then the job is kept as failed with its error. A claimed job
+    is leased to its worker until locked_until, after which another worker may take it
+    over, so that jobs of a worker that died are not lost.
+
+    Attributes:
+        rate (models.OneToOneField): The pending rate to fill.
+        state (models.CharField): Queued, running or failed.
+        attempts (models.PositiveIntegerField): The number of failed fetches.
+        run_after (models.DateTimeField): The time from which a queued job may run.
+        claimed_by (models.CharField): The token of the batch that claimed the job.
+        locked_until (models.DateTimeField): The end of the lease of a running job.
+        last_error (models.TextField): The error of the last failed fetch.
+        created (models.DateTimeField): The time the job was queued.
+
+    Meta:
+        verbose_name_plural (str): The plural name for the model in the admin interface.
+        indexes (list): The index of the due jobs.
+
+    Example:
+        To count the rates waiting for their fetch:
+        RateFetchJob.objects.filter(state=RateFetchJob.QUEUED).count()
+    """
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATES = [(QUEUED, 'Queued'), (RUNNING, 'Running'), (FAILED, 'Failed')]
+
+    rate = models.OneToOneField(CurrencyRate, related_name='fetch_job', on_delete=models.CASCADE)
+    state = models.CharField(verbose_name='State', max_length=16, choices=STATES, default=QUEUED)
+    attempts = models.PositiveIntegerField(verbose_name='Attempts', default=0)
+    run_after = models.DateTimeField(verbose_name='Run after', default=now)
+    claimed_by = models.CharField(verbose_name='Claimed by', max_length=32, blank=True)
+    locked_until = models.DateTimeField(verbose_name='Locked until', null=True, blank=True)
+    last_error = models.TextField(verbose_name='Last error', blank=True)
+    created = models.DateTimeField(verbose_name='Created', default=now)
+
+    def __str__(self):
+        """
+        Returns a human-readable string representation of the RateFetchJob instance.
+        """
+        return f'Fetch of rate {self.rate_id} ({self.state}, {self.attempts} failed attempts)'
+
+    class Meta:
+        """
+        Metadata class for the RateFetchJob model.
+
+        Attributes:
+            verbose_name_plural (str): The plural name for the model in the admin interface.
+            indexes (list): The state and run_after index the workers claim due jobs with.
+        """
+        verbose_name_plural = "Rate Fetch Jobs"
+        indexes = [
+            models.Index(fields=['state', 'run_after'], name='rate_fetch_job_due_idx'),
+        ]
@@ -0,0 +1,66 @@
+from datetime import date
+from django.db import models
+from .currency import Currency
+
+
+class TrackedPair(models.Model):
+    """
+    Model representing a currency pair whose rates are kept up to date by sync_rates.
+
+    The watermark (synced_through) is the last date up to which every rate of the pair
+    from start_date on is stored, so that each sync only looks for gaps after it.
+
+    Attributes:
+        currency_base (models.ForeignKey): The base currency of the pair.
+        currency_target (models.ForeignKey): The target currency of the pair.
+        start_date (models.DateField): The first date whose rate is kept.
+        synced_through (models.DateField): The watermark, empty until the first complete sync.
+        active (models.BooleanField): Whether the pair is synced.
+        last_synced_at (models.DateTimeField): The time of the last sync of the pair.
+
+    Methods:
+        __str__(): Returns the pair as BASE/TARGET.
+        window_start(): Returns the first date the next sync has to check.
+
+    Meta:
+        constraints (list): A pair can only be tracked once.
+
+    Example:
+        To track the USD/EUR rates from 2023 on:
+        TrackedPair.objects.create(currency_base=usd, currency_target=eur, start_date=date(2023, 1, 1))
+    """
+
+    currency_base = models.ForeignKey(Currency, related_name='tracked_as_base', on_delete=models.CASCADE,
+                                      db_index=False)
+    currency_target = models.ForeignKey(Currency, related_name='tracked_as_target', on_delete=models.CASCADE)
+    start_date = models.DateField(verbose_name='Start date', default=date(2010, 6, 1))
+    synced_through = models.DateField(verbose_name='Synced through', null=True, blank=True)
+    active = models.BooleanField(verbose_name='Active', default=True)
+    last_synced_at = models.DateTimeField(verbose_name='Last synced at', null=True, blank=True)
+
+    def __str__(self):
+        """
+        Returns the pair as BASE/TARGET.
+        """
+        return f'{self.currency_base.currency_code}/{self.currency_target.currency_code}'
+
+    def window_start(self):
+        """
+        Returns the first date the next sync has to check, the day after the watermark.
+        """
+        if self.synced_through is None or self.synced_through < self.start_date:
+            return self.start_date
+        return date.fromordinal(self.synced_through.toordinal() + 1)
+
+    class Meta:
+        """
+        Metadata class for the TrackedPair model.
+
+        Attributes:
+            verbose_name_plural (str): The plural name for the model in the admin interface.
+            constraints (list): The unique constraint on the currency pair.
+        """
+        verbose_name_plural = 'Tracked Pairs'
+        constraints = [
+            models.UniqueConstraint(fields=['currency_base', 'currency_target'], name='tracked_pair_unique'),
+        ]
@@ -0,0 +1,2 @@
+from .cursor_pagination import KeysetCursorPagination
+from .estimated_count_paginator import EstimatedCountPaginator
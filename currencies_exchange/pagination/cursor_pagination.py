@@ -0,0 +1,138 @@
+import json
+from django.core.exceptions import ValidationError
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+from currencies_exchange.settings import MAX_PAGE_SIZE, REST_FRAMEWORK
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor (keyset) pagination for the list endpoints.
+
+    DRF's cursor only holds the value of the first ordering field and skips the rows
+    sharing it with an OFFSET, which grows with the number of ties, e.g. the rates of
+    all pairs on one date. Here the ordering always ends with the unique tie breaker
+    field and the cursor holds the values of every ordering field, so that every page
+    is read from its position on with index seeks (see fetch_after()) and the cost of a
+    page does not grow with its position in the list. The ordering is taken from the
+    view's OrderingFilter, falling back to the view's default ordering.
+
+    Attributes:
+        page_size (int): The default number of items per page.
+        page_size_query_param (str): The query parameter overriding the page size.
+        max_page_size (int): The highest page size a client can request.
+        tie_breaker (str): The unique field appended to orderings that do not end with it.
+
+    Example:
+        To fetch the second page of currencies ordered by code:
+        GET /currency/?ordering=currency_code&cursor=<next cursor>
+    """
+
+    page_size = REST_FRAMEWORK['PAGE_SIZE']
+    page_size_query_param = 'page_size'
+    max_page_size = MAX_PAGE_SIZE
+    ordering = 'id'
+    tie_breaker = 'id'
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Returns the requested ordering, ending with the tie breaker in the direction of its first field.
+        """
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering[-1].lstrip('-') not in (self.tie_breaker, 'pk'):
+            ordering += (f'-{self.tie_breaker}' if ordering[0].startswith('-') else self.tie_breaker,)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Returns the page of the cursor, fetched with a keyset condition on every ordering field.
+
+        This follows CursorPagination.paginate_queryset(), only the cursor condition
+        differs. The positions being unique, the cursors never carry an offset.
+        """
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        offset, reverse, current_position = self.cursor or (0, False, None)
+
+        queryset = queryset.order_by(*(_reverse_ordering(self.ordering) if reverse else self.ordering))
+        if current_position is None:
+            results = list(queryset[offset:offset + self.page_size + 1])
+        else:
+            results = self.fetch_after(queryset, current_position, reverse, self.page_size + 1)
+        self.page = results[:self.page_size]
+        following_position = self._get_position_from_instance(results[-1], self.ordering) \
+            if len(results) > len(self.page) else None
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = current_position is not None or offset > 0
+            self.has_previous = following_position is not None
+            self.next_position, self.previous_position = current_position, following_position
+        else:
+            self.has_next = following_position is not None
+            self.has_previous = current_position is not None or offset > 0
+            self.next_position, self.previous_position = following_position, current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def fetch_after(self, queryset, position, reverse, limit):
+        """
+        Fetches the rows following a cursor position in the direction of the page.
+
+        The rows after a position (v1, ..., vn) are the ones equal to v1..vn-1 and after
+        vn, followed by the ones equal to v1..vn-2 and after vn-1, and so on. Every such
+        range is read with its own query until the page is full, e.g. ``history_date = d
+        AND id > i`` then ``history_date > d``, as each one is an index seek where a single
+        OR condition, or a row value comparison ending with the rowid, makes SQLite scan
+        the rest of the date.
+
+        Args:
+            queryset (QuerySet): The ordered queryset.
+            position (str): The cursor position, the JSON list of the ordering values.
+            reverse (bool): Whether the page is read backwards, for a previous link.
+            limit (int): The maximum number of rows to fetch.
+
+        Returns:
+            list: The rows after the position, in order.
+
+        Raises:
+            NotFound: If the position does not match the ordering, like the cursors of
+                another ordering.
+        """
+        fields = [field.lstrip('-') for field in self.ordering]
+        lookups = ['lt' if field.startswith('-') != reverse else 'gt' for field in self.ordering]
+        try:
+            values = json.loads(position)
+            if not isinstance(values, list) or len(values) != len(fields):
+                raise ValueError(position)
+            values = [queryset.query.resolve_ref(field).output_field.to_python(value)
+                      for field, value in zip(fields, values)]
+        except (ValueError, TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        rows = []
+        for index in reversed(range(len(fields))):
+            after = {**dict(zip(fields[:index], values[:index])), f'{fields[index]}__{lookups[index]}': values[index]}
+            rows += queryset.filter(**after)[:limit - len(rows)]
+            if len(rows) == limit:
+                break
+        return rows
+
+    def _get_position_from_instance(self, instance, ordering):
+        """
+        Returns the position of a row, the JSON list of its ordering values.
+        """
+        fields = [field.lstrip('-') for field in ordering]
+        if isinstance(instance, dict):
+            values = [instance[field] for field in fields]
+        else:
+            values = [getattr(instance, field) for field in fields]
+        return json.dumps([value if isinstance(value, (int, float)) or value is None else str(value)
+                           for value in values])
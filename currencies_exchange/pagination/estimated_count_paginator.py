@@ -0,0 +1,33 @@
+from django.db.models import Max
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator estimating the count of unfiltered querysets instead of counting every row.
+
+    ``COUNT(*)`` has to visit every row of the table. For an unfiltered queryset the
+    count is estimated from the highest primary key, found with a single index lookup,
+    which is exact for tables rows are only appended to and an upper bound otherwise.
+    Filtered querysets are counted exactly. Pages past the last real row are empty.
+
+    Attributes:
+        count (int): The exact or estimated number of objects.
+
+    Example:
+        To paginate a model admin changelist in constant time:
+        class CurrencyRateAdmin(admin.ModelAdmin):
+            paginator = EstimatedCountPaginator
+            show_full_result_count = False
+    """
+
+    @cached_property
+    def count(self):
+        """
+        Returns the exact or estimated number of objects.
+        """
+        query = getattr(self.object_list, 'query', None)
+        if query is None or query.where or query.distinct or query.low_mark or query.high_mark is not None:
+            return super().count
+        return self.object_list.model._default_manager.aggregate(count=Max('pk'))['count'] or 0
@@ -0,0 +1,224 @@
+"""
+Opt-in profiling of single requests and management commands.
+
+profile() runs cProfile around a block and records the SQL statements the block runs on
+every database alias, then writes three files named after the block into PROFILING_DIR:
+the binary profile (``.prof``, for pstats, snakeviz or gprof2dot), a text summary of the
+slowest functions by cumulative time (``.txt``) and the SQL timeline with the start offset
+and duration of every statement (``.sql.json``). Work handed to other threads can show up
+as time spent waiting on them, and only one block is profiled at a time per process since
+the interpreter allows a single active profiler (see try_profile()).
+"""
+
+import io
+import re
+import json
+import time
+import pstats
+import cProfile
+import threading
+from pathlib import Path
+from datetime import datetime
+from contextlib import ExitStack, contextmanager
+
+SUMMARY_LINES = 40
+
+_profile_lock = threading.Lock()
+
+
+class SQLTimeline:
+    """
+    Connection execute wrapper recording the start offset and duration of every statement.
+
+    Attributes:
+        started (float): The perf_counter() value the offsets are relative to.
+        alias (str): The database alias of the wrapped connection.
+        entries (list): The recorded statements, shared by the wrappers of all aliases.
+
+    Methods:
+        for_alias(alias): Returns a wrapper recording into the same entries for another alias.
+    """
+
+    def __init__(self, started, alias='default', entries=None):
+        self.started = started
+        self.alias = alias
+        self.entries = [] if entries is None else entries
+
+    def for_alias(self, alias):
+        """
+        Returns a wrapper recording into the same entries for another alias.
+        """
+        return SQLTimeline(self.started, alias, self.entries)
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.entries.append({
+                'start_ms': round((started - self.started) * 1000, 3),
+                'duration_ms': round((time.perf_counter() - started) * 1000, 3),
+                'alias': self.alias,
+                'many': many,
+                'sql': sql,
+            })
+
+
+class Profile:
+    """
+    Result of a profiled block.
+
+    Attributes:
+        name (str): The name of the block, used in the file names.
+        path (Path or None): The path of the binary profile once written, the other files
+            share its stem.
+        seconds (float): The wall time of the block.
+        queries (list): The SQL timeline entries.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.path = None
+        self.seconds = 0.0
+        self.queries = []
+
+
+def profile_path(directory, name):
+    """
+    Returns a unique path without suffix for the profile of a block.
+
+    Args:
+        directory (str or Path): The directory of the profiles, created if missing.
+        name (str): The name of the block, reduced to a safe file name.
+
+    Returns:
+        Path: The path, suffixed with a timestamp.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    safe_name = re.sub(r'[^A-Za-z0-9_.-]+', '_', name).strip('_') or 'profile'
+    return directory / f'{safe_name}-{datetime.now().strftime("%Y%m%d-%H%M%S-%f")}'
+
+
+@contextmanager
+def profile(name, directory=None):
+    """
+    Profiles a block with cProfile, records its SQL timeline and writes both to files.
+
+    Args:
+        name (str): The name of the block, e.g. the command or the request path.
+        directory (str or Path or None): The output directory, PROFILING_DIR when None.
+
+    Yields:
+        Profile: The result, whose path and timings are set when the block exits.
+
+    Example:
+        with profile('pull_currencies') as result:
+            call_command('pull_currencies')
+        print(result.path)
+    """
+    with _profile_lock:
+        with _profiled(name, directory) as result:
+            yield result
+
+
+@contextmanager
+def try_profile(name, directory=None):
+    """
+    Profiles a block like profile() unless another block is being profiled.
+
+    Yields:
+        Profile or None: The result, None when the block runs without profiling.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        yield None
+        return
+    try:
+        with _profiled(name, directory) as result:
+            yield result
+    finally:
+        _profile_lock.release()
+
+
+@contextmanager
+def _profiled(name, directory):
+    """
+    Runs the profiler and the SQL timeline around a block, the caller holding the lock.
+    """
+    from django.conf import settings
+    from django.db import connections
+
+    result = Profile(name)
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    timeline = SQLTimeline(started, entries=result.queries)
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(timeline.for_alias(alias)))
+        profiler.enable()
+        try:
+            yield result
+        finally:
+            profiler.disable()
+            result.seconds = time.perf_counter() - started
+            result.path = write_profile(profiler, result, directory or settings.PROFILING_DIR)
+
+
+def write_profile(profiler, result, directory):
+    """
+    Writes the binary profile, its text summary and the SQL timeline of a profiled block.
+
+    Args:
+        profiler (cProfile.Profile): The stopped profiler.
+        result (Profile): The result of the block.
+        directory (str or Path): The output directory.
+
+    Returns:
+        Path: The path of the binary profile.
+    """
+    base = profile_path(directory, result.name)
+    path = base.with_name(f'{base.name}.prof')
+    profiler.dump_stats(path)
+
+    summary = io.StringIO()
+    summary.write(f'{result.name}: {result.seconds * 1000:.1f} ms, {len(result.queries)} queries '
+                  f'in {sum(query["duration_ms"] for query in result.queries):.1f} ms\n\n')
+    pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(SUMMARY_LINES)
+    base.with_name(f'{base.name}.txt').write_text(summary.getvalue())
+    base.with_name(f'{base.name}.sql.json').write_text(json.dumps(
+        {'name': result.name, 'duration_ms': round(result.seconds * 1000, 3), 'queries': result.queries}, indent=1))
+    return path
+
+
+class ProfiledCommandMixin:
+    """
+    Management command mixin adding a --profile flag that profiles the whole command.
+
+    The profile is named after the command module and written to PROFILING_DIR, its path
+    is printed once the command finishes.
+
+    Methods:
+        create_parser(prog_name, subcommand, **kwargs): Adds the --profile argument.
+        execute(*args, **options): Runs the command, profiled when requested.
+    """
+
+    def create_parser(self, prog_name, subcommand, **kwargs):
+        """
+        Adds the --profile argument to the parser of the command.
+        """
+        parser = super().create_parser(prog_name, subcommand, **kwargs)
+        parser.add_argument('--profile', action='store_true',
+                            help='Profile the command and write the profile and SQL timeline to PROFILING_DIR')
+        return parser
+
+    def execute(self, *args, **options):
+        """
+        Runs the command, profiled when requested.
+        """
+        if not options.get('profile'):
+            return super().execute(*args, **options)
+        with profile(self.__module__.rsplit('.', 1)[-1]) as result:
+            output = super().execute(*args, **options)
+        self.stdout.write(f'Profile of {result.seconds:.2f}s with {len(result.queries)} queries written to '
+                          f'{result.path} (summary {result.path.with_suffix(".txt").name})')
+        return output
@@ -1 +1,5 @@
 from .currency import CurrencySerializer
+from .currency_rate import CurrencyRateSerializer
+from .rate_history import RateHistoryQuerySerializer
+from .values import serialize_values, values_fields
+from .rate_lookup import RateLookupQuerySerializer
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from ..settings import DATETIME_FORMAT
+from ..models.currency import Currency
 from ..models.currency_rate import CurrencyRate
 
 
@@ -15,9 +15,10 @@ class CurrencyRateSerializer(serializers.Serializer):
         currency_base (serializers.CharField): The base currency code.
         currency_target (serializers.CharField): The target currency code.
         rate (serializers.FloatField): The exchange rate.
-        history_date (serializers.DateTimeField): The date of the exchange rate.
+        history_date (serializers.DateField): The date of the exchange rate.
 
     Methods:
+        resolve_currencies(validated_data): Replace the currency codes with Currency instances.
         create(validated_data): Create and return a new CurrencyRate instance.
         update(instance, validated_data): Update and return an existing CurrencyRate instance.
 
@@ -33,10 +34,29 @@ class CurrencyRateSerializer(serializers.Serializer):
     """
 
     id = serializers.IntegerField(read_only=True)
-    currency_base = serializers.CharField()
-    currency_target = serializers.CharField()
+    currency_base = serializers.CharField(source='currency_base.currency_code')
+    currency_target = serializers.CharField(source='currency_target.currency_code')
     rate = serializers.FloatField()
-    history_date = serializers.DateTimeField(format=DATETIME_FORMAT)
+    history_date = serializers.DateField()
+
+    def resolve_currencies(self, validated_data):
+        """
+        Replace the validated currency codes with the matching `Currency` instances.
+
+        Args:
+            validated_data (dict): The validated data holding the currency codes.
+
+        Returns:
+            dict: The validated data holding Currency instances.
+        """
+        for field in ('currency_base', 'currency_target'):
+            if field in validated_data:
+                code = validated_data[field]['currency_code']
+                try:
+                    validated_data[field] = Currency.objects.get(currency_code=code)
+                except Currency.DoesNotExist:
+                    raise serializers.ValidationError({field: f'Unknown currency code {code}'})
+        return validated_data
 
     def create(self, validated_data):
         """
@@ -48,7 +68,7 @@ class CurrencyRateSerializer(serializers.Serializer):
         Returns:
             CurrencyRate: The newly created CurrencyRate instance.
         """
-        return CurrencyRate.objects.create(**validated_data)
+        return CurrencyRate.objects.create(**self.resolve_currencies(validated_data))
 
     def update(self, instance, validated_data):
         """
@@ -61,6 +81,7 @@ class CurrencyRateSerializer(serializers.Serializer):
         Returns:
             CurrencyRate: The updated CurrencyRate instance.
         """
+        validated_data = self.resolve_currencies(validated_data)
         instance.currency_base = validated_data.get('currency_base', instance.currency_base)
         instance.currency_target = validated_data.get('currency_target', instance.currency_target)
         instance.rate = validated_data.get('rate', instance.rate)
@@ -0,0 +1,43 @@
+from rest_framework import serializers
+from ..services.rate_series import RESOLUTIONS
+
+
+class RateHistoryQuerySerializer(serializers.Serializer):
+    """
+    Serializer validating the query parameters of the rate history endpoint.
+
+    Attributes:
+        currency_base (serializers.CharField): The base currency code.
+        currency_target (serializers.CharField): The target currency code.
+        date_from (serializers.DateField): The first date of the series (optional).
+        date_to (serializers.DateField): The last date of the series (optional).
+        resolution (serializers.ChoiceField): The bucket size, 'day', 'week' or 'month'.
+
+    Methods:
+        validate(attrs): Checks that the date range is not reversed.
+
+    Example:
+        To validate the query of a request:
+        query = RateHistoryQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+    """
+
+    currency_base = serializers.CharField()
+    currency_target = serializers.CharField()
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    resolution = serializers.ChoiceField(choices=RESOLUTIONS, default='day')
+
+    def validate(self, attrs):
+        """
+        Checks that the date range is not reversed.
+
+        Args:
+            attrs (dict): The validated query parameters.
+
+        Returns:
+            dict: The validated query parameters.
+        """
+        if attrs.get('date_from') and attrs.get('date_to') and attrs['date_from'] > attrs['date_to']:
+            raise serializers.ValidationError('date_from must not be after date_to')
+        return attrs
@@ -0,0 +1,40 @@
+from datetime import date
+from rest_framework import serializers
+from ..models.currency_rate import yesterday
+
+
+class RateLookupQuerySerializer(serializers.Serializer):
+    """
+    Serializer validating the query parameters of the rate lookup endpoint.
+
+    Attributes:
+        currency_base (serializers.CharField): The base currency code.
+        currency_target (serializers.CharField): The target currency code.
+        date (serializers.DateField): The date of the rate, from 2010-06-01 to yesterday.
+
+    Methods:
+        validate_date(value): Checks that the date can have a historical rate.
+
+    Example:
+        To validate the query of a request:
+        query = RateLookupQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+    """
+
+    currency_base = serializers.CharField()
+    currency_target = serializers.CharField()
+    date = serializers.DateField()
+
+    def validate_date(self, value):
+        """
+        Checks that the date lies between the first historical rate and yesterday.
+
+        Args:
+            value (date): The requested date.
+
+        Returns:
+            date: The requested date.
+        """
+        if not date(2010, 6, 1) <= value <= yesterday():
+            raise serializers.ValidationError(f'Rates are available from 2010-06-01 to {yesterday()}')
+        return value
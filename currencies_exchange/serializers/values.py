@@ -0,0 +1,47 @@
+from rest_framework import serializers
+from django.core.exceptions import ImproperlyConfigured
+
+# Fields whose to_representation() is a no-op on the database value or is done natively by the renderer
+VALUE_FIELDS = (serializers.IntegerField, serializers.CharField, serializers.FloatField, serializers.DateField,
+                serializers.BooleanField)
+
+
+def values_fields(serializer_class):
+    """
+    Returns the output names and the ORM lookups of the fields of a read serializer.
+
+    Every field must be a plain source field (e.g. ``source='currency_base.currency_code'``)
+    of a type in VALUE_FIELDS, so that the database value can be rendered as it is.
+
+    Args:
+        serializer_class (class): The serializer class.
+
+    Returns:
+        tuple: The output field names and the matching ORM lookups.
+
+    Raises:
+        ImproperlyConfigured: When a field cannot be read with values_list().
+    """
+    names, lookups = [], []
+    for name, field in serializer_class().fields.items():
+        if field.write_only:
+            continue
+        if not isinstance(field, VALUE_FIELDS) or field.source == '*':
+            raise ImproperlyConfigured(f'{serializer_class.__name__}.{name} cannot be serialized from values')
+        names.append(name)
+        lookups.append('__'.join(field.source_attrs))
+    return names, lookups
+
+
+def serialize_values(rows, names):
+    """
+    Returns the dicts of value rows, ready to be rendered.
+
+    Args:
+        rows (iterable): The tuples returned by values_list() over the lookups of the names.
+        names (list): The output field names, in the order of the row values.
+
+    Returns:
+        list: One dict per row.
+    """
+    return [dict(zip(names, row)) for row in rows]
@@ -0,0 +1,17 @@
+from .cross_rates import RateSnapshot, derive_rate, get_snapshot, invalidate_snapshot
+from .currency_api_client import CurrencyAPIClient, CurrencyAPIError, get_client, shared_limiter
+from .rate_series import RESOLUTIONS, downsample
+from .conversion import convert_batch
+from .currency_search import rank_expression, search_currency_ids
+from .rate_export import EXPORT_FORMATS, export_rates
+from .columnar_snapshot import (ColumnarSnapshot, build_columnar_snapshot, current_columnar_snapshot,
+                                get_columnar_snapshot, pair_series, refresh_columnar_snapshot)
+from .rate_codes import rate_currency_codes
+from .currency_choices import currency_choices
+from .rate_ingest import IngestResult, fill_pending_rates, ingest_rates, write_rates
+from .rate_gaps import find_gaps, gap_boundaries
+from .async_currency_api_client import (AsyncCurrencyAPIClient, async_client_scope, close_async_client,
+                                        get_async_client, keep_async_client)
+from .rate_lookup import aconvert_batch, afetch_rates, alookup_rate
+from .single_flight import SingleFlight, afetch_historical, fetch_historical, historical_flight
+from .rate_jobs import JobRunResult, claim_jobs, enqueue_rate_fetch, retry_failed_jobs, run_jobs, work
@@ -0,0 +1,191 @@
+import ssl
+import time
+import httpx
+import asyncio
+import certifi
+import logging
+import weakref
+import threading
+from contextlib import asynccontextmanager
+from .currency_api_client import BaseCurrencyAPIClient, CurrencyAPIError, shared_limiter
+from ..settings import CURRENCY_API_ASYNC_MAX_CONNECTIONS
+
+logger = logging.getLogger(__name__)
+
+_async_clients = weakref.WeakKeyDictionary()
+_client_scopes = weakref.WeakKeyDictionary()
+_serving_loops = weakref.WeakSet()
+_ssl_context = None
+_ssl_context_lock = threading.Lock()
+
+
+def shared_ssl_context():
+    """
+    Returns the TLS context shared by all async clients, loading the CA bundle once.
+
+    Loading the bundle takes about 20 ms, which every WSGI request running an async view
+    would pay again with a client of its own.
+    """
+    global _ssl_context
+    if _ssl_context is None:
+        with _ssl_context_lock:
+            if _ssl_context is None:
+                _ssl_context = ssl.create_default_context(cafile=certifi.where())
+    return _ssl_context
+
+
+class AsyncCurrencyAPIClient(BaseCurrencyAPIClient):
+    """
+    Async client for the currencyapi.com integration, used by the views served over ASGI.
+
+    It applies the same timeouts, retries, rate limit and counters as CurrencyAPIClient,
+    but awaits the upstream response, the backoff and the rate limiter, so that a pending
+    call only holds a coroutine instead of a worker thread. Connections are pooled with
+    keep-alive and belong to the event loop that opened them, see get_async_client().
+
+    Attributes:
+        http (httpx.AsyncClient): The pooled HTTP client.
+        slots (asyncio.Semaphore): Admits as many calls as there are connections; waiting
+            here is cheap, while every call queued in the httpx pool slows down all others.
+
+    Methods:
+        get(endpoint, params): Calls an endpoint and returns the decoded JSON body.
+        historical(base_code, target_codes, history_date): Returns historical rates.
+        aclose(): Closes the pooled connections.
+
+    Example:
+        To fetch the EUR and PLN rates of the US Dollar from a coroutine:
+        rates = await get_async_client().historical('USD', ['EUR', 'PLN'], date(2023, 1, 2))
+    """
+
+    def __init__(self, max_connections=CURRENCY_API_ASYNC_MAX_CONNECTIONS, **kwargs):
+        super().__init__(**kwargs)
+        connect_timeout, read_timeout = self.timeout
+        self.http = httpx.AsyncClient(
+            verify=shared_ssl_context(),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+        self.slots = asyncio.Semaphore(max_connections)
+
+    async def get(self, endpoint, params=None):
+        """
+        Calls an endpoint of the API and returns the decoded JSON body.
+
+        Args:
+            endpoint (str): The endpoint path, e.g. 'historical'.
+            params (dict): The query parameters, the API key is added automatically.
+
+        Returns:
+            dict: The decoded JSON body.
+
+        Raises:
+            CurrencyAPIError: If the call fails after all retries.
+        """
+        params = dict(params or {}, apikey=self.api_key)
+        url = f'{self.base_url}/{endpoint}'
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            await self.limiter.acquire_async()
+            response = None
+            async with self.slots:
+                attempt_started = time.perf_counter()
+                try:
+                    response = await self.http.get(url, params=params)
+                    error = None if response.status_code < 400 else f'status code {response.status_code}'
+                except httpx.HTTPError as e:
+                    error = str(e) or type(e).__name__
+
+            if self._should_retry(endpoint, response, error, attempt, time.perf_counter() - attempt_started):
+                delay = self._retry_delay(attempt, response)
+                logger.warning(f'Retrying {endpoint} call in {delay:.2f}s after {error}')
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+
+            self._record(endpoint, time.perf_counter() - started, attempt, bool(error))
+            if error:
+                raise CurrencyAPIError(f'Failed to call {endpoint}: {error}',
+                                       response.status_code if response is not None else None)
+            try:
+                return response.json()
+            except ValueError as e:
+                raise CurrencyAPIError(f'Invalid response from {endpoint}: {e}', response.status_code)
+
+    async def historical(self, base_code, target_codes, history_date):
+        """
+        Returns the rates of the target currencies for one base currency and date in a single call.
+
+        Args:
+            base_code (str): The base currency code.
+            target_codes (list): The target currency codes.
+            history_date (date): The date of the rates.
+
+        Returns:
+            dict: A mapping of target currency code to rate value.
+        """
+        body = await self.get('historical', self.historical_params(base_code, target_codes, history_date))
+        return self.historical_rates(body, target_codes)
+
+    async def aclose(self):
+        """
+        Closes the pooled connections.
+        """
+        await self.http.aclose()
+
+
+def get_async_client():
+    """
+    Returns the client of the running event loop, creating it on first use.
+
+    The client and its connections are shared by the requests of the loop until
+    close_async_client(), see async_client_scope(). Every client takes its tokens from
+    shared_limiter(), so that the rate limit holds across loops.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = AsyncCurrencyAPIClient(limiter=shared_limiter())
+    return client
+
+
+async def close_async_client():
+    """
+    Closes the client of the running event loop, if it has one.
+
+    The next get_async_client() of the loop creates a new client.
+    """
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def keep_async_client():
+    """
+    Keeps the client of the running event loop open between requests, until close_async_client().
+
+    Called on the lifespan startup of an ASGI server (see currencies_exchange.asgi),
+    whose loop serves all the requests of the process.
+    """
+    _serving_loops.add(asyncio.get_running_loop())
+
+
+@asynccontextmanager
+async def async_client_scope():
+    """
+    Scopes the use of the client of the running event loop to a request.
+
+    Under WSGI every async view runs on a short-lived loop of its own, so the client of
+    that loop is closed when its last scope exits, while the loop still runs, instead of
+    leaking its connections with the loop. The loop of an ASGI server marked with
+    keep_async_client() keeps its client for the next requests.
+    """
+    loop = asyncio.get_running_loop()
+    _client_scopes[loop] = _client_scopes.get(loop, 0) + 1
+    try:
+        yield
+    finally:
+        _client_scopes[loop] -= 1
+        if not _client_scopes[loop] and loop not in _serving_loops:
+            await close_async_client()
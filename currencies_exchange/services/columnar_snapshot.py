@@ -0,0 +1,400 @@
+import os
+import json
+import shutil
+import tempfile
+import threading
+import numpy as np
+from datetime import date
+from django.utils import timezone
+from ..models import CatalogVersion, CurrencyRate
+from ..settings import RATE_SNAPSHOT_DIR
+
+COLUMNS = {
+    'key': np.int64,
+    'base': np.int32,
+    'target': np.int32,
+    'day': np.int32,
+    'rate': np.float64,
+}
+CURRENT_FILE = 'CURRENT'
+META_FILE = 'meta.json'
+FORMAT_VERSION = 1
+# Bits of each part of the packed (base, target, day) key, day ordinals stay below 2 ** 21 until year 5741
+KEY_BITS = 21
+READ_CHUNK_SIZE = 50000
+
+_loaded = None
+_loaded_lock = threading.Lock()
+
+
+def pack_keys(base_ids, target_ids, days):
+    """
+    Packs currency pairs and day ordinals into sortable int64 keys.
+
+    Keys sort by base ID, then target ID, then day, so that the rates of a pair are
+    contiguous and in date order.
+
+    Args:
+        base_ids (array-like): The base currency IDs.
+        target_ids (array-like): The target currency IDs.
+        days (array-like): The day ordinals (date.toordinal()).
+
+    Returns:
+        numpy.ndarray: The packed keys.
+    """
+    base_ids = np.asarray(base_ids, dtype=np.int64)
+    target_ids = np.asarray(target_ids, dtype=np.int64)
+    days = np.asarray(days, dtype=np.int64)
+    return (base_ids << (2 * KEY_BITS)) | (target_ids << KEY_BITS) | days
+
+
+def read_rates(queryset, chunk_size=READ_CHUNK_SIZE):
+    """
+    Reads rate rows into columns, chunk by chunk, without building model instances.
+
+    Args:
+        queryset (QuerySet): The rates to read.
+        chunk_size (int): The number of rows converted at once.
+
+    Returns:
+        dict: The unsorted columns, see COLUMNS, and the highest rate ID read as 'max_id'.
+    """
+    rows = queryset.values_list('id', 'currency_base_id', 'currency_target_id', 'history_date', 'rate').iterator(
+        chunk_size=chunk_size)
+    chunks = []
+    while True:
+        chunk = [row for _, row in zip(range(chunk_size), rows)]
+        if not chunk:
+            break
+        ids, bases, targets, days, rates = zip(*chunk)
+        chunks.append((np.array(ids, dtype=np.int64), np.array(bases, dtype=np.int64),
+                       np.array(targets, dtype=np.int64),
+                       np.fromiter((day.toordinal() for day in days), dtype=np.int64, count=len(days)),
+                       np.array(rates, dtype=np.float64)))
+
+    if chunks:
+        ids, bases, targets, days, rates = (np.concatenate(parts) for parts in zip(*chunks))
+    else:
+        ids, bases, targets, days, rates = (np.zeros(0, dtype=np.int64) for _ in range(5))
+    limit = 1 << KEY_BITS
+    if len(ids) and max(bases.max(), targets.max(), days.max()) >= limit:
+        raise ValueError(f'Currency IDs and day ordinals must stay below {limit} to be packed into keys')
+    return {
+        'key': pack_keys(bases, targets, days),
+        'base': bases.astype(np.int32),
+        'target': targets.astype(np.int32),
+        'day': days.astype(np.int32),
+        'rate': rates.astype(np.float64),
+        'max_id': int(ids.max()) if len(ids) else 0,
+    }
+
+
+class ColumnarSnapshot:
+    """
+    Memory-mapped columnar snapshot of the rate table.
+
+    The snapshot is a directory of NumPy arrays (see COLUMNS) holding one entry per rate,
+    sorted by pair, then date, and a meta file. The arrays are opened with ``mmap``, so
+    every process loading the same snapshot shares one copy of its pages through the OS
+    page cache and only the pages that are touched are read. A rate is found by binary
+    search over the packed (base, target, day) keys, without querying the database.
+
+    Attributes:
+        path (str): The directory of the snapshot.
+        meta (dict): The meta data: rows, max_id (the highest rate ID included), rate_version and
+            edit_version (the RATE and RATE_EDIT catalog versions the rates were read at) and
+            built (ISO timestamp).
+        key (numpy.ndarray): The packed keys, sorted.
+        base (numpy.ndarray): The base currency ID of every rate.
+        target (numpy.ndarray): The target currency ID of every rate.
+        day (numpy.ndarray): The day ordinal (date.toordinal()) of every rate.
+        rate (numpy.ndarray): The rates.
+
+    Methods:
+        lookup(base_id, target_id, history_date): Returns the rate of a pair at a date.
+        lookup_many(base_ids, target_ids, dates): Returns the rates of many pairs and dates at once.
+        pair(base_id, target_id): Returns the dates and rates of a pair.
+
+    Example:
+        To look up the USD/EUR rate of a day:
+        snapshot = get_columnar_snapshot()
+        rate = snapshot.lookup(usd.id, eur.id, date(2023, 1, 2))
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as meta:
+            self.meta = json.load(meta)
+        if self.meta.get('format') != FORMAT_VERSION:
+            raise ValueError(f'Unsupported rate snapshot format in {path}')
+        for name in COLUMNS:
+            array = np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r') if self.meta['rows'] else \
+                np.zeros(0, dtype=COLUMNS[name])
+            setattr(self, name, array)
+
+    def __len__(self):
+        return self.meta['rows']
+
+    def lookup_many(self, base_ids, target_ids, dates):
+        """
+        Returns the rates of many pairs and dates at once.
+
+        Args:
+            base_ids (array-like): The base currency IDs.
+            target_ids (array-like): The target currency IDs.
+            dates (array-like): The dates, as date objects or day ordinals.
+
+        Returns:
+            numpy.ndarray: The rates, NaN where the snapshot has none.
+        """
+        days = [value.toordinal() if isinstance(value, date) else value for value in dates]
+        keys = pack_keys(base_ids, target_ids, days)
+        values = np.full(keys.shape, np.nan)
+        if not len(self.key):
+            return values
+        positions = np.searchsorted(self.key, keys).clip(max=len(self.key) - 1)
+        found = self.key[positions] == keys
+        values[found] = self.rate[positions[found]]
+        return values
+
+    def lookup(self, base_id, target_id, history_date):
+        """
+        Returns the rate of a pair at a date.
+
+        Args:
+            base_id (int): The base currency ID.
+            target_id (int): The target currency ID.
+            history_date (date): The date of the rate.
+
+        Returns:
+            float or None: The rate, or None when the snapshot has none.
+        """
+        value = self.lookup_many([base_id], [target_id], [history_date])[0]
+        return None if np.isnan(value) else float(value)
+
+    def pair(self, base_id, target_id):
+        """
+        Returns the dates and rates of a pair, in date order.
+
+        The rates are a view of the mapped pages, nothing is copied.
+
+        Args:
+            base_id (int): The base currency ID.
+            target_id (int): The target currency ID.
+
+        Returns:
+            tuple: The datetime64[D] dates and the rates of the pair.
+        """
+        first, last = np.searchsorted(self.key, pack_keys([base_id, base_id], [target_id, target_id],
+                                                          [0, (1 << KEY_BITS) - 1]))
+        dates = np.datetime64('0001-01-01', 'D') + (self.day[first:last].astype(np.int64) - 1)
+        return dates, self.rate[first:last]
+
+
+def current_path(directory=RATE_SNAPSHOT_DIR):
+    """
+    Returns the path of the current snapshot in the directory, or None when none was built.
+    """
+    try:
+        with open(os.path.join(directory, CURRENT_FILE)) as current:
+            return os.path.join(directory, current.read().strip())
+    except FileNotFoundError:
+        return None
+
+
+def snapshot_versions(directory):
+    """
+    Returns the numbers of the snapshot versions in the directory, sorted.
+    """
+    return sorted(int(name[1:]) for name in os.listdir(directory) if name[:1] == 'v' and name[1:].isdigit())
+
+
+def write_snapshot(directory, columns, max_id, edit_version=0, rate_version=0):
+    """
+    Writes the columns as a new snapshot version and makes it the current one.
+
+    The version is written completely into a private staging directory, then renamed to
+    the next version name, retrying with a later name when a concurrent build took it,
+    before the CURRENT pointer is replaced, so that readers always see a complete
+    snapshot and concurrent builds never write into the same version. The pointer only
+    moves forward, to a version newer than the current one. The previous version is kept
+    for processes that still map it, older versions are removed.
+
+    Args:
+        directory (str): The snapshot directory.
+        columns (dict): The sorted columns, see COLUMNS.
+        max_id (int): The highest rate ID included.
+        edit_version (int): The RATE_EDIT catalog version the rates were read at.
+        rate_version (int): The RATE catalog version the rates were read at.
+
+    Returns:
+        str: The path of the new snapshot.
+    """
+    os.makedirs(directory, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix='.build-', dir=directory)
+    try:
+        for name, dtype in COLUMNS.items():
+            np.save(os.path.join(staging, f'{name}.npy'), np.ascontiguousarray(columns[name], dtype=dtype))
+        with open(os.path.join(staging, META_FILE), 'w') as meta:
+            json.dump({'format': FORMAT_VERSION, 'rows': int(len(columns['key'])), 'max_id': max_id,
+                       'rate_version': rate_version, 'edit_version': edit_version, 'built': timezone.now().isoformat()}, meta)
+        while True:
+            versions = snapshot_versions(directory)
+            version = versions[-1] + 1 if versions else 1
+            path = os.path.join(directory, f'v{version}')
+            try:
+                os.rename(staging, path)
+                break
+            except OSError:
+                if not os.path.exists(path):
+                    raise
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    current = current_path(directory)
+    if current is None or int(os.path.basename(current)[1:]) < version:
+        descriptor, pointer = tempfile.mkstemp(prefix=f'{CURRENT_FILE}.', dir=directory)
+        with os.fdopen(descriptor, 'w') as pointer_file:
+            pointer_file.write(f'v{version}')
+        os.replace(pointer, os.path.join(directory, CURRENT_FILE))
+    for old in snapshot_versions(directory)[:-2]:
+        if old != version:
+            shutil.rmtree(os.path.join(directory, f'v{old}'), ignore_errors=True)
+    return path
+
+
+def build_columnar_snapshot(directory=RATE_SNAPSHOT_DIR, full=False, chunk_size=READ_CHUNK_SIZE):
+    """
+    Builds the columnar snapshot of the rate table, incrementally when possible.
+
+    An incremental build reads the rates with a higher ID than the ones of the current
+    snapshot and merges them into its sorted columns. That only holds while the rates of
+    the snapshot are unchanged, so the snapshot records the RATE_EDIT catalog version,
+    bumped when a stored rate is edited (e.g. in the admin) or deleted, and is rebuilt from
+    scratch when that version has moved since, or when the table holds fewer or more
+    rates than the merge would account for (pending rates were filled). The versions are
+    read before the rates, so an edit made during the build is caught by the next one.
+    The snapshot also records the RATE catalog version, bumped by every rate write, which
+    tells the readers whether it is current (see current_columnar_snapshot()).
+
+    Args:
+        directory (str): The snapshot directory.
+        full (bool): Whether to rebuild from scratch.
+        chunk_size (int): The number of rows converted at once.
+
+    Returns:
+        tuple: The new ColumnarSnapshot and the number of rates read from the database.
+    """
+    rate_version = CatalogVersion.current(CatalogVersion.RATE)[0]
+    edit_version = CatalogVersion.current(CatalogVersion.RATE_EDIT)[0]
+    path = None if full else current_path(directory)
+    previous = ColumnarSnapshot(path) if path else None
+    if previous is not None and previous.meta.get('edit_version') != edit_version:
+        previous = None
+    if previous is not None:
+        added = read_rates(CurrencyRate.objects.filter(id__gt=previous.meta['max_id']), chunk_size)
+        if len(previous) + len(added['key']) != CurrencyRate.objects.count():
+            previous = None
+    if previous is None:
+        added = read_rates(CurrencyRate.objects.all(), chunk_size)
+
+    if previous is not None and not len(added['key']) and previous.meta.get('rate_version') == rate_version:
+        return previous, 0
+    if previous is not None:
+        columns = {name: np.concatenate([getattr(previous, name), added[name]]) for name in COLUMNS}
+        max_id = max(previous.meta['max_id'], added['max_id'])
+    else:
+        columns, max_id = added, added['max_id']
+    order = np.argsort(columns['key'], kind='stable')
+    columns = {name: columns[name][order] for name in COLUMNS}
+    return ColumnarSnapshot(write_snapshot(directory, columns, max_id, edit_version, rate_version)), len(added['key'])
+
+
+def get_columnar_snapshot(directory=RATE_SNAPSHOT_DIR):
+    """
+    Returns the current columnar snapshot mapped by this process, or None when none was built.
+
+    The snapshot is mapped once per process and remapped when a newer version is built.
+    """
+    global _loaded
+    path = current_path(directory)
+    if path is None:
+        return None
+    with _loaded_lock:
+        if _loaded is None or _loaded.path != path:
+            _loaded = ColumnarSnapshot(path)
+        return _loaded
+
+
+def refresh_columnar_snapshot(directory=None):
+    """
+    Merges the rates written since the last build into the columnar snapshot, once one was built.
+
+    Called after the ingests (backfill_rates, sync_rates and the rate fetch workers), so
+    that the snapshot keeps serving reads. Until build_rate_snapshot first builds it, this
+    does nothing, so that only the deployments using the snapshot pay for it.
+
+    Args:
+        directory (str or None): The snapshot directory, RATE_SNAPSHOT_DIR when None.
+
+    Returns:
+        ColumnarSnapshot or None: The refreshed snapshot, None when none was built.
+    """
+    directory = directory or RATE_SNAPSHOT_DIR
+    if current_path(directory) is None:
+        return None
+    return build_columnar_snapshot(directory)[0]
+
+
+def current_columnar_snapshot(directory=None):
+    """
+    Returns the columnar snapshot when it holds every stored rate, None otherwise.
+
+    The snapshot is current while the RATE catalog version, bumped by every rate write,
+    is the one it was built at; one indexed query checks it.
+
+    Args:
+        directory (str or None): The snapshot directory, RATE_SNAPSHOT_DIR when None.
+
+    Returns:
+        ColumnarSnapshot or None: The current snapshot, None when none was built or it is stale.
+    """
+    snapshot = get_columnar_snapshot(directory or RATE_SNAPSHOT_DIR)
+    if snapshot is None or snapshot.meta.get('rate_version') != CatalogVersion.current(CatalogVersion.RATE)[0]:
+        return None
+    return snapshot
+
+
+def pair_series(base_id, target_id, date_from=None, date_to=None, directory=None):
+    """
+    Returns the dates and rates of a pair over a date range, in date order.
+
+    The series is sliced out of the mapped columnar snapshot when it is current, without
+    reading the rates from the database, else read through the covering pair index.
+
+    Args:
+        base_id (int): The base currency ID.
+        target_id (int): The target currency ID.
+        date_from (date or None): The first date, unbounded when None.
+        date_to (date or None): The last date, unbounded when None.
+        directory (str or None): The snapshot directory, RATE_SNAPSHOT_DIR when None.
+
+    Returns:
+        tuple: The datetime64[D] dates and the float64 rates.
+    """
+    snapshot = current_columnar_snapshot(directory)
+    if snapshot is not None:
+        dates, rates = snapshot.pair(base_id, target_id)
+        first = np.searchsorted(dates, np.datetime64(date_from, 'D')) if date_from else 0
+        last = np.searchsorted(dates, np.datetime64(date_to, 'D'), side='right') if date_to else len(dates)
+        return dates[first:last], rates[first:last]
+
+    queryset = CurrencyRate.objects.filter(currency_base_id=base_id, currency_target_id=target_id)
+    if date_from:
+        queryset = queryset.filter(history_date__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(history_date__lte=date_to)
+    rows = list(queryset.order_by('history_date').values_list('history_date', 'rate'))
+    return (np.array([row[0] for row in rows], dtype='datetime64[D]'),
+            np.array([row[1] for row in rows], dtype=np.float64))
@@ -0,0 +1,141 @@
+import math
+import numpy as np
+from datetime import date
+from django.db.models import Q
+from ..models import Currency, CurrencyRate
+from ..settings import CROSS_RATE_PIVOT
+from .cross_rates import build_pivot_matrix
+
+NO_RATE_ERROR = 'No rate for'
+
+
+def parse_items(items):
+    """
+    Parses the conversion items, collecting an error message for every invalid one.
+
+    Amounts must be finite numbers, float() also accepts "nan", "inf" and overflowing
+    values which convert to results JSON cannot represent, and booleans, which are not
+    amounts.
+
+    Args:
+        items (list): Dicts with 'amount', 'from', 'to' and 'date' (YYYY-MM-DD) keys.
+
+    Returns:
+        tuple: The amounts array, the from codes, the to codes, the dates array (datetime64[D])
+            and a mapping of item index to error message.
+    """
+    amounts = np.zeros(len(items))
+    from_codes = [''] * len(items)
+    to_codes = [''] * len(items)
+    dates = np.zeros(len(items), dtype='datetime64[D]')
+    errors = {}
+    for index, item in enumerate(items):
+        try:
+            if isinstance(item['amount'], bool):
+                raise TypeError(f'amount must be a number, got {item["amount"]!r}')
+            amounts[index] = float(item['amount'])
+            if not math.isfinite(amounts[index]):
+                raise ValueError(f'amount must be a finite number, got {item["amount"]!r}')
+            from_codes[index] = str(item['from'])
+            to_codes[index] = str(item['to'])
+            dates[index] = date.fromisoformat(item['date'])
+        except (KeyError, TypeError, ValueError) as e:
+            errors[index] = f'Invalid item: {e}'
+    return amounts, from_codes, to_codes, dates, errors
+
+
+def convert_batch(items):
+    """
+    Converts a batch of amounts between currency pairs at historical dates.
+
+    All rates needed by the batch are read with one grouped query. Every item uses the
+    direct rate of its pair when stored, else the inverted rate of the reverse pair, else
+    the cross rate through the pivot currency (CROSS_RATE_PIVOT). Lookups and conversions
+    are vectorized over the whole batch.
+
+    Args:
+        items (list): Dicts with 'amount', 'from', 'to' and 'date' (YYYY-MM-DD) keys.
+
+    Returns:
+        list: One dict per item, in order, holding either the 'rate', its 'source' and the
+            converted 'result', or an 'error' message.
+    """
+    amounts, from_codes, to_codes, dates, errors = parse_items(items)
+    currency_ids = dict(Currency.objects.filter(
+        currency_code__in=set(from_codes) | set(to_codes) | {CROSS_RATE_PIVOT}
+    ).values_list('currency_code', 'id'))
+    pivot_id = currency_ids.get(CROSS_RATE_PIVOT, -1)
+    from_ids = np.array([currency_ids.get(code, -1) for code in from_codes], dtype=np.int64)
+    to_ids = np.array([currency_ids.get(code, -1) for code in to_codes], dtype=np.int64)
+
+    valid = np.ones(len(items), dtype=bool)
+    valid[list(errors)] = False
+    valid &= (from_ids >= 0) & (to_ids >= 0)
+    unique_dates, date_indexes = np.unique(dates, return_inverse=True)
+    needed_ids = set(from_ids[valid].tolist()) | set(to_ids[valid].tolist())
+
+    rows = np.array(CurrencyRate.objects.filter(
+        Q(currency_base_id__in=needed_ids, currency_target_id__in=needed_ids)
+        | Q(currency_base_id=pivot_id) | Q(currency_target_id=pivot_id),
+        history_date__in=unique_dates[np.unique(date_indexes[valid])].tolist(),
+    ).values_list('history_date', 'currency_base_id', 'currency_target_id', 'rate'), dtype=object).reshape(-1, 4)
+
+    row_dates = np.searchsorted(unique_dates, rows[:, 0].astype('datetime64[D]'))
+    row_bases = rows[:, 1].astype(np.int64)
+    row_targets = rows[:, 2].astype(np.int64)
+    row_rates = rows[:, 3].astype(np.float64)
+    size = int(max(pivot_id, from_ids.max(initial=0), to_ids.max(initial=0),
+                   row_bases.max(initial=0), row_targets.max(initial=0))) + 1
+
+    # Direct and reverse pairs are found by binary search over packed (date, base, target) keys
+    row_keys = (row_dates * size + row_bases) * size + row_targets
+    order = np.argsort(row_keys)
+    row_keys, row_rates_sorted = row_keys[order], row_rates[order]
+
+    def lookup(base_ids, target_ids):
+        values = np.full(len(items), np.nan)
+        if not len(row_keys):
+            return values
+        keys = (date_indexes * size + base_ids) * size + target_ids
+        positions = np.searchsorted(row_keys, keys).clip(max=len(row_keys) - 1)
+        found = valid & (row_keys[positions] == keys)
+        values[found] = row_rates_sorted[positions[found]]
+        return values
+
+    rates = lookup(from_ids, to_ids)
+    sources = np.where(np.isnan(rates), '', 'direct').astype(object)
+
+    with np.errstate(divide='ignore'):
+        inverse = 1.0 / lookup(to_ids, from_ids)
+    use = np.isnan(rates) & np.isfinite(inverse)
+    rates[use], sources[use] = inverse[use], 'inverse'
+
+    if pivot_id >= 0:
+        matrix = build_pivot_matrix(pivot_id, row_dates, row_bases, row_targets, row_rates, len(unique_dates), size)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cross = matrix[date_indexes, np.maximum(to_ids, 0)] / matrix[date_indexes, np.maximum(from_ids, 0)]
+        use = np.isnan(rates) & valid & np.isfinite(cross)
+        rates[use], sources[use] = cross[use], 'cross'
+
+    same = valid & (from_ids == to_ids)
+    rates[same], sources[same] = 1.0, 'direct'
+    with np.errstate(over='ignore'):
+        results = amounts * rates
+
+    output = []
+    for index, item in enumerate(items):
+        if index in errors:
+            output.append({'error': errors[index]})
+        elif from_ids[index] < 0 or to_ids[index] < 0:
+            unknown = from_codes[index] if from_ids[index] < 0 else to_codes[index]
+            output.append({'error': f'Unknown currency code {unknown}'})
+        elif np.isnan(rates[index]):
+            output.append({'error': f'{NO_RATE_ERROR} {from_codes[index]}/{to_codes[index]} on {dates[index]}'})
+        elif not np.isfinite(results[index]):
+            output.append({'error': f'Result out of range converting {amounts[index]:g} {from_codes[index]} to '
+                                    f'{to_codes[index]} on {dates[index]}'})
+        else:
+            output.append({'amount': float(amounts[index]), 'from': from_codes[index], 'to': to_codes[index],
+                           'date': str(dates[index]), 'rate': float(rates[index]), 'source': sources[index],
+                           'result': float(results[index])})
+    return output
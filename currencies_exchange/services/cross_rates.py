@@ -0,0 +1,224 @@
+import threading
+import numpy as np
+from collections import OrderedDict
+from django.db.models import Q
+from ..models import CatalogVersion, Currency, CurrencyRate
+from ..settings import CROSS_RATE_PIVOT, CROSS_RATE_CACHE_SIZE
+
+_snapshots = OrderedDict()
+_snapshots_lock = threading.Lock()
+
+
+def build_pivot_matrix(pivot_id, date_indexes, base_ids, target_ids, rates, dates, size):
+    """
+    Builds the pivot rates of many days from stored rate rows.
+
+    Rows from the pivot currency are used as they are, rows into the pivot currency are
+    inverted and rows not involving the pivot are ignored.
+
+    Args:
+        pivot_id (int): The ID of the pivot currency.
+        date_indexes (numpy.ndarray): The day index of every row.
+        base_ids (numpy.ndarray): The base currency ID of every row.
+        target_ids (numpy.ndarray): The target currency ID of every row.
+        rates (numpy.ndarray): The rate of every row.
+        dates (int): The number of days.
+        size (int): The number of columns, larger than every currency ID.
+
+    Returns:
+        numpy.ndarray: A (dates, size) matrix of pivot rates indexed by day and currency ID, NaN where unknown.
+    """
+    matrix = np.full((dates, size), np.nan)
+    inverse = (target_ids == pivot_id) & (rates != 0)
+    matrix[date_indexes[inverse], base_ids[inverse]] = 1.0 / rates[inverse]
+    direct = base_ids == pivot_id
+    matrix[date_indexes[direct], target_ids[direct]] = rates[direct]
+    matrix[:, pivot_id] = 1.0
+    return matrix
+
+
+class RateSnapshot:
+    """
+    Dense snapshot of the rates of one day against a pivot currency.
+
+    The snapshot holds a NumPy vector indexed by ``Currency.id`` where every entry is the
+    rate from the pivot currency to that currency (NaN when unknown). Any cross rate for
+    the day is then ``rates[target] / rates[base]``.
+
+    Attributes:
+        history_date (date): The date of the snapshot.
+        pivot_id (int or None): The ID of the pivot currency.
+        rates (numpy.ndarray): Pivot rates indexed by currency ID.
+        rate_version (int): The RATE catalog version the rates were read at.
+
+    Methods:
+        from_database(history_date, pivot_code): Builds the snapshot from the stored rates.
+        cross_rates(base_ids, target_ids): Returns the rates of many pairs at once.
+        rate(base_id, target_id): Returns the rate of a single pair.
+        matrix(): Returns the full cross rate matrix.
+
+    Example:
+        To derive the EUR/PLN rate from USD based rates:
+        snapshot = RateSnapshot.from_database(date(2023, 1, 2))
+        rate = snapshot.rate(eur.id, pln.id)
+    """
+
+    def __init__(self, history_date, pivot_id, rates, rate_version=0):
+        self.history_date = history_date
+        self.pivot_id = pivot_id
+        self.rates = rates
+        self.rate_version = rate_version
+
+    @classmethod
+    def from_database(cls, history_date, pivot_code=CROSS_RATE_PIVOT):
+        """
+        Builds the snapshot from the rates stored for the given date.
+
+        Both pivot-to-X and X-to-pivot rows are used, the latter inverted. The RATE catalog
+        version is read first, so that a rate stored during the build moves it past the
+        version of the snapshot.
+
+        Args:
+            history_date (date): The date of the snapshot.
+            pivot_code (str): The code of the pivot currency.
+
+        Returns:
+            RateSnapshot: The snapshot, empty when the pivot currency is unknown.
+        """
+        rate_version = CatalogVersion.current(CatalogVersion.RATE)[0]
+        pivot_id = Currency.objects.filter(currency_code=pivot_code).values_list('id', flat=True).first()
+        if pivot_id is None:
+            return cls(history_date, None, np.full(0, np.nan), rate_version)
+
+        rows = np.array(CurrencyRate.objects.filter(
+            Q(currency_base_id=pivot_id) | Q(currency_target_id=pivot_id), history_date=history_date
+        ).order_by().values_list('currency_base_id', 'currency_target_id', 'rate'), dtype=np.float64).reshape(-1, 3)
+
+        base_ids = rows[:, 0].astype(np.int64)
+        target_ids = rows[:, 1].astype(np.int64)
+        size = int(max(pivot_id, base_ids.max(initial=0), target_ids.max(initial=0))) + 1
+        rates = build_pivot_matrix(pivot_id, np.zeros(len(rows), dtype=np.int64), base_ids, target_ids,
+                                   rows[:, 2], 1, size)[0]
+        return cls(history_date, pivot_id, rates, rate_version)
+
+    def _take(self, ids):
+        """
+        Returns the pivot rates of the given currency IDs, NaN where unknown.
+        """
+        values = np.full(ids.shape, np.nan)
+        valid = (ids >= 0) & (ids < self.rates.size)
+        values[valid] = self.rates[ids[valid]]
+        return values
+
+    def cross_rates(self, base_ids, target_ids):
+        """
+        Returns the rates of many currency pairs at once.
+
+        Args:
+            base_ids (array-like): The base currency IDs.
+            target_ids (array-like): The target currency IDs.
+
+        Returns:
+            numpy.ndarray: The rates of the pairs, NaN where they cannot be derived.
+        """
+        base_ids = np.asarray(base_ids, dtype=np.int64)
+        target_ids = np.asarray(target_ids, dtype=np.int64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result = self._take(target_ids) / self._take(base_ids)
+        return np.where(base_ids == target_ids, 1.0, result)
+
+    def rate(self, base_id, target_id):
+        """
+        Returns the rate of a single currency pair.
+
+        Args:
+            base_id (int): The base currency ID.
+            target_id (int): The target currency ID.
+
+        Returns:
+            float or None: The rate, or None when it cannot be derived.
+        """
+        value = self.cross_rates([base_id], [target_id])[0]
+        return None if np.isnan(value) else float(value)
+
+    def matrix(self):
+        """
+        Returns the full cross rate matrix where ``matrix[base_id, target_id]`` is the rate.
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.rates[np.newaxis, :] / self.rates[:, np.newaxis]
+
+
+def get_snapshot(history_date, refresh=False, version=None):
+    """
+    Returns the snapshot of the given date, building and caching it when needed.
+
+    Args:
+        history_date (date): The date of the snapshot.
+        refresh (bool): Whether to rebuild the cached snapshot.
+        version (int or None): The RATE catalog version the snapshot must have been built
+            at, a cached snapshot of another version is rebuilt.
+
+    Returns:
+        RateSnapshot: The snapshot of the date.
+    """
+    with _snapshots_lock:
+        snapshot = _snapshots.get(history_date)
+        if snapshot is not None and not refresh and version in (None, snapshot.rate_version):
+            _snapshots.move_to_end(history_date)
+            return snapshot
+
+    snapshot = RateSnapshot.from_database(history_date)
+    with _snapshots_lock:
+        _snapshots[history_date] = snapshot
+        _snapshots.move_to_end(history_date)
+        while len(_snapshots) > CROSS_RATE_CACHE_SIZE:
+            _snapshots.popitem(last=False)
+    return snapshot
+
+
+def invalidate_snapshot(history_date=None, currency_ids=None):
+    """
+    Drops the cached snapshot of the given date, or all cached snapshots.
+
+    Args:
+        history_date (date or None): The date of the snapshot, None for all dates.
+        currency_ids (list or None): The currencies of the stored rates. The snapshot is
+            kept when none of them is the pivot, as such rates cannot change it.
+    """
+    with _snapshots_lock:
+        if history_date is None:
+            _snapshots.clear()
+            return
+        snapshot = _snapshots.get(history_date)
+        if snapshot is not None and (currency_ids is None or snapshot.pivot_id in currency_ids
+                                     or snapshot.pivot_id is None):
+            del _snapshots[history_date]
+
+
+def derive_rate(base_id, target_id, history_date):
+    """
+    Derives the rate of a currency pair from the pivot snapshot of the date.
+
+    A cached snapshot that lacks the pair is rebuilt once when the RATE catalog version,
+    bumped by every rate write, has moved since it was built, so rates stored by other
+    processes are picked up before giving up, while a pair that is simply not stored
+    only costs the version query, however many requests miss it.
+
+    Args:
+        base_id (int): The base currency ID.
+        target_id (int): The target currency ID.
+        history_date (date): The date of the rate.
+
+    Returns:
+        float or None: The derived rate, or None when the snapshot has no data for the pair.
+    """
+    if base_id == target_id:
+        return 1.0
+    snapshot = get_snapshot(history_date)
+    rate = snapshot.rate(base_id, target_id)
+    if rate is None:
+        version = CatalogVersion.current(CatalogVersion.RATE)[0]
+        if version != snapshot.rate_version:
+            rate = get_snapshot(history_date, version=version).rate(base_id, target_id)
+    return rate
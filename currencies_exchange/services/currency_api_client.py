@@ -0,0 +1,359 @@
+import math
+import time
+import asyncio
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from ..metrics import record_upstream
+from ..settings import (CURRENCY_API_KEY, CURRENCY_API_BASE_URL, CURRENCY_API_CONNECT_TIMEOUT,
+                        CURRENCY_API_READ_TIMEOUT, CURRENCY_API_MAX_RETRIES, CURRENCY_API_BACKOFF,
+                        CURRENCY_API_MAX_BACKOFF, CURRENCY_API_RATE_LIMIT, CURRENCY_API_BURST,
+                        CURRENCY_API_POOL_SIZE)
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+_client = None
+_client_lock = threading.Lock()
+_limiter = None
+
+
+class CurrencyAPIError(Exception):
+    """
+    Raised when the external currency API call fails.
+
+    Attributes:
+        status_code (int or None): The HTTP status code of the last response, if any.
+    """
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiting the rate of upstream calls.
+
+    Attributes:
+        rate (float): The number of tokens added per second, 0 disables limiting.
+        capacity (float): The maximum number of tokens, i.e. the allowed burst.
+
+    Methods:
+        reserve(): Takes a token if one is available, else returns the wait for the next one.
+        acquire(): Blocks until a token is available and takes it.
+        acquire_async(): Waits for a token without blocking the event loop and takes it.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Takes a token if one is available.
+
+        Returns:
+            float: 0 when a token was taken, else the number of seconds until the next one.
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            current = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (current - self._updated) * self.rate)
+            self._updated = current
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        """
+        Blocks until a token is available and takes it.
+
+        Returns:
+            float: The number of seconds spent waiting.
+        """
+        waited = 0.0
+        while delay := self.reserve():
+            time.sleep(delay)
+            waited += delay
+        return waited
+
+    async def acquire_async(self):
+        """
+        Waits for a token without blocking the event loop and takes it.
+
+        Returns:
+            float: The number of seconds spent waiting.
+        """
+        waited = 0.0
+        while delay := self.reserve():
+            await asyncio.sleep(delay)
+            waited += delay
+        return waited
+
+
+class CallStats:
+    """
+    Latency and error counters of the calls to one upstream endpoint.
+
+    Attributes:
+        calls (int): The number of completed calls.
+        errors (int): The number of calls that failed after all retries.
+        retries (int): The number of retried attempts.
+        total_seconds (float): The summed latency of all calls.
+        max_seconds (float): The highest latency of a single call.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def as_dict(self):
+        """
+        Returns the counters as a dictionary including the mean latency.
+        """
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'retries': self.retries,
+            'total_seconds': self.total_seconds,
+            'max_seconds': self.max_seconds,
+            'mean_seconds': self.total_seconds / self.calls if self.calls else 0.0,
+        }
+
+
+class BaseCurrencyAPIClient:
+    """
+    Configuration, retry policy and counters shared by the blocking and the async client.
+
+    Attributes:
+        base_url (str): The base URL of the API.
+        api_key (str): The API key sent with every call.
+        timeout (tuple): The connect and read timeouts in seconds.
+        max_retries (int): The number of retries after the first attempt.
+        backoff (float): The delay before the first retry, doubled for each next one.
+        max_backoff (float): The longest delay before a retry, Retry-After headers included.
+        limiter (TokenBucket): The limiter applied to every attempt, shared_limiter() for the
+            clients of get_client() and get_async_client().
+
+    Methods:
+        stats(): Returns the call counters per endpoint.
+        historical_params(base_code, target_codes, history_date): Returns the query of a historical call.
+        historical_rates(body, target_codes): Returns the requested rates of a historical response.
+    """
+
+    def __init__(self, base_url=CURRENCY_API_BASE_URL, api_key=CURRENCY_API_KEY,
+                 timeout=(CURRENCY_API_CONNECT_TIMEOUT, CURRENCY_API_READ_TIMEOUT),
+                 max_retries=CURRENCY_API_MAX_RETRIES, backoff=CURRENCY_API_BACKOFF,
+                 max_backoff=CURRENCY_API_MAX_BACKOFF, rate_limit=CURRENCY_API_RATE_LIMIT, burst=CURRENCY_API_BURST,
+                 limiter=None):
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.limiter = limiter or TokenBucket(rate_limit, burst)
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    def _record(self, endpoint, seconds, retries, failed):
+        """
+        Updates the counters of an endpoint after a call.
+        """
+        with self._stats_lock:
+            stats = self._stats.setdefault(endpoint, CallStats())
+            stats.calls += 1
+            stats.retries += retries
+            stats.errors += int(failed)
+            stats.total_seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+
+    def _retry_delay(self, attempt, response):
+        """
+        Returns the delay before the next attempt, honouring a Retry-After header.
+
+        The delay is capped at max_backoff, so that a misbehaving upstream asking for hours
+        does not hold a worker or a request that long.
+        """
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        delay = self.backoff * (2 ** attempt)
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                pass
+        return min(max(delay, 0.0), self.max_backoff) if math.isfinite(delay) else self.max_backoff
+
+    def _should_retry(self, endpoint, response, error, attempt, seconds):
+        """
+        Reports an attempt to the metrics registry and returns whether it is retried.
+        """
+        retryable = response is None or response.status_code in RETRY_STATUS_CODES
+        retried = bool(error) and retryable and attempt < self.max_retries
+        record_upstream(endpoint, response.status_code if response is not None else None, seconds, retried)
+        return retried
+
+    @staticmethod
+    def historical_params(base_code, target_codes, history_date):
+        """
+        Returns the query parameters of a historical call.
+        """
+        return {
+            'base_currency': base_code,
+            'currencies': ','.join(target_codes),
+            'date': history_date.strftime('%Y-%m-%d'),
+        }
+
+    @staticmethod
+    def historical_rates(body, target_codes):
+        """
+        Returns the mapping of target currency code to rate value of a historical response.
+        """
+        return {code: item['value'] for code, item in body.get('data', {}).items() if code in target_codes}
+
+    def stats(self):
+        """
+        Returns the call counters per endpoint.
+
+        Returns:
+            dict: A mapping of endpoint to its counters.
+        """
+        with self._stats_lock:
+            return {endpoint: stats.as_dict() for endpoint, stats in self._stats.items()}
+
+
+class CurrencyAPIClient(BaseCurrencyAPIClient):
+    """
+    Shared client for the currencyapi.com integration.
+
+    The client keeps a pooled keep-alive session, applies connect and read timeouts,
+    retries 429 and 5xx responses with exponential backoff, limits the call rate with a
+    token bucket and records latency and error counters per endpoint. Every attempt is
+    also reported to the metrics registry (see currencies_exchange.metrics).
+
+    Attributes:
+        session (requests.Session): The pooled keep-alive session.
+
+    Methods:
+        get(endpoint, params): Calls an endpoint and returns the decoded JSON body.
+        currencies(): Returns all currencies known to the API.
+        historical(base_code, target_codes, history_date): Returns historical rates.
+
+    Example:
+        To fetch the EUR and PLN rates of the US Dollar:
+        rates = get_client().historical('USD', ['EUR', 'PLN'], date(2023, 1, 2))
+    """
+
+    def __init__(self, pool_size=CURRENCY_API_POOL_SIZE, **kwargs):
+        super().__init__(**kwargs)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get(self, endpoint, params=None):
+        """
+        Calls an endpoint of the API and returns the decoded JSON body.
+
+        Args:
+            endpoint (str): The endpoint path, e.g. 'historical'.
+            params (dict): The query parameters, the API key is added automatically.
+
+        Returns:
+            dict: The decoded JSON body.
+
+        Raises:
+            CurrencyAPIError: If the call fails after all retries.
+        """
+        params = dict(params or {}, apikey=self.api_key)
+        url = f'{self.base_url}/{endpoint}'
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            response = None
+            attempt_started = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+                error = None if response.status_code < 400 else f'status code {response.status_code}'
+            except requests.RequestException as e:
+                error = str(e) or type(e).__name__
+
+            if self._should_retry(endpoint, response, error, attempt, time.perf_counter() - attempt_started):
+                delay = self._retry_delay(attempt, response)
+                logger.warning(f'Retrying {endpoint} call in {delay:.2f}s after {error}')
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            self._record(endpoint, time.perf_counter() - started, attempt, bool(error))
+            if error:
+                raise CurrencyAPIError(f'Failed to call {endpoint}: {error}',
+                                       response.status_code if response is not None else None)
+            try:
+                return response.json()
+            except ValueError as e:
+                raise CurrencyAPIError(f'Invalid response from {endpoint}: {e}', response.status_code)
+
+    def currencies(self):
+        """
+        Returns all currencies known to the API.
+
+        Returns:
+            dict: A mapping of currency code to the currency data.
+        """
+        return self.get('currencies').get('data', {})
+
+    def historical(self, base_code, target_codes, history_date):
+        """
+        Returns the rates of the target currencies for one base currency and date in a single call.
+
+        Args:
+            base_code (str): The base currency code.
+            target_codes (list): The target currency codes.
+            history_date (date): The date of the rates.
+
+        Returns:
+            dict: A mapping of target currency code to rate value.
+        """
+        return self.historical_rates(self.get('historical', self.historical_params(base_code, target_codes,
+                                                                                  history_date)), target_codes)
+
+
+def shared_limiter():
+    """
+    Returns the process-wide token bucket enforcing CURRENCY_API_RATE_LIMIT across all clients.
+
+    The blocking client and the async client of every event loop take their tokens from
+    it, so that the limit holds however the calls are made.
+    """
+    global _limiter
+    if _limiter is None:
+        with _client_lock:
+            if _limiter is None:
+                _limiter = TokenBucket(CURRENCY_API_RATE_LIMIT, CURRENCY_API_BURST)
+    return _limiter
+
+
+def get_client():
+    """
+    Returns the process-wide client, creating it on first use.
+    """
+    global _client
+    if _client is None:
+        limiter = shared_limiter()
+        with _client_lock:
+            if _client is None:
+                _client = CurrencyAPIClient(limiter=limiter)
+    return _client
@@ -0,0 +1,27 @@
+import threading
+from ..models import CatalogVersion, Currency
+
+_choices = None
+_choices_lock = threading.Lock()
+
+
+def currency_choices():
+    """
+    Returns the (ID, code) choices of all currencies, ordered by code.
+
+    The list is built once per process and shared by every caller until the currency
+    catalog version changes, so a caller only pays for the version lookup.
+
+    Returns:
+        tuple: The (ID, code) pairs.
+    """
+    global _choices
+    fingerprint = CatalogVersion.current(CatalogVersion.CURRENCY)
+    with _choices_lock:
+        if _choices is not None and _choices[0] == fingerprint:
+            return _choices[1]
+
+    choices = tuple(Currency.objects.order_by('currency_code').values_list('id', 'currency_code'))
+    with _choices_lock:
+        _choices = (fingerprint, choices)
+    return choices
@@ -0,0 +1,76 @@
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+from ..models import Currency
+
+FTS_TABLE = 'currencies_exchange_currency_fts'
+SEARCH_COLUMNS = ('currency_code', 'currency_name', 'currency_symbol')
+# bm25 weights of the code, name and symbol columns
+COLUMN_WEIGHTS = (10.0, 1.0, 1.0)
+
+
+def build_match_query(term, column=None):
+    """
+    Builds an FTS5 query matching every word of the term as a token prefix.
+
+    Args:
+        term (str): The search term, words are combined with AND.
+        column (str or None): The column to restrict the match to.
+
+    Returns:
+        str: The FTS5 MATCH expression.
+    """
+    query = ' '.join('"{}"*'.format(word.replace('"', '""')) for word in term.split())
+    return f'{column} : ({query})' if column else query
+
+
+def search_currency_ids(term, column=None):
+    """
+    Returns the IDs of the currencies matching a search term, best match first.
+
+    On SQLite the FTS5 index kept in sync by the currency table triggers is used: words
+    match token prefixes of the code, name and symbol, an exact code match ranks first and
+    the remaining matches are ranked by bm25 with the code weighted highest. Other
+    databases fall back to case-insensitive substring matching.
+
+    Args:
+        term (str): The search term.
+        column (str or None): One of SEARCH_COLUMNS to restrict the search to.
+
+    Returns:
+        list: The matching currency IDs.
+    """
+    if not term.split():
+        return []
+    if column is not None and column not in SEARCH_COLUMNS:
+        raise ValueError(f'Unknown search column {column}')
+
+    if connection.vendor != 'sqlite':
+        columns = [column] if column else SEARCH_COLUMNS
+        condition = Q()
+        for word in term.split():
+            condition &= Q(*[Q(**{f'{name}__icontains': word}) for name in columns], _connector=Q.OR)
+        return list(Currency.objects.filter(condition).order_by(
+            Case(When(currency_code__iexact=term.strip(), then=Value(0)), default=Value(1)), 'currency_code'
+        ).values_list('id', flat=True))
+
+    weights = ', '.join(str(weight) for weight in COLUMN_WEIGHTS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            f'ORDER BY currency_code = upper(%s) DESC, bm25({FTS_TABLE}, {weights}), rowid',
+            [build_match_query(term, column), term.strip()])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def rank_expression(ids):
+    """
+    Returns an expression giving every ID its position in the list, to order a queryset by it.
+
+    Args:
+        ids (list): The ranked IDs, must not be empty.
+
+    Returns:
+        Case: The rank expression.
+    """
+    return Case(*[When(id=pk, then=Value(position)) for position, pk in enumerate(ids)],
+                output_field=IntegerField())
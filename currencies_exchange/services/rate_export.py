@@ -0,0 +1,95 @@
+import io
+import csv
+import zlib
+import orjson
+from ..settings import EXPORT_BUFFER_SIZE, EXPORT_CHUNK_SIZE
+
+EXPORT_FIELDS = ['currency_base', 'currency_target', 'history_date', 'rate']
+EXPORT_LOOKUPS = ['currency_base__currency_code', 'currency_target__currency_code', 'history_date', 'rate']
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+
+def iter_rates(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields the export rows of the rates, fetched chunk by chunk with the pair codes joined in.
+
+    Args:
+        queryset (QuerySet): The rates to export.
+        chunk_size (int): The number of rows fetched per database round trip.
+
+    Yields:
+        tuple: The base code, target code, history date and rate of every rate, in date order.
+    """
+    return queryset.order_by('history_date', 'id').values_list(*EXPORT_LOOKUPS).iterator(chunk_size=chunk_size)
+
+
+def encode_csv(rows, buffer_size=EXPORT_BUFFER_SIZE):
+    """
+    Yields the rows encoded as CSV with a header line, in chunks of about buffer_size bytes.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= buffer_size:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def encode_ndjson(rows, buffer_size=EXPORT_BUFFER_SIZE):
+    """
+    Yields the rows encoded as newline delimited JSON objects, in chunks of about buffer_size bytes.
+    """
+    lines, size = [], 0
+    for row in rows:
+        line = orjson.dumps(dict(zip(EXPORT_FIELDS, row)), option=orjson.OPT_APPEND_NEWLINE)
+        lines.append(line)
+        size += len(line)
+        if size >= buffer_size:
+            yield b''.join(lines)
+            lines, size = [], 0
+    yield b''.join(lines)
+
+
+def gzip_chunks(chunks):
+    """
+    Yields the chunks compressed as a single gzip stream.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_rates(queryset, export_format='csv', compress=False, chunk_size=EXPORT_CHUNK_SIZE,
+                 buffer_size=EXPORT_BUFFER_SIZE):
+    """
+    Returns an iterator over the rates encoded for export.
+
+    Nothing is read until the iterator is consumed. Rows are then fetched, encoded and
+    optionally compressed chunk by chunk, so memory use does not depend on the number
+    of exported rates.
+
+    Args:
+        queryset (QuerySet): The rates to export.
+        export_format (str): One of EXPORT_FORMATS.
+        compress (bool): Whether to gzip the encoded rows.
+        chunk_size (int): The number of rows fetched per database round trip.
+        buffer_size (int): The approximate size in bytes of the encoded chunks.
+
+    Returns:
+        iterator: The encoded bytes chunks.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f'Unknown export format {export_format}')
+    encode = encode_csv if export_format == 'csv' else encode_ndjson
+    chunks = (chunk for chunk in encode(iter_rates(queryset, chunk_size), buffer_size) if chunk)
+    return gzip_chunks(chunks) if compress else chunks
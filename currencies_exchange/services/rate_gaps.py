@@ -0,0 +1,91 @@
+from datetime import timedelta
+from django.db.models import DurationField, Exists, ExpressionWrapper, F, OuterRef, Q, Window
+from django.db.models.functions import Lag, Lead
+from ..models import CurrencyRate, TrackedPair
+
+ONE_DAY = timedelta(days=1)
+
+
+def gap_boundaries(pairs, end):
+    """
+    Returns the stored rates that border a gap in the sync window of the given pairs.
+
+    The rows are read with one query over the (base, target, date) index: every rate of a
+    pair between its window start and ``end`` is ranked with its previous and next stored
+    dates (LAG/LEAD over the pair), and only the first and last rate of the window and
+    the rates following a missing day are returned.
+
+    Args:
+        pairs (list): The TrackedPair instances to check.
+        end (date): The last date of the windows.
+
+    Returns:
+        QuerySet: (base ID, target ID, previous date, date, next date) tuples.
+    """
+    in_window = TrackedPair.objects.filter(
+        Q(synced_through__isnull=True) | Q(synced_through__lt=OuterRef('history_date')),
+        pk__in=[pair.pk for pair in pairs],
+        currency_base=OuterRef('currency_base'),
+        currency_target=OuterRef('currency_target'),
+        start_date__lte=OuterRef('history_date'),
+    )
+    partition = [F('currency_base_id'), F('currency_target_id')]
+    return CurrencyRate.objects.filter(
+        Exists(in_window),
+        history_date__gte=min(pair.window_start() for pair in pairs),
+        history_date__lte=end,
+    ).annotate(
+        previous=Window(Lag('history_date'), partition_by=partition, order_by='history_date'),
+        following=Window(Lead('history_date'), partition_by=partition, order_by='history_date'),
+    ).annotate(
+        step=ExpressionWrapper(F('history_date') - F('previous'), output_field=DurationField()),
+    ).filter(
+        Q(previous__isnull=True) | Q(following__isnull=True) | Q(step__gt=ONE_DAY),
+    ).order_by().values_list('currency_base_id', 'currency_target_id', 'previous', 'history_date', 'following')
+
+
+def find_gaps(pairs, end):
+    """
+    Returns the ranges of dates missing from the sync window of every pair.
+
+    The window of a pair runs from the day after its watermark (or its start date) to
+    ``end``. Gaps are derived from the rows of gap_boundaries(), so that the cost depends
+    on the number of gaps rather than the number of days.
+
+    Args:
+        pairs (list): The TrackedPair instances to check.
+        end (date): The last date of the windows.
+
+    Returns:
+        dict: A mapping of pair to its sorted list of missing (first, last) date ranges,
+            only pairs with gaps are included.
+
+    Example:
+        find_gaps(TrackedPair.objects.filter(active=True), date(2023, 1, 31))
+        # {<TrackedPair: USD/EUR>: [(date(2023, 1, 4), date(2023, 1, 5))]}
+    """
+    pairs = [pair for pair in pairs if pair.window_start() <= end]
+    if not pairs:
+        return {}
+    by_ids = {(pair.currency_base_id, pair.currency_target_id): pair for pair in pairs}
+    boundaries = {}
+    for base_id, target_id, previous, current, following in gap_boundaries(pairs, end):
+        boundaries.setdefault((base_id, target_id), []).append((previous, current, following))
+
+    gaps = {}
+    for ids, pair in by_ids.items():
+        ranges = []
+        rows = boundaries.get(ids)
+        if not rows:
+            ranges.append((pair.window_start(), end))
+        for previous, current, following in rows or ():
+            if previous is None:
+                if current > pair.window_start():
+                    ranges.append((pair.window_start(), current - ONE_DAY))
+            elif current - previous > ONE_DAY:
+                ranges.append((previous + ONE_DAY, current - ONE_DAY))
+            if following is None and current < end:
+                ranges.append((current + ONE_DAY, end))
+        if ranges:
+            gaps[pair] = sorted(ranges)
+    return gaps
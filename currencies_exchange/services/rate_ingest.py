@@ -0,0 +1,145 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from ..models import CatalogVersion, CurrencyRate
+from .cross_rates import invalidate_snapshot
+from .currency_api_client import get_client
+
+
+class IngestResult:
+    """
+    Outcome of an ingest_rates() run.
+
+    Attributes:
+        rows (int): The number of rows written, rows stored in the meantime included.
+        calls (int): The number of upstream calls made.
+        failures (int): The number of upstream calls that failed.
+        seconds (float): The wall time of the run.
+        missing (set): The (base ID, target ID, date) triples that were requested but not
+            stored, because their call failed or the upstream had no value for them.
+        unavailable (set): The triples of missing whose call succeeded without a value for
+            them, which retrying would not change.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.calls = 0
+        self.failures = 0
+        self.seconds = 0.0
+        self.missing = set()
+        self.unavailable = set()
+
+
+def fill_pending_rates(values):
+    """
+    Sets the value of the pending rates among the given ones.
+
+    Pending rows were saved while their fetch is queued (see RateFetchJob), they are
+    filled by whichever write gets their value first.
+
+    Args:
+        values (dict): A mapping of (base ID, target ID, date) to rate value.
+
+    Returns:
+        list: The CurrencyRate rows that were filled.
+    """
+    if not values:
+        return []
+    pending = CurrencyRate.with_pending.filter(
+        rate__isnull=True, history_date__in={history_date for _, _, history_date in values}
+    ).order_by().only('id', 'currency_base_id', 'currency_target_id', 'history_date')
+    filled = []
+    for rate in pending:
+        value = values.get((rate.currency_base_id, rate.currency_target_id, rate.history_date))
+        if value is not None:
+            rate.rate = value
+            filled.append(rate)
+    if filled:
+        CurrencyRate.with_pending.bulk_update(filled, ['rate'])
+        CatalogVersion.bump(CatalogVersion.RATE)
+        for history_date in {rate.history_date for rate in filled}:
+            invalidate_snapshot(history_date)
+    return filled
+
+
+def write_rates(rates, chunk_size=1000):
+    """
+    Writes the given rates with chunked bulk inserts.
+
+    Rates stored in the meantime by another process are skipped by the unique constraint,
+    pending rows of the same pairs and dates are filled.
+
+    Args:
+        rates (list): The CurrencyRate instances to insert.
+        chunk_size (int): The number of rows per insert statement.
+
+    Returns:
+        int: The number of rows written.
+    """
+    if rates:
+        CurrencyRate.objects.bulk_create(rates, batch_size=chunk_size, ignore_conflicts=True)
+        fill_pending_rates({(rate.currency_base_id, rate.currency_target_id, rate.history_date): rate.rate
+                            for rate in rates})
+        # Bulk writes skip the model signals that bump the catalog version
+        CatalogVersion.bump(CatalogVersion.RATE)
+        for history_date in {rate.history_date for rate in rates}:
+            invalidate_snapshot(history_date)
+    return len(rates)
+
+
+def ingest_rates(jobs, concurrency=8, chunk_size=1000, on_failure=None):
+    """
+    Fetches historical rates from the external API and stores them.
+
+    Every job is one upstream call for a base currency and date asking for all of its
+    targets at once. Calls run concurrently up to the given limit and the fetched rates
+    are written with chunked bulk inserts as they arrive.
+
+    Args:
+        jobs (list): (base Currency, list of target Currency, date) tuples.
+        concurrency (int): The maximum number of concurrent upstream calls.
+        chunk_size (int): The number of rows per insert statement.
+        on_failure (callable or None): Called with the base currency, the date and the
+            exception of every failed call.
+
+    Returns:
+        IngestResult: The counts, timing and requested rates left missing.
+
+    Example:
+        ingest_rates([(usd, [eur, pln], date(2023, 1, 2))], concurrency=4)
+    """
+    result = IngestResult()
+    started = time.perf_counter()
+    pending = []
+    client = get_client()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {
+            executor.submit(client.historical, base.currency_code,
+                            [target.currency_code for target in targets], history_date): (base, targets, history_date)
+            for base, targets, history_date in jobs
+        }
+        for future in as_completed(futures):
+            base, targets, history_date = futures[future]
+            result.calls += 1
+            try:
+                values = future.result()
+            except Exception as e:
+                result.failures += 1
+                result.missing.update((base.pk, target.pk, history_date) for target in targets)
+                if on_failure is not None:
+                    on_failure(base, history_date, e)
+                continue
+
+            for target in targets:
+                value = values.get(target.currency_code)
+                if value is None:
+                    result.missing.add((base.pk, target.pk, history_date))
+                    result.unavailable.add((base.pk, target.pk, history_date))
+                else:
+                    pending.append(CurrencyRate(currency_base=base, currency_target=target,
+                                                rate=value, history_date=history_date))
+            if len(pending) >= chunk_size:
+                result.rows += write_rates(pending, chunk_size)
+                pending = []
+    result.rows += write_rates(pending, chunk_size)
+    result.seconds = max(time.perf_counter() - started, 1e-9)
+    return result
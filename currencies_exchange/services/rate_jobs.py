@@ -0,0 +1,228 @@
+import uuid
+import logging
+import threading
+from datetime import timedelta
+from django.db.models import Q
+from django.utils.timezone import now
+from ..database import sync_replica
+from ..models import RateFetchJob
+from ..settings import (RATE_JOB_BATCH_SIZE, RATE_JOB_LEASE, RATE_JOB_MAX_ATTEMPTS, RATE_JOB_POLL_INTERVAL,
+                        RATE_JOB_RETRY_DELAY)
+from .columnar_snapshot import refresh_columnar_snapshot
+from .currency_api_client import CurrencyAPIError
+from .rate_ingest import fill_pending_rates
+from .single_flight import fetch_historical
+
+logger = logging.getLogger(__name__)
+
+
+class JobRunResult:
+    """
+    Outcome of the rate fetch jobs run by a worker.
+
+    Attributes:
+        calls (int): The number of upstream calls made.
+        filled (int): The number of pending rates filled.
+        retried (int): The number of jobs queued again after a failed fetch.
+        failed (int): The number of jobs given up.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.filled = 0
+        self.retried = 0
+        self.failed = 0
+
+    def add(self, other):
+        """
+        Adds the counters of another result to this one.
+        """
+        self.calls += other.calls
+        self.filled += other.filled
+        self.retried += other.retried
+        self.failed += other.failed
+
+    def as_dict(self):
+        """
+        Returns the counters as a dict, e.g. to send them from a worker process.
+        """
+        return {'calls': self.calls, 'filled': self.filled, 'retried': self.retried, 'failed': self.failed}
+
+
+def enqueue_rate_fetch(rate):
+    """
+    Queues the fetch of a pending rate, resetting the job of a rate queued before.
+
+    Args:
+        rate (CurrencyRate): The saved rate without a value.
+
+    Returns:
+        RateFetchJob: The queued job.
+    """
+    job, _ = RateFetchJob.objects.update_or_create(rate=rate, defaults={
+        'state': RateFetchJob.QUEUED, 'attempts': 0, 'run_after': now(), 'claimed_by': '', 'locked_until': None,
+        'last_error': '',
+    })
+    return job
+
+
+def retry_failed_jobs():
+    """
+    Queues the failed jobs again with a fresh number of attempts.
+
+    Returns:
+        int: The number of jobs queued again.
+    """
+    return RateFetchJob.objects.filter(state=RateFetchJob.FAILED).update(
+        state=RateFetchJob.QUEUED, attempts=0, run_after=now(), last_error='')
+
+
+def claim_jobs(batch_size=RATE_JOB_BATCH_SIZE, lease=RATE_JOB_LEASE):
+    """
+    Claims a batch of due jobs for the calling worker.
+
+    Due jobs are the queued ones whose run_after has passed and the running ones whose
+    lease expired. The candidates are marked as running with a token of the batch by a
+    conditional update, so that of several workers racing for a job only one gets it,
+    without row locks the SQLite backend does not have.
+
+    Args:
+        batch_size (int): The maximum number of jobs to claim.
+        lease (float): The seconds the jobs are reserved to the worker.
+
+    Returns:
+        list: The claimed RateFetchJob instances with their rate and currencies.
+    """
+    current = now()
+    due = Q(state=RateFetchJob.QUEUED, run_after__lte=current) | Q(state=RateFetchJob.RUNNING,
+                                                                    locked_until__lt=current)
+    ids = list(RateFetchJob.objects.filter(due).order_by('run_after').values_list('id', flat=True)[:batch_size])
+    if not ids:
+        return []
+    token = uuid.uuid4().hex
+    RateFetchJob.objects.filter(due, id__in=ids).update(
+        state=RateFetchJob.RUNNING, claimed_by=token, locked_until=current + timedelta(seconds=lease))
+    return list(RateFetchJob.objects.filter(claimed_by=token, state=RateFetchJob.RUNNING).select_related(
+        'rate__currency_base', 'rate__currency_target'))
+
+
+def run_jobs(jobs, max_attempts=RATE_JOB_MAX_ATTEMPTS, retry_delay=RATE_JOB_RETRY_DELAY):
+    """
+    Fetches the rates of claimed jobs, fills the pending rows and settles the jobs.
+
+    The jobs are grouped into one upstream call per base currency and date, coalesced
+    with identical calls of other workers (see SingleFlight). Jobs whose rate was filled
+    meanwhile are settled without a call. Completed jobs are deleted; failed ones are
+    queued again after retry_delay doubled per attempt, or kept as failed after
+    max_attempts or when the external API has no rate for them. Only the jobs still held
+    by the batch token are settled: a job whose lease expired during the run may have been
+    claimed again by another worker, which settles it instead.
+
+    Args:
+        jobs (list): The RateFetchJob instances returned by claim_jobs().
+        max_attempts (int): The number of failed fetches after which a job is given up.
+        retry_delay (float): The seconds before the first retry.
+
+    Returns:
+        JobRunResult: The counters of the run.
+    """
+    result = JobRunResult()
+    owned = RateFetchJob.objects.filter(claimed_by__in={job.claimed_by for job in jobs})
+    calls = {}
+    done = [job for job in jobs if job.rate.rate is not None]
+    for job in jobs:
+        if job.rate.rate is None:
+            calls.setdefault((job.rate.currency_base, job.rate.history_date), []).append(job)
+
+    values, settled = {}, []
+    for (base, history_date), group in calls.items():
+        codes = sorted({job.rate.currency_target.currency_code for job in group})
+        result.calls += 1
+        try:
+            rates, error = fetch_historical(base.currency_code, codes, history_date), None
+        except CurrencyAPIError as e:
+            logger.warning(f'Failed to fetch {base.currency_code} rates for {history_date}: {e}')
+            rates, error = {}, e
+
+        current = now()
+        for job in group:
+            rate = job.rate
+            value = rates.get(rate.currency_target.currency_code)
+            if value is not None:
+                values[(rate.currency_base_id, rate.currency_target_id, rate.history_date)] = value
+                done.append(job)
+                continue
+            job.attempts += 1
+            job.last_error = str(error) if error else f'No rate for {rate.currency_target.currency_code}'
+            job.claimed_by, job.locked_until = '', None
+            if error is None or error.status_code == 422 or job.attempts >= max_attempts:
+                job.state = RateFetchJob.FAILED
+                result.failed += 1
+            else:
+                job.state = RateFetchJob.QUEUED
+                job.run_after = current + timedelta(seconds=retry_delay * 2 ** (job.attempts - 1))
+                result.retried += 1
+            settled.append(job)
+
+    result.filled = len(fill_pending_rates(values))
+    owned.filter(id__in=[job.id for job in done]).delete()
+    owned.bulk_update(settled, ['state', 'attempts', 'run_after', 'claimed_by', 'locked_until', 'last_error'])
+    return result
+
+
+def publish_filled_rates():
+    """
+    Syncs the read replica and refreshes the columnar snapshot, when they are used, so that the API reads see the
+    filled rates.
+    """
+    sync_replica()
+    refresh_columnar_snapshot()
+
+
+def work(stop=None, batch_size=RATE_JOB_BATCH_SIZE, poll_interval=RATE_JOB_POLL_INTERVAL, once=False):
+    """
+    Runs batches of due jobs until stopped, waiting poll_interval when none is due.
+
+    A batch that fails unexpectedly is logged, or raised with once, and its jobs are left
+    to the lease expiry. The read replica and the columnar snapshot, when used, are
+    refreshed once the queue is drained, or the worker stopped, after rates were filled,
+    so that the API reads see them (see publish_filled_rates()).
+
+    Args:
+        stop (threading.Event or None): Stops the loop once set, between two batches.
+        batch_size (int): The maximum number of jobs per batch.
+        poll_interval (float): The seconds to wait when no job is due.
+        once (bool): Whether to return as soon as no job is due instead of waiting.
+
+    Returns:
+        JobRunResult: The counters of all the batches.
+    """
+    stop = stop or threading.Event()
+    result = JobRunResult()
+    unsynced = 0
+    while not stop.is_set():
+        try:
+            jobs = claim_jobs(batch_size)
+            if jobs:
+                batch = run_jobs(jobs)
+                result.add(batch)
+                unsynced += batch.filled
+                continue
+            if unsynced:
+                publish_filled_rates()
+                unsynced = 0
+        except Exception:
+            if once:
+                raise
+            # The jobs of the batch stay leased and are taken over once the lease expires
+            logger.exception('Failed to run a batch of rate fetch jobs')
+        else:
+            if once:
+                break
+        stop.wait(poll_interval)
+    if unsynced:
+        try:
+            publish_filled_rates()
+        except Exception:
+            logger.exception('Failed to publish the filled rates')
+    return result
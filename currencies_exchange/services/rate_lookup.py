@@ -0,0 +1,155 @@
+import asyncio
+from datetime import date
+from asgiref.sync import sync_to_async
+from ..database import primary_reads, reading_replica
+from ..models import Currency, CurrencyRate
+from ..settings import CONVERT_MAX_UPSTREAM_CALLS
+from .conversion import NO_RATE_ERROR, convert_batch
+from .cross_rates import derive_rate
+from .currency_api_client import CurrencyAPIError
+from .single_flight import afetch_historical
+from .rate_ingest import write_rates
+
+
+async def afetch_rates(calls):
+    """
+    Fetches rates from the external API concurrently and stores them.
+
+    Identical calls running at the same time, in this or another process, are coalesced
+    into one (see SingleFlight).
+
+    Args:
+        calls (dict): A mapping of (base Currency, date) to the list of target Currency
+            to fetch, every entry is one upstream call.
+
+    Returns:
+        tuple: A mapping of (base ID, target ID, date) to the fetched rate, and a mapping of
+            (base ID, date) to the CurrencyAPIError of every failed call.
+    """
+    responses = await asyncio.gather(*(
+        afetch_historical(base.currency_code, [target.currency_code for target in targets], history_date)
+        for (base, history_date), targets in calls.items()
+    ), return_exceptions=True)
+
+    rates, errors, rows = {}, {}, []
+    for ((base, history_date), targets), values in zip(calls.items(), responses):
+        if isinstance(values, CurrencyAPIError):
+            errors[(base.pk, history_date)] = values
+            continue
+        if isinstance(values, BaseException):
+            raise values
+        for target in targets:
+            if values.get(target.currency_code) is not None:
+                rates[(base.pk, target.pk, history_date)] = values[target.currency_code]
+                rows.append(CurrencyRate(currency_base=base, currency_target=target,
+                                         rate=values[target.currency_code], history_date=history_date))
+    if rows:
+        await sync_to_async(write_rates)(rows)
+    return rates, errors
+
+
+def _convert_from_primary(items):
+    """
+    Converts items like convert_batch(), reading the rates from the default database.
+    """
+    with primary_reads():
+        return convert_batch(items)
+
+
+async def alookup_rate(base, target, history_date):
+    """
+    Returns the rate of a currency pair, fetching and storing it when it is unknown.
+
+    The stored rate is read with the async ORM, else the rate is derived from the pivot
+    snapshot of the date, else it is fetched from the external API without blocking the
+    event loop. When the reads go to the replica, the default database is checked again
+    before fetching, as the replica misses the rates stored since its last sync.
+
+    Args:
+        base (Currency): The base currency.
+        target (Currency): The target currency.
+        history_date (date): The date of the rate.
+
+    Returns:
+        tuple: The rate and its source ('stored', 'derived' or 'upstream'), (None, None)
+            when the external API has no rate for the pair.
+
+    Raises:
+        CurrencyAPIError: If the upstream call fails.
+
+    Example:
+        rate, source = await alookup_rate(usd, eur, date(2023, 1, 2))
+    """
+    stored = CurrencyRate.objects.filter(
+        currency_base=base, currency_target=target, history_date=history_date
+    ).order_by().values_list('rate', flat=True)
+    rate = await stored.afirst()
+    if rate is not None:
+        return rate, 'stored'
+    rate = await sync_to_async(derive_rate)(base.pk, target.pk, history_date)
+    if rate is not None:
+        return rate, 'derived'
+    if reading_replica():
+        rate = await stored.using('default').afirst()
+        if rate is not None:
+            return rate, 'stored'
+
+    rates, errors = await afetch_rates({(base, history_date): [target]})
+    if errors:
+        raise errors[(base.pk, history_date)]
+    rate = rates.get((base.pk, target.pk, history_date))
+    return (rate, 'upstream') if rate is not None else (None, None)
+
+
+async def aconvert_batch(items, fetch_missing=False):
+    """
+    Converts a batch of amounts like convert_batch(), optionally fetching missing rates.
+
+    With fetch_missing, the items without a stored or derivable rate are grouped into one
+    upstream call per source currency and date, at most CONVERT_MAX_UPSTREAM_CALLS of them,
+    fetched concurrently, stored and converted with the fetched rates. Items whose call
+    fails keep their error. When the reads go to the replica, the missing items are
+    converted again from the default database first, so that the rates fetched since the
+    last replica sync are not fetched again.
+
+    Args:
+        items (list): Dicts with 'amount', 'from', 'to' and 'date' (YYYY-MM-DD) keys.
+        fetch_missing (bool): Whether to fetch the missing rates from the external API.
+
+    Returns:
+        list: One dict per item, as returned by convert_batch().
+    """
+    results = await sync_to_async(convert_batch)(items)
+    missing = [index for index, result in enumerate(results)
+               if result.get('error', '').startswith(NO_RATE_ERROR)]
+    if not fetch_missing or not missing:
+        return results
+    if reading_replica():
+        rechecked = await sync_to_async(_convert_from_primary)([items[index] for index in missing])
+        for index, result in zip(missing, rechecked):
+            results[index] = result
+        missing = [index for index in missing if results[index].get('error', '').startswith(NO_RATE_ERROR)]
+        if not missing:
+            return results
+
+    codes = {code for index in missing for code in (items[index]['from'], items[index]['to'])}
+    currencies = {currency.currency_code: currency
+                  async for currency in Currency.objects.filter(currency_code__in=codes)}
+    calls = {}
+    for index in missing:
+        key = (currencies[items[index]['from']], date.fromisoformat(items[index]['date']))
+        if key in calls or len(calls) < CONVERT_MAX_UPSTREAM_CALLS:
+            targets = calls.setdefault(key, [])
+            if currencies[items[index]['to']] not in targets:
+                targets.append(currencies[items[index]['to']])
+
+    rates, _ = await afetch_rates(calls)
+    for index in missing:
+        item = items[index]
+        history_date = date.fromisoformat(item['date'])
+        rate = rates.get((currencies[item['from']].pk, currencies[item['to']].pk, history_date))
+        if rate is not None:
+            amount = float(item['amount'])
+            results[index] = {'amount': amount, 'from': item['from'], 'to': item['to'], 'date': str(history_date),
+                              'rate': rate, 'source': 'upstream', 'result': amount * rate}
+    return results
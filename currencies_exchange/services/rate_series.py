@@ -0,0 +1,56 @@
+import numpy as np
+
+RESOLUTIONS = ('day', 'week', 'month')
+
+
+def bucket_starts(dates, resolution):
+    """
+    Returns the first day of the bucket every date falls into.
+
+    Args:
+        dates (numpy.ndarray): The dates as datetime64[D].
+        resolution (str): One of 'day', 'week' (starting on Monday) or 'month'.
+
+    Returns:
+        numpy.ndarray: The bucket start dates as datetime64[D].
+    """
+    if resolution == 'week':
+        # Day 0 of datetime64 is a Thursday, shifting by 3 makes weeks start on Monday
+        return dates - (dates.astype(np.int64) + 3) % 7
+    if resolution == 'month':
+        return dates.astype('datetime64[M]').astype('datetime64[D]')
+    return dates
+
+
+def downsample(dates, rates, resolution):
+    """
+    Aggregates a date sorted rate series into open/high/low/close/mean buckets in one vectorized pass.
+
+    Args:
+        dates (sequence): The dates of the rates, sorted ascending.
+        rates (sequence): The rates.
+        resolution (str): One of 'day', 'week' or 'month'.
+
+    Returns:
+        dict: NumPy arrays 'period', 'open', 'high', 'low', 'close', 'mean' and 'count', one entry per bucket.
+    """
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    rates = np.asarray(rates, dtype=np.float64)
+    if not dates.size:
+        empty = np.empty(0)
+        return {'period': dates, 'open': empty, 'high': empty, 'low': empty, 'close': empty,
+                'mean': empty, 'count': np.empty(0, dtype=np.int64)}
+
+    buckets = bucket_starts(dates, resolution)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], dates.size] - 1
+    counts = ends - starts + 1
+    return {
+        'period': buckets[starts],
+        'open': rates[starts],
+        'high': np.maximum.reduceat(rates, starts),
+        'low': np.minimum.reduceat(rates, starts),
+        'close': rates[ends],
+        'mean': np.add.reduceat(rates, starts) / counts,
+        'count': counts,
+    }
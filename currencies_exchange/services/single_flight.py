@@ -0,0 +1,287 @@
+import json
+import time
+import asyncio
+import hashlib
+import weakref
+import threading
+from datetime import timedelta
+from asgiref.sync import sync_to_async
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.utils.timezone import now
+from ..metrics import registry
+from ..models import FetchLock
+from ..settings import SINGLE_FLIGHT_LOCK_TIMEOUT, SINGLE_FLIGHT_POLL_INTERVAL, SINGLE_FLIGHT_RESULT_TTL
+from .currency_api_client import get_client
+from .async_currency_api_client import get_async_client
+
+
+class Call:
+    """
+    A fetch running in this process, awaited by the other threads asking for its key.
+
+    Attributes:
+        done (threading.Event): Set once the fetch completed or failed.
+        value: The result of the fetch.
+        error (BaseException or None): The error raised by the fetch.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent fetches of the same key into a single call.
+
+    Within a process, the first thread (or coroutine, per event loop) asking for a key runs
+    the fetch and the others wait for its result, or its error. Across processes, the
+    running fetch holds a row of the FetchLock table: processes finding the row wait until
+    it holds the JSON encoded result, which it keeps for result_ttl seconds. A failed fetch
+    deletes its row, the waiting processes then fetch themselves, and a fetch that did not
+    complete within lock_timeout seconds is taken over. Results must be JSON serializable.
+
+    Inside a transaction, like the admin's or with ATOMIC_REQUESTS, the FetchLock table is
+    left alone and fetches are only coalesced within the process: the lock row would hold
+    the SQLite write lock of the transaction for the whole upstream call, during which every
+    other writer, claims of other processes included, fails with "database is locked".
+
+    Attributes:
+        name (str): The name of the flight, the prefix of its keys and its metrics label.
+        lock_timeout (float): The seconds after which a running fetch can be taken over.
+        result_ttl (float): The seconds a result answers other processes.
+        poll_interval (float): The seconds between two looks at the row of a running fetch.
+
+    Methods:
+        do(key, fetch): Returns the result of fetch() for the key, coalesced with concurrent calls.
+        ado(key, fetch): Coroutine version of do() for a coroutine function fetch.
+        can_lock(): Returns whether the FetchLock table may be used, outside transactions.
+        claim(key): Takes the lock of a key or returns the state of the running fetch.
+        complete(key, value): Stores the result of a fetch for the other processes.
+        release(key): Deletes the lock of a failed fetch.
+
+    Example:
+        To fetch a rate once however many threads and processes ask for it:
+        flight = SingleFlight('historical')
+        rates = flight.do('USD:EUR:2023-01-02', lambda: get_client().historical('USD', ['EUR'], day))
+    """
+
+    def __init__(self, name, lock_timeout=SINGLE_FLIGHT_LOCK_TIMEOUT, result_ttl=SINGLE_FLIGHT_RESULT_TTL,
+                 poll_interval=SINGLE_FLIGHT_POLL_INTERVAL):
+        self.name = name
+        self.lock_timeout = lock_timeout
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self._calls = {}
+        self._tasks = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def lock_key(self, key):
+        """
+        Returns the FetchLock key of a key, hashed when it would not fit the column.
+        """
+        lock_key = f'{self.name}:{key}'
+        if len(lock_key) > FetchLock._meta.get_field('key').max_length:
+            lock_key = f'{self.name}:sha256:{hashlib.sha256(str(key).encode()).hexdigest()}'
+        return lock_key
+
+    def coalesced(self, scope):
+        """
+        Counts a call answered by a concurrent fetch of this process or of another one.
+        """
+        registry.inc('singleflight_coalesced_total', (('flight', self.name), ('scope', scope)))
+
+    def do(self, key, fetch):
+        """
+        Returns the result of fetch() for the key, coalesced with the concurrent calls.
+
+        Args:
+            key (str): The key of the fetch, e.g. the currency pair and date.
+            fetch (callable): Runs the fetch and returns its JSON serializable result.
+
+        Returns:
+            The result of the fetch of this call, of a concurrent thread or of another process.
+
+        Raises:
+            Exception: The error of the fetch run by this call or by a concurrent thread.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Call()
+        if not leader:
+            self.coalesced('process')
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = self.fetch_once(key, fetch)
+            return call.value
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def fetch_once(self, key, fetch):
+        """
+        Runs fetch() under the lock of the key, unless another process has or gets its result.
+        """
+        lock_key = self.lock_key(key) if self.can_lock() else None
+        while lock_key is not None:
+            claimed, value = self.claim(lock_key)
+            if claimed:
+                break
+            if value is not None:
+                self.coalesced('lock')
+                return json.loads(value)
+            time.sleep(self.poll_interval)
+
+        try:
+            value = fetch()
+        except BaseException:
+            if lock_key is not None:
+                self.release(lock_key)
+            raise
+        if lock_key is not None:
+            self.complete(lock_key, value)
+        registry.inc('singleflight_fetches_total', (('flight', self.name),))
+        return value
+
+    async def ado(self, key, fetch):
+        """
+        Returns the result of await fetch() for the key, coalesced with the concurrent calls.
+
+        Coroutines of the same event loop share one task, which cancelling a waiting
+        request does not cancel. The FetchLock table is accessed through sync_to_async().
+
+        Args:
+            key (str): The key of the fetch.
+            fetch (callable): Returns an awaitable of the JSON serializable result.
+
+        Returns:
+            The result of the fetch.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            tasks = self._tasks.setdefault(loop, {})
+        task = tasks.get(key)
+        if task is not None:
+            self.coalesced('process')
+        else:
+            task = tasks[key] = loop.create_task(self.afetch_once(key, fetch))
+            task.add_done_callback(lambda done: tasks.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def afetch_once(self, key, fetch):
+        """
+        Coroutine version of fetch_once().
+        """
+        lock_key = self.lock_key(key) if await sync_to_async(self.can_lock)() else None
+        while lock_key is not None:
+            claimed, value = await sync_to_async(self.claim)(lock_key)
+            if claimed:
+                break
+            if value is not None:
+                self.coalesced('lock')
+                return json.loads(value)
+            await asyncio.sleep(self.poll_interval)
+
+        try:
+            value = await fetch()
+        except BaseException:
+            if lock_key is not None:
+                await sync_to_async(self.release)(lock_key)
+            raise
+        if lock_key is not None:
+            await sync_to_async(self.complete)(lock_key, value)
+        registry.inc('singleflight_fetches_total', (('flight', self.name),))
+        return value
+
+    @staticmethod
+    def can_lock():
+        """
+        Returns whether the FetchLock table may be used, which it may not inside a transaction.
+        """
+        return not transaction.get_connection(DEFAULT_DB_ALIAS).in_atomic_block
+
+    def claim(self, lock_key):
+        """
+        Takes the lock of a key, or returns the state of the fetch holding it.
+
+        Args:
+            lock_key (str): The FetchLock key.
+
+        Returns:
+            tuple: (True, None) when the lock was taken, else False and the JSON encoded
+                result, None while the fetch is running.
+        """
+        locks = FetchLock.objects.using(DEFAULT_DB_ALIAS)
+        current = now()
+        lock = locks.filter(key=lock_key).values_list('value', 'expires').first()
+        if lock and lock[1] >= current:
+            return False, lock[0]
+
+        locks.filter(expires__lt=current).delete()
+        try:
+            with transaction.atomic(using=DEFAULT_DB_ALIAS):
+                locks.create(key=lock_key, expires=current + timedelta(seconds=self.lock_timeout))
+        except IntegrityError:
+            return False, None
+        return True, None
+
+    def complete(self, lock_key, value):
+        """
+        Stores the result of a fetch for the other processes, for result_ttl seconds.
+        """
+        FetchLock.objects.using(DEFAULT_DB_ALIAS).filter(key=lock_key).update(
+            value=json.dumps(value), expires=now() + timedelta(seconds=self.result_ttl))
+
+    def release(self, lock_key):
+        """
+        Deletes the lock of a failed fetch, so that the waiting processes fetch themselves.
+        """
+        FetchLock.objects.using(DEFAULT_DB_ALIAS).filter(key=lock_key).delete()
+
+
+historical_flight = SingleFlight('historical')
+
+
+def historical_key(base_code, target_codes, history_date):
+    """
+    Returns the single-flight key of a historical rates call.
+    """
+    return f'{base_code}:{",".join(sorted(target_codes))}:{history_date.isoformat()}'
+
+
+def fetch_historical(base_code, target_codes, history_date):
+    """
+    Returns the rates of get_client().historical(), one call for all concurrent identical requests.
+
+    Args:
+        base_code (str): The base currency code.
+        target_codes (list): The target currency codes.
+        history_date (date): The date of the rates.
+
+    Returns:
+        dict: A mapping of target currency code to rate value.
+
+    Raises:
+        CurrencyAPIError: If the upstream call fails.
+    """
+    return historical_flight.do(historical_key(base_code, target_codes, history_date),
+                                lambda: get_client().historical(base_code, target_codes, history_date))
+
+
+async def afetch_historical(base_code, target_codes, history_date):
+    """
+    Coroutine version of fetch_historical() using the async client.
+    """
+    return await historical_flight.ado(historical_key(base_code, target_codes, history_date),
+                                       lambda: get_async_client().historical(base_code, target_codes, history_date))
@@ -11,7 +11,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -28,8 +28,15 @@ DEBUG = True
 ALLOWED_HOSTS = []
 
 REST_FRAMEWORK = {
-    'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend']
+    'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+    'DEFAULT_RENDERER_CLASSES': [
+        'currencies_exchange.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'currencies_exchange.pagination.KeysetCursorPagination',
+    'PAGE_SIZE': config('PAGE_SIZE', default=100, cast=int),
 }
+MAX_PAGE_SIZE = config('MAX_PAGE_SIZE', default=1000, cast=int)
 # Application definition
 
 INSTALLED_APPS = [
@@ -45,6 +52,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'currencies_exchange.middleware.MetricsMiddleware',
+    'currencies_exchange.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -52,6 +61,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'currencies_exchange.middleware.ReplicaReadMiddleware',
 ]
 
 ROOT_URLCONF = 'currencies_exchange.urls'
@@ -81,9 +91,46 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Persistent connections skip the connection setup and pragmas on every request
+        'CONN_MAX_AGE': config('CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {'timeout': config('SQLITE_BUSY_TIMEOUT', default=20, cast=float)},
     }
 }
 
+# Pragmas applied to every new SQLite connection, see currencies_exchange.database
+SQLITE_JOURNAL_MODE = config('SQLITE_JOURNAL_MODE', default='WAL')
+SQLITE_SYNCHRONOUS = config('SQLITE_SYNCHRONOUS', default='NORMAL')
+SQLITE_MMAP_SIZE = config('SQLITE_MMAP_SIZE', default=268435456, cast=int)
+
+# Read-only copy of the database serving the API reads, refreshed by sync_replica and backfill_rates
+DATABASE_REPLICA = config('DATABASE_REPLICA', default='')
+if DATABASE_REPLICA:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': f'file:{DATABASE_REPLICA}?mode=ro',
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['currencies_exchange.database.ReplicaRouter']
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'currencies-exchange',
+    }
+}
+
+# Seconds a rendered catalog response is cached, a catalog version bump invalidates it earlier
+CATALOG_CACHE_TIMEOUT = config('CATALOG_CACHE_TIMEOUT', default=3600, cast=int)
+
+# Whether the rate admin changelist estimates the unfiltered row count instead of counting it
+ADMIN_ESTIMATED_COUNT = config('ADMIN_ESTIMATED_COUNT', default=True, cast=bool)
+# Whether the rate admin form loads the currencies lazily with autocomplete widgets instead of inline choices
+ADMIN_CURRENCY_AUTOCOMPLETE = config('ADMIN_CURRENCY_AUTOCOMPLETE', default=False, cast=bool)
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -102,22 +149,53 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
-import logging
+# Logging: JSON lines written by a background thread to a file rotated daily and at
+# LOG_MAX_BYTES; the SQL statements of django.db.backends are sampled and rate limited
+LOG_FILE = config('LOG_FILE', default=str(BASE_DIR / 'currencies_exchange' / 'logs' / 'log_api_connection.log'))
+LOG_LEVEL = config('LOG_LEVEL', default='DEBUG' if DEBUG else 'INFO')
+LOG_MAX_BYTES = config('LOG_MAX_BYTES', default=50 * 1024 * 1024, cast=int)
+LOG_BACKUP_COUNT = config('LOG_BACKUP_COUNT', default=14, cast=int)
+LOG_QUEUE_SIZE = config('LOG_QUEUE_SIZE', default=10000, cast=int)
+LOG_SQL_SAMPLE_RATE = config('LOG_SQL_SAMPLE_RATE', default=0.01, cast=float)
+LOG_SQL_RATE_LIMIT = config('LOG_SQL_RATE_LIMIT', default=50, cast=float)
 
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'formatters': {
+        'json': {
+            '()': 'currencies_exchange.structured_logging.JSONFormatter',
+        },
+    },
+    'filters': {
+        'sampling': {
+            '()': 'currencies_exchange.structured_logging.SamplingFilter',
+            'rules': {
+                'django.db.backends': {'sample_rate': LOG_SQL_SAMPLE_RATE, 'rate_limit': LOG_SQL_RATE_LIMIT},
+            },
+        },
+    },
     'handlers': {
         'file': {
-            'level': 'DEBUG',
-            'class': 'logging.FileHandler',
-            'filename': './currencies_exchange/logs/log_api_connection.log',
+            '()': 'currencies_exchange.structured_logging.QueueFileHandler',
+            'level': LOG_LEVEL,
+            'formatter': 'json',
+            'filters': ['sampling'],
+            'filename': LOG_FILE,
+            'max_bytes': LOG_MAX_BYTES,
+            'backup_count': LOG_BACKUP_COUNT,
+            'queue_size': LOG_QUEUE_SIZE,
         },
     },
     'loggers': {
         'django': {
             'handlers': ['file'],
-            'level': 'DEBUG',
+            'level': LOG_LEVEL,
+            'propagate': True,
+        },
+        'currencies_exchange': {
+            'handlers': ['file'],
+            'level': LOG_LEVEL,
             'propagate': True,
         },
     },
@@ -145,3 +223,62 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
 CURRENCY_API_KEY = config('CURRENCY_API_KEY')
+
+# Upstream client: timeouts in seconds, rate limit in calls per second (0 disables it). Point the base URL
+# at http://127.0.0.1:8765/v3 to use the local stand-in (manage.py run_currency_api_standin)
+CURRENCY_API_BASE_URL = config('CURRENCY_API_BASE_URL', default='https://api.currencyapi.com/v3')
+CURRENCY_API_CONNECT_TIMEOUT = config('CURRENCY_API_CONNECT_TIMEOUT', default=5, cast=float)
+CURRENCY_API_READ_TIMEOUT = config('CURRENCY_API_READ_TIMEOUT', default=30, cast=float)
+CURRENCY_API_MAX_RETRIES = config('CURRENCY_API_MAX_RETRIES', default=4, cast=int)
+CURRENCY_API_BACKOFF = config('CURRENCY_API_BACKOFF', default=0.5, cast=float)
+# Longest wait before a retry, capping the exponential backoff and the upstream's Retry-After header
+CURRENCY_API_MAX_BACKOFF = config('CURRENCY_API_MAX_BACKOFF', default=30, cast=float)
+CURRENCY_API_RATE_LIMIT = config('CURRENCY_API_RATE_LIMIT', default=10, cast=float)
+CURRENCY_API_BURST = config('CURRENCY_API_BURST', default=10, cast=int)
+CURRENCY_API_POOL_SIZE = config('CURRENCY_API_POOL_SIZE', default=16, cast=int)
+# Concurrent upstream connections of the async client used by the views served over ASGI, further
+# calls wait for a free one; the pool bookkeeping of httpx grows with connections x waiting calls
+CURRENCY_API_ASYNC_MAX_CONNECTIONS = config('CURRENCY_API_ASYNC_MAX_CONNECTIONS', default=64, cast=int)
+
+# Single-flight upstream fetches (see services.single_flight), in seconds: the lock of a running fetch expires
+# after the timeout, a fetched result answers the other processes for its TTL, waiters poll at the interval
+SINGLE_FLIGHT_LOCK_TIMEOUT = config('SINGLE_FLIGHT_LOCK_TIMEOUT', default=120, cast=float)
+SINGLE_FLIGHT_RESULT_TTL = config('SINGLE_FLIGHT_RESULT_TTL', default=60, cast=float)
+SINGLE_FLIGHT_POLL_INTERVAL = config('SINGLE_FLIGHT_POLL_INTERVAL', default=0.05, cast=float)
+
+# Background rate fetches run by manage.py run_workers: the admin saves a rate it cannot derive as pending and
+# queues its fetch instead of calling currencyapi during the request. Delays are in seconds, a failed fetch
+# is retried after RATE_JOB_RETRY_DELAY doubled per attempt and a claimed job is leased for RATE_JOB_LEASE
+ADMIN_QUEUE_RATE_FETCHES = config('ADMIN_QUEUE_RATE_FETCHES', default=True, cast=bool)
+RATE_JOB_BATCH_SIZE = config('RATE_JOB_BATCH_SIZE', default=50, cast=int)
+RATE_JOB_MAX_ATTEMPTS = config('RATE_JOB_MAX_ATTEMPTS', default=5, cast=int)
+RATE_JOB_RETRY_DELAY = config('RATE_JOB_RETRY_DELAY', default=30, cast=float)
+RATE_JOB_LEASE = config('RATE_JOB_LEASE', default=300, cast=float)
+RATE_JOB_POLL_INTERVAL = config('RATE_JOB_POLL_INTERVAL', default=1.0, cast=float)
+
+# Cross rates are derived from the rates of a single pivot currency per day
+CROSS_RATE_PIVOT = config('CROSS_RATE_PIVOT', default='USD')
+CROSS_RATE_CACHE_SIZE = config('CROSS_RATE_CACHE_SIZE', default=64, cast=int)
+
+# Maximum number of items accepted by a single /convert/ request
+CONVERT_MAX_ITEMS = config('CONVERT_MAX_ITEMS', default=10000, cast=int)
+# Maximum number of upstream calls a /convert/ request with fetch_missing may make
+CONVERT_MAX_UPSTREAM_CALLS = config('CONVERT_MAX_UPSTREAM_CALLS', default=10, cast=int)
+
+# Rate exports: rows fetched per database round trip and bytes per streamed chunk
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+EXPORT_BUFFER_SIZE = config('EXPORT_BUFFER_SIZE', default=65536, cast=int)
+
+# Directory of the memory-mapped columnar rate snapshot built by build_rate_snapshot, next to the
+# other generated files in the ignored logs directory
+RATE_SNAPSHOT_DIR = config('RATE_SNAPSHOT_DIR',
+                           default=str(BASE_DIR / 'currencies_exchange' / 'logs' / 'rate_snapshot'))
+
+# Request, query and upstream metrics served on /metrics and in the Server-Timing header
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+
+# Opt-in profiling: requests from the allowed IPs carrying an X-Profile header or a profile
+# query parameter, plus a random share of all requests, are profiled into PROFILING_DIR
+PROFILING_ALLOWED_IPS = config('PROFILING_ALLOWED_IPS', default='', cast=Csv())
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=0.0, cast=float)
+PROFILING_DIR = config('PROFILING_DIR', default=str(BASE_DIR / 'currencies_exchange' / 'logs' / 'profiles'))
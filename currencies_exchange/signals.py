@@ -0,0 +1,41 @@
+from django.dispatch import receiver
+from .database import configure_connection
+from .metrics import install_query_tracker
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from .models import CatalogVersion, Currency, CurrencyRate
+
+
+@receiver(post_save, sender=Currency)
+@receiver(post_delete, sender=Currency)
+def bump_currency_catalog(sender, **kwargs):
+    """
+    Bumps the currency catalog version whenever a Currency row is saved or deleted.
+
+    Bulk writes do not send these signals and bump the version themselves.
+    """
+    CatalogVersion.bump(CatalogVersion.CURRENCY)
+
+
+@receiver(post_save, sender=CurrencyRate)
+@receiver(post_delete, sender=CurrencyRate)
+def bump_rate_catalog(sender, created=False, **kwargs):
+    """
+    Bumps the rate catalog version whenever a CurrencyRate row is saved or deleted, and
+    the rate edit catalog version when an existing row is changed or deleted.
+
+    Bulk writes do not send these signals and bump the version themselves.
+    """
+    CatalogVersion.bump(CatalogVersion.RATE)
+    if not created:
+        CatalogVersion.bump(CatalogVersion.RATE_EDIT)
+
+
+@receiver(connection_created)
+def tune_connection(sender, connection, **kwargs):
+    """
+    Applies the SQLite pragmas of the database profile to every new connection and
+    installs the query tracker of the request metrics.
+    """
+    configure_connection(sender, connection, **kwargs)
+    install_query_tracker(sender, connection, **kwargs)
@@ -0,0 +1 @@
+from .server import LatencyModel, StandinServer, currency_codes, start_server, usd_value
@@ -0,0 +1,333 @@
+import json
+import math
+import time
+import zlib
+import random
+import threading
+from itertools import product
+from string import ascii_uppercase
+from datetime import date, datetime
+from urllib.parse import parse_qs, urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+API_PREFIX = '/v3'
+MIN_HISTORY_DATE = date(2010, 6, 1)
+LATENCY_DISTRIBUTIONS = ('none', 'fixed', 'uniform', 'lognormal')
+
+
+def currency_codes(count):
+    """
+    Returns deterministic three letter currency codes, USD always being the first one.
+    """
+    codes = ['USD']
+    for letters in product(ascii_uppercase, repeat=3):
+        if len(codes) >= count:
+            break
+        code = ''.join(letters)
+        if code != 'USD':
+            codes.append(code)
+    return codes
+
+
+def usd_value(code, history_date, seed=0):
+    """
+    Returns the synthetic value of one US Dollar in a currency on a date.
+
+    Every currency gets a base value between 0.01 and 1000 derived from a checksum of its
+    code and the seed, which then drifts by up to 5% on a yearly cycle, so the same
+    arguments always return the same value.
+
+    Args:
+        code (str): The currency code.
+        history_date (date): The date of the value.
+        seed (int): The seed mixed into the checksum.
+
+    Returns:
+        float: The value, exactly 1.0 for USD.
+    """
+    if code == 'USD':
+        return 1.0
+    checksum = zlib.crc32(f'{seed}:{code}'.encode())
+    base = 10 ** ((checksum % 50000) / 10000 - 2)
+    phase = (checksum >> 16) / 65536 * 2 * math.pi
+    return base * (1 + 0.05 * math.sin(history_date.toordinal() / 365.25 * 2 * math.pi + phase))
+
+
+class LatencyModel:
+    """
+    Seeded generator of the artificial latency added to every response.
+
+    Attributes:
+        distribution (str): One of 'none', 'fixed', 'uniform' or 'lognormal'.
+        params (tuple): The distribution parameters in milliseconds: the delay for 'fixed',
+            the minimum and maximum for 'uniform', the median and sigma for 'lognormal'.
+
+    Methods:
+        parse(spec, seed): Creates the model from a 'name:param:param' specification.
+        sample(): Returns the next delay in seconds.
+    """
+
+    def __init__(self, distribution='none', params=(), seed=0):
+        if distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f'Unknown latency distribution "{distribution}"')
+        self.distribution = distribution
+        self.params = tuple(params)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def parse(cls, spec, seed=0):
+        """
+        Creates the model from a specification such as 'fixed:50', 'uniform:10:200' or 'lognormal:80:0.6'.
+
+        Raises:
+            ValueError: If the specification is invalid.
+        """
+        name, *params = (spec or 'none').split(':')
+        expected = {'none': 0, 'fixed': 1, 'uniform': 2, 'lognormal': 2}.get(name)
+        if expected is None or len(params) != expected:
+            raise ValueError(f'Invalid latency specification "{spec}"')
+        return cls(name, [float(param) for param in params], seed)
+
+    def sample(self):
+        """
+        Returns the next delay in seconds.
+        """
+        with self._lock:
+            if self.distribution == 'fixed':
+                milliseconds = self.params[0]
+            elif self.distribution == 'uniform':
+                milliseconds = self._random.uniform(*self.params)
+            elif self.distribution == 'lognormal':
+                milliseconds = self._random.lognormvariate(math.log(self.params[0]), self.params[1])
+            else:
+                milliseconds = 0.0
+        return max(milliseconds, 0.0) / 1000
+
+
+class StandinServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the currencyapi.com v3 API with latency, quota and failure injection.
+
+    Serves /v3/currencies and /v3/historical with deterministic synthetic data in the
+    upstream response format. Every request first waits for a delay drawn from the
+    latency model, then is checked against the total quota and the per second rate limit
+    (both answered with 429 and a Retry-After header like the real API), then may fail
+    with one of the injected error statuses. GET /stats returns the request counters.
+
+    Attributes:
+        currencies (list): The served currency codes, USD first.
+        api_key (str or None): The required apikey parameter, any key is accepted when None.
+        latency (LatencyModel): The model of the added latency.
+        rate_limit (float): The allowed requests per second, 0 disables limiting.
+        burst (int): The number of requests allowed at once by the rate limit.
+        quota (int): The total number of served data requests, 0 disables the quota.
+        error_rate (float): The share of requests failing with an injected error status.
+        error_statuses (tuple): The injected error statuses, picked at random.
+        seed (int): The seed of the synthetic rates and of the error injection.
+        counters (dict): The number of requests per outcome.
+
+    Methods:
+        url: The base URL to use as CURRENCY_API_BASE_URL.
+        admit(): Applies the quota, rate limit and error injection to a request.
+        currencies_data(codes): Returns the body of a currencies response.
+        historical_data(base_code, codes, history_date): Returns the body of a historical response.
+
+    Example:
+        To serve the API on a random port in a background thread:
+        server = start_server(latency='lognormal:80:0.5', rate_limit=10, error_rate=0.02)
+    """
+
+    daemon_threads = True
+    # The socketserver default backlog of 5 drops connections of concurrent clients,
+    # which then wait for SYN retransmits of a second and more
+    request_queue_size = 1024
+
+    def __init__(self, address=('127.0.0.1', 0), currencies=170, api_key=None, latency=None, rate_limit=0,
+                 burst=10, quota=0, error_rate=0.0, error_statuses=(500, 503), seed=0):
+        super().__init__(address, StandinHandler)
+        self.currencies = currency_codes(currencies)
+        self.api_key = api_key
+        self.latency = latency or LatencyModel(seed=seed)
+        self.rate_limit = rate_limit
+        self.burst = max(burst, 1)
+        self.quota = quota
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.seed = seed
+        self.counters = {'requests': 0, 'served': 0, 'rate_limited': 0, 'quota_exceeded': 0,
+                         'injected_errors': 0, 'invalid': 0}
+        self._random = random.Random(seed)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        """
+        Returns the base URL to use as CURRENCY_API_BASE_URL.
+        """
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}{API_PREFIX}'
+
+    def count(self, outcome):
+        """
+        Increments the counter of an outcome.
+        """
+        with self._lock:
+            self.counters[outcome] += 1
+
+    def admit(self):
+        """
+        Applies the quota, rate limit and error injection to a request.
+
+        Returns:
+            tuple or None: The status, message and headers of the rejection, None when admitted.
+        """
+        with self._lock:
+            self.counters['requests'] += 1
+            if self.quota and self.counters['served'] >= self.quota:
+                self.counters['quota_exceeded'] += 1
+                return 429, 'You have used all your requests', {'Retry-After': '60'}
+
+            if self.rate_limit > 0:
+                current = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (current - self._updated) * self.rate_limit)
+                self._updated = current
+                if self._tokens < 1:
+                    self.counters['rate_limited'] += 1
+                    retry_after = (1 - self._tokens) / self.rate_limit
+                    return 429, 'API rate limit exceeded', {'Retry-After': f'{retry_after:.3f}'}
+                self._tokens -= 1
+
+            if self.error_statuses and self._random.random() < self.error_rate:
+                self.counters['injected_errors'] += 1
+                return self._random.choice(self.error_statuses), 'Injected failure', {}
+            self.counters['served'] += 1
+        return None
+
+    def currencies_data(self, codes=None):
+        """
+        Returns the body of a currencies response.
+
+        Args:
+            codes (list or None): The requested codes, all served currencies when None.
+        """
+        return {'data': {
+            code: {'symbol': code[0], 'name': f'Currency {code}', 'symbol_native': code[0],
+                   'decimal_digits': 2, 'rounding': 0, 'code': code, 'name_plural': f'Currency {code}s'}
+            for code in self.currencies if codes is None or code in codes
+        }}
+
+    def historical_data(self, base_code, codes, history_date):
+        """
+        Returns the body of a historical response.
+
+        Args:
+            base_code (str): The base currency code.
+            codes (list or None): The requested codes, all served currencies when None.
+            history_date (date): The date of the rates.
+        """
+        base_value = usd_value(base_code, history_date, self.seed)
+        return {
+            'meta': {'last_updated_at': f'{history_date.isoformat()}T23:59:59Z'},
+            'data': {
+                code: {'code': code, 'value': usd_value(code, history_date, self.seed) / base_value}
+                for code in self.currencies if codes is None or code in codes
+            },
+        }
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """
+    Request handler of the stand-in server.
+
+    Methods:
+        do_GET(): Routes a request to the stats, currencies or historical endpoint.
+        send_json(status, body, headers): Writes a JSON response.
+        validation_error(errors): Writes a 422 response in the upstream format.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately, Nagle's algorithm would hold the body back
+    # until the client acknowledges the headers, i.e. ~40 ms on every keep-alive request
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        """
+        Silences the per request log lines.
+        """
+
+    def send_json(self, status, body, headers=None):
+        """
+        Writes a JSON response.
+        """
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def validation_error(self, errors):
+        """
+        Writes a 422 response in the upstream format.
+        """
+        self.server.count('invalid')
+        self.send_json(422, {'message': 'Validation error', 'errors': errors})
+
+    def do_GET(self):
+        """
+        Routes a request to the stats, currencies or historical endpoint.
+        """
+        server = self.server
+        url = urlsplit(self.path)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        if url.path == '/stats':
+            with server._lock:
+                return self.send_json(200, dict(server.counters))
+        if url.path not in (f'{API_PREFIX}/currencies', f'{API_PREFIX}/historical'):
+            return self.send_json(404, {'message': 'Not found'})
+
+        time.sleep(server.latency.sample())
+        if server.api_key is not None and query.get('apikey') != server.api_key:
+            return self.send_json(401, {'message': 'Invalid authentication credentials'})
+        rejection = server.admit()
+        if rejection:
+            status, message, headers = rejection
+            return self.send_json(status, {'message': message}, headers)
+
+        codes = query['currencies'].split(',') if query.get('currencies') else None
+        if url.path.endswith('/currencies'):
+            return self.send_json(200, server.currencies_data(codes))
+
+        base_code = query.get('base_currency', 'USD')
+        if base_code not in server.currencies:
+            return self.validation_error({'base_currency': ['The selected base currency is invalid.']})
+        try:
+            history_date = datetime.strptime(query.get('date', ''), '%Y-%m-%d').date()
+        except ValueError:
+            return self.validation_error({'date': ['The date does not match the format Y-m-d.']})
+        if not MIN_HISTORY_DATE <= history_date < date.today():
+            return self.validation_error({'date': ['The date must be between 2010-06-01 and yesterday.']})
+        self.send_json(200, server.historical_data(base_code, codes, history_date))
+
+
+def start_server(host='127.0.0.1', port=0, latency=None, **options):
+    """
+    Starts a stand-in server in a daemon thread.
+
+    Args:
+        host (str): The interface to listen on.
+        port (int): The port to listen on, a free one when 0.
+        latency (str or None): The latency specification, see LatencyModel.parse().
+        **options: The other StandinServer arguments.
+
+    Returns:
+        StandinServer: The running server, stop it with shutdown() and server_close().
+    """
+    server = StandinServer((host, port), latency=LatencyModel.parse(latency, options.get('seed', 0)), **options)
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    return server
@@ -0,0 +1,300 @@
+"""
+Non-blocking structured logging: JSON records, sampling of chatty loggers and rotation.
+
+Request threads only filter a record and put it on a bounded queue (QueueFileHandler);
+a background thread formats it as one JSON line (JSONFormatter) and writes it to a file
+rotated by time and size (SizeAndTimeRotatingFileHandler). SamplingFilter keeps a share
+of the records of chatty loggers such as ``django.db.backends`` and caps their rate,
+warnings and errors always pass. When the queue is full records are dropped instead of blocking
+the request, and the number of dropped records is attached to the next queued one.
+
+The module only depends on the standard library and orjson, so that it can be referenced
+from settings.LOGGING.
+"""
+
+import os
+import re
+import time
+import queue
+import random
+import atexit
+import logging
+import threading
+import orjson
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+
+RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+# Sequence number ending the names of rotated files
+SEQUENCE_PATTERN = re.compile(r'\.\d{6,}$')
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Formats records as single line JSON objects.
+
+    Every object holds the UTC timestamp, level, logger, message, source location, thread
+    and process, the formatted exception if any, and every extra attribute passed with
+    ``extra=`` (values orjson cannot encode are converted with str()).
+
+    Methods:
+        format(record): Returns the JSON line of a record.
+    """
+
+    def format(self, record):
+        """
+        Returns the JSON line of a record, without the trailing newline.
+        """
+        data = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'function': record.funcName,
+            'line': record.lineno,
+            'thread': record.threadName,
+            'process': record.process,
+        }
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data['exception'] = record.exc_text
+        for name, value in vars(record).items():
+            if name not in RECORD_ATTRIBUTES and name not in data:
+                data[name] = value
+        return orjson.dumps(data, default=str).decode()
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a sampled share of the records of chatty loggers and caps their rate.
+
+    Rules apply to a logger and its children, the most specific rule wins. Records at or
+    above ``always_level`` always pass. The number of records dropped since the last
+    passing record of the same rule is attached to it as ``sampled_out``.
+
+    Attributes:
+        rules (dict): A mapping of logger name to a dict with the share of records kept
+            ('sample_rate', 1 keeps all) and the maximum records per second ('rate_limit',
+            0 disables it).
+        always_level (int): The level from which records are never dropped.
+
+    Methods:
+        rule(name): Returns the rule name applying to a logger, None when none does.
+        filter(record): Returns whether the record is kept.
+
+    Example:
+        SamplingFilter(rules={'django.db.backends': {'sample_rate': 0.01, 'rate_limit': 50}})
+    """
+
+    def __init__(self, rules=None, always_level=logging.WARNING, seed=None):
+        super().__init__()
+        self.rules = rules or {}
+        self.always_level = logging._checkLevel(always_level)
+        self._random = random.Random(seed)
+        self._rule_names = {}
+        self._buckets = {name: [float(rule.get('rate_limit') or 0), time.monotonic()]
+                         for name, rule in self.rules.items()}
+        self._dropped = dict.fromkeys(self.rules, 0)
+        self._lock = threading.Lock()
+
+    def rule(self, name):
+        """
+        Returns the name of the most specific rule applying to a logger, None when none does.
+        """
+        try:
+            return self._rule_names[name]
+        except KeyError:
+            pass
+        match = None
+        for rule_name in self.rules:
+            if (name == rule_name or name.startswith(rule_name + '.')) and len(rule_name) > len(match or ''):
+                match = rule_name
+        self._rule_names[name] = match
+        return match
+
+    def filter(self, record):
+        """
+        Returns whether the record is kept.
+        """
+        if record.levelno >= self.always_level:
+            return True
+        name = self.rule(record.name)
+        if name is None:
+            return True
+        rule = self.rules[name]
+        with self._lock:
+            keep = self._random.random() < rule.get('sample_rate', 1.0)
+            rate_limit = rule.get('rate_limit') or 0
+            if keep and rate_limit > 0:
+                bucket = self._buckets[name]
+                current = time.monotonic()
+                bucket[0] = min(rate_limit, bucket[0] + (current - bucket[1]) * rate_limit)
+                bucket[1] = current
+                keep = bucket[0] >= 1
+                if keep:
+                    bucket[0] -= 1
+            if not keep:
+                self._dropped[name] += 1
+                return False
+            if self._dropped[name]:
+                record.sampled_out = self._dropped[name]
+                self._dropped[name] = 0
+        return True
+
+
+class SizeAndTimeRotatingFileHandler(TimedRotatingFileHandler):
+    """
+    File handler rotating the file on a time schedule and whenever it reaches a size.
+
+    Rotated files are suffixed with the date of their period and a sequence number above
+    the ones of the period, e.g. ``app.log.2023-01-02.000003``, so that their names sort
+    in rotation order. Only the ``backup_count`` newest rotated files are kept.
+
+    Attributes:
+        max_bytes (int): The size that triggers a rotation before the next record, 0 disables it.
+
+    Methods:
+        shouldRollover(record): Returns whether the file is rotated before the record.
+        unique_name(name): Returns the rotated file name, suffixed with the next sequence number.
+        getFilesToDelete(): Returns the rotated files older than the backup_count newest ones.
+    """
+
+    def __init__(self, filename, when='midnight', interval=1, backup_count=14, max_bytes=50 * 1024 * 1024,
+                 encoding='utf-8'):
+        super().__init__(filename, when=when, interval=interval, backupCount=backup_count, encoding=encoding,
+                         delay=True, utc=True)
+        self.max_bytes = max_bytes
+        self.namer = self.unique_name
+
+    def shouldRollover(self, record):
+        """
+        Returns whether the file is rotated before writing the record.
+        """
+        if super().shouldRollover(record):
+            return True
+        return self.max_bytes > 0 and self.stream is not None and self.stream.tell() >= self.max_bytes
+
+    @staticmethod
+    def unique_name(name):
+        """
+        Returns the rotated file name suffixed with the sequence number following the ones of its period.
+        """
+        directory, prefix = os.path.split(name)
+        numbers = [int(file_name[len(prefix) + 1:]) for file_name in os.listdir(directory or '.')
+                   if file_name.startswith(prefix) and SEQUENCE_PATTERN.match(file_name[len(prefix):])]
+        return f'{name}.{max(numbers, default=0) + 1:06d}'
+
+    def getFilesToDelete(self):
+        """
+        Returns the rotated files older than the backup_count newest ones.
+
+        The stdlib version matches the rotated names against the date suffix only, which
+        the sequence numbers do not fit, and sorts them by name. Here the rotated files are
+        the ones named by unique_name(), whose names sort in rotation order.
+        """
+        directory, base = os.path.split(self.baseFilename)
+        prefix = base + '.'
+        rotated = sorted(file_name for file_name in os.listdir(directory)
+                         if file_name.startswith(prefix) and SEQUENCE_PATTERN.search(file_name))
+        return [os.path.join(directory, file_name) for file_name in rotated[:max(len(rotated) - self.backupCount, 0)]]
+
+
+class WriterThread(QueueListener):
+    """
+    Queue listener whose stop signal waits for room in a full queue instead of failing.
+
+    Methods:
+        running: Whether the thread is started.
+        enqueue_sentinel(): Queues the stop signal behind the pending records.
+    """
+
+    @property
+    def running(self):
+        """
+        Returns whether the thread is started.
+        """
+        return self._thread is not None
+
+    def enqueue_sentinel(self):
+        """
+        Queues the stop signal behind the pending records.
+        """
+        self.queue.put(self._sentinel)
+
+
+class QueueFileHandler(QueueHandler):
+    """
+    Handler queueing records for a background thread writing them to a rotated file.
+
+    The calling thread only runs the filters, resolves the message and enqueues the record.
+    The writer thread formats it with the formatter of this handler and writes it with a
+    SizeAndTimeRotatingFileHandler. The queue is drained when the handler is closed, which
+    logging does at interpreter exit.
+
+    Attributes:
+        target (SizeAndTimeRotatingFileHandler): The handler writing the records, on the writer thread.
+        listener (WriterThread): The writer thread.
+        dropped (int): The number of records dropped because the queue was full.
+
+    Methods:
+        prepare(record): Returns a copy of the record safe to format later.
+        enqueue(record): Queues the record, dropping it when the queue is full.
+        setFormatter(fmt): Sets the formatter used by the writer thread.
+        close(): Drains the queue and closes the file.
+
+    Example:
+        QueueFileHandler('logs/app.log', max_bytes=10 * 1024 * 1024, backup_count=7)
+    """
+
+    def __init__(self, filename, when='midnight', interval=1, backup_count=14, max_bytes=50 * 1024 * 1024,
+                 queue_size=10000):
+        os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+        super().__init__(queue.Queue(queue_size))
+        self.target = SizeAndTimeRotatingFileHandler(filename, when, interval, backup_count, max_bytes)
+        self.dropped = 0
+        self.listener = WriterThread(self.queue, self.target)
+        self.listener.start()
+        self._closed = False
+        atexit.register(self.close)
+
+    def setFormatter(self, fmt):
+        """
+        Sets the formatter used by the writer thread, records are queued unformatted.
+        """
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        """
+        Returns a copy of the record with its message resolved, the arguments may change later.
+        """
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        """
+        Queues the record without blocking, dropping it when the queue is full.
+        """
+        dropped = self.dropped
+        if dropped:
+            record.dropped_records = dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+        else:
+            self.dropped -= dropped
+
+    def close(self):
+        """
+        Drains the queue and closes the file.
+        """
+        if not self._closed:
+            self._closed = True
+            if self.listener.running:
+                self.listener.stop()
+            self.target.close()
+        super().close()
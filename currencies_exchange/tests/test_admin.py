@@ -0,0 +1,95 @@
+from datetime import date
+from django.urls import reverse
+from django.test import TestCase
+from django.db import connection
+from django.core.cache import cache
+from django.contrib.auth.models import User
+from django.test.utils import CaptureQueriesContext
+from currencies_exchange.models import Currency, CurrencyRate
+from currencies_exchange.pagination import EstimatedCountPaginator
+from currencies_exchange.services import rate_currency_codes
+
+
+class CurrencyRateAdminTest(TestCase):
+    """
+    Test case for the cached list filter lookups and the estimated count of the rate changelist.
+
+    Methods:
+        setUp(): Set up rates and a logged in superuser.
+        changelist(**params): Load the rate changelist and return its response and queries.
+        test_lookups_cached_until_rate_write(): Test that the filter codes are cached until a rate write.
+        test_changelist_skips_full_scans(): Test that the changelist neither counts, scans distinct codes nor
+            joins the fetch jobs.
+        test_estimated_count(): Test the estimated and exact counts of the paginator.
+
+    Example:
+        To run the tests:
+        python manage.py test currencies_exchange.tests.test_admin
+    """
+
+    def setUp(self):
+        """
+        Set up rates and a logged in superuser.
+        """
+        cache.clear()
+        self.usd, self.eur, self.pln = (
+            Currency.objects.create(currency_name=name, currency_symbol=code, currency_code=code)
+            for code, name in (('USD', 'US Dollar'), ('EUR', 'Euro'), ('PLN', 'Polish Zloty')))
+        CurrencyRate.objects.bulk_create([
+            CurrencyRate(currency_base=self.usd, currency_target=self.eur, rate=0.9, history_date=date(2023, 1, 2)),
+            CurrencyRate(currency_base=self.usd, currency_target=self.pln, rate=4.2, history_date=date(2023, 1, 2)),
+        ])
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(user)
+
+    def changelist(self, **params):
+        """
+        Loads the rate changelist and returns its response and the queries it ran.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin:currencies_exchange_currencyrate_changelist'), params)
+        self.assertEqual(response.status_code, 200)
+        return response, [query['sql'] for query in queries]
+
+    def test_lookups_cached_until_rate_write(self):
+        """
+        Test that the filter codes are cached until a rate is written.
+        """
+        self.assertEqual(rate_currency_codes('currency_base'), ['USD'])
+        self.assertEqual(rate_currency_codes('currency_target'), ['EUR', 'PLN'])
+        with self.assertNumQueries(1):
+            self.assertEqual(rate_currency_codes('currency_target'), ['EUR', 'PLN'])
+
+        CurrencyRate.objects.create(currency_base=self.eur, currency_target=self.usd, rate=1.1,
+                                    history_date=date(2023, 1, 2))
+        self.assertEqual(rate_currency_codes('currency_base'), ['EUR', 'USD'])
+        self.assertEqual(rate_currency_codes('currency_target'), ['EUR', 'PLN', 'USD'])
+
+    def test_changelist_skips_full_scans(self):
+        """
+        Test that a warm changelist neither counts the whole table, scans it for distinct codes nor reads the
+        fetch jobs of a page without pending rates.
+        """
+        self.changelist()
+        response, queries = self.changelist()
+        self.assertFalse([sql for sql in queries if 'ratefetchjob' in sql.lower()])
+
+        self.assertContains(response, '2 Historical Rates')
+        self.assertContains(response, '?currency_target_code=PLN')
+        self.assertFalse([sql for sql in queries if 'COUNT(' in sql.upper() or 'DISTINCT' in sql.upper()])
+
+        response, queries = self.changelist(currency_target_code='PLN')
+        self.assertContains(response, '1 currency rate')
+        self.assertEqual(len([sql for sql in queries if 'COUNT(' in sql.upper()]), 1)
+
+    def test_estimated_count(self):
+        """
+        Test that unfiltered querysets are estimated from the highest ID and filtered ones counted.
+        """
+        CurrencyRate.objects.filter(currency_target=self.eur).delete()
+        highest = CurrencyRate.objects.latest('id').id
+
+        self.assertEqual(EstimatedCountPaginator(CurrencyRate.with_pending.order_by('id'), 10).count, highest)
+        self.assertEqual(EstimatedCountPaginator(CurrencyRate.objects.filter(rate__gt=1).order_by('id'), 10).count, 1)
+        self.assertEqual(EstimatedCountPaginator(CurrencyRate.objects.none(), 10).count, 0)
+        self.assertEqual(EstimatedCountPaginator([1, 2, 3], 10).count, 3)
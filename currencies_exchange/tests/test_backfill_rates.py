@@ -0,0 +1,75 @@
+from io import StringIO
+from datetime import date
+from unittest import mock
+from django.test import TestCase
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from currencies_exchange.models import Currency, CurrencyRate
+
+
+class BackfillRatesCommandTest(TestCase):
+    """
+    Test case for the backfill_rates management command.
+
+    Methods:
+        setUp(): Set up the currencies used by the tests.
+        test_backfill_groups_targets_per_call(): Test that one call is made per base and date.
+        test_backfill_skips_existing_rates(): Test that stored rates are not fetched again.
+        test_backfill_rejects_unknown_codes(): Test that unknown currency codes are reported.
+
+    Example:
+        To run the tests:
+        python manage.py test currencies_exchange.tests.test_backfill_rates
+    """
+
+    def setUp(self):
+        """
+        Set up the currencies used by the tests.
+        """
+        self.usd = Currency.objects.create(currency_name='US Dollar', currency_symbol='$', currency_code='USD')
+        self.eur = Currency.objects.create(currency_name='Euro', currency_symbol='€', currency_code='EUR')
+        self.pln = Currency.objects.create(currency_name='Polish Zloty', currency_symbol='zł', currency_code='PLN')
+
+    def fake_fetch(self, base_code, target_codes, history_date):
+        """
+        Returns deterministic rates in place of the external API.
+        """
+        return {code: 1.0 + index + history_date.day / 100 for index, code in enumerate(target_codes)}
+
+    def test_backfill_groups_targets_per_call(self):
+        """
+        Test that all targets of a base currency and date are fetched in one call.
+        """
+        out = StringIO()
+        with mock.patch('currencies_exchange.services.currency_api_client.CurrencyAPIClient.historical',
+                        side_effect=self.fake_fetch) as fetch:
+            call_command('backfill_rates', '--base', 'USD', '--target', 'EUR', 'PLN',
+                         '--start', '2023-01-01', '--end', '2023-01-03', '--concurrency', '2', stdout=out)
+
+        self.assertEqual(fetch.call_count, 3)
+        self.assertEqual(CurrencyRate.objects.count(), 6)
+        self.assertIn('rows/s', out.getvalue())
+        self.assertIn('calls/s', out.getvalue())
+
+    def test_backfill_skips_existing_rates(self):
+        """
+        Test that rates already stored in the database are not fetched again.
+        """
+        CurrencyRate.objects.bulk_create([
+            CurrencyRate(currency_base=self.usd, currency_target=target, rate=1.5, history_date=date(2023, 1, 1))
+            for target in (self.eur, self.pln)
+        ])
+        with mock.patch('currencies_exchange.services.currency_api_client.CurrencyAPIClient.historical',
+                        side_effect=self.fake_fetch) as fetch:
+            call_command('backfill_rates', '--base', 'USD', '--target', 'EUR', 'PLN',
+                         '--start', '2023-01-01', '--end', '2023-01-02', stdout=StringIO())
+
+        fetch.assert_called_once_with('USD', ['EUR', 'PLN'], date(2023, 1, 2))
+        self.assertEqual(CurrencyRate.objects.count(), 4)
+
+    def test_backfill_rejects_unknown_codes(self):
+        """
+        Test that unknown currency codes raise a CommandError.
+        """
+        with self.assertRaises(CommandError):
+            call_command('backfill_rates', '--base', 'XXX', '--start', '2023-01-01', '--end', '2023-01-02')
@@ -0,0 +1,47 @@
+from django.test import SimpleTestCase
+from currencies_exchange.benchmarks import support
+from currencies_exchange.benchmarks.suite import compare
+
+
+class BenchmarkSuiteTest(SimpleTestCase):
+    """
+    Test case for the regression check of the benchmark suite.
+
+    Methods:
+        stats(p50_ms): Return timings with the given median.
+        test_compare(): Test that only slowdowns beyond the threshold and the noise floor are reported.
+        test_summarize(): Test the timing summary.
+
+    Example:
+        To run the tests:
+        python manage.py test currencies_exchange.tests.test_benchmark_suite
+    """
+
+    def stats(self, p50_ms):
+        """
+        Returns timings with the given median.
+        """
+        return support.summarize([p50_ms])
+
+    def test_compare(self):
+        """
+        Test that only slowdowns beyond the threshold and the noise floor are reported.
+        """
+        baseline = {'list': self.stats(10.0), 'lookup': self.stats(0.1), 'ingest': self.stats(100.0),
+                    'removed': self.stats(1.0)}
+        results = {'list': self.stats(13.0), 'lookup': self.stats(0.2), 'ingest': self.stats(120.0),
+                   'added': self.stats(1.0)}
+
+        (name, before, after, change), = compare(results, baseline, 0.25, 0.2)
+        self.assertEqual((name, before, after), ('list', 10.0, 13.0))
+        self.assertAlmostEqual(change, 0.3)
+        self.assertEqual(sorted(name for name, *_ in compare(results, baseline, 0.1, 0.05)),
+                         ['ingest', 'list', 'lookup'])
+        self.assertEqual(compare(results, baseline, 0.5, 0.2), [])
+
+    def test_summarize(self):
+        """
+        Test that the summary holds the count, mean, median, 95th percentile and maximum.
+        """
+        self.assertEqual(support.summarize([3.0, 1.0, 2.0]),
+                         {'repeat': 3, 'mean_ms': 2.0, 'p50_ms': 2.0, 'p95_ms': 3.0, 'max_ms': 3.0})
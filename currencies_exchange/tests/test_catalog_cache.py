@@ -0,0 +1,69 @@
+from django.urls import reverse
+from django.test import TestCase
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from rest_framework.views import status
+from currencies_exchange.models import CatalogVersion, Currency
+
+
+class CatalogCacheTest(TestCase):
+    """
+    Test case for the conditional GET and response caching of the /currency/ endpoint.
+
+    Methods:
+        setUp(): Set up currencies and an API client.
+        test_validators_and_not_modified(): Test that a matching ETag gets a 304.
+        test_cached_response_skips_queryset(): Test that a cached response only reads the version.
+        test_currency_change_invalidates(): Test that a currency change serves fresh data.
+
+    Example:
+        To run the tests:
+        python manage.py test currencies_exchange.tests.test_catalog_cache
+    """
+
+    def setUp(self):
+        """
+        Set up currencies and an API client.
+        """
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse('currency-api')
+        Currency.objects.create(currency_name='US Dollar', currency_symbol='$', currency_code='USD')
+        Currency.objects.create(currency_name='Euro', currency_symbol='€', currency_code='EUR')
+
+    def test_validators_and_not_modified(self):
+        """
+        Test that responses carry validators and a matching ETag gets a 304.
+        """
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Last-Modified', response)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+    def test_cached_response_skips_queryset(self):
+        """
+        Test that a cached response only costs the catalog version query.
+        """
+        first = self.client.get(self.url, {'search': 'euro'})
+        with self.assertNumQueries(1):
+            second = self.client.get(self.url, {'search': 'euro'})
+
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(len(second.json()['results']), 1)
+        self.assertEqual(len(self.client.get(self.url).json()['results']), 2)
+
+    def test_currency_change_invalidates(self):
+        """
+        Test that a currency change bumps the version and serves fresh data.
+        """
+        etag = self.client.get(self.url)['ETag']
+        version = CatalogVersion.current(CatalogVersion.CURRENCY)[0]
+        Currency.objects.create(currency_name='Polish Zloty', currency_symbol='zł', currency_code='PLN')
+
+        self.assertEqual(CatalogVersion.current(CatalogVersion.CURRENCY)[0], version + 1)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()['results']), 3)
@@ -0,0 +1,183 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+import numpy as np
+from io import StringIO
+from datetime import date, timedelta
+from django.test import TestCase
+from django.core.management import call_command
+from currencies_exchange.models import Currency, CurrencyRate
+from currencies_exchange.services import (build_columnar_snapshot, current_columnar_snapshot, get_columnar_snapshot,
+                                          pair_series, refresh_columnar_snapshot)
+from currencies_exchange.services.columnar_snapshot import snapshot_versions
+
+
+class ColumnarSnapshotTest(TestCase):
+    """
+    Test case for the memory-mapped columnar rate snapshot.
+
+    Methods:
+        setUp(): Set up currencies, rates and a snapshot directory.
+        add_rates(pairs, days, start): Store rates of the pairs over consecutive days.
+        test_lookups(): Test that rates are found without querying the database.
+        test_pair_series(): Test that the rates of a pair are returned in date order.
+        test_incremental_build(): Test that new rates are merged into a new version.
+        test_deleted_rates_rebuild(): Test that deleted rates cause a full rebuild.
+        test_edited_rate_rebuild(): Test that an edited rate causes a full rebuild.
+        test_concurrent_build(): Test that a build whose version name was taken meanwhile takes the next one.
+        test_pair_series_read_path(): Test that series come from the current snapshot, else from the database.
+        test_command(): Test that the command reports the build.
+
+    Example:
+        To run the tests:
+        python manage.py test currencies_exchange.tests.test_columnar_snapshot
+    """
+
+    def setUp(self):
+        """
+        Set up currencies, rates and a scratch snapshot directory.
+        """
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.usd, self.eur, self.pln = (
+            Currency.objects.create(currency_name=name, currency_symbol=code, currency_code=code)
+            for code, name in (('USD', 'US Dollar'), ('EUR', 'Euro'), ('PLN', 'Polish Zloty')))
+        self.pairs = [(self.usd, self.eur), (self.eur, self.pln), (self.usd, self.pln)]
+        self.add_rates(self.pairs, 5, date(2023, 1, 1))
+
+    def add_rates(self, pairs, days, start):
+        """
+        Stores rates of the pairs over consecutive days, the rate encoding the pair and the day.
+        """
+        CurrencyRate.objects.bulk_create([
+            CurrencyRate(currency_base=base, currency_target=target, history_date=start + timedelta(days=day),
+                         rate=base.pk * 100 + target.pk + (start + timedelta(days=day)).day / 100)
+            for day in range(days) for base, target in pairs
+        ])
+
+    def test_lookups(self):
+        """
+        Test that single and batch lookups find the stored rates without querying the database.
+        """
+        snapshot, read = build_columnar_snapshot(self.directory)
+        self.assertEqual((len(snapshot), read), (15, 15))
+        self.assertIsInstance(snapshot.rate, np.memmap)
+
+        with self.assertNumQueries(0):
+            loaded = get_columnar_snapshot(self.directory)
+            rate = loaded.lookup(self.eur.pk, self.pln.pk, date(2023, 1, 3))
+            rates = loaded.lookup_many([self.usd.pk, self.pln.pk, self.usd.pk], [self.eur.pk, self.usd.pk, self.pln.pk],
+                                       [date(2023, 1, 5), date(2023, 1, 5), date(2023, 2, 1)])
+        self.assertAlmostEqual(rate, self.eur.pk * 100 + self.pln.pk + 0.03)
+        self.assertAlmostEqual(rates[0], self.usd.pk * 100 + self.eur.pk + 0.05)
+        self.assertTrue(np.isnan(rates[1:]).all())
+        self.assertIs(get_columnar_snapshot(self.directory), loaded)
+
+    def test_pair_series(self):
+        """
+        Test that the rates of a pair are returned in date order.
+        """
+        snapshot, _ = build_columnar_snapshot(self.directory)
+        dates, rates = snapshot.pair(self.usd.pk, self.pln.pk)
+
+        self.assertEqual(dates.tolist(), [date(2023, 1, 1) + timedelta(days=day) for day in range(5)])
+        self.assertEqual(len(rates), 5)
+        self.assertEqual(len(snapshot.pair(self.pln.pk, self.usd.pk)[0]), 0)
+
+    def test_incremental_build(self):
+        """
+        Test that only new rates are read and merged into a new version, the old one staying readable.
+        """
+        first, _ = build_columnar_snapshot(self.directory)
+        self.assertEqual(build_columnar_snapshot(self.directory)[1], 0)
+
+        self.add_rates(self.pairs[:1], 3, date(2022, 12, 29))
+        second, read = build_columnar_snapshot(self.directory)
+        self.assertEqual((len(second), read), (18, 3))
+        self.assertNotEqual(second.path, first.path)
+        self.assertTrue(np.all(np.diff(second.key) > 0))
+        self.assertEqual(len(second.pair(self.usd.pk, self.eur.pk)[0]), 8)
+        self.assertEqual(get_columnar_snapshot(self.directory).path, second.path)
+        self.assertEqual(len(first.pair(self.usd.pk, self.eur.pk)[0]), 5)
+
+        third, _ = build_columnar_snapshot(self.directory, full=True)
+        self.assertEqual(sorted(os.listdir(self.directory)), ['CURRENT', 'v2', 'v3'])
+        np.testing.assert_array_equal(third.key, second.key)
+
+    def test_deleted_rates_rebuild(self):
+        """
+        Test that deleted rates cause a full rebuild.
+        """
+        build_columnar_snapshot(self.directory)
+        CurrencyRate.objects.filter(currency_base=self.eur).delete()
+
+        snapshot, read = build_columnar_snapshot(self.directory)
+        self.assertEqual((len(snapshot), read), (10, 10))
+        self.assertIsNone(snapshot.lookup(self.eur.pk, self.pln.pk, date(2023, 1, 3)))
+
+    def test_edited_rate_rebuild(self):
+        """
+        Test that a rate edited in place, which leaves the IDs and the count unchanged, causes a full rebuild.
+        """
+        build_columnar_snapshot(self.directory)
+        self.add_rates(self.pairs[:1], 1, date(2022, 12, 31))
+        self.assertEqual(build_columnar_snapshot(self.directory)[1], 1)
+
+        rate = CurrencyRate.objects.get(currency_base=self.eur, currency_target=self.pln, history_date=date(2023, 1, 3))
+        rate.rate = 9.5
+        rate.save()
+        snapshot, read = build_columnar_snapshot(self.directory)
+        self.assertEqual((len(snapshot), read), (16, 16))
+        self.assertEqual(snapshot.lookup(self.eur.pk, self.pln.pk, date(2023, 1, 3)), 9.5)
+        self.assertEqual(build_columnar_snapshot(self.directory)[1], 0)
+
+    def test_concurrent_build(self):
+        """
+        Test that a build whose version name was taken by a concurrent build meanwhile writes the next version.
+        """
+        first, _ = build_columnar_snapshot(self.directory)
+        self.add_rates(self.pairs[:1], 1, date(2022, 12, 31))
+        listings = [[]]
+        with mock.patch('currencies_exchange.services.columnar_snapshot.snapshot_versions',
+                        side_effect=lambda directory: listings.pop() if listings else snapshot_versions(directory)):
+            second, read = build_columnar_snapshot(self.directory)
+
+        self.assertEqual((os.path.basename(second.path), len(second), read), ('v2', 16, 1))
+        self.assertEqual(get_columnar_snapshot(self.directory).path, second.path)
+        self.assertEqual(len(first), 15)
+        self.assertEqual(sorted(os.listdir(self.directory)), ['CURRENT', 'v1', 'v2'])
+
+    def test_pair_series_read_path(self):
+        """
+        Test that series are sliced out of the current snapshot without reading rates, read from the database while
+        it is stale or missing, and that a refresh makes it current again.
+        """
+        self.assertIsNone(refresh_columnar_snapshot(self.directory))
+        dates, rates = pair_series(self.usd.pk, self.eur.pk, date(2023, 1, 2), date(2023, 1, 4), self.directory)
+        self.assertEqual(dates.tolist(), [date(2023, 1, 2), date(2023, 1, 3), date(2023, 1, 4)])
+
+        build_columnar_snapshot(self.directory)
+        with self.assertNumQueries(1):
+            dates, rates = pair_series(self.usd.pk, self.eur.pk, date(2023, 1, 2), date(2023, 1, 4), self.directory)
+        self.assertEqual(dates.tolist(), [date(2023, 1, 2), date(2023, 1, 3), date(2023, 1, 4)])
+        np.testing.assert_allclose(rates, self.usd.pk * 100 + self.eur.pk + np.array([0.02, 0.03, 0.04]))
+
+        CurrencyRate.objects.create(currency_base=self.usd, currency_target=self.eur, rate=7.5,
+                                    history_date=date(2023, 1, 6))
+        self.assertIsNone(current_columnar_snapshot(self.directory))
+        self.assertEqual(pair_series(self.usd.pk, self.eur.pk, date(2023, 1, 6), None, self.directory)[1].tolist(),
+                         [7.5])
+
+        self.assertEqual(len(refresh_columnar_snapshot(self.directory)), 16)
+        self.assertIsNotNone(current_columnar_snapshot(self.directory))
+        with self.assertNumQueries(1):
+            self.assertEqual(pair_series(self.usd.pk, self.eur.pk, None, None, self.directory)[1][-1], 7.5)
+
+    def test_command(self):
+        """
+        Test that the command builds the snapshot and reports it.
+        """
+        out = StringIO()
+        call_command('build_rate_snapshot', '--directory', self.directory, stdout=out)
+        self.assertIn('holds 15 rates, read 15', out.getvalue())
@@ -0,0 +1,108 @@
+from datetime import date
+from django.urls import reverse
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework.views import status
+from currencies_exchange.models import Currency, CurrencyRate
+
+
+class ConvertAPIViewTest(TestCase):
+    """
+    Test case for the batch conversion endpoint.
+
+    Methods:
+        setUp(): Set up USD based rates for a single day.
+        convert(items): Post a batch of items and return the results.
+        test_rate_sources(): Test direct, inverse and cross rate conversions.
+        test_item_errors(): Test that invalid items get an error without failing the batch.
+        test_large_batch_uses_grouped_query(): Test that a large batch costs a constant number of queries.
+        test_invalid_body(): Test that a malformed body is rejected.
+
+    Example:
+        To run the tests:
+        python manage.py test currencies_exchange.tests.test_convert
+    """
+
+    def setUp(self):
+        """
+        Set up USD based rates for a single day.
+        """
+        self.client = APIClient()
+        self.url = reverse('convert-api')
+        usd = Currency.objects.create(currency_name='US Dollar', currency_symbol='$', currency_code='USD')
+        eur = Currency.objects.create(currency_name='Euro', currency_symbol='€', currency_code='EUR')
+        pln = Currency.objects.create(currency_name='Polish Zloty', currency_symbol='zł', currency_code='PLN')
+        gbp = Currency.objects.create(currency_name='British Pound', currency_symbol='£', currency_code='GBP')
+        history_date = date(2023, 1, 2)
+        CurrencyRate.objects.bulk_create([
+            CurrencyRate(currency_base=usd, currency_target=eur, rate=0.5, history_date=history_date),
+            CurrencyRate(currency_base=usd, currency_target=pln, rate=4.0, history_date=history_date),
+            CurrencyRate(currency_base=gbp, currency_target=usd, rate=1.25, history_date=history_date),
+        ])
+
+    def convert(self, items):
+        """
+        Posts a batch of items and returns the results.
+        """
+        response = self.client.post(self.url, {'items': items}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()['results']
+
+    def test_rate_sources(self):
+        """
+        Test that direct, inverse and cross rates are used in that order of preference.
+        """
+        results = self.convert([
+            {'amount': 100, 'from': 'USD', 'to': 'EUR', 'date': '2023-01-02'},
+            {'amount': 100, 'from': 'EUR', 'to': 'USD', 'date': '2023-01-02'},
+            {'amount': 10, 'from': 'EUR', 'to': 'PLN', 'date': '2023-01-02'},
+            {'amount': 10, 'from': 'GBP', 'to': 'EUR', 'date': '2023-01-02'},
+            {'amount': 10, 'from': 'PLN', 'to': 'PLN', 'date': '2023-01-02'},
+        ])
+
+        self.assertEqual([(item['source'], item['result']) for item in results],
+                         [('direct', 50.0), ('inverse', 200.0), ('cross', 80.0), ('cross', 6.25), ('direct', 10.0)])
+
+    def test_item_errors(self):
+        """
+        Test that invalid items get an error message without failing the rest of the batch.
+        """
+        results = self.convert([
+            {'amount': 'abc', 'from': 'USD', 'to': 'EUR', 'date': '2023-01-02'},
+            {'amount': 1, 'from': 'USD', 'to': 'XXX', 'date': '2023-01-02'},
+            {'amount': 1, 'from': 'USD', 'to': 'EUR', 'date': '2023-01-03'},
+            {'amount': 1, 'from': 'USD', 'to': 'EUR', 'date': '2023-01-02'},
+            {'amount': 'nan', 'from': 'USD', 'to': 'EUR', 'date': '2023-01-02'},
+            {'amount': '-inf', 'from': 'USD', 'to': 'EUR', 'date': '2023-01-02'},
+            {'amount': '1e309', 'from': 'USD', 'to': 'EUR', 'date': '2023-01-02'},
+            {'amount': True, 'from': 'USD', 'to': 'EUR', 'date': '2023-01-02'},
+            {'amount': 1e308, 'from': 'EUR', 'to': 'USD', 'date': '2023-01-02'},
+        ])
+
+        self.assertIn('Invalid item', results[0]['error'])
+        self.assertEqual(results[1]['error'], 'Unknown currency code XXX')
+        self.assertIn('No rate', results[2]['error'])
+        self.assertEqual(results[3]['result'], 0.5)
+        self.assertEqual([result['error'] for result in results[4:7]],
+                         [f"Invalid item: amount must be a finite number, got '{amount}'"
+                          for amount in ('nan', '-inf', '1e309')])
+        self.assertEqual(results[7]['error'], 'Invalid item: amount must be a number, got True')
+        self.assertEqual(results[8]['error'], 'Result out of range converting 1e+308 EUR to USD on 2023-01-02')
+
+    def test_large_batch_uses_grouped_query(self):
+        """
+        Test that a batch of 10k items costs a constant number of queries.
+        """
+        codes = ['USD', 'EUR', 'PLN', 'GBP']
+        items = [{'amount': index, 'from': codes[index % 4], 'to': codes[(index // 4) % 4], 'date': '2023-01-02'}
+                 for index in range(10000)]
+        with self.assertNumQueries(2):
+            results = self.convert(items)
+        self.assertTrue(all('result' in item for item in results))
+
+    def test_invalid_body(self):
+        """
+        Test that a body without a list of items is rejected.
+        """
+        response = self.client.post(self.url, {'items': 'USD'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,99 @@
+import numpy as np
+from datetime import date
+from unittest import mock
+from django.test import TestCase
+from currencies_exchange.models import CatalogVersion, Currency, CurrencyRate
+from currencies_exchange.services import RateSnapshot, derive_rate, invalidate_snapshot
+
+
+class CrossRateTest(TestCase):
+    """
+    Test case for the cross rate triangulation engine.
+
+    Methods:
+        setUp(): Set up USD based rates for a single day.
+        test_snapshot_cross_rates(): Test vectorized cross rate derivation.
+        test_snapshot_uses_inverse_rates(): Test that rates into the pivot are inverted.
+        test_save_uses_snapshot(): Test that saving a derivable rate does not call the API.
+        test_save_falls_back_to_api(): Test that the API is called when the snapshot has no data.
+        test_miss_refreshes_on_new_rates(): Test that a miss only rebuilds the snapshot after a rate write.
+
+    Example:
+        To run the tests:
+        python manage.py test currencies_exchange.tests.test_cross_rates
+    """
+
+    def setUp(self):
+        """
+        Set up USD based rates for a single day.
+        """
+        invalidate_snapshot()
+        self.history_date = date(2023, 1, 2)
+        self.usd = Currency.objects.create(currency_name='US Dollar', currency_symbol='$', currency_code='USD')
+        self.eur = Currency.objects.create(currency_name='Euro', currency_symbol='€', currency_code='EUR')
+        self.pln = Currency.objects.create(currency_name='Polish Zloty', currency_symbol='zł', currency_code='PLN')
+        self.gbp = Currency.objects.create(currency_name='British Pound', currency_symbol='£', currency_code='GBP')
+        CurrencyRate.objects.bulk_create([
+            CurrencyRate(currency_base=self.usd, currency_target=self.eur, rate=0.5, history_date=self.history_date),
+            CurrencyRate(currency_base=self.usd, currency_target=self.pln, rate=4.0, history_date=self.history_date),
+        ])
+
+    def test_snapshot_cross_rates(self):
+        """
+        Test that cross rates of many pairs are derived at once.
+        """
+        snapshot = RateSnapshot.from_database(self.history_date)
+        rates = snapshot.cross_rates([self.eur.id, self.pln.id, self.usd.id, self.gbp.id],
+                                     [self.pln.id, self.eur.id, self.usd.id, self.eur.id])
+        np.testing.assert_allclose(rates[:3], [8.0, 0.125, 1.0])
+        self.assertTrue(np.isnan(rates[3]))
+        self.assertAlmostEqual(snapshot.matrix()[self.eur.id, self.pln.id], 8.0)
+
+    def test_snapshot_uses_inverse_rates(self):
+        """
+        Test that rates into the pivot currency are inverted into the snapshot.
+        """
+        CurrencyRate.objects.bulk_create([
+            CurrencyRate(currency_base=self.gbp, currency_target=self.usd, rate=1.25, history_date=self.history_date),
+        ])
+        self.assertAlmostEqual(derive_rate(self.gbp.id, self.eur.id, self.history_date), 0.625)
+
+    def test_save_uses_snapshot(self):
+        """
+        Test that saving a rate derivable from the snapshot does not call the external API.
+        """
+        with mock.patch('currencies_exchange.services.currency_api_client.CurrencyAPIClient.historical') as get:
+            rate = CurrencyRate(currency_base=self.eur, currency_target=self.pln, history_date=self.history_date)
+            rate.save()
+
+        get.assert_not_called()
+        self.assertAlmostEqual(rate.rate, 8.0)
+
+    def test_save_falls_back_to_api(self):
+        """
+        Test that the external API is called when the snapshot has no data for the pair.
+        """
+        with mock.patch('currencies_exchange.services.currency_api_client.CurrencyAPIClient.historical',
+                        return_value={'EUR': 1.1}) as get:
+            rate = CurrencyRate(currency_base=self.gbp, currency_target=self.eur, history_date=self.history_date)
+            rate.save()
+
+        get.assert_called_once()
+        self.assertEqual(CurrencyRate.objects.get(pk=rate.pk).rate, 1.1)
+
+    def test_miss_refreshes_on_new_rates(self):
+        """
+        Test that a pair missing from the cached snapshot only costs the version query, and rebuilds it once the rate
+        catalog version has moved.
+        """
+        self.assertIsNone(derive_rate(self.gbp.id, self.eur.id, self.history_date))
+        with self.assertNumQueries(3):
+            for _ in range(3):
+                self.assertIsNone(derive_rate(self.gbp.id, self.eur.id, self.history_date))
+
+        # A rate stored by another process, which cannot drop the cached snapshot of this one
+        CurrencyRate.objects.bulk_create([CurrencyRate(currency_base=self.usd, currency_target=self.gbp, rate=0.8,
+                                                       history_date=self.history_date)])
+        self.assertIsNone(derive_rate(self.gbp.id, self.eur.id, self.history_date))
+        CatalogVersion.bump(CatalogVersion.RATE)
+        self.assertAlmostEqual(derive_rate(self.gbp.id, self.eur.id, self.history_date), 0.625)
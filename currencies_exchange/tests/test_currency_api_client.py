@@ -0,0 +1,247 @@
+import json
+import asyncio
+import time
+import requests
+import threading
+from unittest import mock
+from datetime import date
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from currencies_exchange.services import (AsyncCurrencyAPIClient, CurrencyAPIClient, CurrencyAPIError,
+                                          async_client_scope, get_async_client, get_client)
+from currencies_exchange.services.currency_api_client import TokenBucket
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Request handler replaying the scripted responses of the stub server.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.client_address))
+        status, body, headers, delay = self.server.responses.pop(0) if self.server.responses else (200, {}, {}, 0)
+        time.sleep(delay)
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class CurrencyAPIClientTest(SimpleTestCase):
+    """
+    Test case for the CurrencyAPIClient against a local stub server.
+
+    Methods:
+        setUp(): Start the stub server and create a client pointing at it.
+        tearDown(): Stop the stub server.
+        test_historical_returns_rates(): Test a successful historical call.
+        test_connections_are_reused(): Test that the session keeps connections alive.
+        test_retries_rate_limited_calls(): Test that 429 responses are retried.
+        test_retry_after_is_capped(): Test that a long Retry-After waits at most the maximum backoff.
+        test_gives_up_after_max_retries(): Test that persistent 5xx responses raise an error.
+        test_client_errors_are_not_retried(): Test that 422 responses fail immediately.
+        test_read_timeout(): Test that a hanging upstream does not block forever.
+        test_errors_without_message(): Test that exceptions with an empty message are retried and raised.
+        test_token_bucket_limits_rate(): Test that the token bucket spaces out calls.
+        test_async_client(): Test that the async client retries, reuses connections and raises errors.
+        test_async_client_per_loop(): Test that the client of a short-lived loop is closed with its request.
+        test_async_client_lifespan(): Test that the client of an ASGI server loop lives until shutdown.
+
+    Example:
+        To run the tests:
+        python manage.py test currencies_exchange.tests.test_currency_api_client
+    """
+
+    def setUp(self):
+        """
+        Start the stub server and create a client pointing at it.
+        """
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        self.server.responses = []
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+        self.client = CurrencyAPIClient(base_url=f'http://127.0.0.1:{self.server.server_port}/v3', api_key='key',
+                                        timeout=(1, 0.5), max_retries=2, backoff=0.01, rate_limit=0)
+
+    def tearDown(self):
+        """
+        Stop the stub server.
+        """
+        self.client.session.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_historical_returns_rates(self):
+        """
+        Test that a historical call returns the rates of the requested targets.
+        """
+        self.server.responses.append((200, {'data': {'EUR': {'code': 'EUR', 'value': 0.9}}}, {}, 0))
+        rates = self.client.historical('USD', ['EUR'], date(2023, 1, 2))
+
+        self.assertEqual(rates, {'EUR': 0.9})
+        path = self.server.requests[0][0]
+        self.assertTrue(path.startswith('/v3/historical?'))
+        self.assertIn('apikey=key', path)
+        self.assertIn('date=2023-01-02', path)
+        self.assertEqual(self.client.stats()['historical']['calls'], 1)
+
+    def test_connections_are_reused(self):
+        """
+        Test that consecutive calls reuse the same keep-alive connection.
+        """
+        self.client.currencies()
+        self.client.currencies()
+        self.assertEqual(self.server.requests[0][1], self.server.requests[1][1])
+
+    def test_retries_rate_limited_calls(self):
+        """
+        Test that 429 responses are retried with backoff.
+        """
+        self.server.responses.extend([(429, {}, {'Retry-After': '0'}, 0), (200, {'data': {'USD': {}}}, {}, 0)])
+        self.assertEqual(self.client.currencies(), {'USD': {}})
+        self.assertEqual(self.client.stats()['currencies']['retries'], 1)
+
+    def test_retry_after_is_capped(self):
+        """
+        Test that a Retry-After header asking for an hour, or for no number, waits at most the maximum backoff.
+        """
+        self.client.max_backoff = 0.05
+        self.server.responses.extend([(429, {}, {'Retry-After': '3600'}, 0), (503, {}, {'Retry-After': 'inf'}, 0),
+                                      (200, {'data': {'USD': {}}}, {}, 0)])
+        started = time.monotonic()
+        self.assertEqual(self.client.currencies(), {'USD': {}})
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(self.client.stats()['currencies']['retries'], 2)
+        self.assertEqual(self.client._retry_delay(10, None), 0.05)
+
+    def test_gives_up_after_max_retries(self):
+        """
+        Test that persistent 5xx responses raise an error after all retries.
+        """
+        self.server.responses.extend([(503, {}, {}, 0)] * 3)
+        with self.assertRaises(CurrencyAPIError) as context:
+            self.client.currencies()
+
+        self.assertEqual(context.exception.status_code, 503)
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(self.client.stats()['currencies']['errors'], 1)
+
+    def test_client_errors_are_not_retried(self):
+        """
+        Test that 422 responses fail without retrying.
+        """
+        self.server.responses.append((422, {}, {}, 0))
+        with self.assertRaises(CurrencyAPIError) as context:
+            self.client.historical('USD', ['EUR'], date(2023, 1, 2))
+
+        self.assertEqual(context.exception.status_code, 422)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_read_timeout(self):
+        """
+        Test that a hanging upstream fails with a timeout instead of blocking forever.
+        """
+        self.client.max_retries = 0
+        self.server.responses.append((200, {}, {}, 1))
+        with self.assertRaises(CurrencyAPIError) as context:
+            self.client.currencies()
+        self.assertIsNone(context.exception.status_code)
+
+    def test_errors_without_message(self):
+        """
+        Test that request exceptions with an empty message are retried and raised instead of treated as a success.
+        """
+        with mock.patch.object(self.client.session, 'get', side_effect=requests.ConnectionError()) as get:
+            with self.assertRaises(CurrencyAPIError) as context:
+                self.client.currencies()
+
+        self.assertEqual(get.call_count, 3)
+        self.assertIn('ConnectionError', str(context.exception))
+        self.assertEqual(self.client.stats()['currencies']['errors'], 1)
+
+    def test_token_bucket_limits_rate(self):
+        """
+        Test that the token bucket spaces out calls beyond the burst.
+        """
+        bucket = TokenBucket(rate=50, capacity=1)
+        started = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
+
+    async def test_async_client(self):
+        """
+        Test that the async client retries 429 responses, keeps connections alive and raises errors.
+        """
+        client = AsyncCurrencyAPIClient(base_url=f'http://127.0.0.1:{self.server.server_port}/v3', api_key='key',
+                                        timeout=(1, 0.5), max_retries=2, backoff=0.01, rate_limit=0)
+        self.server.responses.extend([
+            (429, {}, {'Retry-After': '0'}, 0),
+            (200, {'data': {'EUR': {'code': 'EUR', 'value': 0.9}, 'GBP': {'code': 'GBP', 'value': 0.8}}}, {}, 0),
+            (422, {}, {}, 0),
+        ])
+        try:
+            rates = await client.historical('USD', ['EUR'], date(2023, 1, 2))
+            with self.assertRaises(CurrencyAPIError) as context:
+                await client.historical('USD', ['EUR'], date(2023, 1, 3))
+        finally:
+            await client.aclose()
+
+        self.assertEqual(rates, {'EUR': 0.9})
+        self.assertEqual(context.exception.status_code, 422)
+        self.assertEqual(len({address for _, address in self.server.requests}), 1)
+        self.assertEqual(client.stats()['historical']['retries'], 1)
+
+    def test_async_client_per_loop(self):
+        """
+        Test that the client of a short-lived loop is closed when its last request ends and that all clients share
+        one rate limit.
+        """
+        async def request():
+            async with async_client_scope():
+                async with async_client_scope():
+                    client = get_async_client()
+                self.assertFalse(client.http.is_closed)
+                self.assertIs(get_async_client(), client)
+            return client
+
+        first = async_to_sync(request)()
+        second = async_to_sync(request)()
+
+        self.assertIsNot(first, second)
+        self.assertTrue(first.http.is_closed and second.http.is_closed)
+        self.assertIs(first.limiter, second.limiter)
+        self.assertIs(first.limiter, get_client().limiter)
+
+    def test_async_client_lifespan(self):
+        """
+        Test that the loop of an ASGI server keeps one client for all requests, closed on the lifespan shutdown.
+        """
+        from currencies_exchange.asgi import application
+
+        async def serve():
+            received, sent = asyncio.Queue(), asyncio.Queue()
+            server = asyncio.create_task(application({'type': 'lifespan'}, received.get, sent.put))
+            await received.put({'type': 'lifespan.startup'})
+            self.assertEqual(await sent.get(), {'type': 'lifespan.startup.complete'})
+            clients = []
+            for _ in range(2):
+                async with async_client_scope():
+                    clients.append(get_async_client())
+            self.assertIs(clients[0], clients[1])
+            self.assertFalse(clients[0].http.is_closed)
+            await received.put({'type': 'lifespan.shutdown'})
+            await server
+            self.assertEqual(await sent.get(), {'type': 'lifespan.shutdown.complete'})
+            return clients[0]
+
+        self.assertTrue(async_to_sync(serve)().http.is_closed)
@@ -0,0 +1,123 @@
+from django.urls import reverse
+from django.test import TestCase
+from django.core.cache import cache
+from django.contrib.admin.sites import site
+from rest_framework.test import APIClient
+from currencies_exchange.filters import CurrencyFilter
+from currencies_exchange.models import Currency, CurrencyRate
+from currencies_exchange.services import search_currency_ids
+
+
+class CurrencySearchTest(TestCase):
+    """
+    Test case for the currency search index and the searches served by it.
+
+    Methods:
+        setUp(): Set up currencies and an API client.
+        codes(ids): Return the codes of the currencies with the given IDs, in order.
+        test_index_follows_writes(): Test that the index follows creates, updates and deletes.
+        test_exact_code_ranks_first(): Test that an exact code match ranks first.
+        test_search_endpoint(): Test that the search endpoint returns ranked matches.
+        test_filterset_columns(): Test that the filter set searches single columns.
+        test_admin_search(): Test that the admin searches use the index.
+
+    Example:
+        To run the tests:
+        python manage.py test currencies_exchange.tests.test_currency_search
+    """
+
+    def setUp(self):
+        """
+        Set up currencies and an API client.
+        """
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse('currency-api')
+        Currency.objects.bulk_create([
+            Currency(currency_name='US Dollar', currency_symbol='$', currency_code='USD'),
+            Currency(currency_name='Australian Dollar', currency_symbol='A$', currency_code='AUD'),
+            Currency(currency_name='Euro', currency_symbol='€', currency_code='EUR'),
+            Currency(currency_name='Polish Zloty', currency_symbol='zł', currency_code='PLN'),
+        ])
+
+    def codes(self, ids):
+        """
+        Returns the codes of the currencies with the given IDs, in order.
+        """
+        codes = dict(Currency.objects.values_list('id', 'currency_code'))
+        return [codes[pk] for pk in ids]
+
+    def test_index_follows_writes(self):
+        """
+        Test that the index follows bulk creates, saves, updates and deletes.
+        """
+        self.assertEqual(self.codes(search_currency_ids('zlo')), ['PLN'])
+
+        currency = Currency.objects.create(currency_name='Swiss Franc', currency_symbol='CHF', currency_code='CHF')
+        self.assertEqual(self.codes(search_currency_ids('fra')), ['CHF'])
+
+        Currency.objects.filter(pk=currency.pk).update(currency_name='Franken')
+        self.assertEqual(self.codes(search_currency_ids('franken')), ['CHF'])
+        self.assertEqual(search_currency_ids('franc '), [])
+
+        currency.delete()
+        self.assertEqual(search_currency_ids('fra'), [])
+
+    def test_exact_code_ranks_first(self):
+        """
+        Test that an exact code match ranks first and words match token prefixes.
+        """
+        self.assertEqual(self.codes(search_currency_ids('aud'))[0], 'AUD')
+        self.assertEqual(sorted(self.codes(search_currency_ids('dollar'))), ['AUD', 'USD'])
+        self.assertEqual(self.codes(search_currency_ids('australian dol')), ['AUD'])
+        self.assertEqual(self.codes(search_currency_ids('€')), ['EUR'])
+        self.assertEqual(search_currency_ids('"'), [])
+
+    def test_search_endpoint(self):
+        """
+        Test that the search endpoint returns the ranked matches unless an ordering is requested.
+        """
+        Currency.objects.create(currency_name='Usd Tracker', currency_symbol='T', currency_code='TRK')
+
+        response = self.client.get(self.url, {'search': 'usd'})
+        self.assertEqual([item['currency_code'] for item in response.json()['results']], ['USD', 'TRK'])
+
+        response = self.client.get(self.url, {'search': 'usd', 'ordering': '-currency_code'})
+        self.assertEqual([item['currency_code'] for item in response.json()['results']], ['USD', 'TRK'])
+
+        response = self.client.get(self.url, {'search': 'usd', 'page_size': 1})
+        self.assertEqual(response.json()['results'][0]['currency_code'], 'USD')
+        response = self.client.get(response.json()['next'])
+        self.assertEqual([item['currency_code'] for item in response.json()['results']], ['TRK'])
+
+        self.assertEqual(self.client.get(self.url, {'search': 'yen'}).json()['results'], [])
+
+    def test_filterset_columns(self):
+        """
+        Test that every filter of the filter set only searches its own column.
+        """
+        self.assertEqual(list(CurrencyFilter(data={'currency_name': 'dollar'}).qs.order_by('currency_code')
+                              .values_list('currency_code', flat=True)), ['AUD', 'USD'])
+        self.assertEqual(list(CurrencyFilter(data={'currency_code': 'dollar'}).qs), [])
+        self.assertEqual(list(CurrencyFilter(data={'currency_symbol': 'zł'}).qs.values_list(
+            'currency_code', flat=True)), ['PLN'])
+
+    def test_admin_search(self):
+        """
+        Test that the currency and rate admin searches use the index.
+        """
+        usd, eur, pln = (Currency.objects.get(currency_code=code) for code in ('USD', 'EUR', 'PLN'))
+        CurrencyRate.objects.bulk_create([
+            CurrencyRate(currency_base=usd, currency_target=eur, rate=0.9, history_date='2023-01-02'),
+            CurrencyRate(currency_base=eur, currency_target=pln, rate=4.5, history_date='2023-01-02'),
+        ])
+
+        queryset, duplicates = site._registry[Currency].get_search_results(None, Currency.objects.all(), 'euro')
+        self.assertFalse(duplicates)
+        self.assertEqual(list(queryset.values_list('currency_code', flat=True)), ['EUR'])
+
+        admin = site._registry[CurrencyRate]
+        queryset, _ = admin.get_search_results(None, CurrencyRate.objects.all(), 'eur')
+        self.assertEqual(queryset.count(), 2)
+        queryset, _ = admin.get_search_results(None, CurrencyRate.objects.all(), 'eur pln')
+        self.assertEqual(list(queryset.values_list('currency_target__currency_code', flat=True)), ['PLN'])
@@ -0,0 +1,123 @@
+import os
+import sqlite3
+import tempfile
+from unittest import mock
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.contrib.auth.models import User
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from currencies_exchange.models import CurrencyRate
+from currencies_exchange.middleware import ReplicaReadMiddleware
+from currencies_exchange.database import REPLICA, ReplicaRouter, replica_reads, sync_replica
+
+
+class DatabaseProfileTest(SimpleTestCase):
+    """
+    Test case for the SQLite connection pragmas, the replica router and the replica sync.
+
+    Methods:
+        setUp(): Create a scratch directory.
+        test_connection_pragmas(): Test that new connections get the configured pragmas.
+        test_router(): Test that only app reads inside replica_reads() go to the replica.
+        test_middleware(): Test that only qualifying API requests read from the replica.
+        test_sync_replica(): Test that the replica is refreshed in place.
+
+    Example:
+        To run the tests:
+        python manage.py test currencies_exchange.tests.test_database
+    """
+
+    def setUp(self):
+        """
+        Create a scratch directory.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    @override_settings(SQLITE_JOURNAL_MODE='WAL', SQLITE_SYNCHRONOUS='NORMAL', SQLITE_MMAP_SIZE=1048576)
+    def test_connection_pragmas(self):
+        """
+        Test that a new connection gets the WAL journal, the synchronous level and the mmap size.
+        """
+        wrapper = DatabaseWrapper({**connection.settings_dict, 'NAME': os.path.join(self.directory.name, 'db.sqlite3')},
+                                  alias='scratch')
+        self.addCleanup(wrapper.close)
+        with wrapper.cursor() as cursor:
+            values = [cursor.execute(f'PRAGMA {name}').fetchone()[0]
+                      for name in ('journal_mode', 'synchronous', 'mmap_size')]
+        self.assertEqual(values, ['wal', 1, 1048576])
+
+    def test_router(self):
+        """
+        Test that only app model reads inside replica_reads() go to the replica and writes never do.
+        """
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(CurrencyRate))
+        with replica_reads():
+            self.assertEqual(router.db_for_read(CurrencyRate), REPLICA)
+            self.assertIsNone(router.db_for_read(User))
+            self.assertEqual(router.db_for_write(CurrencyRate), 'default')
+        self.assertIsNone(router.db_for_read(CurrencyRate))
+        self.assertFalse(router.allow_migrate(REPLICA, 'currencies_exchange'))
+        self.assertIsNone(router.allow_migrate('default', 'currencies_exchange'))
+
+    def test_middleware(self):
+        """
+        Test that safe API requests and opted-in views read from the replica, other requests do not.
+        """
+        router = ReplicaRouter()
+
+        class ReadView(APIView):
+            def get(self, request):
+                return Response({'db': router.db_for_read(CurrencyRate)})
+
+            def post(self, request):
+                return self.get(request)
+
+        class ReadOnlyPostView(ReadView):
+            replica_reads = True
+
+        def plain_view(request):
+            return Response({'db': router.db_for_read(CurrencyRate)})
+
+        def call(view, method='get', available=True):
+            request = getattr(RequestFactory(), method)('/')
+            middleware = ReplicaReadMiddleware(lambda request: (
+                middleware.process_view(request, view, (), {}) or view(request)))
+            with mock.patch('currencies_exchange.middleware.replica_reads.replica_available', return_value=available):
+                response = middleware(request)
+            return response.data['db']
+
+        self.assertEqual(call(ReadView.as_view()), REPLICA)
+        self.assertIsNone(call(ReadView.as_view(), 'post'))
+        self.assertEqual(call(ReadOnlyPostView.as_view(), 'post'), REPLICA)
+        self.assertIsNone(call(ReadView.as_view(), available=False))
+        self.assertIsNone(call(plain_view))
+        self.assertIsNone(router.db_for_read(CurrencyRate))
+
+    def test_sync_replica(self):
+        """
+        Test that the replica is created and refreshed in place, open readers seeing the new rows.
+        """
+        source = os.path.join(self.directory.name, 'db.sqlite3')
+        replica = os.path.join(self.directory.name, 'replica.sqlite3')
+        with sqlite3.connect(source) as primary:
+            primary.execute('PRAGMA journal_mode=WAL')
+            primary.execute('CREATE TABLE rate (value REAL)')
+            primary.execute('INSERT INTO rate VALUES (1.0)')
+
+        with override_settings(DATABASE_REPLICA=''):
+            self.assertFalse(sync_replica(source))
+        self.assertTrue(sync_replica(source, replica))
+        reader = sqlite3.connect(f'file:{replica}?mode=ro', uri=True)
+        self.addCleanup(reader.close)
+        self.assertEqual(reader.execute('SELECT count(*) FROM rate').fetchone()[0], 1)
+        self.assertEqual(reader.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+
+        with sqlite3.connect(source) as primary:
+            primary.execute('INSERT INTO rate VALUES (2.0)')
+        primary.close()
+        sync_replica(source, replica)
+        self.assertEqual(reader.execute('SELECT count(*) FROM rate').fetchone()[0], 2)
@@ -0,0 +1,86 @@
+import json
+from decimal import Decimal
+from datetime import date, timedelta
+from django.urls import reverse
+from django.test import TestCase
+from rest_framework.test import APIClient
+from currencies_exchange.models import Currency, CurrencyRate
+from currencies_exchange.renderers import ORJSONRenderer
+from currencies_exchange.serializers import CurrencyRateSerializer
+
+
+class FastListTest(TestCase):
+    """
+    Test case for the value row list responses and the orjson renderer.
+
+    Methods:
+        setUp(): Set up currencies, rates and an API client.
+        test_matches_serializer(): Test that value rows render like the serializer.
+        test_constant_queries(): Test that a page costs one query whatever its size.
+        test_cursor_pages(): Test that cursor pagination works over value rows.
+        test_renderer(): Test the orjson renderer options and fallbacks.
+
+    Example:
+        To run the tests:
+        python manage.py test currencies_exchange.tests.test_fast_list
+    """
+
+    def setUp(self):
+        """
+        Set up currencies, rates over several days and an API client.
+        """
+        self.client = APIClient()
+        self.url = reverse('currency-rate-api')
+        usd = Currency.objects.create(currency_name='US Dollar', currency_symbol='$', currency_code='USD')
+        eur = Currency.objects.create(currency_name='Euro', currency_symbol='€', currency_code='EUR')
+        CurrencyRate.objects.bulk_create([
+            CurrencyRate(currency_base=usd, currency_target=eur, rate=0.9 + day / 100,
+                         history_date=date(2023, 1, 1) + timedelta(days=day))
+            for day in range(20)
+        ])
+
+    def test_matches_serializer(self):
+        """
+        Test that value rows render the same items as the serializer over model instances.
+        """
+        expected = json.loads(json.dumps(CurrencyRateSerializer(
+            CurrencyRate.objects.order_by('history_date', 'id'), many=True).data))
+        self.assertEqual(self.client.get(self.url).json()['results'], expected)
+
+    def test_constant_queries(self):
+        """
+        Test that a page costs one query whatever its size.
+        """
+        for page_size in (2, 20):
+            with self.assertNumQueries(1):
+                response = self.client.get(self.url, {'page_size': page_size, 'currency_base': 'USD'})
+            self.assertEqual(len(response.json()['results']), page_size)
+
+    def test_cursor_pages(self):
+        """
+        Test that following the cursor links visits every rate once, in the requested order.
+        """
+        dates = []
+        response = self.client.get(self.url, {'page_size': 7, 'ordering': '-history_date'}).json()
+        while True:
+            dates.extend(item['history_date'] for item in response['results'])
+            if not response['next']:
+                break
+            response = self.client.get(response['next']).json()
+
+        self.assertEqual(dates, sorted(dates, reverse=True))
+        self.assertEqual(len(set(dates)), 20)
+
+    def test_renderer(self):
+        """
+        Test that the renderer indents on request and encodes decimals, dates and lazy strings.
+        """
+        from django.utils.translation import gettext_lazy
+
+        renderer = ORJSONRenderer()
+        data = {'rate': Decimal('1.5'), 'date': date(2023, 1, 2), 'message': gettext_lazy('Euro')}
+        self.assertEqual(renderer.render(data), b'{"rate":1.5,"date":"2023-01-02","message":"Euro"}')
+        self.assertIn(b'\n  "rate"', renderer.render(data, 'application/json; indent=4'))
+        self.assertEqual(renderer.render(None), b'')
+        with self.assertRaises(TypeError):
+            renderer.render({'value': object()})
@@ -0,0 +1,90 @@
+from unittest import mock
+from datetime import timedelta
+from django.urls import reverse
+from django.test import TestCase
+from django.contrib.admin.sites import site
+from django.contrib.auth.models import User
+from django.utils.timezone import now
+from currencies_exchange.forms import CurrencyRateForm
+from currencies_exchange.models import Currency, CurrencyRate
+
+
+class CurrencyRateFormTest(TestCase):
+    """
+    Test case for the cached currency choices and the autocomplete mode of the rate form.
+
+    Methods:
+        setUp(): Set up currencies.
+        choices(form, name): Return the rendered choices of a form field.
+        test_cached_choices(): Test that a warm form only looks the catalog version up.
+        test_choices_follow_catalog(): Test that new currencies show up in the choices.
+        test_history_date_limits(): Test that the history date is limited to the past.
+        test_admin_autocomplete(): Test that the autocomplete mode does not send the choices inline.
+
+    Example:
+        To run the tests:
+        python manage.py test currencies_exchange.tests.test_forms
+    """
+
+    def setUp(self):
+        """
+        Set up currencies.
+        """
+        for code, name in (('USD', 'US Dollar'), ('EUR', 'Euro'), ('PLN', 'Polish Zloty')):
+            Currency.objects.create(currency_name=name, currency_symbol=code, currency_code=code)
+
+    def choices(self, form, name):
+        """
+        Returns the rendered (value, label) choices of a form field.
+        """
+        return [(option['value'], option['label']) for _, options, _ in form[name].field.widget.optgroups(name, [])
+                for option in options]
+
+    def test_cached_choices(self):
+        """
+        Test that both fields share the cached choices and a warm form only looks the catalog version up.
+        """
+        CurrencyRateForm()
+        with self.assertNumQueries(1):
+            form = CurrencyRateForm()
+            base_choices = self.choices(form, 'currency_base')
+
+        self.assertEqual([label for _, label in base_choices], ['EUR', 'PLN', 'USD'])
+        self.assertEqual(base_choices, self.choices(form, 'currency_target'))
+
+    def test_choices_follow_catalog(self):
+        """
+        Test that a new currency bumps the catalog version and shows up in the choices.
+        """
+        CurrencyRateForm()
+        Currency.objects.create(currency_name='Swiss Franc', currency_symbol='CHF', currency_code='CHF')
+        self.assertEqual([label for _, label in self.choices(CurrencyRateForm(), 'currency_target')],
+                         ['CHF', 'EUR', 'PLN', 'USD'])
+
+    def test_history_date_limits(self):
+        """
+        Test that the history date must be between 2010-06-01 and yesterday.
+        """
+        usd, eur = Currency.objects.get(currency_code='USD'), Currency.objects.get(currency_code='EUR')
+        for history_date in ('2010-05-31', (now().date() + timedelta(days=1)).isoformat()):
+            form = CurrencyRateForm(data={'currency_base': usd.pk, 'currency_target': eur.pk,
+                                          'history_date': history_date})
+            self.assertIn('history_date', form.errors)
+
+    def test_admin_autocomplete(self):
+        """
+        Test that the autocomplete mode renders no inline choices and searches the currencies lazily.
+        """
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        with mock.patch.object(site._registry[CurrencyRate], 'autocomplete_fields', ['currency_base', 'currency_target']):
+            response = self.client.get(reverse('admin:currencies_exchange_currencyrate_add'))
+            self.assertContains(response, 'data-ajax--url', count=2)
+            self.assertNotContains(response, '>PLN</option>')
+
+            response = self.client.get(reverse('admin:autocomplete'), {
+                'app_label': 'currencies_exchange', 'model_name': 'currencyrate',
+                'field_name': 'currency_base', 'term': 'zlo'})
+        self.assertEqual([result['text'] for result in response.json()['results']], ['PLN'])
+
+        response = self.client.get(reverse('admin:currencies_exchange_currencyrate_add'))
+        self.assertContains(response, '>PLN</option>', count=2)
@@ -0,0 +1,86 @@
+from django.urls import reverse
+from django.test import TestCase
+from currencies_exchange.models import Currency
+from currencies_exchange.services import CurrencyAPIClient, CurrencyAPIError
+from currencies_exchange.standin import start_server
+from currencies_exchange.metrics import Histogram, format_labels, registry
+
+
+class MetricsTest(TestCase):
+    """
+    Test case for the metrics middleware, the /metrics endpoint and the upstream instrumentation.
+
+    Methods:
+        setUp(): Clear the registry and set up a currency.
+        test_server_timing_header(): Test that responses carry the request and query timings.
+        test_metrics_endpoint(): Test that served requests are rendered in the Prometheus format.
+        test_upstream_attempts(): Test that upstream attempts, statuses and retries are counted.
+        test_histogram_rendering(): Test the cumulative buckets and the label escaping.
+
+    Example:
+        To run the tests:
+        python manage.py test currencies_exchange.tests.test_metrics
+    """
+
+    def setUp(self):
+        """
+        Clear the registry and set up a currency.
+        """
+        registry.reset()
+        Currency.objects.create(currency_name='US Dollar', currency_symbol='$', currency_code='USD')
+
+    def test_server_timing_header(self):
+        """
+        Test that responses carry the request duration and the number of queries it ran.
+        """
+        response = self.client.get(reverse('currency-api'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response['Server-Timing'], r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="[1-9]\d* queries"$')
+
+    def test_metrics_endpoint(self):
+        """
+        Test that served requests and their queries are rendered in the Prometheus text format.
+        """
+        self.client.get(reverse('currency-api'))
+        self.client.get('/missing/')
+        response = self.client.get(reverse('metrics'))
+        body = response.content.decode()
+
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+        self.assertIn('http_requests_total{view="currency-api",method="GET",status="200"} 1', body)
+        self.assertIn('http_requests_total{view="unmatched",method="GET",status="404"} 1', body)
+        self.assertIn('http_request_duration_seconds_count{view="currency-api",method="GET"} 1', body)
+        self.assertRegex(body, r'db_queries_total\{view="currency-api"\} [1-9]')
+
+    def test_upstream_attempts(self):
+        """
+        Test that every upstream attempt is counted with its status and that retries are counted.
+        """
+        server = start_server(error_rate=1.0, error_statuses=(503,))
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        client = CurrencyAPIClient(base_url=server.url, rate_limit=0, max_retries=1, backoff=0.01)
+        with self.assertRaises(CurrencyAPIError):
+            client.currencies()
+        body = registry.render()
+
+        self.assertIn('upstream_requests_total{endpoint="currencies",status="503"} 2', body)
+        self.assertIn('upstream_retries_total{endpoint="currencies"} 1', body)
+        self.assertIn('upstream_request_duration_seconds_count{endpoint="currencies"} 2', body)
+
+    def test_histogram_rendering(self):
+        """
+        Test that histogram buckets are cumulative and label values are escaped.
+        """
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value)
+        lines = histogram.lines('latency', (('view', 'a"b'),))
+
+        self.assertEqual(lines[:3], ['latency_bucket{view="a\\"b",le="0.1"} 1',
+                                     'latency_bucket{view="a\\"b",le="1.0"} 2',
+                                     'latency_bucket{view="a\\"b",le="+Inf"} 3'])
+        self.assertEqual(lines[-1], 'latency_count{view="a\\"b"} 3')
+        self.assertEqual(format_labels(()), '')
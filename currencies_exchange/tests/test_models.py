@@ -0,0 +1,53 @@
+from datetime import date
+from django.test import TestCase
+from django.db import IntegrityError
+from currencies_exchange.forms import CurrencyRateForm
+from currencies_exchange.models import Currency, CurrencyRate
+
+
+class ModelConstraintTest(TestCase):
+    """
+    Test case for the uniqueness constraints of the Currency and CurrencyRate models.
+
+    Methods:
+        setUp(): Set up a stored rate.
+        test_currency_code_is_unique(): Test that a currency code can only be stored once.
+        test_rate_pair_and_date_is_unique(): Test that a pair can only have one rate per date.
+        test_form_rejects_duplicate_rate(): Test that the admin form reports a duplicate rate.
+
+    Example:
+        To run the tests:
+        python manage.py test currencies_exchange.tests.test_models
+    """
+
+    def setUp(self):
+        """
+        Set up a stored rate.
+        """
+        self.usd = Currency.objects.create(currency_name='US Dollar', currency_symbol='$', currency_code='USD')
+        self.eur = Currency.objects.create(currency_name='Euro', currency_symbol='€', currency_code='EUR')
+        CurrencyRate.objects.create(currency_base=self.usd, currency_target=self.eur, rate=0.9,
+                                    history_date=date(2023, 1, 2))
+
+    def test_currency_code_is_unique(self):
+        """
+        Test that a currency code can only be stored once.
+        """
+        with self.assertRaises(IntegrityError):
+            Currency.objects.create(currency_name='Dollar', currency_symbol='$', currency_code='USD')
+
+    def test_rate_pair_and_date_is_unique(self):
+        """
+        Test that a currency pair can only have one rate per date.
+        """
+        with self.assertRaises(IntegrityError):
+            CurrencyRate.objects.create(currency_base=self.usd, currency_target=self.eur, rate=0.8,
+                                        history_date=date(2023, 1, 2))
+
+    def test_form_rejects_duplicate_rate(self):
+        """
+        Test that the admin form reports a duplicate rate instead of failing on save.
+        """
+        form = CurrencyRateForm(data={'currency_base': self.usd.pk, 'currency_target': self.eur.pk,
+                                      'history_date': '2023-01-02'})
+        self.assertFalse(form.is_valid())
@@ -0,0 +1,117 @@
+from unittest import mock
+from datetime import date, timedelta
+from django.urls import reverse
+from django.db import connection
+from django.test import TestCase
+from django.core.cache import cache
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from currencies_exchange.models import Currency, CurrencyRate
+from currencies_exchange.pagination import KeysetCursorPagination
+
+
+class CursorPaginationTest(TestCase):
+    """
+    Test case for the cursor pagination of the currency and rate list endpoints.
+
+    Methods:
+        setUp(): Set up currencies, rates and an API client.
+        collect(url, params): Follow the next links and collect all results.
+        test_currency_pages_follow_ordering(): Test paging through currencies in both orders.
+        test_max_page_size(): Test that the requested page size is capped.
+        test_rate_pages(): Test paging through the filtered rates of a pair.
+        test_pages_within_a_date(): Test that pages splitting the rates of a date use no OFFSET.
+
+    Example:
+        To run the tests:
+        python manage.py test currencies_exchange.tests.test_pagination
+    """
+
+    def setUp(self):
+        """
+        Set up currencies, rates and an API client.
+        """
+        cache.clear()
+        self.client = APIClient()
+        self.codes = ['CHF', 'EUR', 'GBP', 'PLN', 'USD']
+        currencies = {code: Currency.objects.create(currency_name=code, currency_symbol=code, currency_code=code)
+                      for code in self.codes}
+        self.dates = [date(2023, 1, 1) + timedelta(days=offset) for offset in range(7)]
+        CurrencyRate.objects.bulk_create([
+            CurrencyRate(currency_base=currencies['USD'], currency_target=currencies[target], rate=1.0 + index,
+                         history_date=history_date)
+            for index, history_date in enumerate(self.dates) for target in ('EUR', 'PLN')
+        ])
+
+    def collect(self, url, params):
+        """
+        Follows the next links from the first page and collects all results.
+        """
+        response = self.client.get(url, params)
+        results = response.json()['results']
+        while response.json()['next']:
+            response = self.client.get(response.json()['next'])
+            results.extend(response.json()['results'])
+        return results
+
+    def test_currency_pages_follow_ordering(self):
+        """
+        Test that paging through currencies returns every currency once in the requested order.
+        """
+        url = reverse('currency-api')
+        ascending = self.collect(url, {'page_size': 2})
+        descending = self.collect(url, {'page_size': 2, 'ordering': '-currency_code'})
+
+        self.assertEqual([item['currency_code'] for item in ascending], self.codes)
+        self.assertEqual([item['currency_code'] for item in descending], self.codes[::-1])
+
+    def test_max_page_size(self):
+        """
+        Test that the requested page size is capped at the maximum page size.
+        """
+        with mock.patch.object(KeysetCursorPagination, 'max_page_size', 3):
+            response = self.client.get(reverse('currency-api'), {'page_size': 100})
+        self.assertEqual(len(response.json()['results']), 3)
+
+    def test_rate_pages(self):
+        """
+        Test paging through the rates of a pair with a constant number of queries per page.
+        """
+        url = reverse('currency-rate-api')
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {'currency_base': 'USD', 'currency_target': 'EUR', 'page_size': 3})
+        first = response.json()['results'][0]
+        first.pop('id')
+        self.assertEqual(first, {'currency_base': 'USD', 'currency_target': 'EUR', 'rate': 1.0,
+                                 'history_date': '2023-01-01'})
+
+        results = self.collect(url, {'currency_base': 'USD', 'currency_target': 'EUR', 'page_size': 3,
+                                     'ordering': '-history_date'})
+        self.assertEqual([item['history_date'] for item in results],
+                         [history_date.isoformat() for history_date in reversed(self.dates)])
+
+    def test_pages_within_a_date(self):
+        """
+        Test that paging through rates sharing their dates seeks every page by its keyset, in every ordering.
+        """
+        url = reverse('currency-rate-api')
+        ids = list(CurrencyRate.objects.order_by('history_date', 'id').values_list('id', flat=True))
+        orderings = {'history_date': ids, '-history_date': ids[::-1],
+                     'history_date,-id': [pk for pair in zip(ids[1::2], ids[::2]) for pk in pair]}
+
+        for ordering, expected in orderings.items():
+            with CaptureQueriesContext(connection) as queries:
+                results = self.collect(url, {'page_size': 3, 'ordering': ordering})
+                response = self.client.get(url, {'page_size': 3, 'ordering': ordering})
+                while response.json()['next']:
+                    response = self.client.get(response.json()['next'])
+                backwards = response.json()['results']
+                while response.json()['previous']:
+                    response = self.client.get(response.json()['previous'])
+                    backwards = response.json()['results'] + backwards
+
+            self.assertEqual([item['id'] for item in results], expected, ordering)
+            self.assertEqual([item['id'] for item in backwards], expected, ordering)
+            self.assertFalse([query['sql'] for query in queries if 'OFFSET' in query['sql']])
+
+        self.assertEqual(self.client.get(url, {'cursor': 'cD0yMDIzLTAxLTAy'}).status_code, 404)
@@ -0,0 +1,106 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+from django.urls import reverse
+from django.test import TestCase, override_settings
+from django.core.management import call_command
+from currencies_exchange.models import Currency
+from currencies_exchange.profiling import profile, try_profile
+
+
+class ProfilingTest(TestCase):
+    """
+    Test case for the profiling of single requests and management commands.
+
+    Methods:
+        setUp(): Set up a currency and a temporary profile directory.
+        profile_files(): Return the suffixes of the written profile files.
+        test_profile_writes_files(): Test that a profiled block writes its profile and SQL timeline.
+        test_single_profile_at_a_time(): Test that a block is not profiled while another one is.
+        test_requested_profile(): Test that allowed IPs can request a profile.
+        test_sampled_profile(): Test that requests are profiled at the sample rate.
+        test_command_profile(): Test the --profile flag of the commands.
+
+    Example:
+        To run the tests:
+        python manage.py test currencies_exchange.tests.test_profiling
+    """
+
+    def setUp(self):
+        """
+        Set up a currency and a temporary profile directory.
+        """
+        Currency.objects.create(currency_name='US Dollar', currency_symbol='$', currency_code='USD')
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def profile_files(self):
+        """
+        Returns the sorted suffixes of the written profile files.
+        """
+        return sorted(''.join(path.suffixes) for path in Path(self.directory).iterdir())
+
+    def test_profile_writes_files(self):
+        """
+        Test that a profiled block writes the profile, its summary and the SQL timeline.
+        """
+        with profile('list currencies', self.directory) as result:
+            list(Currency.objects.all())
+
+        self.assertEqual(self.profile_files(), ['.prof', '.sql.json', '.txt'])
+        self.assertTrue(result.path.name.startswith('list_currencies-'))
+        timeline = json.loads(result.path.with_suffix('.sql.json').read_text())
+        self.assertEqual(len(timeline['queries']), 1)
+        self.assertIn('currencies_exchange_currency', timeline['queries'][0]['sql'])
+        self.assertIn('function calls', result.path.with_suffix('.txt').read_text())
+
+    def test_single_profile_at_a_time(self):
+        """
+        Test that a block entered while another one is profiled runs without profiling.
+        """
+        with profile('outer', self.directory):
+            with try_profile('inner', self.directory) as inner:
+                self.assertIsNone(inner)
+        self.assertEqual(len(self.profile_files()), 3)
+
+    def test_requested_profile(self):
+        """
+        Test that allowed IPs get a profile on request and other requests are not profiled.
+        """
+        with override_settings(PROFILING_ALLOWED_IPS=['127.0.0.1'], PROFILING_DIR=self.directory):
+            plain = self.client.get(reverse('currency-api'))
+            requested = self.client.get(reverse('currency-api'), {'profile': 1})
+            header = self.client.get(reverse('currency-api'), HTTP_X_PROFILE='1')
+            foreign = self.client.get(reverse('currency-api'), {'profile': 1}, REMOTE_ADDR='10.0.0.1')
+
+        self.assertNotIn('X-Profile-Id', plain)
+        self.assertNotIn('X-Profile-Id', foreign)
+        self.assertTrue(requested['X-Profile-Id'].startswith('GET_currency-'))
+        self.assertIn('X-Profile-Id', header)
+        self.assertEqual(len(self.profile_files()), 6)
+
+    def test_sampled_profile(self):
+        """
+        Test that every request is profiled with a sample rate of 1.
+        """
+        with override_settings(PROFILING_SAMPLE_RATE=1.0, PROFILING_DIR=self.directory):
+            response = self.client.get(reverse('currency-api'))
+
+        self.assertIn('X-Profile-Id', response)
+
+    def test_command_profile(self):
+        """
+        Test that --profile profiles a command and reports the profile path.
+        """
+        out = StringIO()
+        with override_settings(PROFILING_DIR=self.directory), \
+                mock.patch('currencies_exchange.services.currency_api_client.CurrencyAPIClient.currencies',
+                           return_value={'EUR': {'name': 'Euro', 'symbol': '€', 'code': 'EUR'}}):
+            call_command('pull_currencies', '--profile', stdout=out)
+
+        self.assertIn('Created 1', out.getvalue())
+        self.assertIn('queries written to', out.getvalue())
+        self.assertTrue(any(path.name.startswith('pull_currencies-') for path in Path(self.directory).iterdir()))
@@ -0,0 +1,78 @@
+from io import StringIO
+from unittest import mock
+from django.test import TestCase
+from django.core.management import call_command
+from currencies_exchange.models import Currency
+
+UPSTREAM_CURRENCIES = {
+    'USD': {'name': 'US Dollar', 'symbol': '$', 'code': 'USD'},
+    'EUR': {'name': 'Euro', 'symbol': '€', 'code': 'EUR'},
+    'PLN': {'name': 'Polish Zloty', 'symbol': 'zł', 'code': 'PLN'},
+    'XXX': {'name': '', 'symbol': '', 'code': 'XXX'},
+}
+
+
+class PullCurrenciesCommandTest(TestCase):
+    """
+    Test case for the pull_currencies management command.
+
+    Methods:
+        setUp(): Set up currencies already stored in the database.
+        pull(*args): Run the command against the stubbed upstream currencies.
+        test_creates_missing_currencies(): Test that only missing currencies are created.
+        test_update_changed(): Test that changed currencies are updated on request.
+        test_dry_run(): Test that a dry run does not write anything.
+
+    Example:
+        To run the tests:
+        python manage.py test currencies_exchange.tests.test_pull_currencies
+    """
+
+    def setUp(self):
+        """
+        Set up currencies already stored in the database, one of them outdated.
+        """
+        Currency.objects.create(currency_name='US Dollar', currency_symbol='$', currency_code='USD')
+        Currency.objects.create(currency_name='Old Euro', currency_symbol='E', currency_code='EUR')
+
+    def pull(self, *args):
+        """
+        Runs the command against the stubbed upstream currencies and returns its output.
+        """
+        out = StringIO()
+        with mock.patch('currencies_exchange.services.currency_api_client.CurrencyAPIClient.currencies',
+                        return_value=UPSTREAM_CURRENCIES):
+            call_command('pull_currencies', *args, stdout=out)
+        return out.getvalue()
+
+    def test_creates_missing_currencies(self):
+        """
+        Test that only missing currencies are created and changed ones are left alone by default.
+        """
+        with self.assertNumQueries(5):
+            output = self.pull()
+
+        self.assertIn('Created 1, updated 0, unchanged 1, changed upstream but not updated 1', output)
+        self.assertIn('invalid 1', output)
+        self.assertEqual(Currency.objects.get(currency_code='EUR').currency_name, 'Old Euro')
+        self.assertTrue(Currency.objects.filter(currency_code='PLN').exists())
+
+    def test_update_changed(self):
+        """
+        Test that currencies changed upstream are updated with --update-changed.
+        """
+        output = self.pull('--update-changed')
+
+        self.assertIn('Created 1, updated 1, unchanged 1', output)
+        euro = Currency.objects.get(currency_code='EUR')
+        self.assertEqual((euro.currency_name, euro.currency_symbol), ('Euro', '€'))
+
+    def test_dry_run(self):
+        """
+        Test that a dry run reports the changes without writing them.
+        """
+        output = self.pull('--dry-run', '--update-changed')
+
+        self.assertIn('Dry run: would have created 1, updated 1, unchanged 1', output)
+        self.assertEqual(Currency.objects.count(), 2)
+        self.assertEqual(Currency.objects.get(currency_code='EUR').currency_name, 'Old Euro')
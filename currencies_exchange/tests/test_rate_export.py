@@ -0,0 +1,110 @@
+import os
+import gzip
+import json
+import tempfile
+from io import StringIO
+from datetime import date, timedelta
+from django.urls import reverse
+from django.test import TestCase
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from rest_framework.views import status
+from currencies_exchange.models import Currency, CurrencyRate
+from currencies_exchange.services import export_rates
+
+
+class RateExportTest(TestCase):
+    """
+    Test case for the streaming rate export endpoint and management command.
+
+    Methods:
+        setUp(): Set up currencies, rates and an API client.
+        test_csv_export(): Test that the CSV export streams the filtered rates.
+        test_ndjson_gzip_export(): Test that the NDJSON export can be gzipped.
+        test_invalid_parameters(): Test that invalid parameters are rejected.
+        test_lazy_chunked_reads(): Test that rows are only read while streaming, chunk by chunk.
+        test_command(): Test that the command writes the export to a file.
+
+    Example:
+        To run the tests:
+        python manage.py test currencies_exchange.tests.test_rate_export
+    """
+
+    def setUp(self):
+        """
+        Set up rates of two pairs over ten days and an API client.
+        """
+        self.client = APIClient()
+        self.url = reverse('rate-export-api')
+        usd = Currency.objects.create(currency_name='US Dollar', currency_symbol='$', currency_code='USD')
+        eur = Currency.objects.create(currency_name='Euro', currency_symbol='€', currency_code='EUR')
+        pln = Currency.objects.create(currency_name='Polish Zloty', currency_symbol='zł', currency_code='PLN')
+        CurrencyRate.objects.bulk_create([
+            CurrencyRate(currency_base=usd, currency_target=target, rate=rate + day / 100,
+                         history_date=date(2023, 1, 1) + timedelta(days=day))
+            for day in range(10) for target, rate in ((eur, 0.9), (pln, 4.0))
+        ])
+
+    def test_csv_export(self):
+        """
+        Test that the CSV export streams the filtered rates in date order.
+        """
+        response = self.client.get(self.url, {'currency_target': 'EUR', 'date_from': '2023-01-03',
+                                              'date_to': '2023-01-04'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="rates.csv"')
+        self.assertEqual(b''.join(response.streaming_content).decode().splitlines(), [
+            'currency_base,currency_target,history_date,rate',
+            'USD,EUR,2023-01-03,0.92',
+            'USD,EUR,2023-01-04,0.93',
+        ])
+
+    def test_ndjson_gzip_export(self):
+        """
+        Test that the NDJSON export can be gzipped.
+        """
+        response = self.client.get(self.url, {'output': 'ndjson', 'gzip': 'true'})
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="rates.ndjson.gz"')
+
+        lines = gzip.decompress(b''.join(response.streaming_content)).splitlines()
+        self.assertEqual(len(lines), 20)
+        self.assertEqual(json.loads(lines[0]), {'currency_base': 'USD', 'currency_target': 'EUR',
+                                                'history_date': '2023-01-01', 'rate': 0.9})
+
+    def test_invalid_parameters(self):
+        """
+        Test that an unknown output format or an invalid date is rejected.
+        """
+        self.assertEqual(self.client.get(self.url, {'output': 'xml'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'date_from': 'x'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_lazy_chunked_reads(self):
+        """
+        Test that rows are only read while the export is consumed, in small chunks.
+        """
+        with self.assertNumQueries(0):
+            chunks = export_rates(CurrencyRate.objects.all(), 'ndjson', chunk_size=3, buffer_size=1)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(list(chunks)), 20)
+
+    def test_command(self):
+        """
+        Test that the command writes the filtered, gzipped export to a file.
+        """
+        handle, path = tempfile.mkstemp(suffix='.csv.gz')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+
+        stderr = StringIO()
+        call_command('export_rates', '--target', 'PLN', '--gzip', '--output', path, stderr=stderr)
+        with gzip.open(path, 'rt') as export:
+            lines = export.read().splitlines()
+        self.assertEqual(len(lines), 11)
+        self.assertEqual(lines[1], 'USD,PLN,2023-01-01,4.0')
+        self.assertIn('Exported', stderr.getvalue())
+
+        stdout = StringIO()
+        call_command('export_rates', '--base', 'USD', '--start', '2023-01-10', stdout=stdout, stderr=StringIO())
+        self.assertEqual(len(stdout.getvalue().splitlines()), 3)
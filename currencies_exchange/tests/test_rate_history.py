@@ -0,0 +1,106 @@
+import shutil
+import tempfile
+from unittest import mock
+from datetime import date, timedelta
+from django.db import connection
+from django.urls import reverse
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework.views import status
+from currencies_exchange.models import Currency, CurrencyRate
+from currencies_exchange.services import build_columnar_snapshot
+
+
+class RateHistoryAPIViewTest(TestCase):
+    """
+    Test case for the rate history endpoint.
+
+    Methods:
+        setUp(): Set up daily USD/EUR rates from Monday 2023-01-02 to Sunday 2023-02-05.
+        get(**params): Request the USD/EUR history.
+        test_daily_series(): Test the undownsampled series of a date range.
+        test_weekly_buckets(): Test the OHLC aggregation of Monday based weeks.
+        test_monthly_buckets(): Test the OHLC aggregation of months.
+        test_invalid_query(): Test that invalid parameters are rejected.
+        test_snapshot_series(): Test that the series is read from a current columnar snapshot.
+
+    Example:
+        To run the tests:
+        python manage.py test currencies_exchange.tests.test_rate_history
+    """
+
+    def setUp(self):
+        """
+        Set up daily USD/EUR rates from Monday 2023-01-02 to Sunday 2023-02-05, rate = day index + 1.
+        """
+        self.client = APIClient()
+        self.url = reverse('rate-history-api')
+        usd = Currency.objects.create(currency_name='US Dollar', currency_symbol='$', currency_code='USD')
+        eur = Currency.objects.create(currency_name='Euro', currency_symbol='€', currency_code='EUR')
+        CurrencyRate.objects.bulk_create([
+            CurrencyRate(currency_base=usd, currency_target=eur, rate=offset + 1.0,
+                         history_date=date(2023, 1, 2) + timedelta(days=offset))
+            for offset in range(35)
+        ])
+
+    def get(self, **params):
+        """
+        Requests the USD/EUR history with the given extra parameters.
+        """
+        return self.client.get(self.url, {'currency_base': 'USD', 'currency_target': 'EUR', **params})
+
+    def test_daily_series(self):
+        """
+        Test that the daily series of a date range returns one entry per rate.
+        """
+        response = self.get(date_from='2023-01-03', date_to='2023-01-05')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        series = response.json()['series']
+        self.assertEqual([entry['period'] for entry in series], ['2023-01-03', '2023-01-04', '2023-01-05'])
+        self.assertEqual(series[0], {'period': '2023-01-03', 'open': 2.0, 'high': 2.0, 'low': 2.0,
+                                     'close': 2.0, 'mean': 2.0, 'count': 1})
+
+    def test_weekly_buckets(self):
+        """
+        Test that weekly buckets start on Monday and aggregate seven rates each.
+        """
+        series = self.get(resolution='week').json()['series']
+        self.assertEqual(len(series), 5)
+        self.assertEqual(series[1], {'period': '2023-01-09', 'open': 8.0, 'high': 14.0, 'low': 8.0,
+                                     'close': 14.0, 'mean': 11.0, 'count': 7})
+
+    def test_monthly_buckets(self):
+        """
+        Test that monthly buckets aggregate the rates of each calendar month.
+        """
+        series = self.get(resolution='month').json()['series']
+        self.assertEqual([(entry['period'], entry['count']) for entry in series],
+                         [('2023-01-01', 30), ('2023-02-01', 5)])
+        self.assertEqual((series[1]['open'], series[1]['close'], series[1]['mean']), (31.0, 35.0, 33.0))
+
+    def test_invalid_query(self):
+        """
+        Test that an unknown resolution, a reversed range or an unknown currency is rejected.
+        """
+        self.assertEqual(self.get(resolution='hour').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.get(date_from='2023-02-01', date_to='2023-01-01').status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {'currency_base': 'USD', 'currency_target': 'XXX'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_snapshot_series(self):
+        """
+        Test that the series is sliced out of a current columnar snapshot, with the same result as from the database.
+        """
+        params = {'date_from': '2023-01-09', 'date_to': '2023-01-29', 'resolution': 'week'}
+        expected = self.get(**params).json()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        build_columnar_snapshot(directory)
+
+        with mock.patch('currencies_exchange.services.columnar_snapshot.RATE_SNAPSHOT_DIR', directory), \
+                CaptureQueriesContext(connection) as queries:
+            response = self.get(**params)
+        self.assertEqual(response.json(), expected)
+        self.assertFalse([query['sql'] for query in queries if 'currencyrate' in query['sql']])
@@ -0,0 +1,205 @@
+from io import StringIO
+from unittest import mock
+from datetime import date, timedelta
+from django.urls import reverse
+from django.utils.timezone import now
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.test import TestCase, TransactionTestCase
+from currencies_exchange.models import CatalogVersion, Currency, CurrencyRate, RateFetchJob
+from currencies_exchange.services import CurrencyAPIError, claim_jobs, retry_failed_jobs, run_jobs, work, write_rates
+
+HISTORICAL = 'currencies_exchange.services.currency_api_client.CurrencyAPIClient.historical'
+SYNC_REPLICA = 'currencies_exchange.services.rate_jobs.sync_replica'
+
+
+def create_currencies():
+    """
+    Creates the USD, EUR, PLN and GBP currencies and returns them.
+    """
+    return [Currency.objects.create(currency_name=name, currency_symbol=code, currency_code=code)
+            for code, name in (('USD', 'US Dollar'), ('EUR', 'Euro'), ('PLN', 'Polish Zloty'),
+                               ('GBP', 'British Pound'))]
+
+
+def fake_historical(base_code, target_codes, history_date):
+    """
+    Returns a rate of 2.0 for every target currency.
+    """
+    return {code: 2.0 for code in target_codes}
+
+
+class RateFetchJobTest(TestCase):
+    """
+    Test case for the queued fetches of pending rates and their workers.
+
+    Methods:
+        setUp(): Set up currencies and a logged in superuser.
+        pending(base, target, day): Save a pending rate and return it.
+        test_admin_queues_fetch(): Test that the admin saves a pending rate without calling the API.
+        test_workers_fill_pending_rates(): Test that workers fetch the jobs in batches and fill the rates.
+        test_failed_fetches(): Test the retries, the failed jobs and their requeuing.
+        test_expired_lease(): Test that the jobs of a worker that died are taken over.
+        test_stale_batch(): Test that a batch whose jobs were taken over does not settle them.
+        test_writes_fill_pending_rates(): Test that bulk writes fill the pending rates they store.
+
+    Example:
+        To run the tests:
+        python manage.py test currencies_exchange.tests.test_rate_jobs
+    """
+
+    def setUp(self):
+        """
+        Set up currencies and a logged in superuser.
+        """
+        self.usd, self.eur, self.pln, self.gbp = create_currencies()
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+
+    def pending(self, base, target, day=date(2023, 1, 2)):
+        """
+        Saves a rate with a queued fetch and returns it.
+        """
+        rate = CurrencyRate(currency_base=base, currency_target=target, history_date=day)
+        rate.save(fetch_rate=False)
+        return rate
+
+    def test_admin_queues_fetch(self):
+        """
+        Test that a rate added in the admin is saved pending and listed as such, without an API call.
+        """
+        with mock.patch(HISTORICAL) as historical:
+            response = self.client.post(reverse('admin:currencies_exchange_currencyrate_add'), {
+                'currency_base': self.gbp.pk, 'currency_target': self.eur.pk, 'history_date': '2023-01-02',
+            }, follow=True)
+
+        historical.assert_not_called()
+        self.assertContains(response, 'is pending, it is fetched in the background')
+        rate = CurrencyRate.with_pending.get()
+        self.assertIsNone(rate.rate)
+        self.assertEqual(rate.fetch_job.state, RateFetchJob.QUEUED)
+        self.assertFalse(CurrencyRate.objects.exists())
+        self.assertContains(self.client.get(reverse('admin:currencies_exchange_currencyrate_changelist')),
+                            '<td class="field-rate_value">Pending</td>', html=True)
+
+    def test_workers_fill_pending_rates(self):
+        """
+        Test that the due jobs are fetched with one call per base and date and their rates filled.
+        """
+        self.pending(self.gbp, self.eur)
+        self.pending(self.gbp, self.pln)
+        self.pending(self.usd, self.pln, date(2023, 1, 3))
+        version, _ = CatalogVersion.current(CatalogVersion.RATE)
+
+        with mock.patch(HISTORICAL, side_effect=fake_historical) as historical, \
+                mock.patch(SYNC_REPLICA) as sync_replica:
+            result = work(once=True)
+            work(once=True)
+
+        self.assertEqual((result.calls, result.filled, result.retried, result.failed), (2, 3, 0, 0))
+        sync_replica.assert_called_once_with()
+        historical.assert_any_call('GBP', ['EUR', 'PLN'], date(2023, 1, 2))
+        self.assertEqual(list(CurrencyRate.with_pending.values_list('rate', flat=True)), [2.0, 2.0, 2.0])
+        self.assertFalse(RateFetchJob.objects.exists())
+        self.assertGreater(CatalogVersion.current(CatalogVersion.RATE)[0], version)
+
+    def test_failed_fetches(self):
+        """
+        Test that failed fetches are retried later, given up when unprocessable and can be queued again.
+        """
+        self.pending(self.gbp, self.eur)
+        with mock.patch(HISTORICAL, side_effect=CurrencyAPIError('Service unavailable', 503)):
+            result = work(once=True)
+        job = RateFetchJob.objects.get()
+        self.assertEqual((result.calls, result.retried), (1, 1))
+        self.assertEqual((job.state, job.attempts), (RateFetchJob.QUEUED, 1))
+        self.assertGreater(job.run_after, now())
+        self.assertEqual(claim_jobs(), [])
+
+        RateFetchJob.objects.update(run_after=now())
+        with mock.patch(HISTORICAL, side_effect=CurrencyAPIError('Unprocessable', 422)):
+            result = work(once=True)
+        job.refresh_from_db()
+        self.assertEqual((result.failed, job.state, job.attempts), (1, RateFetchJob.FAILED, 2))
+        self.assertContains(self.client.get(reverse('admin:currencies_exchange_currencyrate_changelist')),
+                            'Fetch failed: Unprocessable')
+
+        self.assertEqual(retry_failed_jobs(), 1)
+        with mock.patch(HISTORICAL, side_effect=fake_historical):
+            self.assertEqual(work(once=True).filled, 1)
+        self.assertEqual(CurrencyRate.objects.get().rate, 2.0)
+
+    def test_expired_lease(self):
+        """
+        Test that running jobs are only claimed again once their lease expired.
+        """
+        job = self.pending(self.gbp, self.eur).fetch_job
+        self.assertEqual([claimed.id for claimed in claim_jobs(lease=60)], [job.id])
+        self.assertEqual(claim_jobs(), [])
+
+        RateFetchJob.objects.update(locked_until=now() - timedelta(seconds=1))
+        self.assertEqual([claimed.id for claimed in claim_jobs()], [job.id])
+
+    def test_stale_batch(self):
+        """
+        Test that a worker whose lease expired leaves the jobs claimed again by another worker alone.
+        """
+        job = self.pending(self.gbp, self.eur).fetch_job
+        stale = claim_jobs(lease=60)
+        RateFetchJob.objects.update(locked_until=now() - timedelta(seconds=1))
+        current = claim_jobs()
+
+        with mock.patch(HISTORICAL, side_effect=CurrencyAPIError('Service unavailable', 503)):
+            run_jobs(stale)
+        job.refresh_from_db()
+        self.assertEqual((job.state, job.claimed_by, job.attempts), (RateFetchJob.RUNNING, current[0].claimed_by, 0))
+
+        with mock.patch(HISTORICAL, side_effect=fake_historical):
+            self.assertEqual(run_jobs(stale).filled, 1)
+            self.assertTrue(RateFetchJob.objects.exists())
+            run_jobs(current)
+        self.assertFalse(RateFetchJob.objects.exists())
+        self.assertEqual(CurrencyRate.objects.get().rate, 2.0)
+
+    def test_writes_fill_pending_rates(self):
+        """
+        Test that a bulk write of a pending rate fills it, leaving its job without an API call.
+        """
+        self.pending(self.gbp, self.eur)
+        write_rates([CurrencyRate(currency_base=self.gbp, currency_target=self.eur, rate=0.9,
+                                  history_date=date(2023, 1, 2))])
+        self.assertEqual(CurrencyRate.objects.get().rate, 0.9)
+
+        with mock.patch(HISTORICAL) as historical:
+            result = work(once=True)
+        historical.assert_not_called()
+        self.assertEqual(result.calls, 0)
+        self.assertFalse(RateFetchJob.objects.exists())
+
+
+class RunWorkersCommandTest(TransactionTestCase):
+    """
+    Test case for the run_workers command, whose worker threads need committed jobs.
+
+    Methods:
+        test_run_workers(): Test that the worker threads drain the queue.
+
+    Example:
+        To run the tests:
+        python manage.py test currencies_exchange.tests.test_rate_jobs
+    """
+
+    def test_run_workers(self):
+        """
+        Test that the worker threads fill the pending rates and stop once no job is due.
+        """
+        usd, eur, pln, gbp = create_currencies()
+        for target in (eur, pln):
+            CurrencyRate(currency_base=gbp, currency_target=target, history_date=date(2023, 1, 2)).save(
+                fetch_rate=False)
+        out = StringIO()
+
+        with mock.patch(HISTORICAL, side_effect=fake_historical):
+            call_command('run_workers', '--workers', '1', '--once', stdout=out)
+
+        self.assertIn('Filled 2 rates from 1 API calls, 0 jobs to retry, 0 failed', out.getvalue())
+        self.assertEqual(CurrencyRate.objects.count(), 2)
@@ -0,0 +1,194 @@
+import os
+import sqlite3
+import asyncio
+import tempfile
+from datetime import date
+from unittest import mock
+from django.urls import reverse
+from django.db import connections
+from django.test import TestCase, TransactionTestCase
+from rest_framework.views import status
+from currencies_exchange.database import REPLICA
+from currencies_exchange.models import Currency, CurrencyRate, FetchLock
+from currencies_exchange.services import CurrencyAPIError
+
+HISTORICAL = 'currencies_exchange.services.async_currency_api_client.AsyncCurrencyAPIClient.historical'
+
+
+class RateLookupAPIViewTest(TestCase):
+    """
+    Test case for the async rate lookup endpoint and the upstream fill of conversions.
+
+    Methods:
+        setUp(): Set up USD based rates for a single day.
+        lookup(base, target, day): Request a rate over WSGI and return the response.
+        test_lookup_sources(): Test stored, derived and fetched rates.
+        test_lookup_errors(): Test invalid queries and upstream failures.
+        test_concurrent_lookups(): Test that lookups waiting on the upstream overlap under ASGI.
+        test_convert_fetch_missing(): Test that conversions can fetch their missing rates.
+
+    Example:
+        To run the tests:
+        python manage.py test currencies_exchange.tests.test_rate_lookup
+    """
+
+    def setUp(self):
+        """
+        Set up USD based rates for a single day.
+        """
+        self.url = reverse('rate-lookup-api')
+        self.usd = Currency.objects.create(currency_name='US Dollar', currency_symbol='$', currency_code='USD')
+        self.eur = Currency.objects.create(currency_name='Euro', currency_symbol='€', currency_code='EUR')
+        self.pln = Currency.objects.create(currency_name='Polish Zloty', currency_symbol='zł', currency_code='PLN')
+        self.gbp = Currency.objects.create(currency_name='British Pound', currency_symbol='£', currency_code='GBP')
+        CurrencyRate.objects.bulk_create([
+            CurrencyRate(currency_base=self.usd, currency_target=self.eur, rate=0.5, history_date=date(2023, 1, 2)),
+            CurrencyRate(currency_base=self.usd, currency_target=self.pln, rate=4.0, history_date=date(2023, 1, 2)),
+        ])
+
+    def lookup(self, base, target, day='2023-01-02'):
+        """
+        Requests the rate of a pair over WSGI and returns the response.
+        """
+        return self.client.get(self.url, {'currency_base': base, 'currency_target': target, 'date': day})
+
+    def test_lookup_sources(self):
+        """
+        Test that rates are read, derived or fetched and stored, in that order of preference.
+        """
+        async def fetch(base_code, target_codes, history_date):
+            return {code: 0.8 for code in target_codes}
+
+        with mock.patch(HISTORICAL, side_effect=fetch) as historical:
+            stored = self.lookup('USD', 'EUR').json()
+            derived = self.lookup('EUR', 'PLN').json()
+            fetched = self.lookup('GBP', 'EUR').json()
+            again = self.lookup('GBP', 'EUR').json()
+
+        self.assertEqual((stored['rate'], stored['source']), (0.5, 'stored'))
+        self.assertEqual((derived['rate'], derived['source']), (8.0, 'derived'))
+        self.assertEqual((fetched['rate'], fetched['source']), (0.8, 'upstream'))
+        self.assertEqual(again['source'], 'stored')
+        self.assertEqual(historical.call_count, 1)
+        self.assertTrue(CurrencyRate.objects.filter(currency_base=self.gbp, currency_target=self.eur).exists())
+
+    def test_lookup_errors(self):
+        """
+        Test that invalid queries are rejected and upstream failures reported.
+        """
+        self.assertEqual(self.lookup('USD', 'XXX').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.lookup('USD', 'EUR', '2009-01-01').status_code, status.HTTP_400_BAD_REQUEST)
+        with mock.patch(HISTORICAL, side_effect=CurrencyAPIError('Unprocessable', 422)):
+            self.assertEqual(self.lookup('GBP', 'EUR').status_code, status.HTTP_404_NOT_FOUND)
+        with mock.patch(HISTORICAL, side_effect=CurrencyAPIError('Service unavailable', 503)):
+            response = self.lookup('GBP', 'EUR')
+        self.assertEqual(response.status_code, status.HTTP_502_BAD_GATEWAY)
+        self.assertEqual(response.json()['detail'], 'Failed to fetch the rate from the currency API.')
+
+    async def test_concurrent_lookups(self):
+        """
+        Test that lookups waiting on the upstream run concurrently on one event loop under ASGI.
+        """
+        in_flight, peak = 0, 0
+
+        async def fetch(base_code, target_codes, history_date):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.05)
+            in_flight -= 1
+            return {code: 0.8 for code in target_codes}
+
+        with mock.patch(HISTORICAL, side_effect=fetch):
+            responses = await asyncio.gather(*(
+                self.async_client.get(self.url, {'currency_base': 'GBP', 'currency_target': 'EUR',
+                                                 'date': f'2023-01-{day:02d}'})
+                for day in range(3, 13)
+            ))
+
+        self.assertEqual({response.status_code for response in responses}, {status.HTTP_200_OK})
+        self.assertEqual({response.json()['source'] for response in responses}, {'upstream'})
+        self.assertGreater(peak, 1)
+        self.assertIn('Server-Timing', responses[0])
+        self.assertEqual(await CurrencyRate.objects.filter(currency_base=self.gbp).acount(), 10)
+
+    def test_convert_fetch_missing(self):
+        """
+        Test that conversions fetch their missing rates on request, one call per source and date.
+        """
+        async def fetch(base_code, target_codes, history_date):
+            return {code: 2.0 for code in target_codes}
+
+        items = [{'amount': 10, 'from': 'GBP', 'to': 'EUR', 'date': '2023-01-02'},
+                 {'amount': 10, 'from': 'GBP', 'to': 'PLN', 'date': '2023-01-02'},
+                 {'amount': 10, 'from': 'USD', 'to': 'EUR', 'date': '2023-01-02'}]
+        with mock.patch(HISTORICAL, side_effect=fetch) as historical:
+            plain = self.client.post(reverse('convert-api'), {'items': items}, content_type='application/json')
+            fetched = self.client.post(reverse('convert-api'), {'items': items, 'fetch_missing': True},
+                                       content_type='application/json')
+
+        self.assertIn('No rate', plain.json()['results'][0]['error'])
+        results = fetched.json()['results']
+        self.assertEqual([result['source'] for result in results], ['upstream', 'upstream', 'direct'])
+        self.assertEqual(results[0]['result'], 20.0)
+        historical.assert_called_once_with('GBP', ['EUR', 'PLN'], date(2023, 1, 2))
+
+
+class ReplicaLookupTest(TransactionTestCase):
+    """
+    Test case for the lookups and conversions reading from a replica that lags behind.
+
+    Methods:
+        setUp(): Set up a replica holding the currencies but no rate.
+        test_stale_replica(): Test that rates stored since the replica sync are not fetched again.
+
+    Example:
+        To run the tests:
+        python manage.py test currencies_exchange.tests.test_rate_lookup
+    """
+
+    def setUp(self):
+        """
+        Set up a replica holding the currencies but no rate, and route the API reads to it.
+        """
+        for code, name in (('USD', 'US Dollar'), ('EUR', 'Euro'), ('PLN', 'Polish Zloty'), ('GBP', 'British Pound')):
+            Currency.objects.create(currency_name=name, currency_symbol=code, currency_code=code)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        replica = os.path.join(directory.name, 'replica.sqlite3')
+        connections['default'].ensure_connection()
+        with sqlite3.connect(replica) as copy:
+            connections['default'].connection.backup(copy)
+        copy.close()
+
+        connections.settings[REPLICA] = {**connections.settings['default'], 'NAME': replica}
+        self.addCleanup(connections.settings.pop, REPLICA)
+        self.addCleanup(connections.__delitem__, REPLICA)
+        self.addCleanup(lambda: connections[REPLICA].close())
+        patcher = mock.patch('currencies_exchange.middleware.replica_reads.replica_available', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_stale_replica(self):
+        """
+        Test that lookups and conversions find the rates fetched since the last sync in the default database.
+        """
+        async def fetch(base_code, target_codes, history_date):
+            return {code: 2.0 for code in target_codes}
+
+        lookup = {'currency_base': 'GBP', 'currency_target': 'EUR', 'date': '2023-01-02'}
+        convert = {'items': [{'amount': 10, 'from': 'GBP', 'to': 'PLN', 'date': '2023-01-02'}], 'fetch_missing': True}
+        sources = []
+        with mock.patch(HISTORICAL, side_effect=fetch) as historical:
+            for _ in range(2):
+                # The fetched results kept for coalescing have expired by the next request
+                FetchLock.objects.all().delete()
+                sources.append(self.client.get(reverse('rate-lookup-api'), lookup).json()['source'])
+                FetchLock.objects.all().delete()
+                sources.append(self.client.post(reverse('convert-api'), convert,
+                                                content_type='application/json').json()['results'][0]['source'])
+
+        self.assertEqual(sources, ['upstream', 'upstream', 'stored', 'direct'])
+        self.assertEqual(historical.call_count, 2)
+        self.assertFalse(CurrencyRate.objects.using(REPLICA).exists())
+        self.assertEqual(CurrencyRate.objects.count(), 2)
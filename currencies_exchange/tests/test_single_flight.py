@@ -0,0 +1,163 @@
+import time
+import asyncio
+import threading
+from unittest import mock
+from datetime import date, timedelta
+from django.db import transaction
+from django.test import TransactionTestCase
+from django.utils.timezone import now
+from currencies_exchange.metrics import registry
+from currencies_exchange.models import FetchLock
+from currencies_exchange.services import CurrencyAPIError, SingleFlight, afetch_historical
+
+ASYNC_HISTORICAL = 'currencies_exchange.services.async_currency_api_client.AsyncCurrencyAPIClient.historical'
+
+
+class SingleFlightTest(TransactionTestCase):
+    """
+    Test case for the coalescing of concurrent identical upstream fetches, outside the
+    transaction of a TestCase in which the FetchLock table is not used.
+
+    Methods:
+        setUp(): Clear the registry and create a flight.
+        wait_for(condition): Wait until a condition holds.
+        coalesced(scope): Return the number of coalesced calls of the flight in a scope.
+        test_threads_share_one_fetch(): Test that waiting threads get the result of the running fetch.
+        test_threads_share_errors(): Test that waiting threads get the error of the running fetch.
+        test_other_process_result(): Test that the result of another process is used.
+        test_expired_lock(): Test that a fetch that never completed is taken over.
+        test_inside_transaction(): Test that the FetchLock table is not used inside a transaction.
+        test_coroutines_share_one_fetch(): Test that coroutines of a loop share one upstream call.
+
+    Example:
+        To run the tests:
+        python manage.py test currencies_exchange.tests.test_single_flight
+    """
+
+    def setUp(self):
+        """
+        Clear the registry and create a flight.
+        """
+        registry.reset()
+        self.flight = SingleFlight('test', poll_interval=0.01)
+
+    def wait_for(self, condition):
+        """
+        Waits up to five seconds until a condition holds.
+        """
+        deadline = time.monotonic() + 5
+        while not condition():
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.005)
+
+    def coalesced(self, scope):
+        """
+        Returns the number of calls of the flight coalesced in the given scope.
+        """
+        return registry.metrics['singleflight_coalesced_total'].get((('flight', 'test'), ('scope', scope)), 0)
+
+    def test_threads_share_one_fetch(self):
+        """
+        Test that threads asking for a key being fetched wait for that fetch instead of calling again.
+        """
+        results = []
+
+        def follower():
+            results.append(self.flight.do('USD:EUR', mock.Mock(side_effect=AssertionError('fetched twice'))))
+
+        def fetch():
+            for thread in threads:
+                thread.start()
+            self.wait_for(lambda: self.coalesced('process') == len(threads))
+            return {'EUR': 0.5}
+
+        threads = [threading.Thread(target=follower) for _ in range(4)]
+        self.assertEqual(self.flight.do('USD:EUR', fetch), {'EUR': 0.5})
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [{'EUR': 0.5}] * 4)
+        self.assertIn('singleflight_fetches_total{flight="test"} 1', registry.render())
+        self.assertIn('singleflight_coalesced_total{flight="test",scope="process"} 4', registry.render())
+        self.assertEqual(FetchLock.objects.get(key='test:USD:EUR').value, '{"EUR": 0.5}')
+
+    def test_threads_share_errors(self):
+        """
+        Test that threads waiting for a failing fetch get its error and that the lock is released.
+        """
+        errors = []
+
+        def follower():
+            try:
+                self.flight.do('USD:EUR', mock.Mock(side_effect=AssertionError('fetched twice')))
+            except CurrencyAPIError as e:
+                errors.append(e)
+
+        def fetch():
+            thread.start()
+            self.wait_for(lambda: self.coalesced('process') == 1)
+            raise CurrencyAPIError('Service unavailable', 503)
+
+        thread = threading.Thread(target=follower)
+        with self.assertRaises(CurrencyAPIError):
+            self.flight.do('USD:EUR', fetch)
+        thread.join()
+
+        self.assertEqual([error.status_code for error in errors], [503])
+        self.assertFalse(FetchLock.objects.exists())
+
+    def test_other_process_result(self):
+        """
+        Test that the result fetched or being fetched by another process is used.
+        """
+        fetch = mock.Mock(return_value={'EUR': 0.1})
+        FetchLock.objects.create(key='test:USD:EUR', value='{"EUR": 0.5}', expires=now() + timedelta(seconds=60))
+        FetchLock.objects.create(key='test:USD:PLN', expires=now() + timedelta(seconds=60))
+
+        def other_process_completes(seconds):
+            FetchLock.objects.filter(key='test:USD:PLN').update(value='{"PLN": 4.0}')
+
+        with mock.patch('currencies_exchange.services.single_flight.time.sleep',
+                        side_effect=other_process_completes) as sleep:
+            self.assertEqual(self.flight.do('USD:EUR', fetch), {'EUR': 0.5})
+            self.assertEqual(self.flight.do('USD:PLN', fetch), {'PLN': 4.0})
+
+        fetch.assert_not_called()
+        sleep.assert_called_once_with(0.01)
+        self.assertEqual(self.coalesced('lock'), 2)
+
+    def test_expired_lock(self):
+        """
+        Test that a fetch whose process did not complete it in time is taken over.
+        """
+        FetchLock.objects.create(key='test:USD:EUR', expires=now() - timedelta(seconds=1))
+
+        self.assertEqual(self.flight.do('USD:EUR', lambda: {'EUR': 0.5}), {'EUR': 0.5})
+        self.assertEqual(FetchLock.objects.get(key='test:USD:EUR').value, '{"EUR": 0.5}')
+
+    def test_inside_transaction(self):
+        """
+        Test that a fetch inside a transaction neither takes a lock nor waits for another process.
+        """
+        FetchLock.objects.create(key='test:USD:PLN', expires=now() + timedelta(seconds=60))
+        with transaction.atomic():
+            self.assertEqual(self.flight.do('USD:EUR', lambda: {'EUR': 0.5}), {'EUR': 0.5})
+            self.assertEqual(self.flight.do('USD:PLN', lambda: {'PLN': 4.0}), {'PLN': 4.0})
+            self.assertEqual(list(FetchLock.objects.values_list('key', 'value')), [('test:USD:PLN', None)])
+        self.assertIn('singleflight_fetches_total{flight="test"} 2', registry.render())
+
+    async def test_coroutines_share_one_fetch(self):
+        """
+        Test that coroutines asking for the same rates at the same time share one upstream call.
+        """
+        async def fetch(base_code, target_codes, history_date):
+            await asyncio.sleep(0.05)
+            return {code: 0.5 for code in target_codes}
+
+        with mock.patch(ASYNC_HISTORICAL, side_effect=fetch) as historical:
+            results = await asyncio.gather(*(afetch_historical('USD', ['EUR'], date(2023, 1, 2)) for _ in range(5)),
+                                           afetch_historical('USD', ['PLN'], date(2023, 1, 2)))
+
+        self.assertEqual(results, [{'EUR': 0.5}] * 5 + [{'PLN': 0.5}])
+        self.assertEqual(historical.call_count, 2)
+        self.assertIn('singleflight_coalesced_total{flight="historical",scope="process"} 4', registry.render())
@@ -0,0 +1,137 @@
+from io import StringIO
+from datetime import date
+from unittest import mock
+from django.test import SimpleTestCase, TestCase
+from django.core.management import call_command
+from currencies_exchange.models import Currency
+from currencies_exchange.services import CurrencyAPIClient, CurrencyAPIError
+from currencies_exchange.standin import LatencyModel, start_server, usd_value
+
+
+class StandinServerTest(SimpleTestCase):
+    """
+    Test case for the local currencyapi stand-in server, called through the real client.
+
+    Methods:
+        serve(**options): Start a stand-in server stopped after the test.
+        api_client(server, **options): Return a client pointed at a stand-in server.
+        test_historical_is_deterministic(): Test that the synthetic rates are reproducible.
+        test_rate_limit_is_retried(): Test that 429 responses are retried after Retry-After.
+        test_quota_and_injected_errors(): Test that the quota and injected errors fail the call.
+        test_validation_and_api_key(): Test the 422 and 401 responses.
+        test_latency_model(): Test the latency specifications.
+
+    Example:
+        To run the tests:
+        python manage.py test currencies_exchange.tests.test_standin
+    """
+
+    def serve(self, **options):
+        """
+        Starts a stand-in server stopped after the test.
+        """
+        server = start_server(currencies=20, **options)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def api_client(self, server, **options):
+        """
+        Returns a client pointed at a stand-in server, without client side rate limiting.
+        """
+        options = {'api_key': 'key', 'max_retries': 0, 'backoff': 0.01, 'rate_limit': 0, **options}
+        return CurrencyAPIClient(base_url=server.url, **options)
+
+    def test_historical_is_deterministic(self):
+        """
+        Test that the same seed returns the same rates and that they are consistent cross rates.
+        """
+        first, second = self.serve(), self.serve()
+        history_date = date(2023, 1, 2)
+        rates = self.api_client(first).historical('AAA', ['USD', 'AAB'], history_date)
+
+        self.assertEqual(rates, self.api_client(second).historical('AAA', ['USD', 'AAB'], history_date))
+        self.assertAlmostEqual(rates['USD'], 1 / usd_value('AAA', history_date))
+        self.assertAlmostEqual(rates['AAB'], usd_value('AAB', history_date) / usd_value('AAA', history_date))
+        self.assertEqual(len(self.api_client(first).currencies()), 20)
+
+    def test_rate_limit_is_retried(self):
+        """
+        Test that requests above the rate limit get a 429 that the client retries after Retry-After.
+        """
+        server = self.serve(rate_limit=20, burst=1)
+        client = self.api_client(server, max_retries=5)
+        for _ in range(3):
+            client.historical('USD', ['AAA'], date(2023, 1, 2))
+
+        self.assertGreater(server.counters['rate_limited'], 0)
+        self.assertEqual(server.counters['served'], 3)
+        self.assertEqual(client.stats()['historical']['retries'], server.counters['rate_limited'])
+
+    def test_quota_and_injected_errors(self):
+        """
+        Test that an exhausted quota and injected errors fail the call with their status codes.
+        """
+        server = self.serve(quota=1)
+        client = self.api_client(server)
+        client.currencies()
+        with self.assertRaises(CurrencyAPIError) as error:
+            client.currencies()
+        self.assertEqual(error.exception.status_code, 429)
+
+        failing = self.serve(error_rate=1.0, error_statuses=(503,))
+        with self.assertRaises(CurrencyAPIError) as error:
+            self.api_client(failing).currencies()
+        self.assertEqual(error.exception.status_code, 503)
+        self.assertEqual(failing.counters['injected_errors'], 1)
+
+    def test_validation_and_api_key(self):
+        """
+        Test that invalid parameters get a 422 and a wrong API key a 401.
+        """
+        server = self.serve(api_key='key')
+        with self.assertRaises(CurrencyAPIError) as error:
+            self.api_client(server).historical('USD', ['AAA'], date(2000, 1, 1))
+        self.assertEqual(error.exception.status_code, 422)
+        with self.assertRaises(CurrencyAPIError) as error:
+            self.api_client(server, api_key='wrong').currencies()
+        self.assertEqual(error.exception.status_code, 401)
+
+    def test_latency_model(self):
+        """
+        Test that latency specifications are parsed and sampled reproducibly.
+        """
+        self.assertEqual(LatencyModel.parse('fixed:20').sample(), 0.02)
+        self.assertEqual(LatencyModel.parse('none').sample(), 0.0)
+        samples = [LatencyModel.parse('lognormal:50:0.5', seed=1).sample() for _ in range(2)]
+        self.assertEqual(samples[0], samples[1])
+        self.assertTrue(0.01 <= LatencyModel.parse('uniform:10:20').sample() <= 0.02)
+        with self.assertRaises(ValueError):
+            LatencyModel.parse('gaussian:1')
+
+
+class StandinIngestTest(TestCase):
+    """
+    Test case for the ingest commands running against the stand-in server.
+
+    Methods:
+        test_pull_currencies(): Test that pull_currencies stores the synthetic currencies.
+
+    Example:
+        To run the tests:
+        python manage.py test currencies_exchange.tests.test_standin
+    """
+
+    def test_pull_currencies(self):
+        """
+        Test that pull_currencies stores every synthetic currency served by the stand-in.
+        """
+        server = start_server(currencies=5)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        client = CurrencyAPIClient(base_url=server.url, rate_limit=0)
+        with mock.patch('currencies_exchange.management.commands.pull_currencies.get_client', return_value=client):
+            call_command('pull_currencies', stdout=StringIO())
+
+        self.assertEqual(sorted(Currency.objects.values_list('currency_code', flat=True)),
+                         ['AAA', 'AAB', 'AAC', 'AAD', 'USD'])
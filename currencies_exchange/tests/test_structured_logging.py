@@ -0,0 +1,146 @@
+import sys
+import json
+import logging
+import tempfile
+from pathlib import Path
+from django.test import SimpleTestCase
+from currencies_exchange.structured_logging import (JSONFormatter, QueueFileHandler, SamplingFilter,
+                                                    SizeAndTimeRotatingFileHandler)
+
+
+def make_record(name='currencies_exchange', level=logging.DEBUG, msg='message %s', args=('a',), **extra):
+    """
+    Returns a log record of the given logger and level with extra attributes.
+    """
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class StructuredLoggingTest(SimpleTestCase):
+    """
+    Test case for the JSON formatter, the sampling filter and the queued rotating file handler.
+
+    Methods:
+        setUp(): Set up a temporary log directory.
+        test_json_formatter(): Test that records are formatted as JSON with their extras.
+        test_sampling_filter(): Test the sampling and rate limit of chatty loggers.
+        test_size_rotation(): Test that the file is rotated once it reaches the size limit.
+        test_newest_backups_kept(): Test that the oldest rotated files are the ones deleted.
+        test_queue_handler(): Test that queued records are written when the handler is closed.
+        test_full_queue_drops(): Test that records are dropped instead of blocking on a full queue.
+
+    Example:
+        To run the tests:
+        python manage.py test currencies_exchange.tests.test_structured_logging
+    """
+
+    def setUp(self):
+        """
+        Set up a temporary log directory.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def test_json_formatter(self):
+        """
+        Test that records are formatted as one JSON object with their extras and exception.
+        """
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            record = make_record(level=logging.ERROR, status_code=500, request=object())
+            record.exc_info = sys.exc_info()
+        data = json.loads(JSONFormatter().format(record))
+
+        self.assertEqual((data['level'], data['logger'], data['message']),
+                         ('ERROR', 'currencies_exchange', 'message a'))
+        self.assertEqual(data['status_code'], 500)
+        self.assertIsInstance(data['request'], str)
+        self.assertIn('ValueError: boom', data['exception'])
+        self.assertTrue(data['time'].endswith('+00:00'))
+
+    def test_sampling_filter(self):
+        """
+        Test that chatty loggers are sampled and rate limited while warnings and other loggers pass.
+        """
+        muted = SamplingFilter(rules={'django.db': {'sample_rate': 0.0}})
+        self.assertFalse(muted.filter(make_record('django.db.backends')))
+        self.assertTrue(muted.filter(make_record('django.db.backends', logging.WARNING)))
+        self.assertTrue(muted.filter(make_record('django.dbx')))
+        self.assertTrue(muted.filter(make_record('django.request')))
+
+        limited = SamplingFilter(rules={'django.db.backends': {'sample_rate': 1.0, 'rate_limit': 2}})
+        kept = [limited.filter(make_record('django.db.backends')) for _ in range(5)]
+        self.assertEqual(kept, [True, True, False, False, False])
+        limited._buckets['django.db.backends'][0] = 1
+        record = make_record('django.db.backends')
+        self.assertTrue(limited.filter(record))
+        self.assertEqual(record.sampled_out, 3)
+
+    def test_size_rotation(self):
+        """
+        Test that the file is rotated with a sequence number once it reaches the size limit.
+        """
+        handler = SizeAndTimeRotatingFileHandler(str(self.directory / 'app.log'), max_bytes=100, backup_count=2)
+        for _ in range(20):
+            handler.emit(make_record(msg='x' * 40, args=()))
+        handler.close()
+
+        names = sorted(path.name for path in self.directory.iterdir())
+        self.assertIn('app.log', names)
+        self.assertEqual(len(names), 3)
+        self.assertLessEqual((self.directory / 'app.log').stat().st_size, 100)
+
+    def test_newest_backups_kept(self):
+        """
+        Test that the backup_count newest rotated files are kept, named in rotation order.
+        """
+        handler = SizeAndTimeRotatingFileHandler(str(self.directory / 'app.log'), max_bytes=200, backup_count=3)
+        for index in range(60):
+            handler.emit(make_record(msg='record %03d ' + 'x' * 40, args=(index,)))
+        handler.close()
+
+        backups = sorted(path for path in self.directory.iterdir() if path.name != 'app.log')
+        self.assertEqual(len(backups), 3)
+        sequences = [int(path.suffix[1:]) for path in backups]
+        self.assertEqual(sequences, list(range(sequences[0], sequences[0] + 3)))
+        lines = [line for path in backups + [self.directory / 'app.log'] for line in path.read_text().splitlines()]
+        numbers = [int(line.split()[1]) for line in lines]
+        self.assertEqual(numbers, list(range(numbers[0], 60)))
+
+    def test_queue_handler(self):
+        """
+        Test that records are formatted on the writer thread and written when the handler is closed.
+        """
+        handler = QueueFileHandler(str(self.directory / 'app.log'))
+        handler.setFormatter(JSONFormatter())
+        logger = logging.getLogger('currencies_exchange.tests.queue')
+        logger.addHandler(handler)
+        self.addCleanup(logger.removeHandler, handler)
+        items = ['a']
+        logger.warning('items %s', items)
+        items.append('b')
+        handler.close()
+
+        lines = (self.directory / 'app.log').read_text().splitlines()
+        self.assertEqual(json.loads(lines[0])['message'], "items ['a']")
+
+    def test_full_queue_drops(self):
+        """
+        Test that records are dropped on a full queue and counted on the next queued record.
+        """
+        handler = QueueFileHandler(str(self.directory / 'app.log'), queue_size=1)
+        self.addCleanup(handler.close)
+        handler.setFormatter(JSONFormatter())
+        handler.listener.stop()
+        for _ in range(3):
+            handler.handle(make_record(level=logging.WARNING))
+        self.assertEqual(handler.dropped, 2)
+
+        handler.listener.start()
+        handler.handle(make_record(level=logging.WARNING))
+        handler.close()
+        lines = [json.loads(line) for line in (self.directory / 'app.log').read_text().splitlines()]
+        self.assertEqual([line.get('dropped_records') for line in lines], [None, 2])
@@ -0,0 +1,175 @@
+import shutil
+import tempfile
+from io import StringIO
+from datetime import date
+from unittest import mock
+from django.db import connection
+from django.test import TestCase
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test.utils import CaptureQueriesContext
+from currencies_exchange.models import Currency, CurrencyRate, TrackedPair
+from currencies_exchange.services import (CurrencyAPIError, build_columnar_snapshot, current_columnar_snapshot,
+                                          find_gaps)
+
+
+class SyncRatesCommandTest(TestCase):
+    """
+    Test case for the gap detection and the sync_rates management command.
+
+    Methods:
+        setUp(): Set up the currencies and tracked pairs used by the tests.
+        store(pair, days): Store rates of a pair for the given days of January 2023.
+        sync(*args): Run the command with the API replaced, returning the upstream calls.
+        test_find_gaps(): Test that the missing ranges are found with one query.
+        test_sync_groups_targets_per_call(): Test that targets missing on the same day share a call.
+        test_sync_is_idempotent(): Test that a second run makes no upstream call.
+        test_failed_call_holds_watermark(): Test that the watermark stops before a failed day.
+        test_empty_day_is_skipped(): Test that a day without an upstream rate does not hold the watermark.
+        test_snapshot_refreshed(): Test that a built columnar snapshot is refreshed with the synced rates.
+        test_track_and_dry_run(): Test tracking new pairs and reporting gaps without fetching.
+
+    Example:
+        To run the tests:
+        python manage.py test currencies_exchange.tests.test_sync_rates
+    """
+
+    def setUp(self):
+        """
+        Set up the currencies and tracked pairs used by the tests.
+        """
+        self.usd = Currency.objects.create(currency_name='US Dollar', currency_symbol='$', currency_code='USD')
+        self.eur = Currency.objects.create(currency_name='Euro', currency_symbol='€', currency_code='EUR')
+        self.pln = Currency.objects.create(currency_name='Polish Zloty', currency_symbol='zł', currency_code='PLN')
+        self.usd_eur = TrackedPair.objects.create(currency_base=self.usd, currency_target=self.eur,
+                                                  start_date=date(2023, 1, 1))
+        self.usd_pln = TrackedPair.objects.create(currency_base=self.usd, currency_target=self.pln,
+                                                  start_date=date(2023, 1, 1))
+
+    def store(self, pair, days):
+        """
+        Stores rates of a pair for the given days of January 2023.
+        """
+        CurrencyRate.objects.bulk_create([
+            CurrencyRate(currency_base=pair.currency_base, currency_target=pair.currency_target, rate=1.5,
+                         history_date=date(2023, 1, day)) for day in days
+        ])
+
+    def sync(self, *args, side_effect=None):
+        """
+        Runs the command up to 2023-01-10 with the API replaced, returning the upstream calls.
+        """
+        def fetch(base_code, target_codes, history_date):
+            return {code: 1.0 + history_date.day / 100 for code in target_codes}
+
+        out = StringIO()
+        with mock.patch('currencies_exchange.services.currency_api_client.CurrencyAPIClient.historical',
+                        side_effect=side_effect or fetch) as historical:
+            call_command('sync_rates', '--end', '2023-01-10', *args, stdout=out)
+        self.output = out.getvalue()
+        return sorted((call.args[0], tuple(call.args[1]), call.args[2]) for call in historical.call_args_list)
+
+    def test_find_gaps(self):
+        """
+        Test that leading, inner and trailing gaps are found with one query.
+        """
+        self.store(self.usd_eur, [3, 4, 5, 8, 9])
+        with CaptureQueriesContext(connection) as queries:
+            gaps = find_gaps([self.usd_eur, self.usd_pln], date(2023, 1, 10))
+
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(gaps[self.usd_eur], [(date(2023, 1, 1), date(2023, 1, 2)),
+                                              (date(2023, 1, 6), date(2023, 1, 7)),
+                                              (date(2023, 1, 10), date(2023, 1, 10))])
+        self.assertEqual(gaps[self.usd_pln], [(date(2023, 1, 1), date(2023, 1, 10))])
+
+        self.usd_eur.synced_through = date(2023, 1, 9)
+        self.assertEqual(find_gaps([self.usd_eur], date(2023, 1, 9)), {})
+
+    def test_sync_groups_targets_per_call(self):
+        """
+        Test that targets missing on the same base and date are fetched in one call.
+        """
+        self.store(self.usd_eur, range(1, 9))
+        self.store(self.usd_pln, range(1, 10))
+        calls = self.sync()
+
+        self.assertEqual(calls, [('USD', ('EUR',), date(2023, 1, 9)),
+                                 ('USD', ('EUR', 'PLN'), date(2023, 1, 10))])
+        self.assertEqual(CurrencyRate.objects.count(), 20)
+        self.usd_eur.refresh_from_db()
+        self.assertEqual(self.usd_eur.synced_through, date(2023, 1, 10))
+        self.assertIsNotNone(self.usd_eur.last_synced_at)
+
+    def test_sync_is_idempotent(self):
+        """
+        Test that a second run finds nothing to do and makes no upstream call.
+        """
+        self.assertEqual(len(self.sync()), 10)
+        with CaptureQueriesContext(connection) as queries:
+            calls = self.sync()
+
+        self.assertEqual(calls, [])
+        self.assertEqual(len(queries), 1)
+        self.assertIn('synced through 2023-01-10', self.output)
+
+    def test_failed_call_holds_watermark(self):
+        """
+        Test that the watermark stops before a day whose call failed and the next run retries it.
+        """
+        def fetch(base_code, target_codes, history_date):
+            if history_date == date(2023, 1, 4):
+                raise CurrencyAPIError('Service unavailable')
+            return {code: 1.1 for code in target_codes}
+
+        self.sync('--pair', 'USD/EUR', side_effect=fetch)
+        self.usd_eur.refresh_from_db()
+        self.assertEqual(self.usd_eur.synced_through, date(2023, 1, 3))
+        self.assertIn('Failed to fetch USD rates for 2023-01-04', self.output)
+
+        self.assertEqual(self.sync('--pair', 'USD/EUR'), [('USD', ('EUR',), date(2023, 1, 4))])
+        self.usd_eur.refresh_from_db()
+        self.assertEqual(self.usd_eur.synced_through, date(2023, 1, 10))
+
+    def test_empty_day_is_skipped(self):
+        """
+        Test that a day the upstream has no rate for is skipped and not fetched again by the next run.
+        """
+        def fetch(base_code, target_codes, history_date):
+            return {} if history_date == date(2023, 1, 4) else {code: 1.1 for code in target_codes}
+
+        self.assertEqual(len(self.sync('--pair', 'USD/EUR', side_effect=fetch)), 10)
+        self.usd_eur.refresh_from_db()
+        self.assertEqual(self.usd_eur.synced_through, date(2023, 1, 10))
+        self.assertIn('Skipped 1 rates the upstream has no value for', self.output)
+        self.assertFalse(CurrencyRate.objects.filter(history_date=date(2023, 1, 4)).exists())
+
+        self.assertEqual(self.sync('--pair', 'USD/EUR', side_effect=fetch), [])
+
+    def test_snapshot_refreshed(self):
+        """
+        Test that a built columnar snapshot is refreshed with the synced rates and stays current.
+        """
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        build_columnar_snapshot(directory)
+        with mock.patch('currencies_exchange.services.columnar_snapshot.RATE_SNAPSHOT_DIR', directory):
+            self.sync()
+            snapshot = current_columnar_snapshot()
+
+        self.assertIn('Refreshed the columnar rate snapshot', self.output)
+        self.assertEqual(len(snapshot), 20)
+        self.assertAlmostEqual(snapshot.lookup(self.usd.pk, self.pln.pk, date(2023, 1, 7)), 1.07)
+
+    def test_track_and_dry_run(self):
+        """
+        Test that pairs can be tracked from the command and gaps reported without fetching.
+        """
+        calls = self.sync('--track', 'eur/pln', '--start', '2023-01-09', '--pair', 'EUR/PLN', '--dry-run')
+
+        self.assertEqual(calls, [])
+        self.assertTrue(TrackedPair.objects.filter(currency_base=self.eur, currency_target=self.pln).exists())
+        self.assertIn('EUR/PLN: 2023-01-09 - 2023-01-10', self.output)
+        self.assertIn('2 API calls needed', self.output)
+        with self.assertRaises(CommandError):
+            self.sync('--track', 'USD/XYZ')
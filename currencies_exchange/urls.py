@@ -1,13 +1,24 @@
+from django.conf import settings
 from django.urls import path
 from django.contrib import admin
 from rest_framework import routers
 
-from currencies_exchange.views import currency_api_views
+from currencies_exchange.views import (convert_api_views, currency_api_views, currency_rate_api_views,
+                                       metrics_views, rate_export_api_views, rate_history_api_views,
+                                       rate_lookup_api_views)
 
 router = routers.DefaultRouter()
 router.register(r'currency', currency_api_views.CurrencyAPIView, basename="Currency")
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('currency/', currency_api_views.CurrencyAPIView.as_view(), name='currency-api')
+    path('currency/', currency_api_views.CurrencyAPIView.as_view(), name='currency-api'),
+    path('rates/', currency_rate_api_views.CurrencyRateAPIView.as_view(), name='currency-rate-api'),
+    path('rates/history/', rate_history_api_views.RateHistoryAPIView.as_view(), name='rate-history-api'),
+    path('rates/lookup/', rate_lookup_api_views.RateLookupAPIView.as_view(), name='rate-lookup-api'),
+    path('rates/export/', rate_export_api_views.RateExportAPIView.as_view(), name='rate-export-api'),
+    path('convert/', convert_api_views.ConvertAPIView.as_view(), name='convert-api'),
 ]
+
+if settings.METRICS_ENABLED:
+    urlpatterns.append(path('metrics', metrics_views.MetricsView.as_view(), name='metrics'))
@@ -1 +1,8 @@
 from .currency_api_views import CurrencyAPIView
+from .currency_rate_api_views import CurrencyRateAPIView
+from .rate_history_api_views import RateHistoryAPIView
+from .convert_api_views import ConvertAPIView
+from .rate_export_api_views import RateExportAPIView
+from .metrics_views import MetricsView
+from .async_api_view import AsyncAPIView
+from .rate_lookup_api_views import RateLookupAPIView
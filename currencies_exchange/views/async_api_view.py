@@ -0,0 +1,76 @@
+from asgiref.sync import iscoroutinefunction
+from django.http import HttpResponse
+from rest_framework.views import APIView
+from currencies_exchange.services import async_client_scope
+
+
+def rendered(response):
+    """
+    Renders a DRF response and returns it as a plain HttpResponse.
+
+    Django renders deferred responses of async views in its single thread for synchronous
+    code, which would serialize every request of the process on that thread.
+
+    Args:
+        response (Response): The finalized DRF response.
+
+    Returns:
+        HttpResponse: The rendered response with the same status and headers.
+    """
+    response.render()
+    plain = HttpResponse(response.content, status=response.status_code)
+    for header, value in response.items():
+        plain[header] = value
+    return plain
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose handlers are coroutines, so that under ASGI they run on the event loop.
+
+    Requests go through the same parsing, content negotiation, exception handling and
+    response finalization as any DRF view, only the handler is awaited. Authentication,
+    permission and throttle checks run on the event loop as well and must not query the
+    database: the views are public and use no authenticators by default. Database work of
+    the handlers goes through the async ORM or sync_to_async(). Under WSGI Django runs the
+    view on a short-lived event loop, so it keeps working, without the concurrency gain;
+    the currencyapi client of that loop is closed with the request (see async_client_scope()).
+
+    Attributes:
+        authentication_classes (list): No authenticators, the session one would query the database.
+
+    Methods:
+        dispatch(request, *args, **kwargs): Awaits the handler of the request method.
+
+    Example:
+        class PingAPIView(AsyncAPIView):
+            async def get(self, request):
+                return Response({'pong': True})
+    """
+
+    authentication_classes = []
+
+    async def dispatch(self, request, *args, **kwargs):
+        """
+        Initializes the request, awaits the handler and returns the rendered response.
+        """
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        async with async_client_scope():
+            try:
+                self.initial(request, *args, **kwargs)
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed) \
+                    if request.method.lower() in self.http_method_names else self.http_method_not_allowed
+                if iscoroutinefunction(handler):
+                    response = await handler(request, *args, **kwargs)
+                else:
+                    response = handler(request, *args, **kwargs)
+            except Exception as exc:
+                response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return rendered(self.response)
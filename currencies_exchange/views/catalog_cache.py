@@ -0,0 +1,68 @@
+import hashlib
+from django.http import HttpResponse
+from django.core.cache import cache
+from django.utils.http import http_date, quote_etag
+from django.utils.cache import get_conditional_response
+from currencies_exchange.models import CatalogVersion
+from currencies_exchange.settings import CATALOG_CACHE_TIMEOUT
+
+
+class CatalogCacheMixin:
+    """
+    Mixin for list views over a versioned catalog.
+
+    Responses carry an ETag and a Last-Modified header derived from the catalog version,
+    so that clients polling an unchanged catalog get a 304. Rendered JSON responses are
+    cached per query string, keyed on the catalog version, so that a bumped version makes
+    every cached response unreachable.
+
+    Attributes:
+        catalog_name (str): The name of the CatalogVersion the view depends on.
+        catalog_cache_timeout (int): The number of seconds rendered responses are cached.
+
+    Methods:
+        list(request, *args, **kwargs): Returns a 304, a cached or a freshly rendered response.
+    """
+
+    catalog_name = None
+    catalog_cache_timeout = CATALOG_CACHE_TIMEOUT
+
+    def list(self, request, *args, **kwargs):
+        """
+        Returns a 304, a cached or a freshly rendered list response.
+        """
+        version, modified = CatalogVersion.current(self.catalog_name)
+        last_modified = int(modified.timestamp()) if modified else None
+        fingerprint = f'{self.catalog_name}:{version}:{modified.timestamp() if modified else 0}'
+        etag = quote_etag(hashlib.md5(
+            f'{fingerprint}:{request.META.get("HTTP_ACCEPT", "")}'.encode()).hexdigest())
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = self.get_cached_response(request, fingerprint, *args, **kwargs)
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def get_cached_response(self, request, fingerprint, *args, **kwargs):
+        """
+        Returns the cached rendering of the request, rendering and caching it on a miss.
+
+        Only JSON responses are cached, the browsable API is rendered on every request.
+        """
+        renderer = request.accepted_renderer
+        if renderer.format != 'json':
+            return super().list(request, *args, **kwargs)
+
+        # Paginated responses hold absolute links, so the host is part of the key
+        query = hashlib.md5(repr((request.get_host(), sorted(request.query_params.lists()))).encode()).hexdigest()
+        key = f'catalog:{hashlib.md5(fingerprint.encode()).hexdigest()}:{query}'
+        cached = cache.get(key)
+        if cached is None:
+            response = super().list(request, *args, **kwargs)
+            content = renderer.render(response.data, request.accepted_media_type, self.get_renderer_context())
+            content_type = f'{renderer.media_type}; charset={renderer.charset}' if renderer.charset else renderer.media_type
+            cached = (content, content_type)
+            cache.set(key, cached, self.catalog_cache_timeout)
+        return HttpResponse(cached[0], content_type=cached[1])
@@ -0,0 +1,47 @@
+from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
+from currencies_exchange.services import aconvert_batch
+from currencies_exchange.settings import CONVERT_MAX_ITEMS
+from .async_api_view import AsyncAPIView
+
+
+class ConvertAPIView(AsyncAPIView):
+    """
+    Async API view converting a batch of amounts between currencies at historical dates.
+
+    All rates of the batch are read with one grouped query. A pair without a stored rate is
+    converted through its reverse pair or through the pivot currency, see convert_batch().
+    With ``"fetch_missing": true`` the rates still missing are fetched from the external API
+    concurrently without holding a worker thread, see aconvert_batch().
+
+    Attributes:
+        replica_reads (bool): Conversions read from the replica despite being a POST, the
+            rates to fetch are checked against the default database first.
+
+    Methods:
+        post(request): Converts the items of the request body.
+
+    Example:
+        To convert 100 USD to EUR and 50 EUR to PLN:
+        POST /convert/
+        {"items": [{"amount": 100, "from": "USD", "to": "EUR", "date": "2023-01-02"},
+                   {"amount": 50, "from": "EUR", "to": "PLN", "date": "2023-01-02"}]}
+    """
+
+    replica_reads = True
+
+    async def post(self, request):
+        """
+        Converts the items of the request body, fetching the missing rates when requested.
+
+        Returns:
+            Response: One result per item, in order, each holding the rate and converted
+                amount or an error message.
+        """
+        items = request.data.get('items') if isinstance(request.data, dict) else None
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            raise ValidationError({'items': 'Expected a list of {amount, from, to, date} objects'})
+        if len(items) > CONVERT_MAX_ITEMS:
+            raise ValidationError({'items': f'At most {CONVERT_MAX_ITEMS} items are allowed per request'})
+        results = await aconvert_batch(items, fetch_missing=request.data.get('fetch_missing') is True)
+        return Response({'results': results})
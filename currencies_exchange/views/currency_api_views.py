@@ -1,17 +1,23 @@
-from rest_framework import filters, generics
-from currencies_exchange.models import Currency
-from currencies_exchange.filters import CurrencyFilter
+from rest_framework import generics
+from .fast_list import FastListMixin
+from .catalog_cache import CatalogCacheMixin
+from currencies_exchange.models import CatalogVersion, Currency
+from currencies_exchange.filters import CurrencyFilter, CurrencyOrderingFilter, CurrencySearchFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from currencies_exchange.serializers import CurrencySerializer
 
 
-class CurrencyAPIView(generics.ListAPIView):
+class CurrencyAPIView(CatalogCacheMixin, FastListMixin, generics.ListAPIView):
     """
     API view for retrieving a list of all currencies.
 
-    This view supports filtering, searching, and ordering of currencies.
+    This view supports filtering, searching, and ordering of currencies. Searches are served
+    by the currency search index and ordered by relevance unless an ordering is requested. Responses are
+    validated with ETag/Last-Modified headers and cached based on the currency catalog version.
+    Pages are read as value rows (see FastListMixin) rather than model instances.
 
     Attributes:
+        catalog_name (str): The catalog version the cached responses depend on.
         serializer_class (class): The serializer class used to serialize currency objects.
         filter_backends (list): The list of filter backends applied to the view.
         filterset_class (class): The filter class used for filtering the queryset.
@@ -27,8 +33,9 @@ class CurrencyAPIView(generics.ListAPIView):
         GET /api/currencies/
     """
 
+    catalog_name = CatalogVersion.CURRENCY
     serializer_class = CurrencySerializer
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, CurrencySearchFilter, CurrencyOrderingFilter]
     filterset_class = CurrencyFilter
     search_fields = ['currency_name', 'currency_symbol', 'currency_code']
     ordering_fields = '__all__'
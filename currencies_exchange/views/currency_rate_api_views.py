@@ -0,0 +1,44 @@
+from rest_framework import filters, generics
+from .fast_list import FastListMixin
+from currencies_exchange.models import CurrencyRate
+from currencies_exchange.filters import CurrencyRateFilter
+from django_filters.rest_framework import DjangoFilterBackend
+from currencies_exchange.serializers import CurrencyRateSerializer
+
+
+class CurrencyRateAPIView(FastListMixin, generics.ListAPIView):
+    """
+    API view for retrieving a cursor paginated list of historical rates.
+
+    This view supports filtering by currency codes and date range, and ordering by history date.
+    Pages are read as value rows with the currency codes joined in (see FastListMixin).
+
+    Attributes:
+        serializer_class (class): The serializer class used to serialize rate objects.
+        filter_backends (list): The list of filter backends applied to the view.
+        filterset_class (class): The filter class used for filtering the queryset.
+        ordering_fields (list): The fields on which ordering is allowed.
+        ordering (list): The default ordering applied to the queryset.
+
+    Methods:
+        get_queryset(): Retrieves the queryset of all rates.
+
+    Example:
+        To retrieve the USD/EUR rates of 2023, newest first:
+        GET /rates/?currency_base=USD&currency_target=EUR&date_from=2023-01-01&ordering=-history_date
+    """
+
+    serializer_class = CurrencyRateSerializer
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_class = CurrencyRateFilter
+    ordering_fields = ['history_date', 'id']
+    ordering = ['history_date', 'id']
+
+    def get_queryset(self):
+        """
+        Retrieves the queryset of all rates, the currency codes are joined in by the value rows.
+
+        Returns:
+            queryset: The queryset containing all rate objects.
+        """
+        return CurrencyRate.objects.all()
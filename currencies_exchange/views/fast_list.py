@@ -0,0 +1,35 @@
+from rest_framework.response import Response
+from currencies_exchange.serializers import serialize_values, values_fields
+
+
+class FastListMixin:
+    """
+    Mixin serving list responses from flat value rows instead of model instances.
+
+    The list queryset is read with ``values_list()`` over the lookups of the serializer
+    fields, so related fields are joined in the query and no model instance or serializer
+    field is built per row. The rows are turned into dicts and handed to the renderer as
+    they are, which needs the serializer fields to be plain read values (see
+    serializers.values_fields). The ordering fields of the paginator are fetched too, so
+    that the cursor positions can be read from the rows.
+
+    Methods:
+        list(request, *args, **kwargs): Returns the paginated list of value rows.
+    """
+
+    def list(self, request, *args, **kwargs):
+        """
+        Returns the paginated list of value rows.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        names, lookups = values_fields(self.get_serializer_class())
+        if self.paginator is not None and hasattr(self.paginator, 'get_ordering'):
+            for field in self.paginator.get_ordering(request, queryset, self):
+                if field.lstrip('-') not in lookups:
+                    lookups = lookups + [field.lstrip('-')]
+        rows = queryset.values_list(*lookups, named=True)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serialize_values(page, names))
+        return Response(serialize_values(rows, names))
@@ -0,0 +1,24 @@
+from django.views import View
+from django.http import HttpResponse
+from currencies_exchange.metrics import registry
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class MetricsView(View):
+    """
+    View rendering the request and upstream metrics of the process for Prometheus.
+
+    Methods:
+        get(request, *args, **kwargs): Returns the metrics in the Prometheus text format.
+
+    Example:
+        To scrape the metrics:
+        GET /metrics
+    """
+
+    def get(self, request, *args, **kwargs):
+        """
+        Returns the metrics in the Prometheus text format.
+        """
+        return HttpResponse(registry.render(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,49 @@
+from rest_framework.views import APIView
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+from currencies_exchange.models import CurrencyRate
+from currencies_exchange.filters import CurrencyRateFilter
+from currencies_exchange.services import EXPORT_FORMATS, export_rates
+
+
+class RateExportAPIView(APIView):
+    """
+    API view streaming the rate history as a CSV or NDJSON file.
+
+    The rates are read in chunks and encoded while the response is sent, so the memory
+    used does not depend on the number of exported rates. The rates can be filtered like
+    the /rates/ list and the file can be gzipped.
+
+    Methods:
+        get(request): Streams the filtered rates.
+
+    Example:
+        To download the gzipped USD rates of 2023 as NDJSON:
+        GET /rates/export/?currency_base=USD&date_from=2023-01-01&date_to=2023-12-31&output=ndjson&gzip=true
+    """
+
+    def get(self, request):
+        """
+        Streams the filtered rates.
+
+        Returns:
+            StreamingHttpResponse: The exported file, as an attachment.
+        """
+        filterset = CurrencyRateFilter(request.query_params, queryset=CurrencyRate.objects.all())
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        export_format = request.query_params.get('output', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError({'output': f'Expected one of {", ".join(EXPORT_FORMATS)}'})
+        compress = request.query_params.get('gzip', '').lower() in ('1', 'true', 'yes')
+
+        content_type, extension = EXPORT_FORMATS[export_format]
+        filename = f'rates.{extension}'
+        if compress:
+            content_type, filename = 'application/gzip', f'{filename}.gz'
+        # The rows are read after the response is returned, so the database is chosen now
+        queryset = filterset.qs
+        response = StreamingHttpResponse(export_rates(queryset.using(queryset.db), export_format, compress),
+                                         content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
@@ -0,0 +1,53 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
+from currencies_exchange.models import Currency
+from currencies_exchange.services import downsample, pair_series
+from currencies_exchange.serializers import RateHistoryQuerySerializer
+
+SERIES_FIELDS = ['period', 'open', 'high', 'low', 'close', 'mean', 'count']
+
+
+class RateHistoryAPIView(APIView):
+    """
+    API view returning the rate history of a currency pair, optionally downsampled.
+
+    The rates of the pair are sliced out of the columnar snapshot when it is current, else
+    read as flat (date, rate) tuples through the covering pair index (see pair_series()),
+    and aggregated into open/high/low/close/mean buckets in one vectorized pass.
+
+    Methods:
+        get(request): Returns the series of the requested pair, date range and resolution.
+
+    Example:
+        To retrieve the weekly USD/EUR series of 2023:
+        GET /rates/history/?currency_base=USD&currency_target=EUR&date_from=2023-01-01&date_to=2023-12-31&resolution=week
+    """
+
+    def get(self, request):
+        """
+        Returns the series of the requested pair, date range and resolution.
+
+        Returns:
+            Response: The pair, the resolution and one series entry per bucket.
+        """
+        query = RateHistoryQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        codes = [params['currency_base'], params['currency_target']]
+        currency_ids = dict(Currency.objects.filter(currency_code__in=codes).values_list('currency_code', 'id'))
+        unknown = [code for code in codes if code not in currency_ids]
+        if unknown:
+            raise ValidationError({'currency': f'Unknown currency codes: {", ".join(unknown)}'})
+
+        dates, rates = pair_series(currency_ids[codes[0]], currency_ids[codes[1]], params.get('date_from'),
+                                   params.get('date_to'))
+        series = downsample(dates, rates, params['resolution'])
+        columns = [series[field].tolist() for field in SERIES_FIELDS]
+        return Response({
+            'currency_base': codes[0],
+            'currency_target': codes[1],
+            'resolution': params['resolution'],
+            'series': [dict(zip(SERIES_FIELDS, values)) for values in zip(*columns)],
+        })
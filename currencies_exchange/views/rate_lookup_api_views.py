@@ -0,0 +1,67 @@
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.exceptions import APIException, NotFound, ValidationError
+from currencies_exchange.models import Currency
+from currencies_exchange.services import CurrencyAPIError, alookup_rate
+from currencies_exchange.serializers import RateLookupQuerySerializer
+from .async_api_view import AsyncAPIView
+
+
+class UpstreamUnavailable(APIException):
+    """
+    Raised when a rate has to be fetched and the external currency API call fails.
+    """
+    status_code = status.HTTP_502_BAD_GATEWAY
+    default_detail = 'Failed to fetch the rate from the currency API.'
+    default_code = 'upstream_unavailable'
+
+
+class RateLookupAPIView(AsyncAPIView):
+    """
+    Async API view returning the rate of a currency pair on a date, fetching it when unknown.
+
+    The rate is read from the database, else derived from the pivot currency, else fetched
+    from the external API and stored, see alookup_rate(). Under ASGI a lookup waiting for
+    the upstream only holds a coroutine, so one worker keeps serving other requests.
+
+    Methods:
+        get(request): Returns the rate of the requested pair and date.
+
+    Example:
+        To retrieve the USD/EUR rate of 2023-01-02:
+        GET /rates/lookup/?currency_base=USD&currency_target=EUR&date=2023-01-02
+    """
+
+    async def get(self, request):
+        """
+        Returns the rate of the requested pair and date.
+
+        Returns:
+            Response: The pair, the date, the rate and its source ('stored', 'derived' or 'upstream').
+        """
+        query = RateLookupQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        codes = [params['currency_base'], params['currency_target']]
+        currencies = {currency.currency_code: currency
+                      async for currency in Currency.objects.filter(currency_code__in=codes)}
+        unknown = [code for code in codes if code not in currencies]
+        if unknown:
+            raise ValidationError({'currency': f'Unknown currency codes: {", ".join(unknown)}'})
+
+        try:
+            rate, source = await alookup_rate(currencies[codes[0]], currencies[codes[1]], params['date'])
+        except CurrencyAPIError as e:
+            if e.status_code == 422:
+                raise NotFound(f'No rate for {codes[0]}/{codes[1]} on {params["date"]}')
+            raise UpstreamUnavailable()
+        if rate is None:
+            raise NotFound(f'No rate for {codes[0]}/{codes[1]} on {params["date"]}')
+        return Response({
+            'currency_base': codes[0],
+            'currency_target': codes[1],
+            'date': params['date'],
+            'rate': rate,
+            'source': source,
+        })
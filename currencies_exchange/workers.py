@@ -0,0 +1,36 @@
+"""
+Entry point of the rate fetch worker processes started by ``manage.py run_workers --processes``.
+
+Worker processes are spawned rather than forked, so that they do not inherit the
+database connections and the logging thread of the command. A spawned process imports
+its target before Django is set up, so this module only imports Django once it is.
+"""
+
+import signal
+
+
+def run_worker_process(stop, results, batch_size, poll_interval, once):
+    """
+    Sets Django up, runs a worker until stopped and sends its counters back.
+
+    Interrupts are left to the parent, which stops the workers between two batches.
+
+    Args:
+        stop (multiprocessing.Event): Stops the worker once set.
+        results (multiprocessing.Queue): Receives the counters of the worker as a dict.
+        batch_size (int): The maximum number of jobs per batch.
+        poll_interval (float): The seconds to wait when no job is due.
+        once (bool): Whether to stop as soon as no job is due.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    import django
+    django.setup()
+
+    from django.db import connections
+    from currencies_exchange.services import work
+
+    try:
+        result = work(stop, batch_size, poll_interval, once)
+    finally:
+        connections.close_all()
+    results.put(result.as_dict())